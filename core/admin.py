@@ -5,6 +5,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.safestring import mark_safe
 
 from core.models.company import Company
+from core.models.jobs import BackgroundJob
 
 
 
@@ -175,4 +176,54 @@ class CompanyAdmin(admin.ModelAdmin):
         actions = super().get_actions(request)
         if 'delete_selected' in actions:
             del actions['delete_selected']
-        return actions
\ No newline at end of file
+        return actions
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    """
+    Background jobs - read-only monitoring
+
+    Jobs are created by services and processed by `manage.py run_jobs`.
+    """
+
+    list_display = [
+        'id', 'job_type', 'status', 'ordering_key', 'attempts',
+        'max_attempts', 'run_after', 'finished_at', 'created_at'
+    ]
+
+    list_filter = ['status', 'job_type']
+
+    search_fields = ['ordering_key', 'idempotency_key', 'last_error']
+
+    readonly_fields = [
+        'job_type', 'payload', 'status', 'ordering_key', 'idempotency_key',
+        'attempts', 'max_attempts', 'run_after', 'locked_by', 'locked_at', 'lease_expires_at',
+        'started_at', 'finished_at', 'result', 'completed_steps', 'last_error', 'created_by', 'created_at'
+    ]
+
+    actions = ['retry_jobs', 'cancel_jobs']
+
+    def has_add_permission(self, request):
+        return False
+
+    def retry_jobs(self, request, queryset):
+        """Return failed jobs to the queue"""
+        from django.utils import timezone
+
+        count = queryset.filter(status=BackgroundJob.FAILED).update(
+            status=BackgroundJob.PENDING,
+            attempts=0,
+            run_after=timezone.now(),
+            finished_at=None
+        )
+        self.message_user(request, f'{count} jobs queued for retry')
+
+    retry_jobs.short_description = _('Retry failed jobs')
+
+    def cancel_jobs(self, request, queryset):
+        """Give up on failed jobs - unblocks younger jobs with the same ordering key"""
+        count = queryset.filter(status=BackgroundJob.FAILED).update(status=BackgroundJob.CANCELLED)
+        self.message_user(request, f'{count} jobs cancelled')
+
+    cancel_jobs.short_description = _('Cancel failed jobs')
@@ -0,0 +1,66 @@
+# core/management/commands/run_jobs.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from core.services.job_queue import JobQueue
+
+
+class Command(BaseCommand):
+    help = 'Process background jobs (post-transition actions etc.)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue once and exit'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the queue is empty (default: 2)'
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            help='Exit after processing this many jobs'
+        )
+        parser.add_argument(
+            '--worker-id',
+            help='Worker name stored on claimed jobs (default: host:pid)'
+        )
+
+    def handle(self, *args, **options):
+        JobQueue.autodiscover()
+
+        worker_id = options['worker_id'] or JobQueue.default_worker_id()
+        max_jobs = options['max_jobs']
+        processed = 0
+
+        self.stdout.write(
+            f"Worker {worker_id} started, handlers: {', '.join(sorted(JobQueue.HANDLERS)) or '-'}"
+        )
+
+        try:
+            while True:
+                JobQueue.requeue_stale()
+
+                limit = max_jobs - processed if max_jobs else None
+                stats = JobQueue.run_pending(worker_id=worker_id, limit=limit)
+                processed += stats['processed']
+
+                if stats['processed']:
+                    self.stdout.write(
+                        f"  {stats['succeeded']} succeeded, {stats['failed']} failed"
+                    )
+
+                if options['once'] or (max_jobs and processed >= max_jobs):
+                    break
+                if not stats['processed']:
+                    time.sleep(options['sleep'])
+
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted')
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs"))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_cache_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='completed_steps',
+            field=models.JSONField(blank=True, default=list, help_text='Non-transactional side effects already performed (e.g. emails) - skipped on retry', verbose_name='Completed Steps'),
+        ),
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, help_text='Extended by the running worker; an expired lease returns the job to the queue', null=True, verbose_name='Lease Expires At'),
+        ),
+        migrations.AlterField(
+            model_name='backgroundjob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=10, verbose_name='Status'),
+        ),
+    ]
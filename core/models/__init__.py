@@ -6,10 +6,14 @@ Contains fundamental business models that affect entire system:
 - Company: System-wide settings including VAT registration
 - DecimalPrecisionConfig: Decimal precision configuration for Bulgarian tax compliance
 - Field classes: Standardized decimal field definitions
+- BackgroundJob: Database-backed job queue for deferred side effects
+- CacheVersion: Cross-process version counters for in-process caches
 """
 
 from .company import Company, CompanyManager
 from .decimal_config import DecimalPrecisionConfig
+from .jobs import BackgroundJob, BackgroundJobManager
+from .cache_versions import CacheVersion
 from .fields import (
     CurrencyField, CostPriceField, QuantityField, 
     PercentageField, VATRateField, ExchangeRateField,
@@ -21,6 +25,9 @@ __all__ = [
     'Company',
     'CompanyManager',
     'DecimalPrecisionConfig',
+    'BackgroundJob',
+    'BackgroundJobManager',
+    'CacheVersion',
     # Field classes
     'CurrencyField', 
     'CostPriceField',
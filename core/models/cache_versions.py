@@ -0,0 +1,29 @@
+# core/models/cache_versions.py
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class CacheVersion(models.Model):
+    """
+    Версия на in-process кеш (price books, barcode index, workflow specs)
+
+    Брояч в базата, споделен от всички процеси - увеличава се в
+    транзакцията на промяната и другите worker-и го виждат след commit.
+    Виж core.services.version_stamp.VersionStamp.
+    """
+
+    key = models.CharField(
+        _('Key'),
+        max_length=200,
+        unique=True,
+        help_text=_('Cache namespace and scope, e.g. price_book:12:3')
+    )
+    version = models.PositiveBigIntegerField(_('Version'), default=0)
+    updated_at = models.DateTimeField(_('Updated At'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('Cache Version')
+        verbose_name_plural = _('Cache Versions')
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
@@ -0,0 +1,143 @@
+# core/models/jobs.py
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class BackgroundJobManager(models.Manager):
+    """Manager for background jobs"""
+
+    def pending(self):
+        return self.filter(status=BackgroundJob.PENDING)
+
+    def due(self, now=None):
+        """Pending jobs whose run_after has passed"""
+        return self.pending().filter(run_after__lte=now or timezone.now())
+
+    def for_ordering_key(self, ordering_key: str):
+        return self.filter(ordering_key=ordering_key).order_by('id')
+
+    def unfinished(self):
+        return self.filter(status__in=[BackgroundJob.PENDING, BackgroundJob.RUNNING])
+
+    def blocking(self):
+        """Jobs that hold back younger jobs with the same ordering_key (failed until resolved)"""
+        return self.filter(status__in=[BackgroundJob.PENDING, BackgroundJob.RUNNING, BackgroundJob.FAILED])
+
+
+class BackgroundJob(models.Model):
+    """
+    Database-backed background job
+
+    Jobs are processed by the run_jobs management command. Jobs sharing
+    an ordering_key run strictly in id order - a job is not claimed while
+    an older job with the same key is still pending, running or failed
+    (until it is retried or cancelled from the admin).
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    STATUS_CHOICES = [
+        (PENDING, _('Pending')),
+        (RUNNING, _('Running')),
+        (DONE, _('Done')),
+        (FAILED, _('Failed')),
+        (CANCELLED, _('Cancelled')),
+    ]
+
+    job_type = models.CharField(
+        _('Job Type'),
+        max_length=100,
+        help_text=_('Registered handler name, e.g. document.post_transition')
+    )
+    payload = models.JSONField(
+        _('Payload'),
+        default=dict,
+        blank=True
+    )
+
+    status = models.CharField(
+        _('Status'),
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+
+    # === ORDERING & IDEMPOTENCY ===
+    ordering_key = models.CharField(
+        _('Ordering Key'),
+        max_length=150,
+        blank=True,
+        help_text=_('Jobs with the same key run one at a time in creation order')
+    )
+    idempotency_key = models.CharField(
+        _('Idempotency Key'),
+        max_length=255,
+        null=True,
+        blank=True,
+        unique=True,
+        help_text=_('Enqueuing twice with the same key returns the existing job')
+    )
+
+    # === RETRIES ===
+    attempts = models.PositiveSmallIntegerField(_('Attempts'), default=0)
+    max_attempts = models.PositiveSmallIntegerField(_('Max Attempts'), default=5)
+    run_after = models.DateTimeField(
+        _('Run After'),
+        default=timezone.now,
+        help_text=_('Job is not claimed before this moment (retry backoff)')
+    )
+
+    # === EXECUTION ===
+    locked_by = models.CharField(_('Locked By'), max_length=100, blank=True)
+    locked_at = models.DateTimeField(_('Locked At'), null=True, blank=True)
+    lease_expires_at = models.DateTimeField(
+        _('Lease Expires At'),
+        null=True,
+        blank=True,
+        help_text=_('Extended by the running worker; an expired lease returns the job to the queue')
+    )
+    started_at = models.DateTimeField(_('Started At'), null=True, blank=True)
+    finished_at = models.DateTimeField(_('Finished At'), null=True, blank=True)
+    result = models.JSONField(_('Result'), null=True, blank=True)
+    completed_steps = models.JSONField(
+        _('Completed Steps'),
+        default=list,
+        blank=True,
+        help_text=_('Non-transactional side effects already performed (e.g. emails) - skipped on retry')
+    )
+    last_error = models.TextField(_('Last Error'), blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='background_jobs',
+        verbose_name=_('Created By')
+    )
+    created_at = models.DateTimeField(_('Created At'), auto_now_add=True)
+
+    objects = BackgroundJobManager()
+
+    class Meta:
+        verbose_name = _('Background Job')
+        verbose_name_plural = _('Background Jobs')
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+            models.Index(fields=['ordering_key', 'status']),
+            models.Index(fields=['job_type', 'status']),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.job_type} [{self.status}]"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.DONE, self.FAILED, self.CANCELLED)
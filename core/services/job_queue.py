@@ -0,0 +1,499 @@
+# core/services/job_queue.py
+"""
+Database-backed job queue
+
+No external broker - jobs live in core.BackgroundJob and are processed by
+`python manage.py run_jobs`. Handlers are registered per job_type in
+`<app>/jobs.py` modules (autodiscovered by the worker).
+
+Guarantees:
+- Handler + completion mark run in one transaction (DB effects are exactly-once);
+  handlers registered with atomic=False commit their own work (e.g. per
+  batch) and must be safe to re-run
+- A running job holds a lease its worker keeps extending; only an expired
+  lease returns it to the queue, and a worker that lost its lease cannot
+  complete the job
+- Non-transactional steps (emails) run after commit and are recorded in
+  completed_steps, so retries do not repeat them
+- Jobs with the same ordering_key run one at a time, in creation order; a
+  failed job blocks its key until it is retried or cancelled
+- Failed jobs are retried with exponential backoff up to max_attempts
+- Enqueuing with an existing idempotency_key returns the existing job
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from core.utils.result import Result
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    """The job was requeued and claimed elsewhere while this worker ran it"""
+
+
+class _LeaseKeeper(threading.Thread):
+    """Extends a running job's lease from a side thread (own DB connection)"""
+
+    def __init__(self, job_id: int, worker_id: str):
+        super().__init__(name=f'job-lease-{job_id}', daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stopped = threading.Event()
+
+    def run(self):
+        from core.models import BackgroundJob
+
+        try:
+            while not self._stopped.wait(JobQueue.HEARTBEAT_INTERVAL.total_seconds()):
+                try:
+                    extended = BackgroundJob.objects.filter(
+                        pk=self.job_id, status=BackgroundJob.RUNNING, locked_by=self.worker_id
+                    ).update(lease_expires_at=timezone.now() + JobQueue.LEASE_DURATION)
+                except DatabaseError as e:
+                    logger.warning(f"⚠️ Could not extend lease of job #{self.job_id}: {e}")
+                    continue
+                if not extended:
+                    break
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class JobQueue:
+    """Enqueue, claim and run BackgroundJob rows"""
+
+    HANDLERS: Dict[str, Callable] = {}
+    NON_ATOMIC: Set[str] = set()
+
+    RETRY_BASE_DELAY = timedelta(seconds=30)
+    RETRY_MAX_DELAY = timedelta(hours=1)
+    LEASE_DURATION = timedelta(minutes=2)
+    HEARTBEAT_INTERVAL = timedelta(seconds=30)
+    CLAIM_WINDOW = 20
+
+    _discovered = False
+
+    # =====================================================
+    # REGISTRATION
+    # =====================================================
+
+    @classmethod
+    def register(cls, job_type: str, atomic: bool = True):
+        """
+        Decorator registering a handler for job_type
+
+        The handler receives the BackgroundJob and may return a Result
+        (error → retry) or a JSON-serializable dict stored as job.result.
+        atomic=False: the handler runs outside the job transaction and
+        commits its own work - for long idempotent passes whose locks must
+        not be held until the whole job commits.
+        """
+        def decorator(func):
+            cls.HANDLERS[job_type] = func
+            if atomic:
+                cls.NON_ATOMIC.discard(job_type)
+            else:
+                cls.NON_ATOMIC.add(job_type)
+            return func
+        return decorator
+
+    @classmethod
+    def autodiscover(cls):
+        """Import jobs.py from every installed app"""
+        if not cls._discovered:
+            autodiscover_modules('jobs')
+            cls._discovered = True
+
+    @classmethod
+    def get_handler(cls, job_type: str) -> Optional[Callable]:
+        if job_type not in cls.HANDLERS:
+            cls.autodiscover()
+        return cls.HANDLERS.get(job_type)
+
+    # =====================================================
+    # ENQUEUE
+    # =====================================================
+
+    @staticmethod
+    def enqueue(job_type: str, payload: Optional[Dict] = None, ordering_key: str = '',
+                idempotency_key: Optional[str] = None, max_attempts: int = 5,
+                delay: Optional[timedelta] = None, created_by=None):
+        """
+        Add a job to the queue
+
+        Call inside the caller's transaction - the job becomes visible to
+        workers only when that transaction commits.
+        """
+        from core.models import BackgroundJob
+
+        if idempotency_key:
+            existing = BackgroundJob.objects.filter(idempotency_key=idempotency_key).first()
+            if existing:
+                logger.debug(f"Job {idempotency_key} already queued as #{existing.pk}")
+                return existing
+
+        job = BackgroundJob(
+            job_type=job_type,
+            payload=payload or {},
+            ordering_key=ordering_key,
+            idempotency_key=idempotency_key,
+            max_attempts=max_attempts,
+            run_after=timezone.now() + (delay or timedelta(0)),
+            created_by=created_by if getattr(created_by, 'pk', None) else None,
+        )
+
+        try:
+            with transaction.atomic():
+                job.save()
+        except IntegrityError:
+            # Concurrent enqueue with the same idempotency key
+            return BackgroundJob.objects.get(idempotency_key=idempotency_key)
+
+        logger.info(f"📥 Queued job #{job.pk} {job_type} ({ordering_key or 'unordered'})")
+        return job
+
+    @staticmethod
+    def enqueue_batch(job_type: str, jobs: List[Dict], max_attempts: int = 5, created_by=None) -> List:
+        """
+        Add many jobs of one type - one lookup of idempotency keys, one INSERT
+
+        jobs: dicts with payload, ordering_key and idempotency_key (same
+        meaning as in enqueue). Keys that are already queued return the
+        existing job. Jobs are returned in input order.
+        """
+        from core.models import BackgroundJob
+
+        keys = [spec['idempotency_key'] for spec in jobs if spec.get('idempotency_key')]
+        known = {
+            job.idempotency_key: job
+            for job in BackgroundJob.objects.filter(idempotency_key__in=keys)
+        } if keys else {}
+
+        run_after = timezone.now()
+        queued, new_jobs = [], []
+        for spec in jobs:
+            key = spec.get('idempotency_key')
+            if key and key in known:
+                queued.append(known[key])
+                continue
+
+            job = BackgroundJob(
+                job_type=job_type,
+                payload=spec.get('payload') or {},
+                ordering_key=spec.get('ordering_key', ''),
+                idempotency_key=key,
+                max_attempts=max_attempts,
+                run_after=run_after,
+                created_by=created_by if getattr(created_by, 'pk', None) else None,
+            )
+            if key:
+                known[key] = job
+            new_jobs.append(job)
+            queued.append(job)
+
+        if not new_jobs:
+            return queued
+
+        try:
+            with transaction.atomic():
+                BackgroundJob.objects.bulk_create(new_jobs)
+        except IntegrityError:
+            # Concurrent enqueue of one of the keys - fall back to one by one
+            return [
+                JobQueue.enqueue(job_type, max_attempts=max_attempts, created_by=created_by, **spec)
+                for spec in jobs
+            ]
+
+        logger.info(f"📥 Queued {len(new_jobs)} {job_type} jobs")
+        return queued
+
+    # =====================================================
+    # WORKER API
+    # =====================================================
+
+    @staticmethod
+    def default_worker_id() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def claim_next(worker_id: str):
+        """
+        Claim the oldest due job whose ordering_key is not blocked
+
+        Claiming is a conditional UPDATE (status=pending → running), so
+        concurrent workers never run the same job. An older pending, running
+        or failed job with the same ordering_key blocks the claim.
+        """
+        from core.models import BackgroundJob
+
+        now = timezone.now()
+        blocked = BackgroundJob.objects.blocking().filter(
+            ordering_key=OuterRef('ordering_key'),
+            id__lt=OuterRef('id')
+        ).exclude(ordering_key='')
+
+        candidates = BackgroundJob.objects.due(now).filter(
+            ~Exists(blocked)
+        ).order_by('id').values_list('id', flat=True)[:JobQueue.CLAIM_WINDOW]
+
+        for job_id in candidates:
+            claimed = BackgroundJob.objects.filter(
+                pk=job_id, status=BackgroundJob.PENDING
+            ).update(
+                status=BackgroundJob.RUNNING,
+                locked_by=worker_id,
+                locked_at=now,
+                lease_expires_at=now + JobQueue.LEASE_DURATION,
+                started_at=now,
+                attempts=F('attempts') + 1
+            )
+            if claimed:
+                return BackgroundJob.objects.get(pk=job_id)
+
+        return None
+
+    @staticmethod
+    def run(job) -> bool:
+        """
+        Execute a claimed job
+
+        Returns:
+            bool: True when the job finished successfully
+        """
+        handler = JobQueue.get_handler(job.job_type)
+        if handler is None:
+            JobQueue._mark_failed(job, f"No handler registered for {job.job_type}", final=True)
+            return False
+
+        keeper = _LeaseKeeper(job.pk, job.locked_by)
+        keeper.start()
+        try:
+            if job.job_type in JobQueue.NON_ATOMIC:
+                # Commits its own work - only the completion mark is transactional
+                outcome = handler(job)
+                with transaction.atomic():
+                    JobQueue._complete(job, outcome)
+            else:
+                with transaction.atomic():
+                    JobQueue._complete(job, handler(job))
+
+            logger.info(f"✅ Job #{job.pk} {job.job_type} done")
+            return True
+
+        except LeaseLost as e:
+            logger.warning(f"⚠️ {e} - changes rolled back")
+            return False
+
+        except Exception as e:
+            JobQueue._mark_failed(job, str(e), final=job.attempts >= job.max_attempts)
+            return False
+
+        finally:
+            keeper.stop()
+
+    @staticmethod
+    def _complete(job, outcome):
+        """Mark an owned job done with the handler outcome (error Result → raise for retry)"""
+        from core.models import BackgroundJob
+
+        if isinstance(outcome, Result):
+            if not outcome.ok:
+                raise RuntimeError(f"{outcome.code}: {outcome.msg}")
+            outcome = outcome.data
+
+        finished = JobQueue._owned(job).update(
+            status=BackgroundJob.DONE,
+            result=JobQueue._json_safe(outcome),
+            last_error='',
+            lease_expires_at=None,
+            finished_at=timezone.now()
+        )
+        if not finished:
+            raise LeaseLost(f"Job #{job.pk} is no longer owned by {job.locked_by}")
+
+    @staticmethod
+    def once_after_commit(job, step: str, func: Callable) -> bool:
+        """
+        Run a non-transactional side effect (email, webhook) once the job commits
+
+        Call from a handler. The step is recorded in job.completed_steps
+        under a row lock, so a retried or requeued job does not repeat it.
+
+        Returns:
+            bool: False when the step was already done
+        """
+        if step in (job.completed_steps or []):
+            logger.debug(f"Job #{job.pk} step {step} already done")
+            return False
+
+        transaction.on_commit(lambda: JobQueue._run_step(job.pk, step, func))
+        return True
+
+    @staticmethod
+    def run_pending(worker_id: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        """Claim and run due jobs until the queue is drained (or limit is reached)"""
+        worker_id = worker_id or JobQueue.default_worker_id()
+        stats = {'processed': 0, 'succeeded': 0, 'failed': 0}
+
+        while limit is None or stats['processed'] < limit:
+            job = JobQueue.claim_next(worker_id)
+            if job is None:
+                break
+
+            ok = JobQueue.run(job)
+            stats['processed'] += 1
+            stats['succeeded' if ok else 'failed'] += 1
+
+        return stats
+
+    @staticmethod
+    def requeue_stale() -> int:
+        """Return running jobs whose lease expired (crashed or stuck worker) to the queue"""
+        from core.models import BackgroundJob
+
+        now = timezone.now()
+        requeued = BackgroundJob.objects.filter(
+            status=BackgroundJob.RUNNING,
+            lease_expires_at__lt=now
+        ).update(
+            status=BackgroundJob.PENDING,
+            locked_by='',
+            locked_at=None,
+            lease_expires_at=None,
+            run_after=now,
+            last_error='Requeued after lease expired'
+        )
+        if requeued:
+            logger.warning(f"⚠️ Requeued {requeued} jobs with expired leases")
+        return requeued
+
+    # =====================================================
+    # STATUS API (UI polling)
+    # =====================================================
+
+    @staticmethod
+    def get_status(job_id: Optional[int] = None, ordering_key: Optional[str] = None) -> Result:
+        """Job status by id, or status of all jobs for an ordering key"""
+        from core.models import BackgroundJob
+
+        if job_id is not None:
+            job = BackgroundJob.objects.filter(pk=job_id).first()
+            if not job:
+                return Result.error('JOB_NOT_FOUND', f'Job {job_id} not found')
+            jobs = [job]
+        elif ordering_key:
+            jobs = list(BackgroundJob.objects.for_ordering_key(ordering_key))
+        else:
+            return Result.error('INVALID_REQUEST', 'Job id or ordering key required')
+
+        items = [JobQueue.describe(job) for job in jobs]
+        finished = all(job.is_finished for job in jobs)
+
+        return Result.success(
+            data={
+                'jobs': items,
+                'finished': finished,
+                'failed': any(job.status == BackgroundJob.FAILED for job in jobs),
+            },
+            msg='All jobs finished' if finished else 'Jobs in progress'
+        )
+
+    @staticmethod
+    def describe(job) -> Dict:
+        return {
+            'id': job.pk,
+            'job_type': job.job_type,
+            'status': job.status,
+            'ordering_key': job.ordering_key,
+            'attempts': job.attempts,
+            'max_attempts': job.max_attempts,
+            'run_after': job.run_after.isoformat() if job.run_after else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+            'result': job.result,
+            'last_error': job.last_error,
+        }
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _owned(job):
+        """The job row while it is still running under this worker's lease"""
+        from core.models import BackgroundJob
+
+        return BackgroundJob.objects.filter(pk=job.pk, status=BackgroundJob.RUNNING, locked_by=job.locked_by)
+
+    @staticmethod
+    def _run_step(job_id: int, step: str, func: Callable):
+        from core.models import BackgroundJob
+
+        try:
+            with transaction.atomic():
+                job = BackgroundJob.objects.select_for_update().get(pk=job_id)
+                if step in job.completed_steps:
+                    return
+
+                func()
+                job.completed_steps = [*job.completed_steps, step]
+                job.save(update_fields=['completed_steps'])
+        except Exception as e:
+            logger.warning(f"⚠️ Job #{job_id} step {step} failed: {e}")
+
+    @staticmethod
+    def _mark_failed(job, error: str, final: bool):
+        from core.models import BackgroundJob
+
+        if final:
+            failed = JobQueue._owned(job).update(
+                status=BackgroundJob.FAILED,
+                last_error=error,
+                lease_expires_at=None,
+                finished_at=timezone.now()
+            )
+            if not failed:
+                logger.warning(f"⚠️ Job #{job.pk} lost its lease - failure not recorded: {error}")
+                return
+            logger.error(f"❌ Job #{job.pk} {job.job_type} failed permanently: {error}")
+            return
+
+        delay = min(
+            JobQueue.RETRY_BASE_DELAY * (2 ** max(job.attempts - 1, 0)),
+            JobQueue.RETRY_MAX_DELAY
+        )
+        JobQueue._owned(job).update(
+            status=BackgroundJob.PENDING,
+            last_error=error,
+            locked_by='',
+            locked_at=None,
+            lease_expires_at=None,
+            run_after=timezone.now() + delay
+        )
+        logger.warning(
+            f"⚠️ Job #{job.pk} {job.job_type} failed (attempt {job.attempts}/{job.max_attempts}), "
+            f"retry in {delay}: {error}"
+        )
+
+    @staticmethod
+    def _json_safe(data):
+        if data is None:
+            return None
+        return json.loads(json.dumps(data, default=str))
+
+
+__all__ = ['JobQueue', 'LeaseLost']
@@ -0,0 +1,95 @@
+# core/services/version_stamp.py
+"""
+Cross-process version stamps for in-process caches
+
+PriceBookService, BarcodeIndexService and WorkflowSpecService keep
+compiled objects in process memory. Each cache compares the version its
+object was built with against a counter in core.CacheVersion:
+
+- bump() increments the counter right after the caller's transaction
+  commits (transaction.on_commit), once per scope and transaction - the
+  counter row is locked only for that one autocommit UPDATE, so unrelated
+  price/product writes never queue behind each other on it
+- current() is read from the database at most once per CHECK_INTERVAL
+  seconds per key and process (bump() in this process refreshes at once)
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Tuple
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class VersionStamp:
+    """Named family of version counters - one per cache"""
+
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, namespace: str, check_interval: float = None):
+        self.namespace = namespace
+        self.check_interval = self.CHECK_INTERVAL if check_interval is None else check_interval
+        self._seen: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def current(self, scope='') -> int:
+        """Current version of a scope (0 until the first bump)"""
+        key = self._key(scope)
+        now = time.monotonic()
+
+        with self._lock:
+            seen = self._seen.get(key)
+        if seen is not None and now - seen[1] < self.check_interval:
+            return seen[0]
+
+        from core.models import CacheVersion
+
+        version = CacheVersion.objects.filter(key=key).values_list('version', flat=True).first() or 0
+        with self._lock:
+            self._seen[key] = (version, now)
+        return version
+
+    def bump(self, scope=''):
+        """Increment a scope's version once the current transaction commits (at once outside one)"""
+        key = self._key(scope)
+
+        # One pending bump per key and transaction - rolled-back callbacks are dropped by Django
+        for entry in connection.run_on_commit:
+            if getattr(entry[1], 'version_key', None) == key:
+                return
+
+        def apply():
+            self._increment(key)
+
+        apply.version_key = key
+        transaction.on_commit(apply)
+
+    def _increment(self, key: str):
+        from core.models import CacheVersion
+
+        updated = CacheVersion.objects.filter(key=key).update(version=F('version') + 1)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    CacheVersion.objects.create(key=key, version=1)
+            except IntegrityError:
+                # Created concurrently
+                CacheVersion.objects.filter(key=key).update(version=F('version') + 1)
+
+        with self._lock:
+            self._seen.pop(key, None)
+
+    def forget(self):
+        """Drop remembered versions - the next current() reads the database"""
+        with self._lock:
+            self._seen.clear()
+
+    def _key(self, scope) -> str:
+        return f"{self.namespace}:{scope}" if scope != '' else self.namespace
+
+
+__all__ = ['VersionStamp']
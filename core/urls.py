@@ -7,4 +7,8 @@ app_name = 'core'
 urlpatterns = [
     # Главна страница - Dashboard
     path('', views.DashboardView.as_view(), name='dashboard'),
+
+    # Background jobs - UI polling
+    path('jobs/status/', views.JobStatusView.as_view(), name='job_status'),
+    path('jobs/<int:pk>/status/', views.JobStatusView.as_view(), name='job_status_detail'),
 ]
\ No newline at end of file
@@ -1,4 +1,6 @@
 from django.shortcuts import render
+from django.http import JsonResponse
+from django.views import View
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.utils import timezone
@@ -174,3 +176,29 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             'database': 'PostgreSQL',  # TODO: от settings  
             'cache': 'Redis',  # TODO: от settings
         }
+
+
+class JobStatusView(LoginRequiredMixin, View):
+    """
+    Статус на background jobs - за polling от UI
+
+    GET /jobs/<pk>/status/           - един job
+    GET /jobs/status/?key=<ordering> - всички jobs за документ
+    """
+
+    def get(self, request, pk=None):
+        from core.services.job_queue import JobQueue
+
+        result = JobQueue.get_status(job_id=pk, ordering_key=request.GET.get('key'))
+
+        if not result.ok:
+            return JsonResponse({
+                'success': False,
+                'message': result.msg
+            }, status=404 if result.code == 'JOB_NOT_FOUND' else 400)
+
+        return JsonResponse({
+            'success': True,
+            'message': result.msg,
+            **result.data
+        })
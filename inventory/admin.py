@@ -15,7 +15,11 @@ from .models import (
     InventoryLocation,
     InventoryItem,
     InventoryBatch,
-    InventoryMovement
+    InventoryMovement,
+    StockCheckpoint,
+    DailyStockSnapshot,
+    StockReservation,
+    DailyMovementSummary
 )
 
 
@@ -108,6 +112,7 @@ class InventoryLocationAdmin(admin.ModelAdmin):
         (_('Batch Tracking Settings'), {
             'fields': (
                 'batch_tracking_mode',
+                'allocation_strategy',
 
             ),
             'classes': ('collapse',)
@@ -115,8 +120,10 @@ class InventoryLocationAdmin(admin.ModelAdmin):
         (_('Stock Management'), {
             'fields': (
                 'allow_negative_stock',
-
-            )
+                'journal_stock_updates',
+            ),
+            'description': _('Journaled stock updates skip the availability check and '
+                             'require allowing negative stock.')
         }),
         (_('Contact Information'), {
             'fields': (
@@ -284,7 +291,7 @@ class InventoryItemAdmin(admin.ModelAdmin):
     ]
 
     list_filter = [
-        'location', 'location__location_type',
+        'location', 'location__location_type', 'journaled',
         ('last_movement_date', admin.DateFieldListFilter),
         ('product__product_type', admin.RelatedOnlyFieldListFilter),
     ]
@@ -321,7 +328,9 @@ class InventoryItemAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         (_('Stock Management'), {
-            'fields': ('min_stock_level', 'max_stock_level')
+            'fields': ('min_stock_level', 'max_stock_level', 'journaled'),
+            'description': _('Journaled items skip the availability check - only at locations '
+                             'that allow negative stock.')
         }),
         (_('System Information'), {
             'fields': (
@@ -937,21 +946,148 @@ class InventoryMovementAdmin(admin.ModelAdmin):
     movement_analysis.short_description = _('Movement Analysis')
 
 
+# =================================================================
+# STOCK CHECKPOINT ADMIN
+# =================================================================
+
+@admin.register(StockCheckpoint)
+class StockCheckpointAdmin(admin.ModelAdmin):
+    """Админ за stock checkpoints - само четене"""
+
+    list_display = [
+        'location', 'product', 'as_of', 'last_movement_id',
+        'qty', 'avg_cost', 'value'
+    ]
+
+    list_filter = ['location', ('as_of', admin.DateFieldListFilter)]
+
+    search_fields = ['product__code', 'product__name', 'location__code']
+
+    list_select_related = ['location', 'product']
+
+    ordering = ['-as_of']
+
+    def has_add_permission(self, request):
+        """Checkpoints се създават от build_stock_checkpoints"""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyStockSnapshot)
+class DailyStockSnapshotAdmin(admin.ModelAdmin):
+    """Админ за дневни складови снимки - само четене"""
+
+    list_display = [
+        'snapshot_date', 'location', 'product', 'closing_qty',
+        'avg_cost', 'closing_value', 'day_in_qty', 'day_out_qty'
+    ]
+
+    list_filter = ['location', ('snapshot_date', admin.DateFieldListFilter)]
+
+    search_fields = ['product__code', 'product__name', 'location__code']
+
+    list_select_related = ['location', 'product']
+
+    date_hierarchy = 'snapshot_date'
+
+    ordering = ['-snapshot_date']
+
+    def has_add_permission(self, request):
+        """Снимките се създават от build_stock_snapshots"""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyMovementSummary)
+class DailyMovementSummaryAdmin(admin.ModelAdmin):
+    """Админ за дневни обобщения на движенията - само четене"""
+
+    list_display = [
+        'summary_date', 'location', 'product', 'movement_type', 'source_document_type',
+        'movement_count', 'total_quantity', 'total_cost_value', 'total_sale_value', 'total_profit'
+    ]
+
+    list_filter = ['movement_type', 'source_document_type', 'location', ('summary_date', admin.DateFieldListFilter)]
+
+    search_fields = ['product__code', 'product__name', 'location__code']
+
+    list_select_related = ['location', 'product']
+
+    date_hierarchy = 'summary_date'
+
+    ordering = ['-summary_date']
+
+    def has_add_permission(self, request):
+        """Обобщенията се създават от build_movement_summaries"""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    """Админ за резервации - активните се освобождават с действие"""
+
+    list_display = [
+        'created_at', 'location', 'product', 'quantity', 'status',
+        'reference', 'expires_at', 'created_by'
+    ]
+
+    list_filter = ['status', 'location']
+
+    search_fields = ['product__code', 'reference', 'reason']
+
+    list_select_related = ['location', 'product', 'created_by']
+
+    readonly_fields = [
+        'location', 'product', 'quantity', 'reference', 'reason', 'status',
+        'expires_at', 'closed_at', 'created_by', 'created_at'
+    ]
+
+    actions = ['release_selected']
+
+    def has_add_permission(self, request):
+        """Резервациите се създават от ReservationService"""
+        return False
+
+    def release_selected(self, request, queryset):
+        """Освобождава избраните активни резервации"""
+        from .services import ReservationService
+
+        released = 0
+        for reservation_id in queryset.filter(status=StockReservation.ACTIVE).values_list('id', flat=True):
+            if ReservationService.release(reservation_id).ok:
+                released += 1
+
+        self.message_user(request, f'Released {released} reservations')
+
+    release_selected.short_description = _('Release selected reservations')
+
+
 # =================================================================
 # ADMIN ACTIONS
 # =================================================================
 
 def recalculate_inventory_items(modeladmin, request, queryset):
-    """Преизчисляване на inventory items"""
+    """Преизчисляване на inventory items от движенията (ledger)"""
+    from collections import defaultdict
+    from .services import StockAuditService
+
+    products_by_location = defaultdict(list)
+    for location_id, product_id in queryset.values_list('location_id', 'product_id'):
+        products_by_location[location_id].append(product_id)
+
     count = 0
-    for item in queryset:
-        try:
-            # Тук би трябвало да има service метод за преизчисляване
-            # За момента само се записва обекта за trigger на update
-            item.save()
-            count += 1
-        except Exception as e:
-            messages.error(request, f'Грешка при {item}: {e}')
+    for location_id, product_ids in products_by_location.items():
+        fixed, errors = StockAuditService.fix(location_id, product_ids)
+        count += fixed
+        for error in errors:
+            messages.error(request, f'Грешка при {error}')
 
     messages.success(request, f'Преизчислени {count} записа')
 
@@ -0,0 +1,100 @@
+# inventory/management/commands/audit_stock.py
+
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import InventoryLocation
+from inventory.services import StockAuditService
+
+
+class Command(BaseCommand):
+    help = 'Audit inventory items against the movement ledger (nightly job)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--location',
+            action='append',
+            help='Location code, repeatable (default: all locations)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Parallel worker processes (default: CPU count, 1 = no pool)'
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Recalculate drifted items from the ledger after confirming the dry-run diff'
+        )
+        parser.add_argument(
+            '--check-cost',
+            action='store_true',
+            help='Also report avg_cost that differs from the ledger average'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Aggregate the full movement history instead of starting from checkpoints'
+        )
+        parser.add_argument(
+            '--show',
+            type=int,
+            default=20,
+            help='Drifted items to list (default: 20)'
+        )
+
+    def handle(self, *args, **options):
+        locations = None
+        if options['location']:
+            codes = [code.upper() for code in options['location']]
+            locations = list(InventoryLocation.objects.filter(code__in=codes))
+            missing = set(codes) - {location.code for location in locations}
+            if missing:
+                raise CommandError(f"Locations not found: {', '.join(sorted(missing))}")
+
+        self.stdout.write('Auditing inventory items against movements...')
+
+        # Always a dry run first - --fix only repairs what the operator confirmed
+        summary = StockAuditService.audit(
+            locations=locations,
+            workers=options['workers'],
+            check_cost=options['check_cost'],
+            use_checkpoints=not options['full']
+        )
+
+        codes = dict(InventoryLocation.objects.values_list('id', 'code'))
+        for drift in summary['drifts'][:options['show']]:
+            self.stdout.write(
+                f"  {codes.get(drift['location_id'], drift['location_id'])} product {drift['product_id']} "
+                f"[{drift['kind']}]: qty {drift['current_qty']} vs ledger {drift['expected_qty']}, "
+                f"avg_cost {drift['avg_cost']} vs {drift['expected_avg_cost']}"
+            )
+        for error in summary['errors']:
+            self.stdout.write(self.style.ERROR(f"  {error}"))
+
+        kinds = ', '.join(f"{kind}: {count}" for kind, count in sorted(summary['by_kind'].items()))
+        message = (
+            f"Checked {summary['items_checked']} items in {summary['locations']} locations "
+            f"({summary['workers']} workers) - {summary['drifted']} drifted"
+            f"{f' ({kinds})' if kinds else ''}"
+        )
+        if not summary['drifted']:
+            self.stdout.write(self.style.SUCCESS(message))
+            return
+        self.stdout.write(self.style.WARNING(message))
+
+        if not options['fix']:
+            return
+
+        if summary['drifted'] > options['show']:
+            self.stdout.write(f"  ... {summary['drifted'] - options['show']} more not listed (raise --show to review)")
+
+        try:
+            answer = input(f"Recalculate {summary['drifted']} drifted items from the ledger? [y/N] ")
+        except EOFError:
+            answer = ''
+        if answer.strip().lower() not in ('y', 'yes'):
+            raise CommandError('Fix not confirmed - nothing was changed')
+
+        result = StockAuditService.fix_drifts(summary['drifted_items'])
+        for error in result['errors']:
+            self.stdout.write(self.style.ERROR(f"  {error}"))
+        self.stdout.write(self.style.SUCCESS(f"Recalculated {result['fixed']} of {summary['drifted']} drifted items"))
@@ -0,0 +1,45 @@
+# inventory/management/commands/build_movement_summaries.py
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import InventoryLocation
+from inventory.services import MovementSummaryService
+
+
+class Command(BaseCommand):
+    help = 'Roll up inventory movements into daily summaries (nightly job)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Last business date to roll up, YYYY-MM-DD (default: yesterday)'
+        )
+        parser.add_argument(
+            '--location',
+            help='Location code (default: all locations)'
+        )
+
+    def handle(self, *args, **options):
+        up_to = None
+        if options['date']:
+            try:
+                up_to = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+
+        location = None
+        if options['location']:
+            try:
+                location = InventoryLocation.objects.get(code=options['location'].upper())
+            except InventoryLocation.DoesNotExist:
+                raise CommandError(f"Location {options['location']} not found")
+
+        self.stdout.write('Building daily movement summaries...')
+
+        stats = MovementSummaryService.refresh(up_to=up_to, location=location)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {stats['rows']} summary rows for {stats['days']} days "
+            f"across {stats['locations']} locations"
+        ))
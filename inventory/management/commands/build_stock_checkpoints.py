@@ -0,0 +1,51 @@
+# inventory/management/commands/build_stock_checkpoints.py
+
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import InventoryLocation
+from inventory.services import StockLedgerService
+
+
+class Command(BaseCommand):
+    help = 'Build or roll forward stock checkpoints from inventory movements'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--location',
+            help='Location code (default: all locations)'
+        )
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=3,
+            help='Checkpoints to keep per location/product (default: 3)'
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Drop existing checkpoints and fold the full movement history'
+        )
+
+    def handle(self, *args, **options):
+        location = None
+        if options['location']:
+            try:
+                location = InventoryLocation.objects.get(code=options['location'].upper())
+            except InventoryLocation.DoesNotExist:
+                raise CommandError(f"Location {options['location']} not found")
+
+        self.stdout.write('Building stock checkpoints...')
+
+        stats = StockLedgerService.build_checkpoints(
+            location=location,
+            keep=options['keep'],
+            rebuild=options['rebuild']
+        )
+
+        if stats['watermark'] is None:
+            self.stdout.write(self.style.WARNING('No movements to checkpoint'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {stats['created']} checkpoints, pruned {stats['pruned']} "
+            f"(watermark movement #{stats['watermark']}, as of {stats['as_of']:%Y-%m-%d %H:%M})"
+        ))
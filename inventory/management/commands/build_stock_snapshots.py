@@ -0,0 +1,50 @@
+# inventory/management/commands/build_stock_snapshots.py
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import InventoryLocation
+from inventory.services import StockSnapshotService
+
+
+class Command(BaseCommand):
+    help = 'Write daily closing stock snapshots (nightly job)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Last business date to snapshot, YYYY-MM-DD (default: yesterday)'
+        )
+        parser.add_argument(
+            '--location',
+            help='Location code (default: all locations)'
+        )
+
+    def handle(self, *args, **options):
+        up_to = None
+        if options['date']:
+            try:
+                up_to = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+
+        location = None
+        if options['location']:
+            try:
+                location = InventoryLocation.objects.get(code=options['location'].upper())
+            except InventoryLocation.DoesNotExist:
+                raise CommandError(f"Location {options['location']} not found")
+
+        self.stdout.write('Building daily stock snapshots...')
+
+        stats = StockSnapshotService.build_snapshots(up_to=up_to, location=location)
+
+        for location_code, rebuilt_from in stats['rebuilt_from'].items():
+            self.stdout.write(self.style.WARNING(
+                f"  {location_code}: backdated movements, rebuilt from {rebuilt_from}"
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {stats['rows']} snapshot rows for {stats['days']} days "
+            f"across {stats['locations']} locations"
+        ))
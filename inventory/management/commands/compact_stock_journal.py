@@ -0,0 +1,43 @@
+# inventory/management/commands/compact_stock_journal.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from inventory.services import StockJournalService
+
+
+class Command(BaseCommand):
+    help = 'Fold journaled stock deltas into inventory items'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep compacting every --interval seconds'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=3.0,
+            help='Seconds between passes in --loop mode (default: 3)'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+
+        try:
+            while True:
+                stats = StockJournalService.compact()
+                total += stats['deltas']
+
+                if stats['deltas'] and options['verbosity'] > 1:
+                    self.stdout.write(f"  {stats['deltas']} deltas into {stats['items']} items")
+
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted')
+
+        self.stdout.write(self.style.SUCCESS(f"Compacted {total} stock deltas"))
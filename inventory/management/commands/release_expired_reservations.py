@@ -0,0 +1,29 @@
+# inventory/management/commands/release_expired_reservations.py
+
+from django.core.management.base import BaseCommand
+from inventory.models import StockReservation
+from inventory.services import ReservationService
+
+
+class Command(BaseCommand):
+    help = 'Release expired stock reservations (abandoned carts)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report expired reservations'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = StockReservation.objects.expired().count()
+            self.stdout.write(f"{count} expired reservations would be released")
+            return
+
+        stats = ReservationService.sweep_expired()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Released {stats['closed']} reservations ({stats['released_qty']} units) "
+            f"on {stats['items']} inventory items"
+        ))
@@ -0,0 +1,53 @@
+# inventory/management/commands/value_inventory.py
+
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import InventoryLocation
+from inventory.services import InventoryValuationEngine
+
+
+class Command(BaseCommand):
+    help = 'Value stock across locations in one pass and export totals as CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--by',
+            choices=list(InventoryValuationEngine.LEVELS),
+            default='location',
+            help='Grouping level of the export (default: location)'
+        )
+        parser.add_argument(
+            '--location',
+            action='append',
+            help='Location code, repeatable (default: all locations)'
+        )
+        parser.add_argument(
+            '--positive-only',
+            action='store_true',
+            help='Ignore items with zero or negative stock'
+        )
+        parser.add_argument(
+            '--output',
+            help='CSV file path (default: stdout)'
+        )
+
+    def handle(self, *args, **options):
+        locations = None
+        if options['location']:
+            codes = [code.upper() for code in options['location']]
+            locations = list(InventoryLocation.objects.filter(code__in=codes))
+            missing = set(codes) - {location.code for location in locations}
+            if missing:
+                raise CommandError(f"Locations not found: {', '.join(sorted(missing))}")
+
+        engine = InventoryValuationEngine(locations=locations, positive_only=options['positive_only'])
+        result = engine.run(levels=[options['by']])
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as stream:
+                rows = engine.export_csv(stream, level=options['by'], result=result)
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {rows} {options['by']} rows to {options['output']} - "
+                f"{result.item_count} items, total value {result.total_value}"
+            ))
+        else:
+            engine.export_csv(self.stdout, level=options['by'], result=result)
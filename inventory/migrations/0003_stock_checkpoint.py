@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_alter_inventorybatch_cost_price_and_more'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateTimeField(help_text='Movements created before this moment are included', verbose_name='As Of')),
+                ('last_movement_id', models.PositiveBigIntegerField(help_text='Highest InventoryMovement id folded into this checkpoint', verbose_name='Last Movement ID')),
+                ('qty', models.DecimalField(decimal_places=3, default=0, max_digits=12, verbose_name='Quantity')),
+                ('value', models.DecimalField(decimal_places=4, default=0, help_text='qty × avg_cost at the checkpoint', max_digits=18, verbose_name='Stock Value')),
+                ('avg_cost', models.DecimalField(decimal_places=4, default=0, max_digits=12, verbose_name='Average Cost')),
+                ('total_in_qty', models.DecimalField(decimal_places=3, default=0, max_digits=15, verbose_name='Total Incoming Quantity')),
+                ('total_in_value', models.DecimalField(decimal_places=4, default=0, max_digits=18, verbose_name='Total Incoming Value')),
+                ('total_out_qty', models.DecimalField(decimal_places=3, default=0, max_digits=15, verbose_name='Total Outgoing Quantity')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_checkpoints', to='inventory.inventorylocation', verbose_name='Location')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_checkpoints', to='products.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Stock Checkpoint',
+                'verbose_name_plural': 'Stock Checkpoints',
+                'ordering': ['location', 'product', '-last_movement_id'],
+                'indexes': [models.Index(fields=['as_of'], name='inventory_s_as_of_05a3d8_idx')],
+                'unique_together': {('location', 'product', 'last_movement_id')},
+            },
+        ),
+    ]
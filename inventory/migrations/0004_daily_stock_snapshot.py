@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_stock_checkpoint'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField(help_text='Business date whose closing balance is stored', verbose_name='Snapshot Date')),
+                ('closing_qty', models.DecimalField(decimal_places=3, default=0, max_digits=12, verbose_name='Closing Quantity')),
+                ('avg_cost', models.DecimalField(decimal_places=4, default=0, max_digits=12, verbose_name='Average Cost')),
+                ('closing_value', models.DecimalField(decimal_places=4, default=0, max_digits=18, verbose_name='Closing Value')),
+                ('day_in_qty', models.DecimalField(decimal_places=3, default=0, max_digits=12, verbose_name='Day Incoming Quantity')),
+                ('day_out_qty', models.DecimalField(decimal_places=3, default=0, max_digits=12, verbose_name='Day Outgoing Quantity')),
+                ('total_in_qty', models.DecimalField(decimal_places=3, default=0, max_digits=15, verbose_name='Total Incoming Quantity')),
+                ('total_in_value', models.DecimalField(decimal_places=4, default=0, max_digits=18, verbose_name='Total Incoming Value')),
+                ('total_out_qty', models.DecimalField(decimal_places=3, default=0, max_digits=15, verbose_name='Total Outgoing Quantity')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stock_snapshots', to='inventory.inventorylocation', verbose_name='Location')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stock_snapshots', to='products.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Daily Stock Snapshot',
+                'verbose_name_plural': 'Daily Stock Snapshots',
+                'ordering': ['-snapshot_date', 'location', 'product'],
+                'indexes': [models.Index(fields=['location', 'snapshot_date'], name='inventory_d_locatio_85a6aa_idx'), models.Index(fields=['snapshot_date'], name='inventory_d_snapsho_6a557a_idx')],
+                'unique_together': {('location', 'product', 'snapshot_date')},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_daily_stock_snapshot'),
+        ('products', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=3, max_digits=12, verbose_name='Quantity')),
+                ('reference', models.CharField(blank=True, help_text='Cart, session or document holding the stock', max_length=100, verbose_name='Reference')),
+                ('reason', models.CharField(blank=True, max_length=200, verbose_name='Reason')),
+                ('status', models.CharField(choices=[('active', 'Active'), ('released', 'Released'), ('consumed', 'Consumed'), ('expired', 'Expired')], default='active', max_length=10, verbose_name='Status')),
+                ('expires_at', models.DateTimeField(blank=True, help_text='Hold is released automatically after this moment (empty = no expiry)', null=True, verbose_name='Expires At')),
+                ('closed_at', models.DateTimeField(blank=True, null=True, verbose_name='Closed At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_reservations', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservations', to='inventory.inventorylocation', verbose_name='Location')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservations', to='products.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Stock Reservation',
+                'verbose_name_plural': 'Stock Reservations',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='inventory_s_status_c656ef_idx'), models.Index(fields=['reference', 'status'], name='inventory_s_referen_803dfe_idx'), models.Index(fields=['location', 'product', 'status'], name='inventory_s_locatio_1ebf4a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_stock_reservation'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMovementSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('summary_date', models.DateField(verbose_name='Date')),
+                ('movement_type', models.CharField(max_length=15, verbose_name='Movement Type')),
+                ('source_document_type', models.CharField(blank=True, max_length=30, verbose_name='Source Document Type')),
+                ('movement_count', models.PositiveIntegerField(default=0, verbose_name='Movements')),
+                ('total_quantity', models.DecimalField(decimal_places=3, default=0, max_digits=15, verbose_name='Quantity')),
+                ('total_cost_value', models.DecimalField(decimal_places=4, default=0, max_digits=18, verbose_name='Cost Value')),
+                ('priced_count', models.PositiveIntegerField(default=0, verbose_name='Priced Movements')),
+                ('priced_quantity', models.DecimalField(decimal_places=3, default=0, max_digits=15, verbose_name='Priced Quantity')),
+                ('priced_cost_value', models.DecimalField(decimal_places=4, default=0, max_digits=18, verbose_name='Priced Cost Value')),
+                ('total_sale_value', models.DecimalField(decimal_places=4, default=0, max_digits=18, verbose_name='Sale Value')),
+                ('total_profit', models.DecimalField(decimal_places=4, default=0, max_digits=18, verbose_name='Profit')),
+                ('unit_profit_sum', models.DecimalField(decimal_places=4, default=0, help_text='Sum of per-unit profit_amount (for average unit profit)', max_digits=18, verbose_name='Unit Profit Sum')),
+                ('rolled_up_at', models.DateTimeField(help_text='Movements created after this moment are not included yet', verbose_name='Rolled Up At')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movement_summaries', to='inventory.inventorylocation', verbose_name='Location')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movement_summaries', to='products.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Daily Movement Summary',
+                'verbose_name_plural': 'Daily Movement Summaries',
+                'ordering': ['-summary_date', 'location', 'product'],
+                'indexes': [models.Index(fields=['location', 'summary_date'], name='inventory_d_locatio_9a743a_idx'), models.Index(fields=['product', 'summary_date'], name='inventory_d_product_70b90b_idx'), models.Index(fields=['movement_type', 'source_document_type', 'summary_date'], name='inventory_d_movemen_7950e4_idx')],
+                'unique_together': {('summary_date', 'location', 'product', 'movement_type', 'source_document_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_daily_movement_summary'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='journaled',
+            field=models.BooleanField(default=False, help_text='Outgoing movements append StockDelta rows instead of updating this row', verbose_name='Journaled'),
+        ),
+        migrations.AddField(
+            model_name='inventorylocation',
+            name='journal_stock_updates',
+            field=models.BooleanField(default=False, help_text='Outgoing movements append stock deltas instead of updating items (folded by compact_stock_journal)', verbose_name='Journaled Stock Updates'),
+        ),
+        migrations.CreateModel(
+            name='StockDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=3, help_text='Signed change of current_qty (negative for outgoing)', max_digits=12, verbose_name='Quantity')),
+                ('movement_date', models.DateField(verbose_name='Movement Date')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_deltas', to='inventory.inventorylocation', verbose_name='Location')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_deltas', to='products.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Stock Delta',
+                'verbose_name_plural': 'Stock Deltas',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['location', 'product', 'id'], name='inventory_s_locatio_114862_idx')],
+            },
+        ),
+    ]
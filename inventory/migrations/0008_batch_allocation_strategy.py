@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_journaled_stock_deltas'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventorylocation',
+            name='allocation_strategy',
+            field=models.CharField(choices=[('FIFO', 'FIFO - First in, first out'), ('FEFO', 'FEFO - First expired, first out'), ('LIFO', 'LIFO - Last in, first out')], default='FIFO', help_text='Batch consumption order for outgoing stock (product groups can override)', max_length=10, verbose_name='Allocation Strategy'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorybatch',
+            index=models.Index(fields=['location', 'product', 'expiry_date', 'remaining_qty'], name='inv_batch_fefo_idx'),
+        ),
+    ]
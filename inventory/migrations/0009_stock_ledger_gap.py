@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_batch_allocation_strategy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockLedgerGap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_movement_id', models.PositiveBigIntegerField(verbose_name='First Movement ID')),
+                ('last_movement_id', models.PositiveBigIntegerField(verbose_name='Last Movement ID')),
+                ('detected_at', models.DateTimeField(verbose_name='Detected At')),
+            ],
+            options={
+                'verbose_name': 'Stock Ledger Gap',
+                'verbose_name_plural': 'Stock Ledger Gaps',
+                'ordering': ['first_movement_id'],
+                'indexes': [models.Index(fields=['detected_at'], name='inventory_s_detecte_a49984_idx')],
+                'unique_together': {('first_movement_id', 'last_movement_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:10
+
+from django.db import migrations, models
+
+
+def drop_ledger_totals(apps, schema_editor):
+    """Checkpoints and snapshots folded without returned quantities - rebuilt by the build commands"""
+    apps.get_model('inventory', 'StockCheckpoint').objects.all().delete()
+    apps.get_model('inventory', 'DailyStockSnapshot').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_stock_ledger_gap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockcheckpoint',
+            name='total_returned_qty',
+            field=models.DecimalField(decimal_places=3, default=0, help_text='REVERSAL IN quantities - counted in stock, not in the average cost', max_digits=15, verbose_name='Total Returned Quantity'),
+        ),
+        migrations.AddField(
+            model_name='dailystocksnapshot',
+            name='total_returned_qty',
+            field=models.DecimalField(decimal_places=3, default=0, help_text='REVERSAL IN quantities - counted in stock, not in the average cost', max_digits=15, verbose_name='Total Returned Quantity'),
+        ),
+        migrations.RunPython(drop_ledger_totals, migrations.RunPython.noop),
+    ]
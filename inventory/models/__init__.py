@@ -5,6 +5,10 @@ Inventory models package
 - groups.py: InventoryLocation
 - movements.py: InventoryMovement (source of truth)
 - items.py: InventoryItem, InventoryBatch (cached data)
+- ledger.py: StockCheckpoint, StockLedgerGap, DailyStockSnapshot (folded movement totals)
+- reservations.py: StockReservation (reservation ledger with TTLs)
+- summaries.py: DailyMovementSummary (daily movement rollup for reports)
+- journal.py: StockDelta (insert-only stock deltas for journaled items)
 """
 
 # Location models
@@ -27,6 +31,33 @@ from .items import (
     InventoryBatchManager
 )
 
+# Ledger models (folded movement history)
+from .ledger import (
+    StockCheckpoint,
+    StockCheckpointManager,
+    StockLedgerGap,
+    DailyStockSnapshot,
+    DailyStockSnapshotManager
+)
+
+# Reservation ledger
+from .reservations import (
+    StockReservation,
+    StockReservationManager
+)
+
+# Reporting rollups
+from .summaries import (
+    DailyMovementSummary,
+    DailyMovementSummaryManager
+)
+
+# Journaled stock deltas
+from .journal import (
+    StockDelta,
+    StockDeltaManager
+)
+
 # Export all for backward compatibility
 __all__ = [
     # Locations
@@ -42,6 +73,25 @@ __all__ = [
     'InventoryBatch',
     'InventoryItemManager',
     'InventoryBatchManager',
+
+    # Ledger
+    'StockCheckpoint',
+    'StockCheckpointManager',
+    'StockLedgerGap',
+    'DailyStockSnapshot',
+    'DailyStockSnapshotManager',
+
+    # Reservations
+    'StockReservation',
+    'StockReservationManager',
+
+    # Summaries
+    'DailyMovementSummary',
+    'DailyMovementSummaryManager',
+
+    # Journal
+    'StockDelta',
+    'StockDeltaManager',
 ]
 
 # Version info
@@ -1,5 +1,6 @@
 # inventory/models/items.py - REFACTORED
 
+from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.db.models import ExpressionWrapper, F, DecimalField, Sum
 from django.utils.translation import gettext_lazy as _
@@ -28,6 +29,11 @@ class InventoryItemManager(models.Manager):
     def negative_stock(self):
         return self.filter(current_qty__lt=0)
 
+    def with_pending_deltas(self):
+        """Annotate pending_delta_qty - journaled stock deltas not yet compacted"""
+        from .journal import StockDelta
+        return self.annotate(pending_delta_qty=StockDelta.objects.pending_qty_subquery())
+
 
 class InventoryBatchManager(models.Manager):
     """Manager for inventory batches"""
@@ -146,6 +152,13 @@ class InventoryItem(models.Model):
         default=0
     )
 
+    # === JOURNALED STOCK (hot SKUs) ===
+    journaled = models.BooleanField(
+        _('Journaled'),
+        default=False,
+        help_text=_('Outgoing movements append StockDelta rows instead of updating this row')
+    )
+
     # === AUDIT ===
     last_movement_date = models.DateTimeField(
         _('Last Movement'),
@@ -170,10 +183,22 @@ class InventoryItem(models.Model):
     def __str__(self):
         return f"{self.product.code} @ {self.location.code}: {self.current_qty}"
 
+    def clean(self):
+        # Deltas skip the availability check - only where stock may go negative
+        if self.journaled and self.location_id and not self.location.allow_negative_stock:
+            raise ValidationError({
+                'journaled': _('Journaled stock requires a location that allows negative stock')
+            })
+
+    @property
+    def effective_qty(self):
+        """current_qty plus pending journal deltas (when loaded via with_pending_deltas)"""
+        return self.current_qty + (getattr(self, 'pending_delta_qty', None) or Decimal('0'))
+
     @property
     def available_qty(self):
         """Quantity available for sale (current - reserved)"""
-        return self.current_qty - self.reserved_qty
+        return self.effective_qty - self.reserved_qty
 
     @property
     def needs_reorder(self):
@@ -340,6 +365,9 @@ class InventoryBatch(models.Model):
         ordering = ['received_date', 'expiry_date']
         indexes = [
             models.Index(fields=['location', 'product', 'remaining_qty']),
+            # FEFO allocation - one range scan per location+product
+            models.Index(fields=['location', 'product', 'expiry_date', 'remaining_qty'],
+                         name='inv_batch_fefo_idx'),
             models.Index(fields=['expiry_date', 'remaining_qty']),
             models.Index(fields=['batch_number']),
             models.Index(fields=['is_unknown_batch']),
@@ -0,0 +1,78 @@
+# inventory/models/journal.py - JOURNALED STOCK DELTAS
+
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils.translation import gettext_lazy as _
+
+
+class StockDeltaManager(models.Manager):
+    """Manager for pending stock deltas"""
+
+    def for_item(self, location_id, product_id):
+        return self.filter(location_id=location_id, product_id=product_id)
+
+    def pending_qty(self, location_id, product_id) -> Decimal:
+        total = self.for_item(location_id, product_id).aggregate(total=Sum('quantity'))['total']
+        return total or Decimal('0')
+
+    def pending_qty_subquery(self, location_ref='location_id', product_ref='product_id'):
+        """Sum of pending deltas for the outer InventoryItem row (0 when none)"""
+        pending = self.filter(
+            location_id=OuterRef(location_ref),
+            product_id=OuterRef(product_ref)
+        ).order_by().values('location_id').annotate(total=Sum('quantity')).values('total')
+
+        return Coalesce(
+            Subquery(pending),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=12, decimal_places=3)
+        )
+
+
+class StockDelta(models.Model):
+    """
+    Insert-only quantity change for a journaled InventoryItem
+
+    Outgoing movements of journaled items (hot SKUs, journal locations)
+    append a row here instead of updating InventoryItem.current_qty, so
+    concurrent tills never queue on the same item row.
+    StockJournalService.compact() folds the rows into the item and deletes
+    them; until then availability reads item + pending deltas.
+    """
+
+    location = models.ForeignKey(
+        'inventory.InventoryLocation',
+        on_delete=models.CASCADE,
+        related_name='stock_deltas',
+        verbose_name=_('Location')
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='stock_deltas',
+        verbose_name=_('Product')
+    )
+    quantity = models.DecimalField(
+        _('Quantity'),
+        max_digits=12,
+        decimal_places=3,
+        help_text=_('Signed change of current_qty (negative for outgoing)')
+    )
+    movement_date = models.DateField(_('Movement Date'))
+    created_at = models.DateTimeField(_('Created At'), auto_now_add=True)
+
+    objects = StockDeltaManager()
+
+    class Meta:
+        verbose_name = _('Stock Delta')
+        verbose_name_plural = _('Stock Deltas')
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['location', 'product', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.location_id}: {self.quantity:+}"
@@ -0,0 +1,268 @@
+# inventory/models/ledger.py - STOCK LEDGER CHECKPOINTS
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class StockCheckpointManager(models.Manager):
+    """Manager for stock checkpoints"""
+
+    def for_combination(self, location, product):
+        return self.filter(location=location, product=product)
+
+    def latest_for(self, location_id: int, product_id: int):
+        """Latest checkpoint for location/product or None"""
+        return self.filter(
+            location_id=location_id,
+            product_id=product_id
+        ).order_by('-last_movement_id').first()
+
+
+class StockCheckpoint(models.Model):
+    """
+    Periodic stock position per location+product
+
+    Folds all movements up to last_movement_id into running totals, so
+    recalculations and audits only have to aggregate newer movements.
+    Totals follow MovementService._recalculate_inventory_item rules:
+    REVERSAL IN movements are kept apart as returned quantity (stock, but
+    not the cost average); outgoing totals include REVERSAL OUTs.
+    """
+
+    location = models.ForeignKey(
+        'inventory.InventoryLocation',
+        on_delete=models.CASCADE,
+        related_name='stock_checkpoints',
+        verbose_name=_('Location')
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='stock_checkpoints',
+        verbose_name=_('Product')
+    )
+
+    # === WATERMARK ===
+    as_of = models.DateTimeField(
+        _('As Of'),
+        help_text=_('Movements created before this moment are included')
+    )
+    last_movement_id = models.PositiveBigIntegerField(
+        _('Last Movement ID'),
+        help_text=_('Highest InventoryMovement id folded into this checkpoint')
+    )
+
+    # === POSITION ===
+    qty = models.DecimalField(
+        _('Quantity'),
+        max_digits=12,
+        decimal_places=3,
+        default=0
+    )
+    value = models.DecimalField(
+        _('Stock Value'),
+        max_digits=18,
+        decimal_places=4,
+        default=0,
+        help_text=_('qty × avg_cost at the checkpoint')
+    )
+    avg_cost = models.DecimalField(
+        _('Average Cost'),
+        max_digits=12,
+        decimal_places=4,
+        default=0
+    )
+
+    # === RUNNING TOTALS (needed to fold newer movements) ===
+    total_in_qty = models.DecimalField(
+        _('Total Incoming Quantity'),
+        max_digits=15,
+        decimal_places=3,
+        default=0
+    )
+    total_in_value = models.DecimalField(
+        _('Total Incoming Value'),
+        max_digits=18,
+        decimal_places=4,
+        default=0
+    )
+    total_returned_qty = models.DecimalField(
+        _('Total Returned Quantity'),
+        max_digits=15,
+        decimal_places=3,
+        default=0,
+        help_text=_('REVERSAL IN quantities - counted in stock, not in the average cost')
+    )
+    total_out_qty = models.DecimalField(
+        _('Total Outgoing Quantity'),
+        max_digits=15,
+        decimal_places=3,
+        default=0
+    )
+
+    created_at = models.DateTimeField(_('Created At'), auto_now_add=True)
+
+    objects = StockCheckpointManager()
+
+    class Meta:
+        unique_together = ('location', 'product', 'last_movement_id')
+        verbose_name = _('Stock Checkpoint')
+        verbose_name_plural = _('Stock Checkpoints')
+        ordering = ['location', 'product', '-last_movement_id']
+        indexes = [
+            models.Index(fields=['as_of']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.location_id} as of {self.as_of:%Y-%m-%d %H:%M}: {self.qty}"
+
+
+class StockLedgerGap(models.Model):
+    """
+    Movement ids a checkpoint build passed over without seeing them
+
+    A gap below a checkpoint watermark is either a rolled-back insert or a
+    transaction that had not committed yet. The next build checks the range
+    again and drops the checkpoints that missed a late commit; gaps older
+    than StockLedgerService.LATE_COMMIT_HORIZON are forgotten.
+    """
+
+    first_movement_id = models.PositiveBigIntegerField(_('First Movement ID'))
+    last_movement_id = models.PositiveBigIntegerField(_('Last Movement ID'))
+    detected_at = models.DateTimeField(_('Detected At'))
+
+    class Meta:
+        unique_together = ('first_movement_id', 'last_movement_id')
+        verbose_name = _('Stock Ledger Gap')
+        verbose_name_plural = _('Stock Ledger Gaps')
+        ordering = ['first_movement_id']
+        indexes = [
+            models.Index(fields=['detected_at']),
+        ]
+
+    def __str__(self):
+        return f"Movements {self.first_movement_id}-{self.last_movement_id} unseen since {self.detected_at:%Y-%m-%d %H:%M}"
+
+
+class DailyStockSnapshotManager(models.Manager):
+    """Manager for daily closing snapshots"""
+
+    def for_location(self, location):
+        return self.filter(location=location)
+
+    def on_date(self, location, snapshot_date):
+        return self.filter(location=location, snapshot_date=snapshot_date)
+
+    def latest_date(self, location, on_or_before=None):
+        """Latest snapshot date for location (optionally not after a date)"""
+        queryset = self.filter(location=location)
+        if on_or_before is not None:
+            queryset = queryset.filter(snapshot_date__lte=on_or_before)
+        return queryset.aggregate(latest=models.Max('snapshot_date'))['latest']
+
+
+class DailyStockSnapshot(models.Model):
+    """
+    Closing stock balance per location+product at the end of a business day
+
+    Sparse: written by build_stock_snapshots only for days the product
+    moved on (by movement_date) - the balance on later days is the latest
+    row carried forward. Carries the same running totals as
+    StockCheckpoint, so valuation follows
+    MovementService._recalculate_inventory_item rules.
+    """
+
+    location = models.ForeignKey(
+        'inventory.InventoryLocation',
+        on_delete=models.CASCADE,
+        related_name='daily_stock_snapshots',
+        verbose_name=_('Location')
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='daily_stock_snapshots',
+        verbose_name=_('Product')
+    )
+    snapshot_date = models.DateField(
+        _('Snapshot Date'),
+        help_text=_('Business date whose closing balance is stored')
+    )
+
+    # === CLOSING POSITION ===
+    closing_qty = models.DecimalField(
+        _('Closing Quantity'),
+        max_digits=12,
+        decimal_places=3,
+        default=0
+    )
+    avg_cost = models.DecimalField(
+        _('Average Cost'),
+        max_digits=12,
+        decimal_places=4,
+        default=0
+    )
+    closing_value = models.DecimalField(
+        _('Closing Value'),
+        max_digits=18,
+        decimal_places=4,
+        default=0
+    )
+
+    # === DAY ACTIVITY ===
+    day_in_qty = models.DecimalField(
+        _('Day Incoming Quantity'),
+        max_digits=12,
+        decimal_places=3,
+        default=0
+    )
+    day_out_qty = models.DecimalField(
+        _('Day Outgoing Quantity'),
+        max_digits=12,
+        decimal_places=3,
+        default=0
+    )
+
+    # === RUNNING TOTALS ===
+    total_in_qty = models.DecimalField(
+        _('Total Incoming Quantity'),
+        max_digits=15,
+        decimal_places=3,
+        default=0
+    )
+    total_in_value = models.DecimalField(
+        _('Total Incoming Value'),
+        max_digits=18,
+        decimal_places=4,
+        default=0
+    )
+    total_returned_qty = models.DecimalField(
+        _('Total Returned Quantity'),
+        max_digits=15,
+        decimal_places=3,
+        default=0,
+        help_text=_('REVERSAL IN quantities - counted in stock, not in the average cost')
+    )
+    total_out_qty = models.DecimalField(
+        _('Total Outgoing Quantity'),
+        max_digits=15,
+        decimal_places=3,
+        default=0
+    )
+
+    created_at = models.DateTimeField(_('Created At'), auto_now_add=True)
+
+    objects = DailyStockSnapshotManager()
+
+    class Meta:
+        unique_together = ('location', 'product', 'snapshot_date')
+        verbose_name = _('Daily Stock Snapshot')
+        verbose_name_plural = _('Daily Stock Snapshots')
+        ordering = ['-snapshot_date', 'location', 'product']
+        indexes = [
+            models.Index(fields=['location', 'snapshot_date']),
+            models.Index(fields=['snapshot_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.location_id} on {self.snapshot_date}: {self.closing_qty}"
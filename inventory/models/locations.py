@@ -2,6 +2,7 @@
 
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -56,6 +57,17 @@ class InventoryLocation(models.Model):
         (BATCH_ENFORCED, _('Enforced - Always require batches')),
     ]
 
+    # === Batch allocation strategies ===
+    ALLOCATION_FIFO = 'FIFO'
+    ALLOCATION_FEFO = 'FEFO'
+    ALLOCATION_LIFO = 'LIFO'
+
+    ALLOCATION_STRATEGY_CHOICES = [
+        (ALLOCATION_FIFO, _('FIFO - First in, first out')),
+        (ALLOCATION_FEFO, _('FEFO - First expired, first out')),
+        (ALLOCATION_LIFO, _('LIFO - Last in, first out')),
+    ]
+
     # === CORE FIELDS ===
     code = models.CharField(
         _('Location Code'),
@@ -104,6 +116,14 @@ class InventoryLocation(models.Model):
         help_text=_('Default expiry period for products without explicit expiry')
     )
 
+    allocation_strategy = models.CharField(
+        _('Allocation Strategy'),
+        max_length=10,
+        choices=ALLOCATION_STRATEGY_CHOICES,
+        default=ALLOCATION_FIFO,
+        help_text=_('Batch consumption order for outgoing stock (product groups can override)')
+    )
+
     # === PRICING & VAT SETTINGS ===
     purchase_prices_include_vat = models.BooleanField(
         _('Purchase Prices Include VAT'),
@@ -159,6 +179,11 @@ class InventoryLocation(models.Model):
         default=False,
         help_text=_('Allow sales when insufficient stock')
     )
+    journal_stock_updates = models.BooleanField(
+        _('Journaled Stock Updates'),
+        default=False,
+        help_text=_('Outgoing movements append stock deltas instead of updating items (folded by compact_stock_journal)')
+    )
 
     # === STATUS ===
     is_active = models.BooleanField(_('Is Active'), default=True)
@@ -183,6 +208,17 @@ class InventoryLocation(models.Model):
         if self.name:
             self.name = self.name.strip()
 
+        # Journaled stock skips the availability check - only where stock may go negative
+        if not self.allow_negative_stock:
+            if self.journal_stock_updates:
+                raise ValidationError({
+                    'journal_stock_updates': _('Journaled stock updates require allowing negative stock')
+                })
+            if self.pk and self.inventory_items.filter(journaled=True).exists():
+                raise ValidationError({
+                    'allow_negative_stock': _('Journaled inventory items at this location need negative stock')
+                })
+
     def save(self, *args, **kwargs):
         self.full_clean()
         super().save(*args, **kwargs)
@@ -440,43 +440,17 @@ class InventoryMovement(models.Model):
     def get_profit_summary(cls, location=None, product=None, date_from=None, date_to=None) -> dict:
         """
         NEW: Get profit summary for sales movements
+
+        Served from DailyMovementSummary plus the movements not rolled up yet.
         """
-        queryset = cls.objects.sales().filter(
-            sale_price__isnull=False,
-            profit_amount__isnull=False
-        )
+        from inventory.services.movement_summary import MovementSummaryService
 
-        if location:
-            queryset = queryset.filter(location=location)
-        if product:
-            queryset = queryset.filter(product=product)
-        if date_from:
-            queryset = queryset.filter(movement_date__gte=date_from)
-        if date_to:
-            queryset = queryset.filter(movement_date__lte=date_to)
-
-        from django.db.models import Sum, Count, Avg
-
-        summary = queryset.aggregate(
-            total_movements=Count('id'),
-            total_quantity=Sum('quantity'),
-            total_revenue=Sum(models.F('quantity') * models.F('sale_price')),
-            total_cost=Sum(models.F('quantity') * models.F('cost_price')),
-            total_profit=Sum(models.F('quantity') * models.F('profit_amount')),
-            avg_profit_margin=Avg('profit_amount'),
+        return MovementSummaryService.get_profit_summary(
+            location=location,
+            product=product,
+            date_from=date_from,
+            date_to=date_to
         )
 
-        # Calculate derived metrics
-        total_revenue = summary['total_revenue'] or Decimal('0')
-        total_profit = summary['total_profit'] or Decimal('0')
-
-        if total_revenue > 0:
-            from core.utils.decimal_utils import round_percentage
-            summary['profit_margin_percentage'] = round_percentage(total_profit / total_revenue * 100)
-        else:
-            summary['profit_margin_percentage'] = Decimal('0')
-
-        return summary
-
     def __repr__(self):
         return f"<InventoryMovement: {self.movement_type} {self.quantity} {self.product.code} @ {self.location.code}>"
\ No newline at end of file
@@ -0,0 +1,119 @@
+# inventory/models/reservations.py - STOCK RESERVATION LEDGER
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class StockReservationManager(models.Manager):
+    """Manager for stock reservations"""
+
+    def active(self):
+        return self.filter(status=StockReservation.ACTIVE)
+
+    def for_reference(self, reference: str):
+        return self.filter(reference=reference)
+
+    def expired(self, now=None):
+        """Active holds whose TTL has passed"""
+        return self.active().filter(expires_at__lte=now or timezone.now())
+
+
+class StockReservation(models.Model):
+    """
+    One stock hold (cart line, order, transfer)
+
+    InventoryItem.reserved_qty is the sum of all holds. The ledger row
+    records who holds what until when, so abandoned holds are released
+    by the sweeper instead of leaking reserved_qty.
+    """
+
+    ACTIVE = 'active'
+    RELEASED = 'released'
+    CONSUMED = 'consumed'
+    EXPIRED = 'expired'
+
+    STATUS_CHOICES = [
+        (ACTIVE, _('Active')),
+        (RELEASED, _('Released')),
+        (CONSUMED, _('Consumed')),
+        (EXPIRED, _('Expired')),
+    ]
+
+    location = models.ForeignKey(
+        'inventory.InventoryLocation',
+        on_delete=models.CASCADE,
+        related_name='stock_reservations',
+        verbose_name=_('Location')
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='stock_reservations',
+        verbose_name=_('Product')
+    )
+    quantity = models.DecimalField(
+        _('Quantity'),
+        max_digits=12,
+        decimal_places=3
+    )
+
+    reference = models.CharField(
+        _('Reference'),
+        max_length=100,
+        blank=True,
+        help_text=_('Cart, session or document holding the stock')
+    )
+    reason = models.CharField(
+        _('Reason'),
+        max_length=200,
+        blank=True
+    )
+
+    status = models.CharField(
+        _('Status'),
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=ACTIVE
+    )
+    expires_at = models.DateTimeField(
+        _('Expires At'),
+        null=True,
+        blank=True,
+        help_text=_('Hold is released automatically after this moment (empty = no expiry)')
+    )
+    closed_at = models.DateTimeField(
+        _('Closed At'),
+        null=True,
+        blank=True
+    )
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_reservations',
+        verbose_name=_('Created By')
+    )
+    created_at = models.DateTimeField(_('Created At'), auto_now_add=True)
+
+    objects = StockReservationManager()
+
+    class Meta:
+        verbose_name = _('Stock Reservation')
+        verbose_name_plural = _('Stock Reservations')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+            models.Index(fields=['reference', 'status']),
+            models.Index(fields=['location', 'product', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.location_id}: {self.quantity} [{self.status}]"
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == self.ACTIVE
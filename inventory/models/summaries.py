@@ -0,0 +1,135 @@
+# inventory/models/summaries.py - DAILY MOVEMENT ROLLUP
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class DailyMovementSummaryManager(models.Manager):
+    """Manager for daily movement rollups"""
+
+    def for_location(self, location):
+        return self.filter(location=location)
+
+    def in_period(self, date_from=None, date_to=None):
+        queryset = self.all()
+        if date_from:
+            queryset = queryset.filter(summary_date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(summary_date__lte=date_to)
+        return queryset
+
+    def watermarks(self):
+        """
+        Per-location {location_id: (last summary_date, rolled_up_at)}
+
+        Every movement created up to rolled_up_at and dated up to the last
+        summary_date of its location is already in the rollup.
+        """
+        rows = self.values('location_id').annotate(
+            last_date=models.Max('summary_date'),
+            rolled_up_at=models.Max('rolled_up_at')
+        ).order_by()
+        return {row['location_id']: (row['last_date'], row['rolled_up_at']) for row in rows}
+
+
+class DailyMovementSummary(models.Model):
+    """
+    Movement totals per day, location, product, movement type and source document type
+
+    Rebuilt per (location, day) from InventoryMovement by
+    MovementSummaryService; statistics and profit reports read rolled-up
+    days from here and only the movements after the watermark from the raw
+    table. Values are quantized to 0.0001.
+
+    "Priced" totals cover movements with sale_price and profit_amount set -
+    the same rows InventoryMovement.get_profit_summary used to scan.
+    """
+
+    summary_date = models.DateField(_('Date'))
+    location = models.ForeignKey(
+        'inventory.InventoryLocation',
+        on_delete=models.CASCADE,
+        related_name='movement_summaries',
+        verbose_name=_('Location')
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='movement_summaries',
+        verbose_name=_('Product')
+    )
+    movement_type = models.CharField(_('Movement Type'), max_length=15)
+    source_document_type = models.CharField(_('Source Document Type'), max_length=30, blank=True)
+
+    # === ALL MOVEMENTS ===
+    movement_count = models.PositiveIntegerField(_('Movements'), default=0)
+    total_quantity = models.DecimalField(
+        _('Quantity'),
+        max_digits=15,
+        decimal_places=3,
+        default=0
+    )
+    total_cost_value = models.DecimalField(
+        _('Cost Value'),
+        max_digits=18,
+        decimal_places=4,
+        default=0
+    )
+
+    # === PRICED MOVEMENTS (profit tracking) ===
+    priced_count = models.PositiveIntegerField(_('Priced Movements'), default=0)
+    priced_quantity = models.DecimalField(
+        _('Priced Quantity'),
+        max_digits=15,
+        decimal_places=3,
+        default=0
+    )
+    priced_cost_value = models.DecimalField(
+        _('Priced Cost Value'),
+        max_digits=18,
+        decimal_places=4,
+        default=0
+    )
+    total_sale_value = models.DecimalField(
+        _('Sale Value'),
+        max_digits=18,
+        decimal_places=4,
+        default=0
+    )
+    total_profit = models.DecimalField(
+        _('Profit'),
+        max_digits=18,
+        decimal_places=4,
+        default=0
+    )
+    unit_profit_sum = models.DecimalField(
+        _('Unit Profit Sum'),
+        max_digits=18,
+        decimal_places=4,
+        default=0,
+        help_text=_('Sum of per-unit profit_amount (for average unit profit)')
+    )
+
+    rolled_up_at = models.DateTimeField(
+        _('Rolled Up At'),
+        help_text=_('Movements created after this moment are not included yet')
+    )
+
+    objects = DailyMovementSummaryManager()
+
+    class Meta:
+        unique_together = ('summary_date', 'location', 'product', 'movement_type', 'source_document_type')
+        verbose_name = _('Daily Movement Summary')
+        verbose_name_plural = _('Daily Movement Summaries')
+        ordering = ['-summary_date', 'location', 'product']
+        indexes = [
+            models.Index(fields=['location', 'summary_date']),
+            models.Index(fields=['product', 'summary_date']),
+            models.Index(fields=['movement_type', 'source_document_type', 'summary_date']),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.summary_date} {self.location_id}/{self.product_id} "
+            f"{self.movement_type}/{self.source_document_type}: {self.total_quantity}"
+        )
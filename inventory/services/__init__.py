@@ -4,8 +4,40 @@ Inventory business services
 
 from .inventory_service import InventoryService
 from .movement_service import MovementService
+from .posting_engine import StockPostingEngine
+from .fifo_allocator import (
+    FifoAllocator, LifoAllocator, FefoAllocator, SpecificBatchAllocator, AllocationStrategy, BatchAllocation
+)
+from .stock_ledger import StockLedgerService
+from .stock_snapshots import StockSnapshotService
+from .reservation_service import ReservationService
+from .reversal_engine import DocumentReversalEngine
+from .movement_history import MovementHistoryService
+from .movement_summary import MovementSummaryService
+from .stock_journal import StockJournalService
+from .movement_resync import MovementResyncEngine
+from .valuation_engine import InventoryValuationEngine, ValuationResult
+from .stock_audit import StockAuditService
 
 __all__ = [
     'InventoryService',
     'MovementService',
+    'StockPostingEngine',
+    'FifoAllocator',
+    'LifoAllocator',
+    'FefoAllocator',
+    'SpecificBatchAllocator',
+    'AllocationStrategy',
+    'BatchAllocation',
+    'StockLedgerService',
+    'StockSnapshotService',
+    'ReservationService',
+    'DocumentReversalEngine',
+    'MovementHistoryService',
+    'MovementSummaryService',
+    'StockJournalService',
+    'MovementResyncEngine',
+    'InventoryValuationEngine',
+    'ValuationResult',
+    'StockAuditService',
 ]
\ No newline at end of file
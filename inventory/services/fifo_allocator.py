@@ -0,0 +1,244 @@
+# inventory/services/fifo_allocator.py - SINGLE-PASS BATCH ALLOCATION STRATEGIES
+
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import F, Q, Sum, Window
+
+from ..models import InventoryBatch, InventoryLocation
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchAllocation:
+    """Quantity taken from one batch"""
+    batch: InventoryBatch
+    quantity: Decimal
+
+
+class FifoAllocator:
+    """
+    FIFO allocation of an outgoing quantity across InventoryBatch rows
+
+    On databases with window functions the running sum of remaining_qty
+    selects only the batches needed to cover the quantity, so one query
+    returns (and locks) exactly the consumed batches. Elsewhere all
+    batches with stock are scanned in allocation order. Allocation itself
+    is computed in memory and written back with a single bulk_update.
+
+    Other strategies only change ORDERING ((field, descending) pairs,
+    unique through the trailing id) and BATCH_FILTER.
+    """
+
+    STRATEGY = InventoryLocation.ALLOCATION_FIFO
+    ORDERING = (('created_at', False), ('id', False))
+    BATCH_FILTER = Q()
+
+    def __init__(self, location, product):
+        self.location = location
+        self.product = product
+
+    # =====================================================
+    # PUBLIC API
+    # =====================================================
+
+    def allocate(self, quantity: Decimal) -> Tuple[List[BatchAllocation], Decimal]:
+        """
+        Lock the needed batches and split quantity across them
+
+        Returns:
+            Tuple of (allocations in allocation order, uncovered quantity)
+        """
+        batches = self._lock_candidates(quantity)
+        allocations, shortfall = self.split(batches, quantity)
+
+        # Window snapshot can be stale once locks are granted - top up from later batches
+        while shortfall > 0 and batches and self.uses_running_sum():
+            batches = self._lock_after(batches[-1], shortfall)
+            if not batches:
+                break
+            extra, shortfall = self.split(batches, shortfall)
+            allocations.extend(extra)
+
+        return allocations, shortfall
+
+    @staticmethod
+    def split(batches, quantity: Decimal) -> Tuple[List[BatchAllocation], Decimal]:
+        """Split quantity across batches in the given order - no database access"""
+        allocations = []
+        remaining = quantity
+
+        for batch in batches:
+            if remaining <= 0:
+                break
+            if batch.remaining_qty <= 0:
+                continue
+
+            take = min(remaining, batch.remaining_qty)
+            allocations.append(BatchAllocation(batch=batch, quantity=take))
+            remaining -= take
+
+        return allocations, remaining
+
+    @staticmethod
+    def apply(allocations: List[BatchAllocation]) -> int:
+        """Decrement consumed batches with one bulk_update"""
+        if not allocations:
+            return 0
+
+        batches = []
+        for allocation in allocations:
+            batch = allocation.batch
+            batch.remaining_qty = F('remaining_qty') - allocation.quantity
+            batches.append(batch)
+
+        return InventoryBatch.objects.bulk_update(batches, ['remaining_qty'])
+
+    @staticmethod
+    def uses_running_sum() -> bool:
+        return connection.features.supports_over_clause
+
+    # =====================================================
+    # QUERIES
+    # =====================================================
+
+    def _base_queryset(self):
+        return InventoryBatch.objects.filter(
+            self.BATCH_FILTER,
+            location=self.location,
+            product=self.product,
+            remaining_qty__gt=0
+        )
+
+    def _order_by(self):
+        return [F(field).desc() if descending else F(field).asc() for field, descending in self.ORDERING]
+
+    def _lock_candidates(self, quantity: Decimal) -> List[InventoryBatch]:
+        """Batches whose running total (in allocation order) starts below the requested quantity"""
+        queryset = self._base_queryset()
+
+        if self.uses_running_sum():
+            running_total = Window(
+                expression=Sum('remaining_qty'),
+                order_by=self._order_by()
+            )
+            needed = self._base_queryset().annotate(
+                running_total=running_total
+            ).filter(
+                running_total__lt=F('remaining_qty') + quantity
+            ).values('pk')
+            queryset = queryset.filter(pk__in=needed)
+
+        return list(queryset.select_for_update().order_by(*self._order_by()))
+
+    def _lock_after(self, last_batch: InventoryBatch, quantity: Decimal) -> List[InventoryBatch]:
+        """Next batches in allocation order after last_batch"""
+        later = Q()
+        previous = {}
+        for field, descending in self.ORDERING:
+            value = getattr(last_batch, field)
+            later |= Q(**previous, **{f"{field}__{'lt' if descending else 'gt'}": value})
+            previous[field] = value
+
+        batches = []
+        covered = Decimal('0')
+        for batch in self._base_queryset().filter(later).select_for_update().order_by(*self._order_by()):
+            batches.append(batch)
+            covered += batch.remaining_qty
+            if covered >= quantity:
+                break
+        return batches
+
+
+class LifoAllocator(FifoAllocator):
+    """Newest batches first"""
+
+    STRATEGY = InventoryLocation.ALLOCATION_LIFO
+    ORDERING = (('created_at', True), ('id', True))
+
+
+class FefoAllocator(FifoAllocator):
+    """
+    Earliest expiry first
+
+    Dated batches are read in (expiry_date, id) order from the
+    (location, product, expiry_date, remaining_qty) index; batches without
+    an expiry date are consumed FIFO after them.
+    """
+
+    STRATEGY = InventoryLocation.ALLOCATION_FEFO
+    ORDERING = (('expiry_date', False), ('id', False))
+    BATCH_FILTER = Q(expiry_date__isnull=False)
+
+    def allocate(self, quantity: Decimal) -> Tuple[List[BatchAllocation], Decimal]:
+        allocations, shortfall = super().allocate(quantity)
+
+        if shortfall > 0:
+            undated, shortfall = _UndatedFifoAllocator(self.location, self.product).allocate(shortfall)
+            allocations.extend(undated)
+
+        return allocations, shortfall
+
+
+class _UndatedFifoAllocator(FifoAllocator):
+    BATCH_FILTER = Q(expiry_date__isnull=True)
+
+
+class SpecificBatchAllocator(FifoAllocator):
+    """Only the named batch (manual batch selection)"""
+
+    STRATEGY = 'SPECIFIC'
+
+    def __init__(self, location, product, batch_number: str):
+        super().__init__(location, product)
+        self.BATCH_FILTER = Q(batch_number=batch_number)
+
+
+class AllocationStrategy:
+    """
+    Pick the batch allocator for a location+product
+
+    Priority: explicit batch -> nearest product group (up the tree) with a
+    strategy -> InventoryLocation.allocation_strategy -> FIFO.
+    """
+
+    ALLOCATORS = {
+        InventoryLocation.ALLOCATION_FIFO: FifoAllocator,
+        InventoryLocation.ALLOCATION_FEFO: FefoAllocator,
+        InventoryLocation.ALLOCATION_LIFO: LifoAllocator,
+    }
+
+    @staticmethod
+    def resolve(location, product) -> str:
+        strategy = AllocationStrategy._group_strategy(product)
+        if not strategy:
+            strategy = getattr(location, 'allocation_strategy', None)
+        return strategy if strategy in AllocationStrategy.ALLOCATORS else InventoryLocation.ALLOCATION_FIFO
+
+    @staticmethod
+    def get_allocator(location, product, batch_number: Optional[str] = None) -> FifoAllocator:
+        if batch_number:
+            return SpecificBatchAllocator(location, product, batch_number)
+        return AllocationStrategy.ALLOCATORS[AllocationStrategy.resolve(location, product)](location, product)
+
+    @staticmethod
+    def _group_strategy(product) -> Optional[str]:
+        group = getattr(product, 'product_group', None)
+        if group is None:
+            return None
+        if group.allocation_strategy:
+            return group.allocation_strategy
+
+        return group.get_ancestors().exclude(
+            allocation_strategy=''
+        ).order_by('-level').values_list('allocation_strategy', flat=True).first()
+
+
+__all__ = [
+    'FifoAllocator', 'LifoAllocator', 'FefoAllocator', 'SpecificBatchAllocator',
+    'AllocationStrategy', 'BatchAllocation',
+]
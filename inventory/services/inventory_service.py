@@ -2,7 +2,6 @@
 
 from django.db.models import Sum, F
 from django.utils import timezone
-from django.db import transaction
 from typing import Dict, List
 from decimal import Decimal
 from core.utils.result import Result
@@ -29,14 +28,14 @@ class InventoryService:
         Replaces check_availability() with better error handling
         """
         try:
-            item = InventoryItem.objects.get(location=location, product=product)
+            item = InventoryItem.objects.with_pending_deltas().get(location=location, product=product)
 
             available = item.available_qty
             can_fulfill = available >= required_qty or location.allow_negative_stock
 
             availability_data = {
                 'available': True,
-                'current_qty': item.current_qty,
+                'current_qty': item.effective_qty,
                 'available_qty': available,
                 'reserved_qty': item.reserved_qty,
                 'can_fulfill': can_fulfill,
@@ -163,57 +162,34 @@ class InventoryService:
     def reserve_stock_qty(location: InventoryLocation, product, quantity: Decimal, reason: str = '') -> Result:
         """
         Reserve stock quantity - NEW Result-based method
+
+        FIXED: One conditional UPDATE instead of read + select_for_update + save.
+        For expiring holds (carts) use ReservationService.reserve().
         """
         try:
-            # First check availability
-            availability_result = InventoryService.validate_availability(location, product, quantity)
-            if not availability_result.ok:
-                return availability_result
+            from .reservation_service import ReservationService
 
-            with transaction.atomic():
-                item = InventoryItem.objects.select_for_update().get(
-                    location=location, product=product
-                )
+            if not ReservationService.increment_reserved(location, product, quantity):
+                return ReservationService._reserve_failure(location, product, quantity)
 
-                if item.available_qty < quantity and not location.allow_negative_stock:
-                    return Result.error(
-                        code='INSUFFICIENT_AVAILABLE',
-                        msg=f"Cannot reserve {quantity}, only {item.available_qty} available",
-                        data={
-                            'requested_qty': quantity,
-                            'available_qty': item.available_qty,
-                            'current_qty': item.current_qty,
-                            'reserved_qty': item.reserved_qty
-                        }
-                    )
+            item = InventoryItem.objects.with_pending_deltas().get(location=location, product=product)
 
-                # Update reservation
-                old_reserved = item.reserved_qty
-                item.reserved_qty += quantity
-                item.save(update_fields=['reserved_qty'])
-
-                reservation_data = {
-                    'product_code': product.code,
-                    'location_code': location.code,
-                    'reserved_quantity': quantity,
-                    'total_reserved': item.reserved_qty,
-                    'previous_reserved': old_reserved,
-                    'available_after_reservation': item.available_qty,
-                    'reason': reason,
-                    'timestamp': timezone.now().isoformat()
-                }
-
-                return Result.success(
-                    data=reservation_data,
-                    msg=f"Reserved {quantity} units. Total reserved: {item.reserved_qty}"
-                )
+            reservation_data = {
+                'product_code': product.code,
+                'location_code': location.code,
+                'reserved_quantity': quantity,
+                'total_reserved': item.reserved_qty,
+                'previous_reserved': item.reserved_qty - quantity,
+                'available_after_reservation': item.available_qty,
+                'reason': reason,
+                'timestamp': timezone.now().isoformat()
+            }
 
-        except InventoryItem.DoesNotExist:
-            return Result.error(
-                code='ITEM_NOT_FOUND',
-                msg=f"Cannot reserve: Product {product.code} not found at {location.code}",
-                data={'product_code': product.code, 'location_code': location.code}
+            return Result.success(
+                data=reservation_data,
+                msg=f"Reserved {quantity} units. Total reserved: {item.reserved_qty}"
             )
+
         except Exception as e:
             return Result.error(
                 code='RESERVATION_ERROR',
@@ -225,50 +201,48 @@ class InventoryService:
     def release_reservation(location: InventoryLocation, product, quantity: Decimal) -> Result:
         """
         Release stock reservation - NEW Result-based method
+
+        FIXED: One conditional UPDATE (reserved_qty >= quantity), no row lock.
         """
         try:
-            with transaction.atomic():
-                item = InventoryItem.objects.select_for_update().get(
-                    location=location, product=product
-                )
+            from .reservation_service import ReservationService
 
-                if item.reserved_qty < quantity:
-                    return Result.error(
-                        code='INSUFFICIENT_RESERVED',
-                        msg=f"Cannot release {quantity}, only {item.reserved_qty} reserved",
-                        data={
-                            'requested_qty': quantity,
-                            'reserved_qty': item.reserved_qty,
-                            'available_qty': item.available_qty
-                        }
-                    )
+            released = ReservationService.decrement_reserved(location.pk, product.pk, quantity)
+            item = InventoryItem.objects.filter(location=location, product=product).first()
 
-                # Update reservation
-                old_reserved = item.reserved_qty
-                item.reserved_qty -= quantity
-                item.save(update_fields=['reserved_qty'])
-
-                release_data = {
-                    'product_code': product.code,
-                    'location_code': location.code,
-                    'released_quantity': quantity,
-                    'total_reserved': item.reserved_qty,
-                    'previous_reserved': old_reserved,
-                    'available_after_release': item.available_qty,
-                    'timestamp': timezone.now().isoformat()
-                }
+            if item is None:
+                return Result.error(
+                    code='ITEM_NOT_FOUND',
+                    msg=f"Cannot release: Product {product.code} not found at {location.code}",
+                    data={'product_code': product.code, 'location_code': location.code}
+                )
 
-                return Result.success(
-                    data=release_data,
-                    msg=f"Released {quantity} units. Total reserved: {item.reserved_qty}"
+            if not released:
+                return Result.error(
+                    code='INSUFFICIENT_RESERVED',
+                    msg=f"Cannot release {quantity}, only {item.reserved_qty} reserved",
+                    data={
+                        'requested_qty': quantity,
+                        'reserved_qty': item.reserved_qty,
+                        'available_qty': item.available_qty
+                    }
                 )
 
-        except InventoryItem.DoesNotExist:
-            return Result.error(
-                code='ITEM_NOT_FOUND',
-                msg=f"Cannot release: Product {product.code} not found at {location.code}",
-                data={'product_code': product.code, 'location_code': location.code}
+            release_data = {
+                'product_code': product.code,
+                'location_code': location.code,
+                'released_quantity': quantity,
+                'total_reserved': item.reserved_qty,
+                'previous_reserved': item.reserved_qty + quantity,
+                'available_after_release': item.available_qty,
+                'timestamp': timezone.now().isoformat()
+            }
+
+            return Result.success(
+                data=release_data,
+                msg=f"Released {quantity} units. Total reserved: {item.reserved_qty}"
             )
+
         except Exception as e:
             return Result.error(
                 code='RELEASE_ERROR',
@@ -282,7 +256,7 @@ class InventoryService:
         Get comprehensive stock information - NEW Result-based method
         """
         try:
-            item = InventoryItem.objects.get(location=location, product=product)
+            item = InventoryItem.objects.with_pending_deltas().get(location=location, product=product)
 
             # Get batch information if available
             batches = []
@@ -313,7 +287,7 @@ class InventoryService:
                 'product_name': product.name,
                 'location_code': location.code,
                 'location_name': location.name,
-                'current_qty': item.current_qty,
+                'current_qty': item.effective_qty,
                 'available_qty': item.available_qty,
                 'reserved_qty': item.reserved_qty,
                 'avg_cost': item.avg_cost,
@@ -321,19 +295,19 @@ class InventoryService:
                 'last_purchase_date': getattr(item, 'last_purchase_date', None),
                 'last_sale_date': getattr(item, 'last_sale_date', None),
                 'last_sale_price': getattr(item, 'last_sale_price', None),
-                'total_stock_value': item.current_qty * item.avg_cost,
+                'total_stock_value': item.effective_qty * item.avg_cost,
                 'available_stock_value': item.available_qty * item.avg_cost,
                 'batches': batches,
                 'batch_count': len(batches),
                 'total_batch_qty': batch_total_qty,
                 'tracks_batches': product.track_batches and location.should_track_batches(product),
-                'stock_status': 'IN_STOCK' if item.current_qty > 0 else 'OUT_OF_STOCK',
+                'stock_status': 'IN_STOCK' if item.effective_qty > 0 else 'OUT_OF_STOCK',
                 'last_updated': item.updated_at
             }
 
             return Result.success(
                 data=stock_data,
-                msg=f"Stock summary for {product.code}: {item.current_qty} units"
+                msg=f"Stock summary for {product.code}: {item.effective_qty} units"
             )
 
         except InventoryItem.DoesNotExist:
@@ -477,6 +451,33 @@ class InventoryService:
                 data={'product_code': product.code, 'location_code': location.code}
             )
 
+    @staticmethod
+    def get_stock_as_of(location: InventoryLocation, as_of_date, product=None) -> Result:
+        """
+        Point-in-time stock and valuation - NEW Result-based method
+
+        Reads the closest DailyStockSnapshot plus movements dated after it
+        instead of summing the full movement history.
+        """
+        try:
+            from .stock_snapshots import StockSnapshotService
+
+            position = StockSnapshotService.get_position_as_of(location, as_of_date, product=product)
+            position['location_code'] = location.code
+
+            return Result.success(
+                data=position,
+                msg=f"Stock as of {as_of_date}: {position['product_count']} products, "
+                    f"value {position['total_value']}"
+            )
+
+        except Exception as e:
+            return Result.error(
+                code='STOCK_AS_OF_ERROR',
+                msg=f"Error calculating stock as of {as_of_date}: {str(e)}",
+                data={'location_code': location.code, 'as_of': as_of_date}
+            )
+
     # =====================================================
     # LEGACY METHODS - BACKWARD COMPATIBILITY
     # =====================================================
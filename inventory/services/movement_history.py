@@ -0,0 +1,174 @@
+# inventory/services/movement_history.py - STREAMING MOVEMENT HISTORY
+
+import logging
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from ..models import InventoryMovement
+
+logger = logging.getLogger(__name__)
+
+
+class MovementHistoryService:
+    """
+    Movement history without materializing the full result
+
+    - iter_history(): generator over .values().iterator(chunk_size)
+    - get_page(): keyset pagination on (movement_date, id), newest first
+    - get_summary(): totals aggregated in the database
+    """
+
+    CHUNK_SIZE = 2000
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 1000
+
+    HISTORY_FIELDS = (
+        'id', 'movement_date', 'movement_type', 'quantity', 'cost_price', 'sale_price',
+        'batch_number', 'source_document_type', 'source_document_number', 'reason',
+    )
+    RELATED_FIELDS = {
+        'product_code': F('product__code'),
+        'location_code': F('location__code'),
+        'created_by_username': F('created_by__username'),
+    }
+    ORDERING = ('-movement_date', '-id')
+
+    # =====================================================
+    # QUERYSET
+    # =====================================================
+
+    @staticmethod
+    def build_queryset(location=None, product=None, days_back: int = 30,
+                       movement_types: Optional[List[str]] = None,
+                       date_from: Optional[date] = None, date_to: Optional[date] = None):
+        """Filtered movements - same filters as the legacy history"""
+        queryset = InventoryMovement.objects.all()
+
+        if location:
+            queryset = queryset.filter(location=location)
+        if product:
+            queryset = queryset.filter(product=product)
+        if movement_types:
+            queryset = queryset.filter(movement_type__in=movement_types)
+
+        if date_from is None and days_back > 0:
+            date_from = timezone.now().date() - timedelta(days=days_back)
+        if date_from:
+            queryset = queryset.filter(movement_date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(movement_date__lte=date_to)
+
+        return queryset
+
+    # =====================================================
+    # STREAMING / PAGINATION
+    # =====================================================
+
+    @staticmethod
+    def iter_history(queryset, include_profit_data: bool = True,
+                     chunk_size: Optional[int] = None) -> Iterator[Dict]:
+        """Yield history rows newest first, chunk_size rows per DB fetch"""
+        rows = MovementHistoryService._values(queryset).order_by(*MovementHistoryService.ORDERING)
+
+        for row in rows.iterator(chunk_size=chunk_size or MovementHistoryService.CHUNK_SIZE):
+            yield MovementHistoryService._format_row(row, include_profit_data)
+
+    @staticmethod
+    def get_page(queryset, cursor: Optional[str] = None, limit: Optional[int] = None,
+                 include_profit_data: bool = True) -> Dict:
+        """
+        One page of history after a cursor
+
+        Returns:
+            Dict with movements and next_cursor (None on the last page)
+        """
+        limit = min(limit or MovementHistoryService.DEFAULT_PAGE_SIZE, MovementHistoryService.MAX_PAGE_SIZE)
+
+        if cursor:
+            movement_date, movement_id = MovementHistoryService.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(movement_date__lt=movement_date) |
+                Q(movement_date=movement_date, id__lt=movement_id)
+            )
+
+        rows = list(
+            MovementHistoryService._values(queryset).order_by(*MovementHistoryService.ORDERING)[:limit + 1]
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return {
+            'movements': [MovementHistoryService._format_row(row, include_profit_data) for row in rows],
+            'next_cursor': MovementHistoryService.encode_cursor(rows[-1]) if has_more else None,
+        }
+
+    @staticmethod
+    def encode_cursor(row: Dict) -> str:
+        return f"{row['movement_date'].isoformat()}_{row['id']}"
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[date, int]:
+        try:
+            movement_date, movement_id = cursor.split('_', 1)
+            return date.fromisoformat(movement_date), int(movement_id)
+        except (ValueError, AttributeError):
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    # =====================================================
+    # SUMMARY
+    # =====================================================
+
+    @staticmethod
+    def get_summary(queryset) -> Dict:
+        """Movement totals in one aggregate query"""
+        line_profit = ExpressionWrapper(
+            (F('sale_price') - F('cost_price')) * F('quantity'),
+            output_field=DecimalField(max_digits=18, decimal_places=4)
+        )
+        with_sale_price = Q(sale_price__isnull=False) & ~Q(sale_price=0)
+
+        totals = queryset.aggregate(
+            total_movements=Count('id'),
+            total_in=Sum('quantity', filter=Q(movement_type=InventoryMovement.IN)),
+            total_out=Sum('quantity', filter=Q(movement_type=InventoryMovement.OUT)),
+            total_profit=Sum(line_profit, filter=with_sale_price),
+        )
+
+        total_in = totals['total_in'] or Decimal('0')
+        total_out = totals['total_out'] or Decimal('0')
+        return {
+            'total_movements': totals['total_movements'],
+            'total_in': total_in,
+            'total_out': total_out,
+            'net_movement': total_in - total_out,
+            'total_profit': (totals['total_profit'] or Decimal('0')).quantize(Decimal('0.0001')),
+        }
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _values(queryset):
+        return queryset.values(*MovementHistoryService.HISTORY_FIELDS, **MovementHistoryService.RELATED_FIELDS)
+
+    @staticmethod
+    def _format_row(row: Dict, include_profit_data: bool) -> Dict:
+        row['created_by'] = row.pop('created_by_username')
+
+        sale_price = row['sale_price']
+        if include_profit_data and sale_price:
+            unit_profit = sale_price - row['cost_price']
+            row.update({
+                'unit_profit': unit_profit,
+                'total_profit': unit_profit * row['quantity'],
+                'profit_margin': (unit_profit / sale_price * 100) if sale_price > 0 else 0
+            })
+        return row
+
+
+__all__ = ['MovementHistoryService']
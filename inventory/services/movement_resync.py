@@ -0,0 +1,409 @@
+# inventory/services/movement_resync.py - DIFF-BASED DOCUMENT MOVEMENT RESYNC
+
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Q, Sum
+
+from core.utils.decimal_utils import round_cost_price
+from ..models import InventoryMovement
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _ExpectedLine:
+    """Net stock effect one document line should have"""
+    line_id: Optional[int]
+    location: object
+    product: object
+    quantity: Decimal  # signed: + incoming, - outgoing
+    source_document_type: str
+    cost_price: Optional[Decimal] = None
+    batch_number: Optional[str] = None
+    expiry_date: object = None
+    to_location: object = None  # transfers only
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return self.location.pk, self.product.pk
+
+
+class MovementResyncEngine:
+    """
+    Bring a document's movements in line with its current lines
+
+    Existing movements (originals plus REV- reversals) are netted per
+    (source_document_line_id, location, product) and compared with what
+    each line should post. Only the differences are posted:
+
+    - same product/cost/batch, other quantity -> one delta movement
+    - product, cost or batch changed -> reverse the old net, post the line
+    - removed line -> reverse its net; added line -> post it
+
+    Untouched lines cost nothing. Nothing is deleted, so stock ledger
+    checkpoints and rollups stay valid and InventoryItem follows the
+    corrections through the regular posting paths.
+    """
+
+    CORRECTION_TYPE = 'CORRECTION'
+
+    SUPPORTED_TYPE_KEYS = {
+        'delivery_receipt': 'delivery', 'deliveryreceipt': 'delivery',
+        'purchase_order': 'purchase_order', 'purchaseorder': 'purchase_order',
+        'purchase_request': 'purchase_request', 'purchaserequest': 'purchase_request',
+        'stock_transfer': 'stock_transfer', 'stocktransfer': 'stock_transfer',
+    }
+
+    def __init__(self, document, created_by=None):
+        self.document = document
+        self.document_number = document.document_number
+        self.created_by = created_by or getattr(document, 'updated_by', None) or getattr(document, 'created_by', None)
+        self.stats = {'unchanged': 0, 'changed': 0, 'added': 0, 'removed': 0}
+
+    @staticmethod
+    def get_kind(document) -> Optional[str]:
+        type_key = getattr(getattr(document, 'document_type', None), 'type_key', None)
+        if not type_key:
+            type_key = document._meta.model_name.lower()
+        return MovementResyncEngine.SUPPORTED_TYPE_KEYS.get(type_key)
+
+    @staticmethod
+    def supports(document) -> bool:
+        return MovementResyncEngine.get_kind(document) is not None
+
+    # =====================================================
+    # PUBLIC API
+    # =====================================================
+
+    @transaction.atomic
+    def resync(self, creates_movements: bool = True) -> Dict:
+        """
+        Args:
+            creates_movements: False when the current status posts nothing -
+                               every line is reversed to zero
+
+        Raises:
+            ValidationError: A correction could not be posted (nothing is kept)
+        """
+        expected = self._expected_lines() if creates_movements else []
+        existing = self._existing_lines()
+
+        expected_by_line: Dict[Optional[int], List[_ExpectedLine]] = {}
+        for line in expected:
+            expected_by_line.setdefault(line.line_id, []).append(line)
+
+        postings: List[Dict] = []
+        transfers: List[Tuple] = []
+
+        for line_id in sorted(set(expected_by_line) | set(existing), key=lambda value: (value is None, value or 0)):
+            wanted = expected_by_line.get(line_id, [])
+            current = existing.get(line_id, {})
+
+            before = len(postings) + len(transfers)
+            if self.get_kind(self.document) == 'stock_transfer':
+                self._diff_transfer_line(line_id, wanted, current, transfers)
+            else:
+                self._diff_line(line_id, wanted, current, postings)
+            touched = len(postings) + len(transfers) > before
+
+            if not touched:
+                self.stats['unchanged'] += 1
+            elif not current:
+                self.stats['added'] += 1
+            elif not wanted:
+                self.stats['removed'] += 1
+            else:
+                self.stats['changed'] += 1
+
+        movements = self._post(postings) + self._post_transfers(transfers)
+
+        logger.info(
+            f"Resynced {self.document_number}: {self.stats['changed']} changed, {self.stats['added']} added, "
+            f"{self.stats['removed']} removed, {self.stats['unchanged']} unchanged lines, "
+            f"{len(movements)} correction movements"
+        )
+        return {**self.stats, 'created_movements': len(movements)}
+
+    # =====================================================
+    # DIFF
+    # =====================================================
+
+    def _diff_line(self, line_id, wanted: List[_ExpectedLine], current: Dict, postings: List[Dict]):
+        wanted_keys = {line.key for line in wanted}
+
+        # Old location/product combinations of the line - reverse them
+        for key, net in current.items():
+            if key not in wanted_keys:
+                postings.extend(self._reverse_net(line_id, net))
+
+        for line in wanted:
+            net = current.get(line.key)
+            if net is None:
+                postings.append(self._posting(line, line.quantity))
+            elif self._compatible(line, net):
+                delta = line.quantity - net['net_qty']
+                if delta:
+                    postings.append(self._delta_posting(line, net, delta))
+            else:
+                postings.extend(self._reverse_net(line_id, net))
+                postings.append(self._posting(line, line.quantity))
+
+    def _diff_transfer_line(self, line_id, wanted: List[_ExpectedLine], current: Dict, transfers: List[Tuple]):
+        """Transfers move stock between two locations - correct with (reverse) transfers"""
+        line = wanted[0] if wanted else None
+        product_ids = {product_id for _, product_id in current}
+
+        for product_id in product_ids:
+            if line is not None and line.product.pk == product_id:
+                continue
+            moved, from_id, to_id = self._transferred(current, product_id)
+            if moved:
+                transfers.append((line_id, product_id, to_id, from_id, moved, self.CORRECTION_TYPE))
+
+        if line is None:
+            return
+
+        moved, _, _ = self._transferred(current, line.product.pk, line.location.pk, line.to_location.pk)
+        delta = line.quantity - moved
+        if delta > 0:
+            transfers.append((line_id, line.product.pk, line.location.pk, line.to_location.pk, delta, 'TRANSFER'))
+        elif delta < 0:
+            transfers.append((line_id, line.product.pk, line.to_location.pk, line.location.pk, -delta, self.CORRECTION_TYPE))
+
+    def _compatible(self, line: _ExpectedLine, net: Dict) -> bool:
+        """Same valuation basis - a quantity delta is enough"""
+        if line.quantity > 0:
+            if net['net_qty'] <= 0:
+                return False
+            if round_cost_price(line.cost_price or Decimal('0')) != round_cost_price(self._net_cost(net)):
+                return False
+            if line.batch_number and (net['batch_count'] != 1 or net['batch_number'] != line.batch_number):
+                return False
+            return True
+
+        return net['net_qty'] <= 0
+
+    # =====================================================
+    # POSTING ROWS
+    # =====================================================
+
+    def _posting(self, line: _ExpectedLine, quantity: Decimal) -> Dict:
+        """Row posting `quantity` of the line in its own direction"""
+        if quantity > 0:
+            return self._row(
+                line.line_id, line.location, line.product, InventoryMovement.IN, quantity,
+                line.source_document_type, cost_price=line.cost_price or Decimal('0'),
+                batch_number=line.batch_number, expiry_date=line.expiry_date
+            )
+        return self._row(
+            line.line_id, line.location, line.product, InventoryMovement.OUT, -quantity,
+            line.source_document_type
+        )
+
+    def _delta_posting(self, line: _ExpectedLine, net: Dict, delta: Decimal) -> Dict:
+        """Same direction as the line -> post more; opposite -> take back at the line's cost"""
+        if (delta > 0) == (line.quantity > 0):
+            return self._posting(line, delta)
+        return self._take_back(line.line_id, net, abs(delta))
+
+    def _reverse_net(self, line_id, net: Dict) -> List[Dict]:
+        if not net['net_qty']:
+            return []
+        return [self._take_back(line_id, net, abs(net['net_qty']))]
+
+    def _take_back(self, line_id, net: Dict, quantity: Decimal) -> Dict:
+        """Correction against the net direction of existing movements"""
+        location, product = net['location'], net['product']
+
+        if net['net_qty'] > 0:
+            # Incoming line shrinks - stock leaves at the line's receipt cost
+            from .movement_service import MovementService
+            if MovementService._should_track_batches(location, product):
+                if net['batch_count'] == 1 and net['batch_number']:
+                    # Take the stock back out of the line's own batch
+                    return self._row(
+                        line_id, location, product, InventoryMovement.OUT, quantity, self.CORRECTION_TYPE,
+                        manual_batch_number=net['batch_number'], manual_cost_price=self._net_cost(net)
+                    )
+                # Line spans several batches - FIFO keeps batch quantities consistent
+                return self._row(line_id, location, product, InventoryMovement.OUT, quantity, self.CORRECTION_TYPE)
+            return self._row(
+                line_id, location, product, InventoryMovement.OUT, quantity, self.CORRECTION_TYPE,
+                manual_cost_price=self._net_cost(net), use_fifo=False
+            )
+
+        # Outgoing line shrinks - stock comes back at the cost it left with
+        out_cost = net['out_value'] / net['out_qty'] if net['out_qty'] else Decimal('0')
+        return self._row(
+            line_id, location, product, InventoryMovement.IN, quantity, self.CORRECTION_TYPE,
+            cost_price=out_cost
+        )
+
+    def _row(self, line_id, location, product, movement_type, quantity, source_document_type, **extra) -> Dict:
+        return {
+            'location': location,
+            'product': product,
+            'movement_type': movement_type,
+            'quantity': quantity,
+            'source_document_type': source_document_type,
+            'source_document_number': self.document_number,
+            'source_document_line_id': line_id,
+            'reason': f"Resync correction (line {line_id})",
+            'created_by': self.created_by,
+            **extra
+        }
+
+    def _post(self, postings: List[Dict]) -> List[InventoryMovement]:
+        if not postings:
+            return []
+
+        from .posting_engine import StockPostingEngine
+
+        movements, errors = StockPostingEngine(postings).post()
+        if errors:
+            raise ValidationError(errors)
+        return movements
+
+    def _post_transfers(self, transfers: List[Tuple]) -> List[InventoryMovement]:
+        from .movement_service import MovementService
+        from products.models import Product
+        from ..models import InventoryLocation
+
+        movements = []
+        for line_id, product_id, from_id, to_id, quantity, source_type in transfers:
+            outbound, inbound = MovementService._create_transfer_movement_internal(
+                from_location=InventoryLocation.objects.get(pk=from_id),
+                to_location=InventoryLocation.objects.get(pk=to_id),
+                product=Product.objects.get(pk=product_id),
+                quantity=quantity,
+                source_document_type=source_type,
+                source_document_number=self.document_number,
+                source_document_line_id=line_id,
+                reason=f"Resync correction (line {line_id})",
+                created_by=self.created_by
+            )
+            movements.extend(outbound)
+            movements.extend(inbound)
+        return movements
+
+    # =====================================================
+    # STATE
+    # =====================================================
+
+    def _existing_lines(self) -> Dict[Optional[int], Dict[Tuple[int, int], Dict]]:
+        """Net quantities per line and location/product - one aggregate query"""
+        value = ExpressionWrapper(F('quantity') * F('cost_price'), output_field=DecimalField(max_digits=18, decimal_places=4))
+        incoming = Q(movement_type=InventoryMovement.IN)
+        outgoing = Q(movement_type=InventoryMovement.OUT)
+
+        rows = InventoryMovement.objects.filter(
+            Q(source_document_number=self.document_number) |
+            Q(source_document_type='REVERSAL', source_document_number=f"REV-{self.document_number}")
+        ).values(
+            'source_document_line_id', 'location_id', 'product_id'
+        ).annotate(
+            in_qty=Sum('quantity', filter=incoming),
+            in_value=Sum(value, filter=incoming),
+            out_qty=Sum('quantity', filter=outgoing),
+            out_value=Sum(value, filter=outgoing),
+            batch_count=Count('batch_number', filter=incoming, distinct=True),
+            batch_number=Max('batch_number', filter=incoming),
+        ).order_by()
+
+        rows = list(rows)
+        locations, products = self._load_objects(rows)
+
+        existing: Dict[Optional[int], Dict[Tuple[int, int], Dict]] = {}
+        for row in rows:
+            for field in ('in_qty', 'in_value', 'out_qty', 'out_value'):
+                row[field] = row[field] or Decimal('0')
+            row['net_qty'] = row['in_qty'] - row['out_qty']
+            row['location'] = locations[row['location_id']]
+            row['product'] = products[row['product_id']]
+            existing.setdefault(row['source_document_line_id'], {})[(row['location_id'], row['product_id'])] = row
+
+        return existing
+
+    def _expected_lines(self) -> List[_ExpectedLine]:
+        from .movement_service import MovementService
+
+        kind = self.get_kind(self.document)
+        document = self.document
+        expected = []
+
+        for line in document.lines.all().select_related('product'):
+            quantity = MovementService._get_document_line_quantity(line)
+            if not quantity:
+                continue
+
+            line_id = getattr(line, 'line_number', None)
+            batch_number = getattr(line, 'batch_number', None) or None
+            expiry_date = getattr(line, 'expiry_date', None)
+
+            if kind == 'delivery':
+                direction = getattr(document.document_type, 'inventory_direction', 'in')
+                if direction == 'out' or (direction == 'both' and quantity < 0):
+                    source_type = 'DELIVERY_OUT' if direction == 'out' else 'DELIVERY_RETURN'
+                    expected.append(_ExpectedLine(line_id, document.location, line.product, -abs(quantity), source_type))
+                else:
+                    expected.append(_ExpectedLine(
+                        line_id, document.location, line.product, abs(quantity), 'DELIVERY',
+                        cost_price=MovementService._get_document_line_price(line) or Decimal('0.00'),
+                        batch_number=batch_number, expiry_date=expiry_date
+                    ))
+
+            elif kind in ('purchase_order', 'purchase_request'):
+                if quantity <= 0:
+                    continue
+                expected.append(_ExpectedLine(
+                    line_id, document.location, line.product, quantity,
+                    'PURCHASE_AUTO' if kind == 'purchase_order' else 'PURCHASE_REQUEST',
+                    cost_price=MovementService._get_document_line_price(line) or Decimal('0.00')
+                ))
+
+            elif kind == 'stock_transfer':
+                if quantity <= 0:
+                    continue
+                expected.append(_ExpectedLine(
+                    line_id, document.from_location, line.product, quantity, 'TRANSFER',
+                    to_location=document.to_location
+                ))
+
+        return expected
+
+    @staticmethod
+    def _net_cost(net: Dict) -> Decimal:
+        """Unit cost of what an incoming line still holds (take-backs leave at this cost)"""
+        return max(net['in_value'] - net['out_value'], Decimal('0')) / net['net_qty']
+
+    @staticmethod
+    def _transferred(current: Dict, product_id: int, from_id: Optional[int] = None,
+                     to_id: Optional[int] = None) -> Tuple[Decimal, Optional[int], Optional[int]]:
+        """Quantity currently moved by a transfer line, with its source and destination"""
+        moved = Decimal('0')
+        for (location_id, row_product_id), net in current.items():
+            if row_product_id != product_id:
+                continue
+            if net['net_qty'] < 0 and (from_id is None or location_id == from_id):
+                moved += -net['net_qty']
+                from_id = location_id
+            elif net['net_qty'] > 0 and to_id is None:
+                to_id = location_id
+        return moved, from_id, to_id
+
+    @staticmethod
+    def _load_objects(rows) -> Tuple[Dict, Dict]:
+        from products.models import Product
+        from ..models import InventoryLocation
+
+        locations = InventoryLocation.objects.in_bulk({row['location_id'] for row in rows})
+        products = Product.objects.in_bulk({row['product_id'] for row in rows})
+        return locations, products
+
+
+__all__ = ['MovementResyncEngine']
@@ -2,7 +2,6 @@
 
 
 import logging
-from datetime import timedelta
 from django.db import transaction
 
 from django.utils import timezone
@@ -16,7 +15,7 @@ from core.utils.decimal_utils import (
     validate_currency_precision, ensure_decimal
 )
 from ..models import InventoryLocation, InventoryMovement, InventoryItem, InventoryBatch
-from django.db.models import Sum, F
+from django.db.models import F
 logger = logging.getLogger(__name__)
 
 
@@ -433,21 +432,24 @@ class MovementService:
     @staticmethod
     def bulk_create_movements(movement_data_list: List[Dict]) -> Result:
         """
-        🎯 BULK API: Create multiple movements efficiently - NEW Result-based method
+        🎯 BULK API: Create multiple movements efficiently - set-based posting engine
         """
         try:
-            # Use legacy method for full functionality
-            movements = MovementService._bulk_create_movements_internal(movement_data_list)
+            from .posting_engine import StockPostingEngine
+
+            movements, errors = StockPostingEngine(movement_data_list).post()
 
             bulk_data = {
                 'total_requested': len(movement_data_list),
                 'successfully_created': len(movements),
+                'failed_count': len(errors),
+                'errors': errors,
                 'movements': [{'id': m.id, 'product_code': m.product.code} for m in movements]
             }
 
             return Result.success(
                 data=bulk_data,
-                msg=f'Successfully created {len(movements)} out of {len(movement_data_list)} movements'
+                msg=f'Successfully created {len(movements)} movements from {len(movement_data_list)} rows'
             )
 
         except Exception as e:
@@ -461,106 +463,44 @@ class MovementService:
     @staticmethod
     def reverse_document_movements(document_number: str, reason: str = '', created_by=None) -> Result:
         """
-        🎯 REVERSAL API: Safely reverse all movements for a document with cache updates - NEW Method
+        🎯 REVERSAL API: Reverse all movements for a document with cache updates - set-based
+
+        FIXED: One DocumentReversalEngine pass (bulk_create + set-based item/batch
+        deltas) instead of reverse_stock_movement per movement + full recalculation
         """
         try:
-            # ✅ FIXED: Only reverse movements that haven't been reversed yet
-            # Find the latest reversal to determine which movements to exclude
-            latest_reversal = InventoryMovement.objects.filter(
-                source_document_number=document_number,
-                source_document_type='REVERSAL'
-            ).order_by('-created_at').first()
-            
-            if latest_reversal:
-                # Only reverse movements created after the latest reversal
-                movements = InventoryMovement.objects.filter(
-                    source_document_number=document_number,
-                    created_at__gt=latest_reversal.created_at
-                ).exclude(source_document_type='REVERSAL')
-            else:
-                # No previous reversals, reverse all non-reversal movements
-                movements = InventoryMovement.objects.filter(
-                    source_document_number=document_number
-                ).exclude(source_document_type='REVERSAL')
-            
-            if not movements.exists():
+            from .reversal_engine import DocumentReversalEngine
+
+            reversals, originals = DocumentReversalEngine(
+                document_number, reason=reason, created_by=created_by
+            ).reverse()
+
+            if not reversals:
                 return Result.success(
                     data={'reversed_count': 0},
                     msg=f'No movements found for document {document_number}'
                 )
-            
-            reversed_movements = []
-            failed_reversals = []
-            
-            # Set batch mode flag to skip incremental updates for multiple reversals
-            batch_mode = movements.count() > 1
-            
-            for movement in movements:
-                try:
-                    # Pass batch mode info to the reversal method
-                    if batch_mode:
-                        movement._batch_reversal_mode = True
-                        
-                    reverse_result = MovementService.reverse_stock_movement(
-                        original_movement=movement,
-                        reason=reason or f'Document reversal: {document_number}',
-                        created_by=created_by
-                    )
-                    if reverse_result.ok:
-                        reversed_movements.append(reverse_result.data['reverse_movement_id'])
-                    else:
-                        failed_reversals.append({
-                            'movement_id': movement.id,
-                            'error': reverse_result.msg
-                        })
-                except Exception as e:
-                    failed_reversals.append({
-                        'movement_id': movement.id,
-                        'error': str(e)
-                    })
-            
+
             result_data = {
                 'document_number': document_number,
-                'original_movements_count': movements.count(),
-                'successfully_reversed': len(reversed_movements),
-                'reversed_count': len(reversed_movements),  # ✅ FIXED: Add reversed_count for StatusManager compatibility
-                'failed_reversals': len(failed_reversals),
-                'reversed_movement_ids': reversed_movements,
-                'failures': failed_reversals
+                'original_movements_count': len(originals),
+                'successfully_reversed': len(reversals),
+                'reversed_count': len(reversals),  # ✅ FIXED: Add reversed_count for StatusManager compatibility
+                'failed_reversals': 0,
+                'reversed_movement_ids': [movement.id for movement in reversals],
+                'failures': []
             }
-            
-            if failed_reversals:
-                return Result.error(
-                    code='PARTIAL_REVERSAL_FAILURE',
-                    msg=f'Reversed {len(reversed_movements)} of {movements.count()} movements. {len(failed_reversals)} failed.',
-                    data=result_data
-                )
-            else:
-                # ✅ CONDITIONAL BATCH UPDATE: Only recalculate if multiple movements reversed
-                # Single reversals use normal incremental updates in _reverse_movement_internal
-                if len(reversed_movements) > 1:
-                    try:
-                        affected_combinations = set()
-                        for movement in movements:
-                            affected_combinations.add((movement.location.id, movement.product.id))
-                        
-                        for location_id, product_id in affected_combinations:
-                            MovementService._recalculate_inventory_item(location_id, product_id)
-                            
-                        logger.info(f"✅ Batch recalculated {len(affected_combinations)} inventory items after {len(reversed_movements)} reversals")
-                    except Exception as e:
-                        logger.warning(f"Reversal succeeded but batch inventory update failed: {e}")
-                
-                return Result.success(
-                    data=result_data,
-                    msg=f'Successfully reversed all {len(reversed_movements)} movements for document {document_number}'
-                )
-                
+
+            return Result.success(
+                data=result_data,
+                msg=f'Successfully reversed all {len(reversals)} movements for document {document_number}'
+            )
+
         except Exception as e:
-            logger.error(f"Error reversing document movements: {e}")
+            logger.error(f"Error reversing document movements for {document_number}: {e}")
             return Result.error(
-                code='REVERSAL_ERROR',
-                msg=f'Document movement reversal failed: {str(e)}',
+                code='DOCUMENT_REVERSAL_ERROR',
+                msg=f'Document reversal failed: {str(e)}',
                 data={'document_number': document_number}
             )
 
@@ -569,34 +509,35 @@ class MovementService:
             location=None,
             product=None,
             days_back: int = 30,
-            movement_types: List[str] = None
+            movement_types: List[str] = None,
+            cursor: Optional[str] = None,
+            limit: Optional[int] = None
     ) -> Result:
         """
         🎯 ANALYSIS API: Get detailed movement history and analysis - NEW Result-based method
+
+        FIXED: Totals are aggregated in the database and movements are returned
+        one keyset page at a time (pass next_cursor back to get the next page).
+        Use MovementHistoryService.iter_history() to stream the full history.
         """
         try:
-            # Use legacy method for full functionality
-            history = MovementService._get_movement_history_internal(
+            from .movement_history import MovementHistoryService
+
+            queryset = MovementHistoryService.build_queryset(
                 location=location,
                 product=product,
                 days_back=days_back,
-                movement_types=movement_types,
-                include_profit_data=True
+                movement_types=movement_types
             )
 
-            # Calculate summary statistics
-            total_in = sum(h['quantity'] for h in history if h['movement_type'] == 'IN')
-            total_out = sum(h['quantity'] for h in history if h['movement_type'] == 'OUT')
-            total_profit = sum(h.get('total_profit', 0) for h in history if h.get('total_profit'))
+            summary = MovementHistoryService.get_summary(queryset)
+            page = MovementHistoryService.get_page(queryset, cursor=cursor, limit=limit)
 
             analysis_data = {
                 'period_days': days_back,
-                'total_movements': len(history),
-                'total_in': total_in,
-                'total_out': total_out,
-                'net_movement': total_in - total_out,
-                'total_profit': total_profit,
-                'movements': history
+                **summary,
+                'movements': page['movements'],
+                'next_cursor': page['next_cursor']
             }
 
             return Result.success(
@@ -653,6 +594,9 @@ class MovementService:
             created_by=created_by
         )
 
+        from .stock_ledger import StockLedgerService
+        StockLedgerService.track_new_movements([movement])
+
         # ✅ CACHE REFRESH & PRICING UPDATE
         try:
             # Опит за incremental обновяване
@@ -662,6 +606,12 @@ class MovementService:
             ).first()
 
             if existing_item:
+                from .stock_journal import StockJournalService
+                if StockJournalService.is_journaled(location, existing_item):
+                    # Weighted average needs the real quantity - fold pending deltas first
+                    StockJournalService.compact(keys=[(location.pk, product.pk)])
+                    existing_item.refresh_from_db(fields=['current_qty'])
+
                 # INCREMENTAL AVG COST CALCULATION
                 old_qty = existing_item.current_qty
                 old_avg_cost = existing_item.avg_cost or Decimal('0.00')
@@ -672,7 +622,8 @@ class MovementService:
                 new_total_value = old_total_value + new_movement_value
                 new_total_qty = old_qty + quantity  # ← CONSISTENT calculation
 
-                new_avg_cost = round_currency(new_total_value / new_total_qty) if new_total_qty > 0 else Decimal('0.00')
+                # Cost precision (4dp) - same as StockPostingEngine and the ledger recalculation
+                new_avg_cost = round_cost_price(new_total_value / new_total_qty) if new_total_qty > 0 else Decimal('0.00')
 
                 # ATOMIC UPDATE - използвай calculated new_total_qty
                 InventoryItem.objects.filter(pk=existing_item.pk).update(
@@ -691,6 +642,9 @@ class MovementService:
                     cost_change_percentage = abs(new_avg_cost - old_avg_cost) / old_avg_cost * 100
                     if cost_change_percentage > 5:  # 5% threshold
                         MovementService._trigger_pricing_update(location, product, new_avg_cost)
+                elif new_avg_cost > 0:
+                    # NEW: first known cost - markup prices were still 0
+                    MovementService._trigger_pricing_update(location, product, new_avg_cost)
 
             else:
                 # Ако няма съществуващ item, създай нов директно
@@ -705,6 +659,8 @@ class MovementService:
                     last_movement_date=timezone.now()
                 )
                 logger.debug(f"Created new inventory: {product.code} qty={quantity} avg_cost={cost_price}")
+                if cost_price > 0:
+                    MovementService._trigger_pricing_update(location, product, cost_price)
 
 
         except Exception as e:
@@ -799,31 +755,50 @@ class MovementService:
                 sale_price = round_currency(detected_price)  # Ensure proper rounding
 
         # 🔒 CRITICAL FIX: Lock AND update atomically
-        if not allow_negative_stock:
+        from .stock_journal import StockJournalService
+
+        if StockJournalService.appends_deltas(location, allow_negative_stock=allow_negative_stock):
+            # 📒 Journaled location - insert-only, folded by compact_stock_journal
+            StockJournalService.append(location, product, quantity, movement_date)
+        elif not allow_negative_stock:
             # Try to update atomically with F() expression
-            updated = InventoryItem.objects.filter(
+            # FIXED: Journaled items never append here - no availability check on that path
+            stock_filter = dict(
                 location=location,
                 product=product,
                 current_qty__gte=quantity + F('reserved_qty')  # Check available
-            ).update(
+            )
+            updated = InventoryItem.objects.filter(journaled=False, **stock_filter).update(
                 current_qty=F('current_qty') - quantity  # Decrease atomically
             )
 
             if updated == 0:
-                # No rows updated = insufficient stock
+                # No rows updated = insufficient stock (or a journaled item)
                 try:
                     item = InventoryItem.objects.get(location=location, product=product)
-                    available = item.current_qty - item.reserved_qty
-                    raise ValidationError(
-                        f"Insufficient stock. Available: {available}, Required: {quantity}"
-                    )
+                    if item.journaled:
+                        # Rows flagged before InventoryItem.clean() forbade it here - fold
+                        # leftover deltas, then the same conditional update
+                        StockJournalService.compact(keys=[(location.pk, product.pk)])
+                        updated = InventoryItem.objects.filter(**stock_filter).update(
+                            current_qty=F('current_qty') - quantity
+                        )
+                        item.refresh_from_db(fields=['current_qty', 'reserved_qty'])
+
+                    if updated == 0:
+                        available = item.current_qty - item.reserved_qty
+                        raise ValidationError(
+                            f"Insufficient stock. Available: {available}, Required: {quantity}"
+                        )
                 except InventoryItem.DoesNotExist:
                     raise ValidationError("No inventory record found for this product at this location")
         else:
             # If negative allowed, update OR create.html with negative quantity
             existing_item = InventoryItem.objects.filter(location=location, product=product).first()
 
-            if existing_item:
+            if existing_item and existing_item.journaled:
+                StockJournalService.append(location, product, quantity, movement_date)
+            elif existing_item:
                 # Update existing item
                 InventoryItem.objects.filter(pk=existing_item.pk).update(
                     current_qty=F('current_qty') - quantity
@@ -841,11 +816,13 @@ class MovementService:
         movements = []
         should_track_batches = MovementService._should_track_batches(location, product)
 
-        if should_track_batches and use_fifo and manual_batch_number is None:
+        if should_track_batches and use_fifo:
             # 🔧 FIXED: Pass pre-rounded sale_price to FIFO method
+            # Allocation strategy (FIFO/FEFO/LIFO) per location/product group; manual batch = that batch only
             movements = MovementService._create_fifo_outgoing_movements(
                 location, product, quantity, movement_date, source_document_type,
-                source_document_number, source_document_line_id, reason, created_by, sale_price
+                source_document_number, source_document_line_id, reason, created_by, sale_price,
+                batch_number=manual_batch_number
             )
         else:
             cost_price = manual_cost_price or MovementService._get_smart_cost_price(
@@ -881,6 +858,9 @@ class MovementService:
             )
             movements.append(movement)
 
+        from .stock_ledger import StockLedgerService
+        StockLedgerService.track_new_movements(movements)
+
         # Log success
         total_profit = sum(getattr(m, 'profit_amount', 0) or Decimal('0') for m in movements)
         logger.info(
@@ -893,61 +873,43 @@ class MovementService:
     @staticmethod
     def _create_fifo_outgoing_movements(
             location, product, quantity, movement_date, source_document_type,
-            source_document_number, source_document_line_id, reason, created_by, sale_price
+            source_document_number, source_document_line_id, reason, created_by, sale_price,
+            batch_number=None
     ) -> List[InventoryMovement]:
-        """FIFO implementation with COMPLETE DECIMAL PRECISION FIX"""
+        """Batch allocation via the location/product group strategy (FIFO, FEFO, LIFO, specific batch), bulk writes"""
+
+        from .fifo_allocator import AllocationStrategy, FifoAllocator
 
         movements = []
-        remaining_qty = quantity
 
         # Note: sale_price is already rounded by caller - do not re-round here
 
-        # 🔒 Lock batches with select_for_update()
-        available_batches = InventoryBatch.objects.select_for_update().filter(
-            location=location,
-            product=product,
-            remaining_qty__gt=0
-        ).order_by('created_at')
+        # 🔒 One running-sum query locks only the batches needed for this quantity
+        allocator = AllocationStrategy.get_allocator(location, product, batch_number)
+        allocations, remaining_qty = allocator.allocate(quantity)
 
-        for batch in available_batches:
-            if remaining_qty <= 0:
-                break
-
-            qty_from_batch = min(remaining_qty, batch.remaining_qty)
+        for allocation in allocations:
+            batch = allocation.batch
 
             # 🔧 COMPLETE FIX: Proper decimal handling
             batch_cost = round_cost_price(batch.cost_price or Decimal('0.00'))
-            profit_amount = Decimal('0.00')
 
-            if sale_price is not None:  # sale_price is already rounded
-                # Calculate profit with properly rounded components
-                profit_per_unit = round_currency(sale_price - batch_cost)
-                profit_amount = round_currency(profit_per_unit * qty_from_batch)
-
-            movement = InventoryMovement.objects.create(
+            movements.append(InventoryMovement(
                 location=location,
                 product=product,
                 movement_type=InventoryMovement.OUT,
-                quantity=qty_from_batch,
+                quantity=allocation.quantity,
                 cost_price=batch_cost,
                 sale_price=sale_price,  # Already quantized
-                profit_amount=profit_amount,  # Now properly quantized
                 batch_number=batch.batch_number,
+                expiry_date=batch.expiry_date,  # Identifies the consumed batch row for reversals
                 source_document_type=source_document_type,
                 source_document_number=source_document_number,
                 source_document_line_id=source_document_line_id,
                 movement_date=movement_date,
-                reason=reason or f'FIFO from batch {batch.batch_number}',
+                reason=reason or f'{allocator.STRATEGY} from batch {batch.batch_number}',
                 created_by=created_by
-            )
-            movements.append(movement)
-
-            # Update batch atomically
-            InventoryBatch.objects.filter(pk=batch.pk).update(
-                remaining_qty=F('remaining_qty') - qty_from_batch
-            )
-
-            remaining_qty -= qty_from_batch
+            ))
 
         # Handle remaining if no batches
         if remaining_qty > 0:
@@ -965,29 +927,30 @@ class MovementService:
             # FIXED: Use proper cost rounding function
             default_cost = round_cost_price(default_cost)
 
-            # 🔧 FIXED: Proper rounding for fallback case
-            profit_amount = Decimal('0.00')
-            if sale_price is not None:  # sale_price is already rounded
-                # FIXED: Use currency rounding only for final profit (display value)
-                profit_per_unit = round_currency(sale_price - default_cost)
-                profit_amount = round_currency(profit_per_unit * remaining_qty)
-
-            movement = InventoryMovement.objects.create(
+            movements.append(InventoryMovement(
                 location=location,
                 product=product,
                 movement_type=InventoryMovement.OUT,
                 quantity=remaining_qty,
                 cost_price=default_cost,
                 sale_price=sale_price,  # Already rounded
-                profit_amount=profit_amount,  # Now properly rounded
+                batch_number=batch_number,
                 source_document_type=source_document_type,
                 source_document_number=source_document_number,
                 source_document_line_id=source_document_line_id,
                 movement_date=movement_date,
                 reason=reason,
                 created_by=created_by
-            )
-            movements.append(movement)
+            ))
+
+        # bulk_create skips save() - apply the same profit rule and validation here
+        for movement in movements:
+            if movement.sale_price is not None:
+                movement.profit_amount = movement.sale_price - movement.cost_price
+            movement.clean()
+
+        InventoryMovement.objects.bulk_create(movements)
+        FifoAllocator.apply(allocations)
 
         return movements
 
@@ -1132,6 +1095,9 @@ class MovementService:
             created_by=created_by
         )
 
+        from .stock_ledger import StockLedgerService
+        StockLedgerService.track_new_movements([movement])
+
         # Cache refresh
         try:
             existing_item = InventoryItem.objects.select_for_update().filter(
@@ -1224,6 +1190,9 @@ class MovementService:
                 created_by=created_by
             )
 
+            from .stock_ledger import StockLedgerService
+            StockLedgerService.track_new_movements([reverse_movement])
+
             # ✅ CONDITIONAL: Only skip incremental updates for batch reversals
             # Single reversals still get incremental updates for performance
             should_skip_incremental = hasattr(original_movement, '_batch_reversal_mode') and original_movement._batch_reversal_mode
@@ -1270,61 +1239,50 @@ class MovementService:
     @staticmethod
     def _recalculate_inventory_item(location_id: int, product_id: int):
         """
-        Recalculate InventoryItem from all movements for location/product combination
+        Recalculate InventoryItem from the latest StockCheckpoint plus newer movements
         Used after batch operations like reversals to ensure accuracy
+
+        FIXED: One transaction under the exclusive journal lock - no append can
+        commit meanwhile, and only the deltas read here are discarded.
         """
         from inventory.models import InventoryItem
         from products.models import Product
-        from core.interfaces.service_registry import ServiceRegistry
-        from django.db.models import Sum, Q
         from django.utils import timezone
-        
+        from .stock_ledger import StockLedgerService
+        from .stock_journal import StockJournalService
+
         try:
-            # Use interface-based location lookup
-            location_service = ServiceRegistry.get_location_service()
-            location = location_service.get_by_id(location_id)
+            location = InventoryLocation.objects.get(id=location_id)
             product = Product.objects.get(id=product_id)
-            
-            # Calculate totals from all movements (excluding reversals for IN calculation)
-            in_movements = InventoryMovement.objects.filter(
-                location=location,
-                product=product,
-                movement_type='IN'
-            ).exclude(source_document_type='REVERSAL')
-            
-            out_movements = InventoryMovement.objects.filter(
-                location=location,
-                product=product,
-                movement_type='OUT'
-            )
-            
-            total_in = in_movements.aggregate(qty=Sum('quantity'))['qty'] or 0
-            total_out = out_movements.aggregate(qty=Sum('quantity'))['qty'] or 0
-            current_qty = total_in - total_out
-            
-            # Calculate weighted average cost from IN movements only
-            if in_movements.exists():
-                total_cost_value = sum(
-                    movement.quantity * movement.cost_price 
-                    for movement in in_movements
+
+            with transaction.atomic():
+                # Lock order as compaction: deltas, then the item row
+                StockJournalService.lock_item(location.pk, product.pk)
+                delta_ids = StockJournalService.pending_ids(location.pk, product.pk)
+                InventoryItem.objects.select_for_update().filter(location=location, product=product).first()
+
+                # Latest checkpoint + movements after it
+                position = StockLedgerService.compute_position(location.pk, product.pk)
+
+                # Movements are the truth - the deltas read above are already in them
+                StockJournalService.discard(location.pk, product.pk, ids=delta_ids)
+
+                current_qty = position['qty']
+                avg_cost = position['avg_cost']
+
+                # Update or create.html InventoryItem
+                item, created = InventoryItem.objects.update_or_create(
+                    location=location,
+                    product=product,
+                    defaults={
+                        'current_qty': current_qty,
+                        'avg_cost': avg_cost,
+                        'last_movement_date': timezone.now()
+                    }
                 )
-                avg_cost = total_cost_value / total_in if total_in > 0 else 0
-            else:
-                avg_cost = 0
-                
-            # Update or create.html InventoryItem
-            item, created = InventoryItem.objects.update_or_create(
-                location=location,
-                product=product,
-                defaults={
-                    'current_qty': current_qty,
-                    'avg_cost': avg_cost,
-                    'last_movement_date': timezone.now()
-                }
-            )
-            
+
             logger.info(f"{'Created' if created else 'Updated'} inventory item: {product.code}@{location.code} = {current_qty}")
-            
+
         except Exception as e:
             logger.error(f"Error recalculating inventory item {location_id}/{product_id}: {e}")
             raise
@@ -1367,21 +1325,18 @@ class MovementService:
 
     @staticmethod
     def _sync_movements_with_document_internal(document) -> Dict:
-        """FIXED: Configuration-driven logic"""
+        """FIXED: Configuration-driven logic - diff-based via MovementResyncEngine where lines carry ids"""
 
         try:
             from inventory.models import InventoryMovement
-            from nomenclatures.models import DocumentTypeStatus
+            from nomenclatures.services.workflow import WorkflowSpecService
 
             # 🎯 ПЪРВО: Провери конфигурацията
-            current_config = DocumentTypeStatus.objects.filter(
-                document_type=document.document_type,
-                status__code=document.status,
-                is_active=True
-            ).first()
+            current_config = WorkflowSpecService.get_status(document.document_type, document.status)
 
             # 🚫 Ако не позволява коригиране - СТОП
-            if not current_config or not current_config.can_correct_movements():
+            if (not current_config or not current_config.allows_movement_correction
+                    or not document.document_type.affects_inventory):
                 return {
                     'success': False,
                     'error': 'Movement correction not allowed in current status',
@@ -1389,6 +1344,26 @@ class MovementService:
                     'allows_correction': False
                 }
 
+            # ✅ DIFF-BASED: само корекции за променени/добавени/премахнати редове
+            from .movement_resync import MovementResyncEngine
+            if MovementResyncEngine.supports(document):
+                diff = MovementResyncEngine(document).resync(
+                    creates_movements=current_config.creates_inventory_movements
+                )
+                return {
+                    'success': True,
+                    'deleted_original': 0,
+                    'deleted_reversal': 0,
+                    'created_movements': diff['created_movements'],
+                    'lines_unchanged': diff['unchanged'],
+                    'lines_changed': diff['changed'],
+                    'lines_added': diff['added'],
+                    'lines_removed': diff['removed'],
+                    'diff_based': True,
+                    'config_driven': True
+                }
+
+            # Документи без line-level движения (напр. корекции) - изтрий и създай наново
             # ✅ УНИВЕРСАЛЕН ФИЛТЪР - без hardcoded типове
             original_movements = InventoryMovement.objects.filter(
                 source_document_number=document.document_number
@@ -1403,8 +1378,17 @@ class MovementService:
             original_count = original_movements.count()
             reversal_count = reversal_movements.count()
 
+            from .stock_ledger import StockLedgerService
+            from .movement_summary import MovementSummaryService
+            StockLedgerService.invalidate_for_movements(original_movements)
+            StockLedgerService.invalidate_for_movements(reversal_movements)
+
+            # Rolled-up days of the deleted movements are recomputed below
+            affected_days = MovementSummaryService.affected_days(original_movements | reversal_movements)
+
             original_movements.delete()
             reversal_movements.delete()
+            MovementSummaryService.rebuild_days(affected_days)
 
             # Създай нови САМО ако конфигурацията позволява
             new_movements = []
@@ -1424,33 +1408,10 @@ class MovementService:
 
     @staticmethod
     def _bulk_create_movements_internal(movement_data_list: List[Dict]) -> List[InventoryMovement]:
-        """Internal bulk creation - full original logic"""
-
-        movements = []
-        errors = []
+        """Internal bulk creation - delegates to StockPostingEngine"""
+        from .posting_engine import StockPostingEngine
 
-        for i, data in enumerate(movement_data_list):
-            try:
-                # Validate data
-                is_valid, validation_errors = MovementService.validate_movement_data(data)
-                if not is_valid:
-                    errors.append(f"Row {i + 1}: {', '.join(validation_errors)}")
-                    continue
-
-                # Create movement based on type
-                if data['movement_type'] == 'IN':
-                    movement = MovementService._create_incoming_movement_internal(**data)
-                    movements.append(movement)
-                elif data['movement_type'] == 'OUT':
-                    movement_list = MovementService._create_outgoing_movement_internal(**data)
-                    movements.extend(movement_list)
-                else:
-                    errors.append(f"Row {i + 1}: Unsupported movement type: {data['movement_type']}")
-                    continue
-
-            except Exception as e:
-                errors.append(f"Row {i + 1}: {str(e)}")
-                continue
+        movements, errors = StockPostingEngine(movement_data_list).post()
 
         if errors:
             logger.error(f"Bulk movement creation errors: {errors}")
@@ -1466,55 +1427,16 @@ class MovementService:
             movement_types: List[str] = None,
             include_profit_data: bool = True
     ) -> List[Dict]:
-        """Internal movement history - full original logic"""
+        """Internal movement history - materialized list (prefer MovementHistoryService.iter_history)"""
+        from .movement_history import MovementHistoryService
 
-        queryset = InventoryMovement.objects.select_related(
-            'product', 'location', 'created_by'
+        queryset = MovementHistoryService.build_queryset(
+            location=location,
+            product=product,
+            days_back=days_back,
+            movement_types=movement_types
         )
-
-        if location:
-            queryset = queryset.filter(location=location)
-        if product:
-            queryset = queryset.filter(product=product)
-        if movement_types:
-            queryset = queryset.filter(movement_type__in=movement_types)
-
-        # Filter by date
-        if days_back > 0:
-            start_date = timezone.now().date() - timedelta(days=days_back)
-            queryset = queryset.filter(movement_date__gte=start_date)
-
-        movements = queryset.order_by('-movement_date', '-created_at')
-
-        history = []
-        for movement in movements:
-            movement_data = {
-                'id': movement.id,
-                'movement_date': movement.movement_date,
-                'movement_type': movement.movement_type,
-                'quantity': movement.quantity,
-                'cost_price': movement.cost_price,
-                'sale_price': movement.sale_price,
-                'batch_number': movement.batch_number,
-                'source_document_type': movement.source_document_type,
-                'source_document_number': movement.source_document_number,
-                'reason': movement.reason,
-                'product_code': movement.product.code,
-                'location_code': movement.location.code,
-                'created_by': movement.created_by.username if movement.created_by else None,
-            }
-
-            if include_profit_data and movement.sale_price:
-                movement_data.update({
-                    'unit_profit': movement.sale_price - movement.cost_price,
-                    'total_profit': (movement.sale_price - movement.cost_price) * movement.quantity,
-                    'profit_margin': ((
-                                                  movement.sale_price - movement.cost_price) / movement.sale_price * 100) if movement.sale_price > 0 else 0
-                })
-
-            history.append(movement_data)
-
-        return history
+        return list(MovementHistoryService.iter_history(queryset, include_profit_data=include_profit_data))
 
     # =====================================================
     # DOCUMENT PROCESSING METHODS (FULL ORIGINAL IMPLEMENTATIONS)
@@ -1610,14 +1532,10 @@ class MovementService:
 
         # ✅ NEW: Check DocumentTypeStatus configuration instead of DocumentType
         try:
-            from nomenclatures.models import DocumentTypeStatus
+            from nomenclatures.services.workflow import WorkflowSpecService
 
             # Check if current status should create.html movements
-            current_config = DocumentTypeStatus.objects.filter(
-                document_type=order.document_type,
-                status__code=order.status,
-                is_active=True
-            ).first()
+            current_config = WorkflowSpecService.get_status(order.document_type, order.status)
 
             if not current_config or not current_config.creates_inventory_movements:
                 logger.debug(f"Order {order.document_number} status '{order.status}' does not create.html movements")
@@ -1875,12 +1793,24 @@ class MovementService:
 
     @staticmethod
     def _trigger_pricing_update(location, product, new_cost):
-        """Trigger pricing update when cost changes significantly"""
+        """Queue markup-based prices of the product for repricing (debounced per product)"""
+        MovementService._trigger_pricing_updates({(location, product): new_cost})
+
+    @staticmethod
+    def _trigger_pricing_updates(changes: Dict):
+        """
+        NEW: Batch variant - {(location, product): new_cost}
+
+        Repricing itself runs later in the 'pricing.reprice' job, so a burst of
+        receipts for the same product reprices it only once.
+        """
         try:
-            from pricing.services import PricingService
-            # Update markup-based prices
-            logger.info(f"Triggering pricing update for {product.code} with new cost {new_cost}")
-            # Implementation would depend on pricing structure
+            from pricing.services import RepricingService
+            product_ids = {product.pk for _, product in changes}
+            # Savepoint - a queueing failure must not abort the movement transaction
+            with transaction.atomic():
+                RepricingService.record_cost_changes(product_ids)
+            logger.info(f"Queued repricing for {len(product_ids)} products after cost change")
         except Exception as e:
             logger.warning(f"Could not trigger pricing update: {e}")
 
@@ -1910,31 +1840,15 @@ class MovementService:
 
     @staticmethod
     def get_movement_statistics(location=None, product=None, date_from=None, date_to=None) -> Dict:
-        """Get movement statistics for reporting"""
-        queryset = InventoryMovement.objects.all()
-
-        if location:
-            queryset = queryset.filter(location=location)
-        if product:
-            queryset = queryset.filter(product=product)
-        if date_from:
-            queryset = queryset.filter(movement_date__gte=date_from)
-        if date_to:
-            queryset = queryset.filter(movement_date__lte=date_to)
-
-        stats = {
-            'total_movements': queryset.count(),
-            'total_in': queryset.filter(movement_type='IN').count(),
-            'total_out': queryset.filter(movement_type='OUT').count(),
-            'total_quantity_in': queryset.filter(movement_type='IN').aggregate(
-                total=Sum('quantity'))['total'] or Decimal('0'),
-            'total_quantity_out': queryset.filter(movement_type='OUT').aggregate(
-                total=Sum('quantity'))['total'] or Decimal('0'),
-        }
-
-        stats['net_quantity'] = stats['total_quantity_in'] - stats['total_quantity_out']
-
-        return stats
+        """Get movement statistics for reporting - served from the daily rollup"""
+        from .movement_summary import MovementSummaryService
+
+        return MovementSummaryService.get_statistics(
+            location=location,
+            product=product,
+            date_from=date_from,
+            date_to=date_to
+        )
 
 
 # =====================================================
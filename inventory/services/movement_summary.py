@@ -0,0 +1,327 @@
+# inventory/services/movement_summary.py - DAILY MOVEMENT ROLLUP
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Set
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from ..models import InventoryLocation, InventoryMovement, DailyMovementSummary
+
+logger = logging.getLogger(__name__)
+
+
+class MovementSummaryService:
+    """
+    Daily rollup of movements per (date, location, product, type, source document type)
+
+    Each location keeps a watermark: the last rolled-up summary_date and the
+    moment of the run (rolled_up_at). Rows hold exactly the movements created
+    up to that moment, so reports add only the raw movements after the
+    watermark - today's sales plus anything backdated since the last run.
+    Deleted movements (document resync) are handled by rebuild_days().
+    """
+
+    BULK_BATCH_SIZE = 1000
+    DAYS_PER_CHUNK = 100
+
+    # Movements committed by long transactions may carry a created_at older
+    # than the run that should have seen them - re-read that window next time
+    SAFETY_LAG = timedelta(minutes=10)
+
+    VALUE_QUANT = Decimal('0.0001')
+
+    # =====================================================
+    # BUILDING
+    # =====================================================
+
+    @staticmethod
+    def refresh(up_to=None, location=None) -> Dict:
+        """
+        Roll up movements dated up to (and including) a date
+
+        Only days with movements created since the previous run (or dated
+        after the previous last day) are recomputed.
+
+        Args:
+            up_to: Last business date to roll up (default: yesterday)
+            location: Limit to one InventoryLocation (default: all)
+        """
+        if up_to is None:
+            up_to = timezone.now().date() - timedelta(days=1)
+
+        locations = [location] if location is not None else InventoryLocation.objects.all()
+        watermarks = DailyMovementSummary.objects.watermarks()
+        started = timezone.now()
+
+        stats = {'locations': 0, 'days': 0, 'rows': 0}
+        for loc in locations:
+            dirty = MovementSummaryService._dirty_days(loc.pk, up_to, watermarks.get(loc.pk))
+            rows = MovementSummaryService._write_days(loc.pk, dirty, started)
+
+            stats['locations'] += 1
+            stats['days'] += len(dirty)
+            stats['rows'] += rows
+
+        logger.info(
+            f"Movement rollup up to {up_to}: {stats['days']} days, {stats['rows']} rows "
+            f"across {stats['locations']} locations"
+        )
+        return stats
+
+    @staticmethod
+    def affected_days(movements_queryset) -> Dict[int, Set]:
+        """{location_id: {movement_date}} of movements about to be deleted or rewritten"""
+        affected = defaultdict(set)
+        rows = movements_queryset.values_list('location_id', 'movement_date').distinct().order_by()
+        for location_id, movement_date in rows:
+            affected[location_id].add(movement_date)
+        return dict(affected)
+
+    @staticmethod
+    def rebuild_days(affected: Dict[int, Set]) -> int:
+        """
+        Recompute already rolled-up days after movements were deleted
+
+        The location watermark is kept, so movements created after it stay
+        on the raw side of the reports.
+        """
+        watermarks = DailyMovementSummary.objects.watermarks()
+
+        rows = 0
+        for location_id, days in affected.items():
+            watermark = watermarks.get(location_id)
+            if watermark is None:
+                continue
+
+            last_date, rolled_up_at = watermark
+            days = {day for day in days if day <= last_date}
+            rows += MovementSummaryService._write_days(location_id, days, rolled_up_at)
+
+        return rows
+
+    # =====================================================
+    # REPORTS
+    # =====================================================
+
+    @staticmethod
+    def get_statistics(location=None, product=None, date_from=None, date_to=None) -> Dict:
+        """Movement counts and quantities - rollup plus movements after the watermark"""
+        in_filter = Q(movement_type=InventoryMovement.IN)
+        out_filter = Q(movement_type=InventoryMovement.OUT)
+
+        rolled = MovementSummaryService._rollup_queryset(location, product, date_from, date_to).aggregate(
+            total_movements=Sum('movement_count'),
+            total_in=Sum('movement_count', filter=in_filter),
+            total_out=Sum('movement_count', filter=out_filter),
+            total_quantity_in=Sum('total_quantity', filter=in_filter),
+            total_quantity_out=Sum('total_quantity', filter=out_filter),
+        )
+        raw = MovementSummaryService._raw_queryset(location, product, date_from, date_to).aggregate(
+            total_movements=Count('id'),
+            total_in=Count('id', filter=in_filter),
+            total_out=Count('id', filter=out_filter),
+            total_quantity_in=Sum('quantity', filter=in_filter),
+            total_quantity_out=Sum('quantity', filter=out_filter),
+        )
+
+        stats = {
+            'total_movements': (rolled['total_movements'] or 0) + raw['total_movements'],
+            'total_in': (rolled['total_in'] or 0) + raw['total_in'],
+            'total_out': (rolled['total_out'] or 0) + raw['total_out'],
+            'total_quantity_in': MovementSummaryService._add(rolled, raw, 'total_quantity_in'),
+            'total_quantity_out': MovementSummaryService._add(rolled, raw, 'total_quantity_out'),
+        }
+        stats['net_quantity'] = stats['total_quantity_in'] - stats['total_quantity_out']
+        return stats
+
+    @staticmethod
+    def get_profit_summary(location=None, product=None, date_from=None, date_to=None) -> Dict:
+        """Sales profit totals - same figures as the legacy scan over sales movements"""
+        from core.utils.decimal_utils import round_percentage
+
+        sales = Q(movement_type=InventoryMovement.OUT, source_document_type='SALE')
+
+        rolled = MovementSummaryService._rollup_queryset(location, product, date_from, date_to).filter(
+            sales, priced_count__gt=0
+        ).aggregate(
+            total_movements=Sum('priced_count'),
+            total_quantity=Sum('priced_quantity'),
+            total_revenue=Sum('total_sale_value'),
+            total_cost=Sum('priced_cost_value'),
+            total_profit=Sum('total_profit'),
+            unit_profit_sum=Sum('unit_profit_sum'),
+        )
+        raw = MovementSummaryService._raw_queryset(location, product, date_from, date_to).filter(
+            sales, sale_price__isnull=False, profit_amount__isnull=False
+        ).aggregate(
+            total_movements=Count('id'),
+            **MovementSummaryService._priced_aggregates(prefix='')
+        )
+
+        summary = {
+            'total_movements': (rolled['total_movements'] or 0) + raw['total_movements'],
+            'total_quantity': MovementSummaryService._add(rolled, raw, 'total_quantity'),
+            'total_revenue': MovementSummaryService._add(rolled, raw, 'total_revenue'),
+            'total_cost': MovementSummaryService._add(rolled, raw, 'total_cost'),
+            'total_profit': MovementSummaryService._add(rolled, raw, 'total_profit'),
+        }
+
+        unit_profit_sum = MovementSummaryService._add(rolled, raw, 'unit_profit_sum')
+        summary['avg_profit_margin'] = (
+            unit_profit_sum / summary['total_movements'] if summary['total_movements'] else None
+        )
+
+        if summary['total_revenue'] > 0:
+            summary['profit_margin_percentage'] = round_percentage(
+                summary['total_profit'] / summary['total_revenue'] * 100
+            )
+        else:
+            summary['profit_margin_percentage'] = Decimal('0')
+
+        return summary
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _dirty_days(location_id: int, up_to, watermark) -> Set:
+        movements = InventoryMovement.objects.filter(location_id=location_id, movement_date__lte=up_to)
+
+        if watermark is not None:
+            last_date, rolled_up_at = watermark
+            movements = movements.filter(
+                Q(created_at__gt=rolled_up_at - MovementSummaryService.SAFETY_LAG) |
+                Q(movement_date__gt=last_date)
+            )
+
+        return set(movements.values_list('movement_date', flat=True).distinct().order_by())
+
+    @staticmethod
+    def _write_days(location_id: int, days: Iterable, rolled_up_at) -> int:
+        """Replace the rollup rows of some days with movements created up to rolled_up_at"""
+        days = sorted(days)
+        rows = 0
+
+        for start in range(0, len(days), MovementSummaryService.DAYS_PER_CHUNK):
+            chunk = days[start:start + MovementSummaryService.DAYS_PER_CHUNK]
+
+            grouped = InventoryMovement.objects.filter(
+                location_id=location_id,
+                movement_date__in=chunk,
+                created_at__lte=rolled_up_at
+            ).values(
+                'movement_date', 'product_id', 'movement_type', 'source_document_type'
+            ).annotate(
+                movement_count=Count('id'),
+                total_quantity=Sum('quantity'),
+                total_cost_value=Sum(MovementSummaryService._value('cost_price')),
+                priced_count=Count('id', filter=MovementSummaryService._priced()),
+                **MovementSummaryService._priced_aggregates(prefix='priced_')
+            ).order_by()
+
+            summaries = [
+                MovementSummaryService._build_row(location_id, row, rolled_up_at)
+                for row in grouped
+            ]
+
+            with transaction.atomic():
+                DailyMovementSummary.objects.filter(location_id=location_id, summary_date__in=chunk).delete()
+                DailyMovementSummary.objects.bulk_create(summaries, batch_size=MovementSummaryService.BULK_BATCH_SIZE)
+
+            rows += len(summaries)
+
+        return rows
+
+    @staticmethod
+    def _build_row(location_id: int, row: Dict, rolled_up_at) -> DailyMovementSummary:
+        quantize = MovementSummaryService._quantize
+        return DailyMovementSummary(
+            summary_date=row['movement_date'],
+            location_id=location_id,
+            product_id=row['product_id'],
+            movement_type=row['movement_type'],
+            source_document_type=row['source_document_type'],
+            movement_count=row['movement_count'],
+            total_quantity=row['total_quantity'] or Decimal('0'),
+            total_cost_value=quantize(row['total_cost_value']),
+            priced_count=row['priced_count'],
+            priced_quantity=row['priced_total_quantity'] or Decimal('0'),
+            priced_cost_value=quantize(row['priced_total_cost']),
+            total_sale_value=quantize(row['priced_total_revenue']),
+            total_profit=quantize(row['priced_total_profit']),
+            unit_profit_sum=quantize(row['priced_unit_profit_sum']),
+            rolled_up_at=rolled_up_at,
+        )
+
+    @staticmethod
+    def _rollup_queryset(location, product, date_from, date_to):
+        queryset = DailyMovementSummary.objects.in_period(date_from, date_to)
+        if location:
+            queryset = queryset.filter(location=location)
+        if product:
+            queryset = queryset.filter(product=product)
+        return queryset
+
+    @staticmethod
+    def _raw_queryset(location, product, date_from, date_to):
+        """Movements not yet in the rollup - after each location's watermark"""
+        queryset = InventoryMovement.objects.all()
+        if location:
+            queryset = queryset.filter(location=location)
+        if product:
+            queryset = queryset.filter(product=product)
+        if date_from:
+            queryset = queryset.filter(movement_date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(movement_date__lte=date_to)
+
+        watermarks = DailyMovementSummary.objects.watermarks()
+        if location:
+            watermarks = {location.pk: watermarks[location.pk]} if location.pk in watermarks else {}
+
+        pending = ~Q(location_id__in=list(watermarks))
+        for location_id, (last_date, rolled_up_at) in watermarks.items():
+            pending |= Q(location_id=location_id) & (
+                Q(movement_date__gt=last_date) | Q(created_at__gt=rolled_up_at)
+            )
+
+        return queryset.filter(pending)
+
+    @staticmethod
+    def _priced() -> Q:
+        return Q(sale_price__isnull=False, profit_amount__isnull=False)
+
+    @staticmethod
+    def _value(price_field: str) -> ExpressionWrapper:
+        return ExpressionWrapper(
+            F('quantity') * F(price_field),
+            output_field=DecimalField(max_digits=18, decimal_places=4)
+        )
+
+    @staticmethod
+    def _priced_aggregates(prefix: str) -> Dict:
+        priced = MovementSummaryService._priced()
+        return {
+            f'{prefix}total_quantity': Sum('quantity', filter=priced),
+            f'{prefix}total_revenue': Sum(MovementSummaryService._value('sale_price'), filter=priced),
+            f'{prefix}total_cost': Sum(MovementSummaryService._value('cost_price'), filter=priced),
+            f'{prefix}total_profit': Sum(MovementSummaryService._value('profit_amount'), filter=priced),
+            f'{prefix}unit_profit_sum': Sum('profit_amount', filter=priced),
+        }
+
+    @staticmethod
+    def _quantize(value) -> Decimal:
+        return (value or Decimal('0')).quantize(MovementSummaryService.VALUE_QUANT)
+
+    @staticmethod
+    def _add(rolled: Dict, raw: Dict, key: str) -> Decimal:
+        return (rolled[key] or Decimal('0')) + (raw[key] or Decimal('0'))
+
+
+__all__ = ['MovementSummaryService']
@@ -0,0 +1,502 @@
+# inventory/services/posting_engine.py - SET-BASED BATCH STOCK POSTING
+
+import inspect
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.utils.decimal_utils import (
+    round_currency, round_cost_price, round_quantity, get_currency_decimal_places
+)
+from ..models import InventoryMovement, InventoryItem, InventoryBatch
+from .stock_journal import StockJournalService
+from .stock_ledger import StockLedgerService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PostingRow:
+    """Normalized input row for the posting engine"""
+    index: int
+    location: object
+    product: object
+    movement_type: str
+    quantity: Decimal
+    data: Dict
+    cost_price: Optional[Decimal] = None
+    sale_price: Optional[Decimal] = None
+    movements: List[InventoryMovement] = field(default_factory=list)
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return self.location.pk, self.product.pk
+
+
+class StockPostingEngine:
+    """
+    Set-based posting of many IN/OUT movement rows
+
+    FLOW:
+    1. Validate and normalize every row (per-row errors, no DB work)
+    2. Group rows by (location, product)
+    3. Lock each InventoryItem once, in (location_id, product_id) order
+    4. Apply rows in input order against in-memory quantities and costs
+    5. bulk_create movements, bulk_update items and batches
+
+    Groups that need FIFO batch consumption are posted through the
+    regular per-row MovementService path after the set-based part.
+    """
+
+    BULK_BATCH_SIZE = 1000
+    LOCK_CHUNK_SIZE = 500
+
+    ITEM_UPDATE_FIELDS = [
+        'current_qty', 'avg_cost', 'last_purchase_cost',
+        'last_purchase_date', 'last_movement_date', 'updated_at'
+    ]
+
+    def __init__(self, movement_data_list: List[Dict]):
+        self.movement_data_list = movement_data_list
+        self.errors: List[Tuple[int, str]] = []
+        self.now = timezone.now()
+        self.today = self.now.date()
+        self.currency_places = get_currency_decimal_places()
+
+    # =====================================================
+    # PUBLIC API
+    # =====================================================
+
+    def post(self) -> Tuple[List[InventoryMovement], List[str]]:
+        """
+        Post all rows
+
+        Returns:
+            Tuple of (created movements in input order, per-row error strings)
+        """
+        rows = self._prepare_rows()
+
+        groups: 'OrderedDict[Tuple[int, int], List[_PostingRow]]' = OrderedDict()
+        for row in rows:
+            groups.setdefault(row.key, []).append(row)
+
+        set_based = OrderedDict()
+        per_row = OrderedDict()
+        for key, group_rows in groups.items():
+            if self._needs_fifo(group_rows):
+                per_row[key] = group_rows
+            else:
+                set_based[key] = group_rows
+
+        from .movement_service import MovementService
+
+        pricing_updates = {}
+        if set_based:
+            with transaction.atomic():
+                pricing_updates = self._post_set_based(set_based)
+
+        for group_rows in per_row.values():
+            self._post_per_row(group_rows)
+
+        if pricing_updates:
+            MovementService._trigger_pricing_updates(pricing_updates)
+
+        movements = []
+        for row in rows:
+            movements.extend(row.movements)
+
+        logger.info(
+            f"Batch posting: {len(movements)} movements from {len(self.movement_data_list)} rows, "
+            f"{len(set_based)} set-based groups, {len(per_row)} per-row groups, {len(self.errors)} errors"
+        )
+        return movements, [f"Row {index + 1}: {message}" for index, message in sorted(self.errors)]
+
+    # =====================================================
+    # PREPARATION
+    # =====================================================
+
+    def _prepare_rows(self) -> List[_PostingRow]:
+        """Validate and normalize input rows - no database access"""
+        from .movement_service import MovementService
+
+        rows = []
+        for i, data in enumerate(self.movement_data_list):
+            is_valid, validation_errors = MovementService.validate_movement_data(data)
+            if not is_valid:
+                self._add_error(i, ', '.join(validation_errors))
+                continue
+
+            row = _PostingRow(
+                index=i,
+                location=data['location'],
+                product=data['product'],
+                movement_type=data['movement_type'],
+                quantity=round_quantity(Decimal(str(data['quantity']))),
+                data=data,
+            )
+
+            if row.movement_type == InventoryMovement.IN:
+                cost_price = Decimal(str(data.get('cost_price') or '0'))
+                if cost_price < 0:
+                    self._add_error(i, 'Cost price cannot be negative')
+                    continue
+                row.cost_price = round_cost_price(cost_price)
+            else:
+                if data.get('sale_price') is not None:
+                    row.sale_price = self._round_currency(data['sale_price'])
+                if data.get('manual_cost_price') is not None:
+                    row.cost_price = round_cost_price(data['manual_cost_price'])
+
+            rows.append(row)
+
+        return rows
+
+    def _needs_fifo(self, group_rows: List[_PostingRow]) -> bool:
+        """
+        Group consumes batches - cannot be posted set-based
+
+        Includes OUT rows with manual_batch_number: the allocator decrements
+        that batch, the set-based path would only stamp it on the movement.
+        """
+        from .movement_service import MovementService
+
+        for row in group_rows:
+            if row.movement_type != InventoryMovement.OUT:
+                continue
+            if not row.data.get('use_fifo', True):
+                continue
+            if MovementService._should_track_batches(row.location, row.product):
+                return True
+        return False
+
+    # =====================================================
+    # SET-BASED POSTING
+    # =====================================================
+
+    def _post_set_based(self, groups) -> Dict:
+        """Post non-FIFO groups with one lock pass and bulk writes"""
+        from .movement_service import MovementService
+
+        self._create_missing_items(groups)
+        # Absolute item math below - fold journaled deltas first
+        StockJournalService.compact(keys=groups.keys())
+        items = self._lock_items(groups.keys())
+        batch_costs = self._load_manual_batch_costs(groups)
+
+        new_movements = []
+        batch_increments: Dict[Tuple, Decimal] = OrderedDict()
+        batch_first_rows: Dict[Tuple, _PostingRow] = {}
+        changed_items = []
+        pricing_updates = {}
+
+        for key in sorted(groups):
+            group_rows = groups[key]
+            item = items.get(key)
+            start_avg_cost = item.avg_cost if item else None
+            touched = False
+
+            for row in group_rows:
+                if row.movement_type == InventoryMovement.IN:
+                    movement = self._apply_incoming(row, item)
+                else:
+                    movement = self._apply_outgoing(row, item, batch_costs)
+
+                if movement is None:
+                    continue
+
+                touched = True
+                row.movements.append(movement)
+                new_movements.append(movement)
+
+                batch_number = row.data.get('batch_number')
+                if row.movement_type == InventoryMovement.IN and batch_number:
+                    if MovementService._should_track_batches(row.location, row.product):
+                        batch_key = key + (batch_number, row.data.get('expiry_date'))
+                        batch_increments[batch_key] = batch_increments.get(batch_key, Decimal('0')) + row.quantity
+                        batch_first_rows.setdefault(batch_key, row)
+
+            if touched and item is not None:
+                item.last_movement_date = self.now
+                item.updated_at = self.now
+                changed_items.append(item)
+
+                if start_avg_cost and start_avg_cost > 0:
+                    change_pct = abs(item.avg_cost - start_avg_cost) / start_avg_cost * 100
+                    if change_pct > 5:
+                        pricing_updates[(group_rows[0].location, group_rows[0].product)] = item.avg_cost
+                elif item.avg_cost and item.avg_cost > 0:
+                    # First known cost - markup prices were still 0
+                    pricing_updates[(group_rows[0].location, group_rows[0].product)] = item.avg_cost
+
+        InventoryMovement.objects.bulk_create(new_movements, batch_size=self.BULK_BATCH_SIZE)
+        StockLedgerService.track_new_movements(new_movements)
+        InventoryItem.objects.bulk_update(changed_items, self.ITEM_UPDATE_FIELDS, batch_size=self.BULK_BATCH_SIZE)
+        self._apply_batch_increments(batch_increments, batch_first_rows)
+
+        return pricing_updates
+
+    def _apply_incoming(self, row: _PostingRow, item: Optional[InventoryItem]) -> Optional[InventoryMovement]:
+        """Apply IN row to in-memory item - weighted average cost"""
+        if item is None:
+            self._add_error(row.index, 'Inventory record could not be created for this product at this location')
+            return None
+
+        movement = self._build_movement(row, row.cost_price)
+        if movement is None:
+            return None
+
+        old_qty = item.current_qty
+        old_value = old_qty * (item.avg_cost or Decimal('0'))
+        new_qty = old_qty + row.quantity
+        new_value = old_value + row.quantity * row.cost_price
+
+        item.current_qty = new_qty
+        item.avg_cost = round_cost_price(new_value / new_qty) if new_qty > 0 else Decimal('0.00')
+        item.last_purchase_cost = row.cost_price
+        item.last_purchase_date = movement.movement_date
+        return movement
+
+    def _apply_outgoing(self, row: _PostingRow, item: Optional[InventoryItem],
+                        batch_costs: Dict) -> Optional[InventoryMovement]:
+        """Apply OUT row to in-memory item - availability check against running totals"""
+        allow_negative = self._allows_negative_stock(row)
+
+        if item is None:
+            self._add_error(row.index, 'No inventory record found for this product at this location')
+            return None
+
+        if not allow_negative and item.current_qty < row.quantity + item.reserved_qty:
+            available = item.current_qty - item.reserved_qty
+            self._add_error(row.index, f"Insufficient stock. Available: {available}, Required: {row.quantity}")
+            return None
+
+        if row.sale_price is None and row.data.get('source_document_type', 'SALE') in ['SALE', 'DELIVERY']:
+            from .movement_service import MovementService
+            detected_price = MovementService._detect_sale_price(
+                row.location, row.product, row.data.get('customer'), row.quantity
+            )
+            if detected_price is not None:
+                row.sale_price = self._round_currency(detected_price)
+
+        cost_price = row.cost_price
+        if cost_price is None:
+            manual_batch = row.data.get('manual_batch_number')
+            if manual_batch:
+                cost_price = batch_costs.get(row.key + (manual_batch,), Decimal('0'))
+            else:
+                cost_price = item.avg_cost or Decimal('0')
+        cost_price = round_cost_price(cost_price)
+
+        movement = self._build_movement(row, cost_price, batch_number=row.data.get('manual_batch_number'))
+        if movement is None:
+            return None
+
+        item.current_qty -= row.quantity
+        return movement
+
+    def _build_movement(self, row: _PostingRow, cost_price: Decimal,
+                        batch_number=None) -> Optional[InventoryMovement]:
+        """Build unsaved movement with model-level validation (bulk_create skips save())"""
+        data = row.data
+        is_incoming = row.movement_type == InventoryMovement.IN
+
+        movement = InventoryMovement(
+            location=row.location,
+            product=row.product,
+            movement_type=row.movement_type,
+            quantity=row.quantity,
+            cost_price=cost_price,
+            sale_price=None if is_incoming else row.sale_price,
+            batch_number=data.get('batch_number') if is_incoming else batch_number,
+            expiry_date=data.get('expiry_date') if is_incoming else None,
+            source_document_type=data.get('source_document_type') or ('RECEIPT' if is_incoming else 'SALE'),
+            source_document_number=data.get('source_document_number', ''),
+            source_document_line_id=data.get('source_document_line_id'),
+            movement_date=data.get('movement_date') or self.today,
+            reason=data.get('reason', ''),
+            created_by=data.get('created_by'),
+        )
+
+        # Same profit rule as InventoryMovement.save()
+        if movement.sale_price is not None:
+            movement.profit_amount = movement.sale_price - movement.cost_price
+
+        try:
+            movement.clean()
+        except ValidationError as e:
+            self._add_error(row.index, '; '.join(e.messages))
+            return None
+
+        return movement
+
+    # =====================================================
+    # DATABASE HELPERS
+    # =====================================================
+
+    def _create_missing_items(self, groups):
+        """Insert zero rows for groups that may create stock - conflicts are ignored"""
+        candidates = []
+        for (location_id, product_id), group_rows in groups.items():
+            first = group_rows[0]
+            creates_stock = any(
+                row.movement_type == InventoryMovement.IN or self._allows_negative_stock(row)
+                for row in group_rows
+            )
+            if creates_stock:
+                candidates.append(InventoryItem(
+                    location=first.location,
+                    product=first.product,
+                    current_qty=Decimal('0'),
+                    reserved_qty=Decimal('0'),
+                    avg_cost=Decimal('0'),
+                ))
+
+        if candidates:
+            InventoryItem.objects.bulk_create(
+                candidates, batch_size=self.BULK_BATCH_SIZE, ignore_conflicts=True
+            )
+
+    @staticmethod
+    def _lock_items(keys) -> Dict[Tuple[int, int], InventoryItem]:
+        """Lock every affected InventoryItem once, in deterministic order (also used by DocumentReversalEngine)"""
+        products_by_location: Dict[int, List[int]] = {}
+        for location_id, product_id in keys:
+            products_by_location.setdefault(location_id, []).append(product_id)
+
+        items = {}
+        for location_id in sorted(products_by_location):
+            product_ids = sorted(products_by_location[location_id])
+            for start in range(0, len(product_ids), StockPostingEngine.LOCK_CHUNK_SIZE):
+                chunk = product_ids[start:start + StockPostingEngine.LOCK_CHUNK_SIZE]
+                locked = InventoryItem.objects.select_for_update().filter(
+                    location_id=location_id,
+                    product_id__in=chunk
+                ).order_by('product_id')
+                for item in locked:
+                    items[(item.location_id, item.product_id)] = item
+
+        return items
+
+    def _load_manual_batch_costs(self, groups) -> Dict[Tuple, Decimal]:
+        """Preload batch cost prices for OUT rows with manual_batch_number"""
+        wanted: Dict[int, set] = {}
+        for (location_id, product_id), group_rows in groups.items():
+            for row in group_rows:
+                batch_number = row.data.get('manual_batch_number')
+                if row.movement_type == InventoryMovement.OUT and batch_number and row.cost_price is None:
+                    wanted.setdefault(location_id, set()).add((product_id, batch_number))
+
+        costs = {}
+        for location_id, pairs in wanted.items():
+            batches = InventoryBatch.objects.filter(
+                location_id=location_id,
+                product_id__in={p for p, _ in pairs},
+                batch_number__in={b for _, b in pairs}
+            ).values_list('product_id', 'batch_number', 'cost_price')
+            for product_id, batch_number, cost_price in batches:
+                costs[(location_id, product_id, batch_number)] = cost_price or Decimal('0')
+        return costs
+
+    def _apply_batch_increments(self, batch_increments: Dict[Tuple, Decimal], first_rows: Dict[Tuple, _PostingRow]):
+        """Add received quantities to existing batches or create new ones"""
+        if not batch_increments:
+            return
+
+        by_location: Dict[int, List[Tuple]] = {}
+        for batch_key in batch_increments:
+            by_location.setdefault(batch_key[0], []).append(batch_key)
+
+        existing = {}
+        for location_id, batch_keys in by_location.items():
+            batches = InventoryBatch.objects.filter(
+                location_id=location_id,
+                product_id__in={k[1] for k in batch_keys},
+                batch_number__in={k[2] for k in batch_keys}
+            )
+            for batch in batches:
+                existing[(batch.location_id, batch.product_id, batch.batch_number, batch.expiry_date)] = batch
+
+        to_update = []
+        to_create = []
+        for batch_key, quantity in batch_increments.items():
+            batch = existing.get(batch_key)
+            if batch is not None:
+                batch.received_qty = F('received_qty') + quantity
+                batch.remaining_qty = F('remaining_qty') + quantity
+                batch.updated_at = self.now
+                to_update.append(batch)
+            else:
+                row = first_rows[batch_key]
+                batch_number = batch_key[2]
+                to_create.append(InventoryBatch(
+                    location=row.location,
+                    product=row.product,
+                    batch_number=batch_number,
+                    expiry_date=batch_key[3],
+                    received_qty=quantity,
+                    remaining_qty=quantity,
+                    cost_price=row.cost_price,
+                    received_date=self.now,
+                    is_unknown_batch=batch_number.startswith('AUTO_') or batch_number.startswith('UNKNOWN_'),
+                ))
+
+        if to_update:
+            InventoryBatch.objects.bulk_update(
+                to_update, ['received_qty', 'remaining_qty', 'updated_at'], batch_size=self.BULK_BATCH_SIZE
+            )
+        if to_create:
+            InventoryBatch.objects.bulk_create(to_create, batch_size=self.BULK_BATCH_SIZE)
+
+    # =====================================================
+    # PER-ROW FALLBACK
+    # =====================================================
+
+    def _post_per_row(self, group_rows: List[_PostingRow]):
+        """Post FIFO groups through the regular MovementService path"""
+        from .movement_service import MovementService
+
+        for row in group_rows:
+            if row.movement_type == InventoryMovement.IN:
+                handler = MovementService._create_incoming_movement_internal
+                overrides = {'cost_price': row.cost_price}
+            else:
+                handler = MovementService._create_outgoing_movement_internal
+                overrides = {'sale_price': row.sale_price, 'manual_cost_price': row.cost_price}
+
+            accepted = inspect.signature(handler).parameters
+            kwargs = {k: v for k, v in row.data.items() if k in accepted}
+            kwargs.update(overrides, quantity=row.quantity)
+
+            try:
+                with transaction.atomic():
+                    created = handler(**kwargs)
+                row.movements.extend(created if isinstance(created, list) else [created])
+            except Exception as e:
+                self._add_error(row.index, str(e))
+
+    # =====================================================
+    # UTILITIES
+    # =====================================================
+
+    @staticmethod
+    def _allows_negative_stock(row: _PostingRow) -> bool:
+        allow_negative = row.data.get('allow_negative_stock')
+        if allow_negative is None:
+            allow_negative = getattr(row.location, 'allow_negative_stock', False)
+        return bool(allow_negative)
+
+    def _round_currency(self, amount) -> Decimal:
+        return round_currency(amount, places=self.currency_places)
+
+    def _add_error(self, index: int, message: str):
+        self.errors.append((index, message))
+
+
+__all__ = ['StockPostingEngine']
@@ -0,0 +1,266 @@
+# inventory/services/reservation_service.py - ATOMIC RESERVATIONS WITH EXPIRING HOLDS
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Optional
+
+from django.db import connection, transaction
+from django.db.models import DecimalField, F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from core.utils.result import Result
+from ..models import InventoryItem, StockDelta, StockReservation
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationService:
+    """
+    Stock holds without row locks
+
+    reserved_qty is changed with one conditional UPDATE
+    (current_qty >= reserved_qty + qty), so concurrent terminals never wait
+    on each other - the database decides who gets the last unit. Each hold
+    is recorded in StockReservation with an optional TTL; expired holds are
+    returned by sweep_expired (release_expired_reservations command).
+    """
+
+    DEFAULT_TTL = timedelta(minutes=30)
+    SWEEP_BATCH_SIZE = 500
+
+    # =====================================================
+    # SINGLE-STATEMENT COUNTER UPDATES
+    # =====================================================
+
+    @staticmethod
+    def increment_reserved(location, product, quantity: Decimal) -> bool:
+        """Add quantity to reserved_qty if available - one UPDATE, no lock held"""
+        items = InventoryItem.objects.filter(location=location, product=product)
+        if not location.allow_negative_stock:
+            # Journaled items: pending deltas count against current_qty
+            items = items.annotate(
+                pending_delta_qty=StockDelta.objects.pending_qty_subquery()
+            ).filter(
+                current_qty__gte=F('reserved_qty') + quantity - F('pending_delta_qty')
+            )
+        return items.update(reserved_qty=F('reserved_qty') + quantity) == 1
+
+    @staticmethod
+    def decrement_reserved(location_id: int, product_id: int, quantity: Decimal, strict: bool = True) -> bool:
+        """
+        Subtract quantity from reserved_qty - one UPDATE
+
+        strict=True fails when less than quantity is reserved; otherwise
+        reserved_qty is clamped at zero.
+        """
+        items = InventoryItem.objects.filter(location_id=location_id, product_id=product_id)
+        if strict:
+            items = items.filter(reserved_qty__gte=quantity)
+            new_reserved = F('reserved_qty') - quantity
+        else:
+            new_reserved = Greatest(
+                F('reserved_qty') - quantity,
+                Value(Decimal('0')),
+                output_field=DecimalField(max_digits=12, decimal_places=3)
+            )
+        return items.update(reserved_qty=new_reserved) == 1
+
+    # =====================================================
+    # RESERVATION LEDGER
+    # =====================================================
+
+    @staticmethod
+    def reserve(location, product, quantity: Decimal, reference: str = '', reason: str = '',
+                ttl: Optional[timedelta] = DEFAULT_TTL, user=None) -> Result:
+        """
+        Place a hold - one conditional UPDATE plus the ledger INSERT
+
+        Args:
+            ttl: Hold lifetime (None = until released/consumed)
+        """
+        if quantity <= 0:
+            return Result.error('INVALID_QUANTITY', 'Reservation quantity must be positive')
+
+        try:
+            expires_at = timezone.now() + ttl if ttl else None
+
+            with transaction.atomic():
+                if not ReservationService.increment_reserved(location, product, quantity):
+                    return ReservationService._reserve_failure(location, product, quantity)
+
+                reservation = StockReservation.objects.create(
+                    location=location,
+                    product=product,
+                    quantity=quantity,
+                    reference=reference,
+                    reason=reason,
+                    expires_at=expires_at,
+                    created_by=user if getattr(user, 'pk', None) else None
+                )
+
+            return Result.success(
+                data={
+                    'reservation_id': reservation.pk,
+                    'product_code': product.code,
+                    'location_code': location.code,
+                    'reserved_quantity': quantity,
+                    'reference': reference,
+                    'expires_at': expires_at,
+                },
+                msg=f"Reserved {quantity} units of {product.code}"
+            )
+
+        except Exception as e:
+            return Result.error(
+                code='RESERVATION_ERROR',
+                msg=f"Error reserving stock: {str(e)}",
+                data={'product_code': product.code, 'quantity': quantity}
+            )
+
+    @staticmethod
+    def release(reservation_id: int) -> Result:
+        """Cancel a hold (cart line removed, order cancelled)"""
+        return ReservationService._close(reservation_id, StockReservation.RELEASED)
+
+    @staticmethod
+    def consume(reservation_id: int) -> Result:
+        """Close a hold whose stock left via an OUT movement"""
+        return ReservationService._close(reservation_id, StockReservation.CONSUMED)
+
+    @staticmethod
+    def extend(reservation_id: int, ttl: timedelta = DEFAULT_TTL) -> Result:
+        """Push the expiry of an active hold (cart heartbeat)"""
+        expires_at = timezone.now() + ttl
+        updated = StockReservation.objects.active().filter(pk=reservation_id).update(expires_at=expires_at)
+        if not updated:
+            return Result.error('RESERVATION_NOT_ACTIVE', f'Reservation {reservation_id} is not active')
+
+        return Result.success(
+            data={'reservation_id': reservation_id, 'expires_at': expires_at},
+            msg=f'Reservation extended until {expires_at:%H:%M:%S}'
+        )
+
+    @staticmethod
+    def release_reference(reference: str) -> Result:
+        """Release every active hold of a cart/document"""
+        try:
+            stats = ReservationService._close_many(
+                StockReservation.objects.active().filter(reference=reference),
+                StockReservation.RELEASED
+            )
+            return Result.success(
+                data=stats,
+                msg=f"Released {stats['closed']} reservations for {reference}"
+            )
+        except Exception as e:
+            return Result.error('RELEASE_ERROR', f'Error releasing reservations: {str(e)}')
+
+    @staticmethod
+    def sweep_expired(now=None) -> Dict:
+        """Return all expired holds to available stock"""
+        now = now or timezone.now()
+        totals = {'closed': 0, 'released_qty': Decimal('0'), 'items': 0}
+
+        while True:
+            stats = ReservationService._close_many(
+                StockReservation.objects.expired(now),
+                StockReservation.EXPIRED,
+                limit=ReservationService.SWEEP_BATCH_SIZE
+            )
+            if not stats['closed']:
+                break
+            for key in totals:
+                totals[key] += stats[key]
+
+        if totals['closed']:
+            logger.info(f"Released {totals['closed']} expired reservations ({totals['released_qty']} units)")
+        return totals
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _close(reservation_id: int, status: str) -> Result:
+        try:
+            with transaction.atomic():
+                closed = StockReservation.objects.active().filter(pk=reservation_id).update(
+                    status=status, closed_at=timezone.now()
+                )
+                if not closed:
+                    return Result.error('RESERVATION_NOT_ACTIVE', f'Reservation {reservation_id} is not active')
+
+                reservation = StockReservation.objects.values(
+                    'location_id', 'product_id', 'quantity'
+                ).get(pk=reservation_id)
+                ReservationService.decrement_reserved(
+                    reservation['location_id'], reservation['product_id'], reservation['quantity'], strict=False
+                )
+
+            return Result.success(
+                data={'reservation_id': reservation_id, 'status': status, 'quantity': reservation['quantity']},
+                msg=f"Reservation {reservation_id} {status}"
+            )
+
+        except Exception as e:
+            return Result.error('RELEASE_ERROR', f'Error closing reservation: {str(e)}')
+
+    @staticmethod
+    def _close_many(queryset, status: str, limit: Optional[int] = None) -> Dict:
+        """Close holds and apply one reserved_qty decrement per location/product"""
+        skip_locked = connection.features.has_select_for_update_skip_locked
+
+        with transaction.atomic():
+            rows = queryset.select_for_update(skip_locked=skip_locked).values(
+                'id', 'location_id', 'product_id', 'quantity'
+            ).order_by('id')
+            if limit:
+                rows = rows[:limit]
+            rows = list(rows)
+            if not rows:
+                return {'closed': 0, 'released_qty': Decimal('0'), 'items': 0}
+
+            StockReservation.objects.filter(id__in=[row['id'] for row in rows]).update(
+                status=status, closed_at=timezone.now()
+            )
+
+            per_item = defaultdict(Decimal)
+            for row in rows:
+                per_item[(row['location_id'], row['product_id'])] += row['quantity']
+
+            for (location_id, product_id), quantity in per_item.items():
+                ReservationService.decrement_reserved(location_id, product_id, quantity, strict=False)
+
+        return {
+            'closed': len(rows),
+            'released_qty': sum(per_item.values(), Decimal('0')),
+            'items': len(per_item),
+        }
+
+    @staticmethod
+    def _reserve_failure(location, product, quantity: Decimal) -> Result:
+        """Read the item only when the conditional update matched nothing"""
+        item = InventoryItem.objects.with_pending_deltas().filter(location=location, product=product).first()
+        if item is None:
+            return Result.error(
+                code='ITEM_NOT_FOUND',
+                msg=f"Cannot reserve: Product {product.code} not found at {location.code}",
+                data={'product_code': product.code, 'location_code': location.code}
+            )
+
+        return Result.error(
+            code='INSUFFICIENT_AVAILABLE',
+            msg=f"Cannot reserve {quantity}, only {item.available_qty} available",
+            data={
+                'requested_qty': quantity,
+                'available_qty': item.available_qty,
+                'current_qty': item.effective_qty,
+                'reserved_qty': item.reserved_qty
+            }
+        )
+
+
+__all__ = ['ReservationService']
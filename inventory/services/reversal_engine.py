@@ -0,0 +1,247 @@
+# inventory/services/reversal_engine.py - SET-BASED DOCUMENT REVERSAL
+
+import logging
+import re
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Set, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.utils.decimal_utils import round_cost_price
+from ..models import InventoryMovement, InventoryItem, InventoryBatch
+from .posting_engine import StockPostingEngine
+from .stock_journal import StockJournalService
+from .stock_ledger import StockLedgerService
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentReversalEngine:
+    """
+    Reverse every not-yet-reversed movement of a document in one pass
+
+    FLOW:
+    1. Load original movements (select_related) and the ids already reversed
+    2. Create missing InventoryItem rows (conflicts ignored), fold pending
+       journal deltas, then lock the exact (location, product) rows once,
+       in StockPostingEngine order
+    3. Build REVERSAL movements in memory and bulk_create them
+    4. Apply quantity/cost deltas: one bulk_update for items,
+       F() increments for the batch rows the originals consumed
+
+    Reversal rows keep the per-movement marker `[original_id:N]` used by
+    MovementService._reverse_movement_internal, so both paths stay idempotent
+    against each other.
+    """
+
+    BULK_BATCH_SIZE = 1000
+    ORIGINAL_ID_PATTERN = re.compile(r'\[original_id:(\d+)\]')
+
+    ITEM_UPDATE_FIELDS = ['current_qty', 'avg_cost', 'last_movement_date', 'updated_at']
+
+    def __init__(self, document_number: str, reason: str = '', created_by=None):
+        self.document_number = document_number
+        self.reversal_number = f"REV-{document_number}"
+        self.reason = reason or f'Document reversal: {document_number}'
+        self.created_by = created_by
+        self.now = timezone.now()
+
+    # =====================================================
+    # PUBLIC API
+    # =====================================================
+
+    @transaction.atomic
+    def reverse(self) -> Tuple[List[InventoryMovement], List[InventoryMovement]]:
+        """
+        Returns:
+            Tuple of (reversal movements created, original movements reversed)
+        """
+        originals = list(
+            InventoryMovement.objects.filter(
+                source_document_number=self.document_number
+            ).exclude(
+                source_document_type='REVERSAL'
+            ).select_related('location', 'product').order_by('id')
+        )
+
+        reversed_ids = self._already_reversed_ids()
+        pending = [movement for movement in originals if movement.id not in reversed_ids]
+        if not pending:
+            return [], []
+
+        items = self._lock_items(pending)
+
+        reversals = []
+        batch_deltas: Dict[Tuple, Decimal] = defaultdict(Decimal)
+        for original in pending:
+            reversal = self._build_reversal(original)
+            reversal.clean()
+            reversals.append(reversal)
+
+            self._apply_item_delta(items, original)
+
+            if original.batch_number:
+                sign = Decimal('-1') if original.movement_type == InventoryMovement.IN else Decimal('1')
+                batch_key = (original.location_id, original.product_id, original.batch_number, original.expiry_date)
+                batch_deltas[batch_key] += sign * original.quantity
+
+        InventoryMovement.objects.bulk_create(reversals, batch_size=self.BULK_BATCH_SIZE)
+        StockLedgerService.track_new_movements(reversals)
+
+        InventoryItem.objects.bulk_update(
+            list(items.values()), self.ITEM_UPDATE_FIELDS, batch_size=self.BULK_BATCH_SIZE
+        )
+
+        self._apply_batch_deltas(batch_deltas)
+
+        logger.info(
+            f"Reversed {len(reversals)} movements of {self.document_number} "
+            f"across {len(items)} inventory items"
+        )
+        return reversals, pending
+
+    # =====================================================
+    # BUILDING
+    # =====================================================
+
+    def _build_reversal(self, original: InventoryMovement) -> InventoryMovement:
+        reverse_type = InventoryMovement.OUT if original.movement_type == InventoryMovement.IN else InventoryMovement.IN
+
+        return InventoryMovement(
+            movement_type=reverse_type,
+            product=original.product,
+            location=original.location,
+            quantity=original.quantity,
+            cost_price=original.cost_price,
+            batch_number=original.batch_number,
+            expiry_date=original.expiry_date,
+            source_document_type='REVERSAL',
+            source_document_number=self.reversal_number,
+            source_document_line_id=original.source_document_line_id,
+            reason=f'{self.reason} [original_id:{original.id}]',
+            movement_date=self.now.date(),
+            created_by=self.created_by,
+        )
+
+    def _apply_item_delta(self, items: Dict[Tuple[int, int], InventoryItem], original: InventoryMovement):
+        """Same deltas as the incremental update in _reverse_movement_internal"""
+        item = items[(original.location_id, original.product_id)]
+
+        if original.movement_type == InventoryMovement.IN:
+            # Reversing an IN - stock leaves at its cost, average unchanged
+            item.current_qty -= original.quantity
+        else:
+            # Reversing an OUT - stock comes back at the movement cost
+            new_qty = item.current_qty + original.quantity
+            if new_qty > 0:
+                total_value = item.current_qty * item.avg_cost + original.quantity * original.cost_price
+                item.avg_cost = round_cost_price(total_value / new_qty)
+            item.current_qty = new_qty
+
+        item.last_movement_date = self.now
+        item.updated_at = self.now
+
+    # =====================================================
+    # DATABASE HELPERS
+    # =====================================================
+
+    def _already_reversed_ids(self) -> Set[int]:
+        reasons = InventoryMovement.objects.filter(
+            source_document_type='REVERSAL',
+            source_document_number=self.reversal_number
+        ).values_list('reason', flat=True)
+
+        reversed_ids = set()
+        for reason in reasons:
+            match = self.ORIGINAL_ID_PATTERN.search(reason or '')
+            if match:
+                reversed_ids.add(int(match.group(1)))
+        return reversed_ids
+
+    def _lock_items(self, movements: List[InventoryMovement]) -> Dict[Tuple[int, int], InventoryItem]:
+        """
+        Lock exactly the affected (location, product) rows, creating missing ones first
+
+        Rows are locked once, per location in product order - the same
+        order as StockPostingEngine, so the two cannot deadlock.
+        """
+        keys = {(movement.location_id, movement.product_id) for movement in movements}
+
+        products_by_location: Dict[int, Set[int]] = defaultdict(set)
+        for location_id, product_id in keys:
+            products_by_location[location_id].add(product_id)
+
+        exact_pairs = Q()
+        for location_id, product_ids in products_by_location.items():
+            exact_pairs |= Q(location_id=location_id, product_id__in=product_ids)
+
+        # Unlocked existence check - a concurrent insert of the same row is ignored, not an IntegrityError
+        existing = set(InventoryItem.objects.filter(exact_pairs).values_list('location_id', 'product_id'))
+        missing = keys - existing
+        if missing:
+            InventoryItem.objects.bulk_create([
+                InventoryItem(
+                    location_id=location_id,
+                    product_id=product_id,
+                    current_qty=Decimal('0'),
+                    reserved_qty=Decimal('0'),
+                    avg_cost=Decimal('0')
+                )
+                for location_id, product_id in sorted(missing)
+            ], batch_size=self.BULK_BATCH_SIZE, ignore_conflicts=True)
+
+        # Absolute item math below - fold journaled deltas first
+        StockJournalService.compact(keys=keys)
+        return StockPostingEngine._lock_items(keys)
+
+    def _apply_batch_deltas(self, batch_deltas: Dict[Tuple, Decimal]):
+        """
+        One bulk_update of remaining_qty for the batch rows the originals consumed
+
+        Keys are (location, product, batch_number, expiry_date). Batch rows
+        are unique by that key; a movement without expiry_date (posted
+        before OUT movements recorded it) matches by batch number alone and
+        raises when several rows share it.
+        """
+        batch_deltas = {key: delta for key, delta in batch_deltas.items() if delta}
+        if not batch_deltas:
+            return
+
+        lookup = Q()
+        for location_id, product_id, batch_number, _ in batch_deltas:
+            lookup |= Q(location_id=location_id, product_id=product_id, batch_number=batch_number)
+
+        candidates = defaultdict(list)
+        for batch in InventoryBatch.objects.filter(lookup).order_by('id'):
+            candidates[(batch.location_id, batch.product_id, batch.batch_number)].append(batch)
+
+        batches = []
+        for (location_id, product_id, batch_number, expiry_date), delta in batch_deltas.items():
+            rows = candidates.get((location_id, product_id, batch_number), [])
+            matching = [batch for batch in rows if batch.expiry_date == expiry_date]
+            if not matching and expiry_date is None:
+                matching = rows
+
+            if not matching:
+                logger.warning(
+                    f"Batch {batch_number} not found at {location_id}/{product_id} - reversal not applied to batches"
+                )
+                continue
+            if len(matching) > 1:
+                raise ValidationError(
+                    f"Batch {batch_number} at {location_id}/{product_id} matches {len(matching)} batch rows - "
+                    f"cannot tell which one to reverse"
+                )
+
+            batch = matching[0]
+            batch.remaining_qty = F('remaining_qty') + delta
+            batches.append(batch)
+
+        InventoryBatch.objects.bulk_update(batches, ['remaining_qty'], batch_size=self.BULK_BATCH_SIZE)
+
+
+__all__ = ['DocumentReversalEngine']
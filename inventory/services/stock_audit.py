@@ -0,0 +1,280 @@
+# inventory/services/stock_audit.py - INVENTORY ITEM VS LEDGER AUDIT
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.db import connections
+from django.db.models import Exists, OuterRef
+
+from ..models import InventoryItem, InventoryLocation, InventoryMovement, StockCheckpoint
+from .stock_ledger import StockLedgerService
+
+logger = logging.getLogger(__name__)
+
+
+class StockAuditService:
+    """
+    Compare InventoryItem rows with the movement ledger
+
+    Expected positions are computed per location with set-based
+    aggregates: latest StockCheckpoint per product plus one GROUP BY over
+    the newer movements per distinct checkpoint watermark (or over the
+    full history with use_checkpoints=False). Locations are independent,
+    so audit() spreads them over a process pool.
+
+    Quantity drift is always checked (current_qty + pending journal
+    deltas vs IN + returned - OUT). avg_cost is only compared on request - the
+    incremental path keeps a moving average while the ledger position
+    uses the all-time IN average, so they legitimately differ.
+
+    Auditing never writes. fix_drifts() repairs the drifts of an audit
+    the operator has reviewed, through
+    MovementService._recalculate_inventory_item - the same repair used
+    after reversals.
+    """
+
+    QTY_TOLERANCE = Decimal('0.001')
+    COST_TOLERANCE = Decimal('0.01')
+    DETAIL_LIMIT = 1000
+
+    # =====================================================
+    # PUBLIC API
+    # =====================================================
+
+    @staticmethod
+    def audit(locations: Optional[Iterable[InventoryLocation]] = None,
+              workers: Optional[int] = None, check_cost: bool = False,
+              use_checkpoints: bool = True) -> Dict:
+        """
+        Audit locations (default: all) - read only
+
+        Args:
+            workers: Process pool size (default: CPU count, 1 = in-process)
+
+        Returns:
+            Summary dict with per-kind counts, the first DETAIL_LIMIT drifts
+            and every drifted (location_id, product_id) in drifted_items
+        """
+        if locations is None:
+            location_ids = list(InventoryLocation.objects.order_by('id').values_list('id', flat=True))
+        else:
+            location_ids = [location.pk for location in locations]
+
+        workers = min(workers or os.cpu_count() or 1, len(location_ids) or 1)
+        tasks = [(location_id, check_cost, use_checkpoints) for location_id in location_ids]
+
+        if workers <= 1:
+            results = [_audit_location_task(task) for task in tasks]
+        else:
+            # Forked workers must not share the parent's connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                results = list(pool.map(_audit_location_task, tasks))
+
+        summary = StockAuditService._merge(results)
+        summary['workers'] = workers
+
+        logger.info(
+            f"Stock audit: {summary['items_checked']} items in {summary['locations']} locations, "
+            f"{summary['drifted']} drifted"
+        )
+        return summary
+
+    @staticmethod
+    def audit_location(location_id: int, check_cost: bool = False,
+                       use_checkpoints: bool = True) -> Dict:
+        """Audit one location - two aggregate reads plus one per extra checkpoint watermark"""
+        expected = StockAuditService.expected_positions(location_id, use_checkpoints=use_checkpoints)
+        actual = {
+            row['product_id']: row
+            for row in InventoryItem.objects.with_pending_deltas().filter(
+                location_id=location_id
+            ).values('product_id', 'current_qty', 'pending_delta_qty', 'avg_cost').iterator()
+        }
+
+        drifts = []
+        for product_id in expected.keys() | actual.keys():
+            drift = StockAuditService._compare(
+                product_id, expected.get(product_id), actual.get(product_id), check_cost
+            )
+            if drift:
+                drift['location_id'] = location_id
+                drifts.append(drift)
+
+        return {
+            'location_id': location_id,
+            'items_checked': len(actual),
+            'drifts': drifts,
+            'errors': [],
+        }
+
+    @staticmethod
+    def expected_positions(location_id: int, use_checkpoints: bool = True) -> Dict[int, Dict]:
+        """Ledger position of every product with history at the location"""
+        movements = InventoryMovement.objects.filter(location_id=location_id)
+
+        latest = {}
+        if use_checkpoints:
+            checkpoints = StockCheckpoint.objects.filter(location_id=location_id)
+            latest = {
+                product_id: checkpoint
+                for (_, product_id), checkpoint in StockLedgerService._latest_checkpoints(checkpoints).items()
+            }
+
+        positions = {
+            product_id: StockLedgerService._fold(StockLedgerService._checkpoint_totals(checkpoint), {})
+            for product_id, checkpoint in latest.items()
+        }
+
+        watermarks = {checkpoint.last_movement_id for checkpoint in latest.values()}
+        watermarks.add(0)
+
+        for watermark in sorted(watermarks, reverse=True):
+            window = movements.filter(id__gt=watermark)
+            if watermark == 0 and latest:
+                window = window.filter(~Exists(StockCheckpoint.objects.filter(
+                    location_id=OuterRef('location_id'),
+                    product_id=OuterRef('product_id')
+                )))
+
+            rows = window.values('product_id').annotate(
+                **StockLedgerService._total_expressions()
+            ).order_by()
+
+            for totals in rows.iterator():
+                product_id = totals['product_id']
+                checkpoint = latest.get(product_id)
+                if (checkpoint.last_movement_id if checkpoint else 0) != watermark:
+                    continue
+                positions[product_id] = StockLedgerService._fold(
+                    StockLedgerService._checkpoint_totals(checkpoint), totals
+                )
+
+        return positions
+
+    @staticmethod
+    def fix(location_id: int, product_ids: Iterable[int]):
+        """Rebuild the given items from the ledger - returns (fixed count, error messages)"""
+        from .movement_service import MovementService
+
+        fixed = 0
+        errors = []
+        for product_id in product_ids:
+            try:
+                MovementService._recalculate_inventory_item(location_id, product_id)
+                fixed += 1
+            except Exception as e:
+                errors.append(f"{location_id}/{product_id}: {e}")
+
+        return fixed, errors
+
+    @staticmethod
+    def fix_drifts(drifted_items: Iterable) -> Dict:
+        """Rebuild reviewed drifts - (location_id, product_id) pairs from audit()['drifted_items']"""
+        products_by_location: Dict[int, List[int]] = {}
+        for location_id, product_id in drifted_items:
+            products_by_location.setdefault(location_id, []).append(product_id)
+
+        summary = {'fixed': 0, 'errors': []}
+        for location_id in sorted(products_by_location):
+            fixed, errors = StockAuditService.fix(location_id, products_by_location[location_id])
+            summary['fixed'] += fixed
+            summary['errors'].extend(errors)
+
+        logger.info(f"Stock audit fix: {summary['fixed']} items recalculated, {len(summary['errors'])} errors")
+        return summary
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _compare(product_id: int, expected: Optional[Dict], actual: Optional[Dict],
+                 check_cost: bool) -> Optional[Dict]:
+        zero = Decimal('0')
+        expected_qty = expected['qty'] if expected else zero
+        expected_cost = expected['avg_cost'] if expected else zero
+
+        if actual is None:
+            if expected_qty == 0:
+                return None
+            kind = 'missing_item'
+            actual_qty = actual_cost = zero
+        else:
+            actual_qty = actual['current_qty'] + (actual['pending_delta_qty'] or zero)
+            actual_cost = actual['avg_cost'] or zero
+
+            if abs(actual_qty - expected_qty) >= StockAuditService.QTY_TOLERANCE:
+                kind = 'no_movements' if expected is None else 'qty'
+            elif check_cost and expected_qty > 0 and \
+                    abs(actual_cost - expected_cost) >= StockAuditService.COST_TOLERANCE:
+                kind = 'avg_cost'
+            else:
+                return None
+
+        return {
+            'product_id': product_id,
+            'kind': kind,
+            'current_qty': actual_qty,
+            'expected_qty': expected_qty,
+            'qty_diff': actual_qty - expected_qty,
+            'avg_cost': actual_cost,
+            'expected_avg_cost': expected_cost,
+        }
+
+    @staticmethod
+    def _merge(results: List[Dict]) -> Dict:
+        summary = {
+            'locations': len(results),
+            'items_checked': 0,
+            'drifted': 0,
+            'by_kind': {},
+            'drifts': [],
+            'drifted_items': [],
+            'errors': [],
+        }
+
+        for result in results:
+            summary['items_checked'] += result['items_checked']
+            summary['drifted'] += len(result['drifts'])
+            summary['errors'].extend(result['errors'])
+
+            for drift in result['drifts']:
+                summary['drifted_items'].append((drift['location_id'], drift['product_id']))
+                summary['by_kind'][drift['kind']] = summary['by_kind'].get(drift['kind'], 0) + 1
+                if len(summary['drifts']) < StockAuditService.DETAIL_LIMIT:
+                    summary['drifts'].append(drift)
+
+        summary['drifts'].sort(key=lambda drift: abs(drift['qty_diff']), reverse=True)
+        return summary
+
+
+# =====================================================
+# PROCESS POOL ENTRY POINTS (module level for pickling)
+# =====================================================
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def _audit_location_task(task) -> Dict:
+    location_id, check_cost, use_checkpoints = task
+    try:
+        return StockAuditService.audit_location(
+            location_id, check_cost=check_cost, use_checkpoints=use_checkpoints
+        )
+    except Exception as e:
+        logger.error(f"Stock audit failed for location {location_id}: {e}")
+        return {'location_id': location_id, 'items_checked': 0, 'drifts': [],
+                'errors': [f"location {location_id}: {e}"]}
+
+
+__all__ = ['StockAuditService']
@@ -0,0 +1,217 @@
+# inventory/services/stock_journal.py - JOURNALED STOCK FOR HOT SKUS
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import InventoryItem, StockDelta
+
+logger = logging.getLogger(__name__)
+
+
+class StockJournalService:
+    """
+    Insert-only stock decrements for contended items
+
+    An item is journaled when InventoryItem.journaled is set or its
+    location has journal_stock_updates. Its outgoing movements append a
+    StockDelta instead of updating the item row; compact() (the
+    compact_stock_journal command, every few seconds) folds the deltas
+    into current_qty with one UPDATE per item.
+
+    Appends check no availability, so only locations that allow negative
+    stock append deltas (appends_deltas); elsewhere journaled items take
+    the locked row-update path. Each append holds a shared per-item lock
+    until commit; recalculations take it exclusively (lock_item) so no
+    delta can commit behind their back.
+    """
+
+    COMPACT_BATCH_SIZE = 5000
+    KEY_CHUNK_SIZE = 500
+
+    # =====================================================
+    # SALE PATH
+    # =====================================================
+
+    @staticmethod
+    def is_journaled(location, item: Optional[InventoryItem] = None) -> bool:
+        return bool(getattr(location, 'journal_stock_updates', False) or (item is not None and item.journaled))
+
+    @staticmethod
+    def appends_deltas(location, item: Optional[InventoryItem] = None,
+                       allow_negative_stock: bool = False) -> bool:
+        """Journaled and allowed to go negative - the insert-only path skips the availability check"""
+        return bool(allow_negative_stock) and StockJournalService.is_journaled(location, item)
+
+    @staticmethod
+    def append(location, product, quantity: Decimal, movement_date=None) -> StockDelta:
+        """
+        Record an outgoing quantity - one INSERT under the shared item lock
+
+        No availability check: callers only append for locations that allow
+        negative stock (appends_deltas). Must run inside the caller's
+        transaction so the lock is held until the delta commits.
+        """
+        StockJournalService._advisory_lock(location.pk, product.pk, shared=True)
+
+        return StockDelta.objects.create(
+            location=location,
+            product=product,
+            quantity=-quantity,
+            movement_date=movement_date or timezone.now().date()
+        )
+
+    @staticmethod
+    def lock_item(location_id: int, product_id: int):
+        """
+        Exclusive per-item journal lock until commit
+
+        Waits for in-flight appends to commit and blocks new ones - taken
+        before an item is recalculated from movements.
+        """
+        StockJournalService._advisory_lock(location_id, product_id, shared=False)
+
+    # =====================================================
+    # COMPACTION
+    # =====================================================
+
+    @staticmethod
+    def compact(keys: Optional[Iterable[Tuple[int, int]]] = None,
+                batch_size: Optional[int] = None) -> Dict:
+        """
+        Fold pending deltas into InventoryItem.current_qty
+
+        Args:
+            keys: Only these (location_id, product_id) pairs. Waits for
+                  locked deltas - used before absolute item recalculations.
+                  Only pairs with pending deltas are locked, one location /
+                  KEY_CHUNK_SIZE products per query.
+                  Without keys, rows locked by another compactor are skipped.
+        """
+        batch_size = batch_size or StockJournalService.COMPACT_BATCH_SIZE
+        totals = {'deltas': 0, 'items': 0}
+
+        if keys is None:
+            StockJournalService._compact_rows(
+                StockDelta.objects.all(), batch_size, totals,
+                skip_locked=connection.features.has_select_for_update_skip_locked
+            )
+        else:
+            for location_id, product_ids in StockJournalService._key_chunks(
+                    StockJournalService.pending_keys(keys)):
+                StockJournalService._compact_rows(
+                    StockDelta.objects.filter(location_id=location_id, product_id__in=product_ids),
+                    batch_size, totals, skip_locked=False
+                )
+
+        if totals['deltas']:
+            logger.debug(f"Compacted {totals['deltas']} stock deltas into {totals['items']} items")
+        return totals
+
+    @staticmethod
+    def pending_keys(keys: Iterable[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+        """The (location_id, product_id) pairs among keys that have pending deltas - no locks"""
+        pending = set()
+        for location_id, product_ids in StockJournalService._key_chunks(keys):
+            pending.update(
+                StockDelta.objects.filter(
+                    location_id=location_id, product_id__in=product_ids
+                ).values_list('location_id', 'product_id').distinct()
+            )
+        return pending
+
+    @staticmethod
+    def pending_ids(location_id: int, product_id: int) -> List[int]:
+        """Lock and return the pending delta ids of an item (waits for a running compaction)"""
+        return list(
+            StockDelta.objects.for_item(location_id, product_id).select_for_update().order_by('id').values_list(
+                'id', flat=True
+            )
+        )
+
+    @staticmethod
+    def discard(location_id: int, product_id: int, ids: Iterable[int]) -> int:
+        """
+        Drop pending deltas of an item whose current_qty is recalculated from movements
+
+        ids: exactly the deltas read by the recalculation (pending_ids) -
+        never a range, a delta it did not read belongs to a movement it did not see.
+        """
+        deleted, _ = StockDelta.objects.for_item(location_id, product_id).filter(id__in=list(ids)).delete()
+        return deleted
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _advisory_lock(location_id: int, product_id: int, shared: bool):
+        """Transaction-level advisory lock keyed on (location, product) - SQLite serialises writers anyway"""
+        if connection.vendor != 'postgresql':
+            return
+
+        function = 'pg_advisory_xact_lock_shared' if shared else 'pg_advisory_xact_lock'
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT {function}(%s::integer, %s::integer)', [location_id, product_id])
+
+    @staticmethod
+    def _apply(per_item: Dict[Tuple[int, int], Decimal]):
+        now = timezone.now()
+
+        for (location_id, product_id), delta in sorted(per_item.items()):
+            updated = InventoryItem.objects.filter(location_id=location_id, product_id=product_id).update(
+                current_qty=F('current_qty') + delta,
+                last_movement_date=now
+            )
+            if not updated:
+                # Negative-stock location with no item yet
+                InventoryItem.objects.create(
+                    location_id=location_id,
+                    product_id=product_id,
+                    current_qty=delta,
+                    last_movement_date=now
+                )
+
+    @staticmethod
+    def _compact_rows(deltas, batch_size: int, totals: Dict, skip_locked: bool):
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    deltas.select_for_update(skip_locked=skip_locked).order_by('id').values(
+                        'id', 'location_id', 'product_id', 'quantity'
+                    )[:batch_size]
+                )
+                if not rows:
+                    break
+
+                per_item = defaultdict(Decimal)
+                for row in rows:
+                    per_item[(row['location_id'], row['product_id'])] += row['quantity']
+
+                StockJournalService._apply(per_item)
+                StockDelta.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+            totals['deltas'] += len(rows)
+            totals['items'] += len(per_item)
+            if len(rows) < batch_size:
+                break
+
+    @staticmethod
+    def _key_chunks(keys) -> Iterator[Tuple[int, List[int]]]:
+        """(location_id, product_ids) chunks in deterministic order - same chunking as the posting engine locks"""
+        products_by_location: Dict[int, List[int]] = {}
+        for location_id, product_id in set(keys):
+            products_by_location.setdefault(location_id, []).append(product_id)
+
+        for location_id in sorted(products_by_location):
+            product_ids = sorted(products_by_location[location_id])
+            for start in range(0, len(product_ids), StockJournalService.KEY_CHUNK_SIZE):
+                yield location_id, product_ids[start:start + StockJournalService.KEY_CHUNK_SIZE]
+
+
+__all__ = ['StockJournalService']
@@ -0,0 +1,421 @@
+# inventory/services/stock_ledger.py - CHECKPOINTED STOCK LEDGER
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import DecimalField, Exists, ExpressionWrapper, F, Max, Min, OuterRef, Q, Sum
+from django.utils import timezone
+
+from core.utils.decimal_utils import round_cost_price
+from ..models import DailyStockSnapshot, InventoryMovement, StockCheckpoint, StockLedgerGap
+
+logger = logging.getLogger(__name__)
+
+
+class StockLedgerService:
+    """
+    Stock positions computed from the latest StockCheckpoint plus newer movements
+
+    Checkpoints are keyed by a movement id watermark: the highest id created
+    more than SAFETY_LAG ago. Ids at or below it that were not visible at
+    build time (transactions that commit out of id order) are recorded as
+    StockLedgerGap ranges; once such a movement commits, the checkpoints it
+    fell behind are dropped - on commit by invalidate_for_new_movements()
+    and, as a backstop, by the next build.
+    """
+
+    SAFETY_LAG = timedelta(minutes=5)
+    LATE_COMMIT_HORIZON = timedelta(days=1)
+    BULK_BATCH_SIZE = 1000
+    GAP_CHUNK_SIZE = 200
+
+    # Reversed outgoing stock comes back into qty but stays out of the cost average
+    INCOMING_FILTER = Q(movement_type=InventoryMovement.IN) & ~Q(source_document_type='REVERSAL')
+    RETURNED_FILTER = Q(movement_type=InventoryMovement.IN, source_document_type='REVERSAL')
+    OUTGOING_FILTER = Q(movement_type=InventoryMovement.OUT)
+
+    # =====================================================
+    # POSITION API
+    # =====================================================
+
+    @staticmethod
+    def compute_position(location_id: int, product_id: int) -> Dict:
+        """
+        Current position for one location/product
+
+        One checkpoint lookup plus one aggregate over newer movements.
+        """
+        checkpoint = StockCheckpoint.objects.latest_for(location_id, product_id)
+        watermark = checkpoint.last_movement_id if checkpoint else 0
+
+        totals = InventoryMovement.objects.filter(
+            location_id=location_id,
+            product_id=product_id,
+            id__gt=watermark
+        ).aggregate(**StockLedgerService._total_expressions())
+
+        position = StockLedgerService._fold(StockLedgerService._checkpoint_totals(checkpoint), totals)
+        position['checkpoint_id'] = checkpoint.pk if checkpoint else None
+        return position
+
+    @staticmethod
+    def invalidate_for_movements(movements_queryset) -> int:
+        """
+        Drop checkpoints and daily snapshots that already folded any movement in the queryset
+
+        Must be called before those movements are deleted or rewritten.
+        """
+        from .stock_snapshots import StockSnapshotService
+
+        deleted = 0
+        affected = movements_queryset.values('location_id', 'product_id').annotate(
+            first_id=Min('id'),
+            first_date=Min('movement_date')
+        ).order_by()
+
+        first_dates = {}
+        for row in affected:
+            deleted += StockCheckpoint.objects.filter(
+                location_id=row['location_id'],
+                product_id=row['product_id'],
+                last_movement_id__gte=row['first_id']
+            ).delete()[0]
+
+            location_id = row['location_id']
+            first_dates[location_id] = min(first_dates.get(location_id, row['first_date']), row['first_date'])
+
+        # Daily snapshots are per location - drop the whole day range
+        for location_id, first_date in first_dates.items():
+            deleted += StockSnapshotService.invalidate_from(location_id, first_date)
+
+        if deleted:
+            logger.info(f"Invalidated {deleted} stock checkpoints and snapshots")
+        return deleted
+
+    @staticmethod
+    def track_new_movements(movements: Iterable[InventoryMovement]):
+        """
+        Check freshly inserted movements against checkpoints and snapshots once they commit
+
+        Call from every path that inserts movements. A transaction that ran
+        longer than SAFETY_LAG commits ids below a checkpoint watermark, and
+        a backdated movement lands in days that already have snapshots.
+        """
+        entries = [
+            (movement.pk, movement.location_id, movement.product_id, movement.movement_date)
+            for movement in movements if movement.pk
+        ]
+        if entries:
+            transaction.on_commit(lambda: StockLedgerService.invalidate_for_new_movements(entries))
+
+    @staticmethod
+    def invalidate_for_new_movements(entries: List[Tuple]) -> int:
+        """
+        Drop checkpoints and snapshots that committed movements fell behind
+
+        entries: (movement_id, location_id, product_id, movement_date). The
+        common case (ids above every watermark, dated after the last
+        snapshot) costs two queries.
+        """
+        location_ids = {entry[1] for entry in entries}
+
+        watermarks = {}
+        late_checkpoints = StockCheckpoint.objects.filter(
+            location_id__in=location_ids,
+            last_movement_id__gte=min(entry[0] for entry in entries)
+        ).values('location_id', 'product_id').annotate(watermark=Max('last_movement_id')).order_by()
+        for row in late_checkpoints:
+            watermarks[(row['location_id'], row['product_id'])] = row['watermark']
+
+        last_snapshot_dates = dict(
+            DailyStockSnapshot.objects.filter(location_id__in=location_ids).values('location_id').annotate(
+                latest=Max('snapshot_date')
+            ).order_by().values_list('location_id', 'latest')
+        )
+
+        late_ids = [
+            movement_id
+            for movement_id, location_id, product_id, movement_date in entries
+            if movement_id <= watermarks.get((location_id, product_id), 0)
+            or (location_id in last_snapshot_dates and movement_date <= last_snapshot_dates[location_id])
+        ]
+        if not late_ids:
+            return 0
+
+        return StockLedgerService.invalidate_for_movements(InventoryMovement.objects.filter(id__in=late_ids))
+
+    # =====================================================
+    # CHECKPOINT BUILDING
+    # =====================================================
+
+    @staticmethod
+    def build_checkpoints(location=None, keep: int = 3, rebuild: bool = False) -> Dict:
+        """
+        Roll checkpoints forward for every location/product with new movements
+
+        Args:
+            location: Limit to one InventoryLocation (default: all)
+            keep: Checkpoints to keep per location/product (older ones are pruned)
+            rebuild: Drop existing checkpoints and fold the full history
+
+        Returns:
+            Dict with counters for reporting
+        """
+        now = timezone.now()
+        cutoff = now - StockLedgerService.SAFETY_LAG
+
+        movements = InventoryMovement.objects.all()
+        checkpoints = StockCheckpoint.objects.all()
+        if location is not None:
+            movements = movements.filter(location=location)
+            checkpoints = checkpoints.filter(location=location)
+
+        target_watermark = movements.filter(created_at__lt=cutoff).aggregate(last_id=Max('id'))['last_id']
+        if not target_watermark:
+            return {'created': 0, 'pruned': 0, 'watermark': None, 'as_of': cutoff}
+
+        # Ids up to the highest watermark were already checked for gaps
+        scanned_up_to = StockCheckpoint.objects.aggregate(last_id=Max('last_movement_id'))['last_id'] or 0
+        late = StockLedgerService._reconcile_gaps(now)
+
+        with transaction.atomic():
+            if rebuild:
+                checkpoints.delete()
+
+            # Record unseen ids before aggregating - a movement committing in
+            # between is then folded and flagged, never skipped
+            gaps = StockLedgerService._record_gaps(scanned_up_to, target_watermark, now)
+
+            latest = StockLedgerService._latest_checkpoints(checkpoints)
+
+            # Group pairs by their previous watermark - one aggregate per distinct watermark
+            watermarks = {checkpoint.last_movement_id for checkpoint in latest.values()}
+            watermarks.add(0)
+
+            new_checkpoints = []
+            for watermark in sorted(watermarks, reverse=True):
+                window = movements.filter(id__gt=watermark, id__lte=target_watermark)
+                if watermark == 0:
+                    # Full-history scan only for pairs that have no checkpoint yet
+                    window = window.filter(~Exists(StockCheckpoint.objects.filter(
+                        location_id=OuterRef('location_id'),
+                        product_id=OuterRef('product_id')
+                    )))
+
+                rows = window.values('location_id', 'product_id').annotate(
+                    **StockLedgerService._total_expressions()
+                ).order_by()
+
+                for totals in rows.iterator(chunk_size=StockLedgerService.BULK_BATCH_SIZE):
+                    key = (totals['location_id'], totals['product_id'])
+                    previous = latest.get(key)
+                    if (previous.last_movement_id if previous else 0) != watermark:
+                        continue
+
+                    position = StockLedgerService._fold(StockLedgerService._checkpoint_totals(previous), totals)
+                    new_checkpoints.append(StockCheckpoint(
+                        location_id=key[0],
+                        product_id=key[1],
+                        as_of=cutoff,
+                        last_movement_id=target_watermark,
+                        qty=position['qty'],
+                        value=position['value'],
+                        avg_cost=position['avg_cost'],
+                        total_in_qty=position['total_in_qty'],
+                        total_in_value=position['total_in_value'],
+                        total_returned_qty=position['total_returned_qty'],
+                        total_out_qty=position['total_out_qty'],
+                    ))
+
+            StockCheckpoint.objects.bulk_create(
+                new_checkpoints, batch_size=StockLedgerService.BULK_BATCH_SIZE, ignore_conflicts=True
+            )
+            pruned = StockLedgerService._prune(checkpoints, keep)
+
+        logger.info(
+            f"Stock checkpoints: {len(new_checkpoints)} created, {pruned} pruned, watermark {target_watermark}, "
+            f"{gaps} new gaps, {late} late movements"
+        )
+        return {
+            'created': len(new_checkpoints),
+            'pruned': pruned,
+            'watermark': target_watermark,
+            'as_of': cutoff,
+            'gaps': gaps,
+            'late_movements': late,
+        }
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _record_gaps(scanned_up_to: int, target_watermark: int, now) -> int:
+        """
+        Store id ranges in (scanned_up_to, target_watermark] without a visible movement
+
+        A gap followed by a movement created before LATE_COMMIT_HORIZON is a
+        rolled-back insert - no transaction stays open that long.
+        """
+        if target_watermark <= scanned_up_to:
+            return 0
+
+        horizon = now - StockLedgerService.LATE_COMMIT_HORIZON
+        ids = InventoryMovement.objects.filter(
+            id__gt=scanned_up_to, id__lte=target_watermark
+        ).order_by('id').values_list('id', 'created_at')
+
+        gaps = []
+        expected = scanned_up_to + 1
+        for movement_id, created_at in ids.iterator(chunk_size=StockLedgerService.BULK_BATCH_SIZE):
+            if movement_id > expected and created_at >= horizon:
+                gaps.append(StockLedgerGap(
+                    first_movement_id=expected, last_movement_id=movement_id - 1, detected_at=now
+                ))
+            expected = movement_id + 1
+
+        StockLedgerGap.objects.bulk_create(
+            gaps, batch_size=StockLedgerService.BULK_BATCH_SIZE, ignore_conflicts=True
+        )
+        return len(gaps)
+
+    @staticmethod
+    def _reconcile_gaps(now) -> int:
+        """
+        Drop checkpoints that missed a movement committed into a recorded gap
+
+        The gap shrinks to the ids still missing; gaps past
+        LATE_COMMIT_HORIZON are deleted. Returns the number of late movements.
+        """
+        StockLedgerGap.objects.filter(detected_at__lt=now - StockLedgerService.LATE_COMMIT_HORIZON).delete()
+
+        gaps = list(StockLedgerGap.objects.all())
+        late = 0
+        for start in range(0, len(gaps), StockLedgerService.GAP_CHUNK_SIZE):
+            chunk = gaps[start:start + StockLedgerService.GAP_CHUNK_SIZE]
+
+            in_gaps = Q()
+            for gap in chunk:
+                in_gaps |= Q(id__gte=gap.first_movement_id, id__lte=gap.last_movement_id)
+            late_ids = sorted(InventoryMovement.objects.filter(in_gaps).values_list('id', flat=True))
+            if not late_ids:
+                continue
+
+            with transaction.atomic():
+                StockLedgerService.invalidate_for_movements(InventoryMovement.objects.filter(id__in=late_ids))
+
+                remaining = []
+                for gap in chunk:
+                    expected = gap.first_movement_id
+                    for movement_id in late_ids:
+                        if gap.first_movement_id <= movement_id <= gap.last_movement_id:
+                            if movement_id > expected:
+                                remaining.append((expected, movement_id - 1, gap.detected_at))
+                            expected = movement_id + 1
+                    if expected <= gap.last_movement_id:
+                        remaining.append((expected, gap.last_movement_id, gap.detected_at))
+
+                StockLedgerGap.objects.filter(pk__in=[gap.pk for gap in chunk]).delete()
+                StockLedgerGap.objects.bulk_create([
+                    StockLedgerGap(first_movement_id=first, last_movement_id=last, detected_at=detected_at)
+                    for first, last, detected_at in remaining
+                ], ignore_conflicts=True)
+
+            late += len(late_ids)
+            logger.warning(f"⚠️ {len(late_ids)} movements committed behind stock checkpoints - checkpoints dropped")
+
+        return late
+
+    @staticmethod
+    def _total_expressions() -> Dict:
+        line_value = ExpressionWrapper(
+            F('quantity') * F('cost_price'),
+            output_field=DecimalField(max_digits=18, decimal_places=4)
+        )
+        return {
+            'in_qty': Sum('quantity', filter=StockLedgerService.INCOMING_FILTER),
+            'in_value': Sum(line_value, filter=StockLedgerService.INCOMING_FILTER),
+            'returned_qty': Sum('quantity', filter=StockLedgerService.RETURNED_FILTER),
+            'out_qty': Sum('quantity', filter=StockLedgerService.OUTGOING_FILTER),
+            'last_id': Max('id'),
+        }
+
+    @staticmethod
+    def _fold(base: Optional[Dict], totals: Dict) -> Dict:
+        """
+        Add aggregated movement totals to a base position
+
+        base holds total_in_qty / total_in_value / total_returned_qty /
+        total_out_qty (a checkpoint or a daily snapshot); None means empty
+        history. Returned (REVERSAL IN) quantities count in qty only - the
+        average cost is total_in_value / total_in_qty.
+        """
+        zero = Decimal('0')
+        base = base or {}
+
+        total_in_qty = base.get('total_in_qty', zero) + (totals.get('in_qty') or zero)
+        total_in_value = base.get('total_in_value', zero) + (totals.get('in_value') or zero)
+        total_returned_qty = base.get('total_returned_qty', zero) + (totals.get('returned_qty') or zero)
+        total_out_qty = base.get('total_out_qty', zero) + (totals.get('out_qty') or zero)
+
+        qty = total_in_qty + total_returned_qty - total_out_qty
+        avg_cost = round_cost_price(total_in_value / total_in_qty) if total_in_qty > 0 else zero
+
+        return {
+            'qty': qty,
+            'avg_cost': avg_cost,
+            'value': (qty * avg_cost).quantize(Decimal('0.0001')),
+            'total_in_qty': total_in_qty,
+            'total_in_value': total_in_value,
+            'total_returned_qty': total_returned_qty,
+            'total_out_qty': total_out_qty,
+            'last_movement_id': totals.get('last_id') or base.get('last_movement_id', 0),
+        }
+
+    @staticmethod
+    def _checkpoint_totals(checkpoint: Optional[StockCheckpoint]) -> Optional[Dict]:
+        if checkpoint is None:
+            return None
+        return {
+            'total_in_qty': checkpoint.total_in_qty,
+            'total_in_value': checkpoint.total_in_value,
+            'total_returned_qty': checkpoint.total_returned_qty,
+            'total_out_qty': checkpoint.total_out_qty,
+            'last_movement_id': checkpoint.last_movement_id,
+        }
+
+    @staticmethod
+    def _latest_checkpoints(checkpoints) -> Dict[Tuple[int, int], StockCheckpoint]:
+        latest = {}
+        for checkpoint in checkpoints.order_by('location_id', 'product_id', '-last_movement_id').iterator():
+            latest.setdefault((checkpoint.location_id, checkpoint.product_id), checkpoint)
+        return latest
+
+    @staticmethod
+    def _prune(checkpoints, keep: int) -> int:
+        """Keep the newest `keep` checkpoints per location/product"""
+        if keep <= 0:
+            return 0
+
+        stale_ids = []
+        counts: Dict[Tuple[int, int], int] = {}
+        ordered = checkpoints.order_by('location_id', 'product_id', '-last_movement_id').values_list(
+            'id', 'location_id', 'product_id'
+        )
+        for checkpoint_id, location_id, product_id in ordered.iterator():
+            key = (location_id, product_id)
+            counts[key] = counts.get(key, 0) + 1
+            if counts[key] > keep:
+                stale_ids.append(checkpoint_id)
+
+        pruned = 0
+        for start in range(0, len(stale_ids), StockLedgerService.BULK_BATCH_SIZE):
+            chunk = stale_ids[start:start + StockLedgerService.BULK_BATCH_SIZE]
+            pruned += StockCheckpoint.objects.filter(id__in=chunk).delete()[0]
+        return pruned
+
+
+__all__ = ['StockLedgerService']
@@ -0,0 +1,253 @@
+# inventory/services/stock_snapshots.py - DAILY CLOSING STOCK SNAPSHOTS
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from django.db import transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+from django.utils import timezone
+
+from ..models import InventoryLocation, InventoryMovement, DailyStockSnapshot
+from .stock_ledger import StockLedgerService
+
+logger = logging.getLogger(__name__)
+
+
+class StockSnapshotService:
+    """
+    Daily closing balances per location+product
+
+    Sparse: a product gets a row only for days it moved on. Its closing
+    balance on any later date is its latest row on or before that date
+    (carried forward at read time). The nightly job reads the movements
+    dated after the last snapshot in one grouped query; point-in-time
+    queries read the carried-forward rows plus the movements after them.
+    """
+
+    BULK_BATCH_SIZE = 1000
+
+    SNAPSHOT_TOTAL_FIELDS = ('total_in_qty', 'total_in_value', 'total_returned_qty', 'total_out_qty')
+
+    # =====================================================
+    # BUILDING
+    # =====================================================
+
+    @staticmethod
+    def build_snapshots(up_to=None, location=None) -> Dict:
+        """
+        Write missing daily snapshots up to (and including) a date
+
+        Args:
+            up_to: Last business date to snapshot (default: yesterday)
+            location: Limit to one InventoryLocation (default: all)
+
+        Returns:
+            Dict with counters for reporting
+        """
+        if up_to is None:
+            up_to = timezone.now().date() - timedelta(days=1)
+
+        locations = [location] if location is not None else InventoryLocation.objects.all()
+
+        stats = {'locations': 0, 'days': 0, 'rows': 0, 'rebuilt_from': {}}
+        for loc in locations:
+            days, rows, rebuilt_from = StockSnapshotService._build_for_location(loc, up_to)
+            stats['locations'] += 1
+            stats['days'] += days
+            stats['rows'] += rows
+            if rebuilt_from:
+                stats['rebuilt_from'][loc.code] = rebuilt_from
+
+        logger.info(
+            f"Daily stock snapshots up to {up_to}: {stats['days']} days, {stats['rows']} rows "
+            f"across {stats['locations']} locations"
+        )
+        return stats
+
+    @staticmethod
+    def invalidate_from(location_id: int, from_date) -> int:
+        """Drop snapshots of a location from a business date on - rebuilt by the next run"""
+        deleted, _ = DailyStockSnapshot.objects.filter(
+            location_id=location_id,
+            snapshot_date__gte=from_date
+        ).delete()
+        if deleted:
+            logger.info(f"Invalidated {deleted} daily snapshots at location {location_id} from {from_date}")
+        return deleted
+
+    @staticmethod
+    def _build_for_location(location, up_to):
+        last_date = DailyStockSnapshot.objects.latest_date(location)
+
+        # Movements posted after the last run but dated on or before it
+        rebuilt_from = None
+        if last_date is not None:
+            last_built = DailyStockSnapshot.objects.filter(
+                location=location, snapshot_date=last_date
+            ).aggregate(built=Max('created_at'))['built']
+            rebuilt_from = InventoryMovement.objects.filter(
+                location=location,
+                created_at__gt=last_built - StockLedgerService.SAFETY_LAG,
+                movement_date__lte=last_date
+            ).aggregate(first=Min('movement_date'))['first']
+
+            if rebuilt_from is not None:
+                StockSnapshotService.invalidate_from(location.pk, rebuilt_from)
+                last_date = DailyStockSnapshot.objects.latest_date(location)
+
+        if last_date is not None and last_date >= up_to:
+            return 0, 0, rebuilt_from
+
+        movements = InventoryMovement.objects.filter(location=location, movement_date__lte=up_to)
+        previous = {}
+        if last_date is not None:
+            movements = movements.filter(movement_date__gt=last_date)
+            previous = StockSnapshotService._closing_totals(location, last_date)
+
+        days, rows = StockSnapshotService._write_days(location, movements, previous)
+        return days, rows, rebuilt_from
+
+    @staticmethod
+    def _write_days(location, movements, previous: Dict[int, Dict]):
+        """
+        Rows for each (day, product) with movements = carried-forward closing + that day's totals
+
+        One grouped query ordered by day; each day is written in its own
+        transaction.
+        """
+        grouped = movements.values('movement_date', 'product_id').annotate(
+            **StockLedgerService._total_expressions()
+        ).order_by('movement_date', 'product_id')
+
+        days = 0
+        rows = 0
+        day, snapshots = None, []
+        for totals in grouped.iterator(chunk_size=StockSnapshotService.BULK_BATCH_SIZE):
+            if totals['movement_date'] != day:
+                rows += StockSnapshotService._save_day(snapshots)
+                day, snapshots = totals['movement_date'], []
+                days += 1
+
+            product_id = totals['product_id']
+            position = StockLedgerService._fold(previous.get(product_id), totals)
+            previous[product_id] = position
+
+            snapshots.append(DailyStockSnapshot(
+                location=location,
+                product_id=product_id,
+                snapshot_date=day,
+                closing_qty=position['qty'],
+                avg_cost=position['avg_cost'],
+                closing_value=position['value'],
+                day_in_qty=(totals.get('in_qty') or Decimal('0')) + (totals.get('returned_qty') or Decimal('0')),
+                day_out_qty=totals.get('out_qty') or Decimal('0'),
+                total_in_qty=position['total_in_qty'],
+                total_in_value=position['total_in_value'],
+                total_returned_qty=position['total_returned_qty'],
+                total_out_qty=position['total_out_qty'],
+            ))
+
+        rows += StockSnapshotService._save_day(snapshots)
+        return days, rows
+
+    @staticmethod
+    def _save_day(snapshots: List[DailyStockSnapshot]) -> int:
+        if snapshots:
+            with transaction.atomic():
+                DailyStockSnapshot.objects.bulk_create(snapshots, batch_size=StockSnapshotService.BULK_BATCH_SIZE)
+        return len(snapshots)
+
+    # =====================================================
+    # POINT-IN-TIME QUERIES
+    # =====================================================
+
+    @staticmethod
+    def get_position_as_of(location, as_of_date, product=None) -> Dict:
+        """
+        Stock and value per product at the end of a business date
+
+        Reads each product's latest snapshot on or before the location's
+        latest snapshot date (carried forward), plus the movements dated
+        after that date (normally at most one day).
+        """
+        snapshot_date = DailyStockSnapshot.objects.latest_date(location, on_or_before=as_of_date)
+
+        movements = InventoryMovement.objects.filter(location=location, movement_date__lte=as_of_date)
+        if snapshot_date is not None:
+            movements = movements.filter(movement_date__gt=snapshot_date)
+        if product is not None:
+            movements = movements.filter(product=product)
+
+        base = {}
+        codes = {}
+        if snapshot_date is not None:
+            base = StockSnapshotService._closing_totals(location, snapshot_date, product=product)
+            codes = {product_id: row['product__code'] for product_id, row in base.items()}
+
+        deltas = {}
+        delta_rows = movements.values('product_id', 'product__code').annotate(
+            **StockLedgerService._total_expressions()
+        ).order_by()
+        for row in delta_rows:
+            deltas[row['product_id']] = row
+            codes[row['product_id']] = row['product__code']
+
+        items: List[Dict] = []
+        total_qty = Decimal('0')
+        total_value = Decimal('0')
+        for product_id in sorted(base.keys() | deltas.keys(), key=lambda pid: codes[pid]):
+            position = StockLedgerService._fold(base.get(product_id), deltas.get(product_id, {}))
+            if position['qty'] == 0:
+                continue
+
+            items.append({
+                'product_id': product_id,
+                'product_code': codes[product_id],
+                'qty': position['qty'],
+                'avg_cost': position['avg_cost'],
+                'value': position['value'],
+            })
+            total_qty += position['qty']
+            total_value += position['value']
+
+        return {
+            'as_of': as_of_date,
+            'snapshot_date': snapshot_date,
+            'delta_days': (as_of_date - snapshot_date).days if snapshot_date else None,
+            'items': items,
+            'product_count': len(items),
+            'total_qty': total_qty,
+            'total_value': total_value,
+        }
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _closing_totals(location, on_or_before, product=None) -> Dict[int, Dict]:
+        """Each product's latest snapshot row on or before a date - the carried-forward closing totals"""
+        latest_date = DailyStockSnapshot.objects.filter(
+            location=OuterRef('location'),
+            product=OuterRef('product'),
+            snapshot_date__lte=on_or_before
+        ).order_by('-snapshot_date').values('snapshot_date')[:1]
+
+        rows = DailyStockSnapshot.objects.filter(
+            location=location, snapshot_date__lte=on_or_before
+        )
+        if product is not None:
+            rows = rows.filter(product=product)
+        rows = rows.filter(
+            snapshot_date=Subquery(latest_date)
+        ).values('product_id', 'product__code', *StockSnapshotService.SNAPSHOT_TOTAL_FIELDS)
+
+        return {
+            row['product_id']: row
+            for row in rows.iterator(chunk_size=StockSnapshotService.BULK_BATCH_SIZE)
+        }
+
+
+__all__ = ['StockSnapshotService']
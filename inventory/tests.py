@@ -1,3 +1,240 @@
+# inventory/tests.py - batch allocation and set-based posting behaviour
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
 from django.test import TestCase
+from django.utils import timezone
+
+from nomenclatures.models import TaxGroup, UnitOfMeasure
+from products.models import Product
+
+from .models import InventoryBatch, InventoryItem, InventoryLocation, InventoryMovement
+from .services import MovementService
+from .services.fifo_allocator import FefoAllocator, FifoAllocator
+from .services.posting_engine import StockPostingEngine
+
+
+class InventoryTestMixin:
+    """Minimal product + location fixtures"""
+
+    @classmethod
+    def create_product(cls, code, track_batches=False):
+        if not hasattr(cls, 'unit'):
+            cls.unit = UnitOfMeasure.objects.create(code='PCS', name='Piece')
+            cls.tax_group = TaxGroup.objects.create(code='VAT20', name='VAT 20%', rate=Decimal('20.00'))
+        return Product.objects.create(
+            code=code, name=f"Product {code}", base_unit=cls.unit, tax_group=cls.tax_group,
+            track_batches=track_batches
+        )
+
+    @staticmethod
+    def create_location(code, **kwargs):
+        return InventoryLocation.objects.create(code=code, name=f"Location {code}", **kwargs)
+
+    def create_batch(self, batch_number, quantity, cost_price='1.00', expiry_date=None):
+        return InventoryBatch.objects.create(
+            location=self.location, product=self.product, batch_number=batch_number,
+            expiry_date=expiry_date, received_qty=Decimal(quantity), remaining_qty=Decimal(quantity),
+            cost_price=Decimal(cost_price), received_date=timezone.now()
+        )
+
+    @staticmethod
+    def split(allocations):
+        return [(allocation.batch.batch_number, allocation.quantity) for allocation in allocations]
+
+
+class FifoAllocatorTest(InventoryTestMixin, TestCase):
+    """Window-sum FIFO: lock only the batches the quantity needs"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = cls.create_product('FIFO1', track_batches=True)
+        cls.location = cls.create_location('WH1')
+
+    def setUp(self):
+        self.batches = [self.create_batch(f"B{i}", '10.000') for i in range(1, 4)]
+        self.allocator = FifoAllocator(self.location, self.product)
+
+    def test_partial_first_batch(self):
+        self.assertTrue(FifoAllocator.uses_running_sum())
+
+        locked = self.allocator._lock_candidates(Decimal('4'))
+        allocations, shortfall = self.allocator.allocate(Decimal('4'))
+
+        self.assertEqual([batch.batch_number for batch in locked], ['B1'])
+        self.assertEqual(self.split(allocations), [('B1', Decimal('4'))])
+        self.assertEqual(shortfall, Decimal('0'))
+
+    def test_exact_fit_stops_at_last_needed_batch(self):
+        locked = self.allocator._lock_candidates(Decimal('20'))
+        allocations, shortfall = self.allocator.allocate(Decimal('20'))
+
+        self.assertEqual([batch.batch_number for batch in locked], ['B1', 'B2'])
+        self.assertEqual(self.split(allocations), [('B1', Decimal('10')), ('B2', Decimal('10'))])
+        self.assertEqual(shortfall, Decimal('0'))
+
+    def test_spans_batches_and_apply_decrements(self):
+        allocations, shortfall = self.allocator.allocate(Decimal('15'))
+
+        self.assertEqual(self.split(allocations), [('B1', Decimal('10')), ('B2', Decimal('5'))])
+        self.assertEqual(shortfall, Decimal('0'))
+
+        FifoAllocator.apply(allocations)
+        remaining = dict(
+            InventoryBatch.objects.filter(product=self.product).values_list('batch_number', 'remaining_qty')
+        )
+        self.assertEqual(remaining, {'B1': Decimal('0'), 'B2': Decimal('5'), 'B3': Decimal('10')})
+
+    def test_shortfall_when_stock_runs_out(self):
+        allocations, shortfall = self.allocator.allocate(Decimal('35'))
+
+        self.assertEqual([batch for batch, _ in self.split(allocations)], ['B1', 'B2', 'B3'])
+        self.assertEqual(shortfall, Decimal('5'))
+
+    def test_tops_up_from_later_batches_when_drained_concurrently(self):
+        original = FifoAllocator._lock_candidates
+        drained = self.batches[1]
+
+        def lock_then_drain(allocator, quantity):
+            # Running sum picked B1+B2; another sale drains B2 before its lock is granted
+            batches = original(allocator, quantity)
+            InventoryBatch.objects.filter(pk=drained.pk).update(remaining_qty=Decimal('2'))
+            for batch in batches:
+                batch.refresh_from_db(fields=['remaining_qty'])
+            return batches
+
+        with patch.object(FifoAllocator, '_lock_candidates', lock_then_drain), \
+                patch.object(FifoAllocator, '_lock_after', wraps=self.allocator._lock_after) as lock_after:
+            allocations, shortfall = self.allocator.allocate(Decimal('15'))
+
+        self.assertEqual(
+            self.split(allocations),
+            [('B1', Decimal('10')), ('B2', Decimal('2')), ('B3', Decimal('3'))]
+        )
+        self.assertEqual(shortfall, Decimal('0'))
+        lock_after.assert_called_once()
+
+    def test_full_scan_matches_running_sum(self):
+        with_window = self.split(self.allocator.allocate(Decimal('15'))[0])
+
+        with patch.object(FifoAllocator, 'uses_running_sum', return_value=False):
+            without_window = self.split(self.allocator.allocate(Decimal('15'))[0])
+
+        self.assertEqual(with_window, without_window)
+
+
+class FefoAllocatorTest(InventoryTestMixin, TestCase):
+    """Earliest expiry first, undated batches FIFO after the dated ones"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = cls.create_product('FEFO1', track_batches=True)
+        cls.location = cls.create_location('WH2', allocation_strategy=InventoryLocation.ALLOCATION_FEFO)
+
+    def setUp(self):
+        self.create_batch('U1', '5.000')
+        self.create_batch('LATE', '5.000', expiry_date=date(2031, 6, 1))
+        self.create_batch('U2', '5.000')
+        self.create_batch('EARLY', '5.000', expiry_date=date(2030, 1, 1))
+        self.allocator = FefoAllocator(self.location, self.product)
+
+    def test_dated_batches_by_expiry(self):
+        allocations, shortfall = self.allocator.allocate(Decimal('7'))
+
+        self.assertEqual(self.split(allocations), [('EARLY', Decimal('5')), ('LATE', Decimal('2'))])
+        self.assertEqual(shortfall, Decimal('0'))
+
+    def test_undated_batches_after_dated_in_fifo_order(self):
+        allocations, shortfall = self.allocator.allocate(Decimal('17'))
+
+        self.assertEqual(
+            self.split(allocations),
+            [('EARLY', Decimal('5')), ('LATE', Decimal('5')), ('U1', Decimal('5')), ('U2', Decimal('2'))]
+        )
+        self.assertEqual(shortfall, Decimal('0'))
+
+    def test_shortfall_after_undated_batches(self):
+        allocations, shortfall = self.allocator.allocate(Decimal('22'))
+
+        self.assertEqual(len(allocations), 4)
+        self.assertEqual(shortfall, Decimal('2'))
+
+
+class StockPostingEngineTest(InventoryTestMixin, TestCase):
+    """Set-based posting must leave the same stock as posting row by row"""
+
+    ROWS = [
+        ('IN', '10.000', '2.1300'),
+        ('IN', '7.000', '3.4100'),
+        ('OUT', '4.000', None),
+        ('IN', '3.000', '1.9900'),
+        ('OUT', '9.000', None),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = cls.create_product('POST1')
+        cls.set_location = cls.create_location('SET')
+        cls.row_location = cls.create_location('ROW')
+
+    def movement_data(self, location, rows):
+        data = []
+        for movement_type, quantity, cost_price in rows:
+            row = {
+                'location': location, 'product': self.product, 'movement_type': movement_type,
+                'quantity': Decimal(quantity), 'source_document_number': 'DOC-1',
+            }
+            if movement_type == 'IN':
+                row['cost_price'] = Decimal(cost_price)
+            else:
+                # Stock/cost parity only - no sale price detection
+                row['source_document_type'] = 'ADJUSTMENT'
+            data.append(row)
+        return data
+
+    def post_per_row(self, location, rows):
+        results = []
+        for data in self.movement_data(location, rows):
+            data = {key: value for key, value in data.items() if key != 'movement_type'}
+            if 'cost_price' in data:
+                results.append(MovementService.create_incoming_stock(**data))
+            else:
+                results.append(MovementService.create_outgoing_stock(**data))
+        return results
+
+    def state(self, location):
+        item = InventoryItem.objects.get(location=location, product=self.product)
+        movements = list(InventoryMovement.objects.filter(location=location).order_by('id').values_list(
+            'movement_type', 'quantity', 'cost_price', 'sale_price', 'profit_amount'
+        ))
+        return (item.current_qty, item.avg_cost, item.last_purchase_cost), movements
+
+    def test_set_based_matches_per_row(self):
+        movements, errors = StockPostingEngine(self.movement_data(self.set_location, self.ROWS)).post()
+        results = self.post_per_row(self.row_location, self.ROWS)
+
+        self.assertEqual(errors, [])
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(len(movements), len(self.ROWS))
+        self.assertEqual(self.state(self.set_location), self.state(self.row_location))
+
+    def test_insufficient_stock_rejected_like_per_row(self):
+        rows = [('IN', '5.000', '2.0000'), ('OUT', '8.000', None), ('OUT', '5.000', None)]
+
+        movements, errors = StockPostingEngine(self.movement_data(self.set_location, rows)).post()
+        results = self.post_per_row(self.row_location, rows)
+
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith('Row 2: Insufficient stock'))
+        self.assertEqual(len(movements), 2)
+        self.assertEqual(self.state(self.set_location), self.state(self.row_location))
+
+    def test_outgoing_without_item_rejected(self):
+        movements, errors = StockPostingEngine(self.movement_data(self.set_location, [('OUT', '1.000', None)])).post()
 
-# Create your tests here.
+        self.assertEqual(movements, [])
+        self.assertEqual(errors, ['Row 1: No inventory record found for this product at this location'])
+        self.assertFalse(InventoryItem.objects.filter(location=self.set_location).exists())
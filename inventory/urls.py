@@ -0,0 +1,11 @@
+# inventory/urls.py
+from django.urls import path
+from . import views
+
+app_name = 'inventory'
+
+urlpatterns = [
+    # Movement history - keyset pages and streaming export
+    path('movements/history/', views.MovementHistoryView.as_view(), name='movement_history'),
+    path('movements/history/export/', views.MovementHistoryExportView.as_view(), name='movement_history_export'),
+]
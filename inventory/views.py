@@ -1,3 +1,153 @@
-from django.shortcuts import render
+# inventory/views.py
+import csv
+import json
+import logging
 
-# Create your views here.
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.generic import View
+
+from .models import InventoryLocation
+from .services import MovementHistoryService
+
+logger = logging.getLogger(__name__)
+
+
+class MovementHistoryMixin:
+    """Common GET filters for movement history endpoints"""
+
+    def get_history_queryset(self):
+        params = self.request.GET
+
+        location = None
+        if params.get('location'):
+            location = get_object_or_404(InventoryLocation, code=params['location'].upper())
+
+        product = None
+        if params.get('product'):
+            from products.models import Product
+            product = get_object_or_404(Product, code=params['product'])
+
+        movement_types = [t for t in params.get('types', '').upper().split(',') if t]
+
+        return MovementHistoryService.build_queryset(
+            location=location,
+            product=product,
+            days_back=int(params.get('days_back', 30)),
+            movement_types=movement_types or None,
+            date_from=self._parse_date(params.get('date_from')),
+            date_to=self._parse_date(params.get('date_to')),
+        )
+
+    @staticmethod
+    def _parse_date(value):
+        from datetime import date
+        return date.fromisoformat(value) if value else None
+
+
+class MovementHistoryView(LoginRequiredMixin, PermissionRequiredMixin, MovementHistoryMixin, View):
+    """
+    Keyset-paginated movement history (JSON)
+
+    GET ?location=&product=&types=IN,OUT&days_back=&cursor=&limit=
+    """
+
+    permission_required = 'inventory.view_inventorymovement'
+
+    def get(self, request):
+        try:
+            queryset = self.get_history_queryset()
+            page = MovementHistoryService.get_page(
+                queryset,
+                cursor=request.GET.get('cursor'),
+                limit=int(request.GET.get('limit', MovementHistoryService.DEFAULT_PAGE_SIZE))
+            )
+
+            response = {'success': True, **page}
+            if not request.GET.get('cursor'):
+                response['summary'] = MovementHistoryService.get_summary(queryset)
+
+            return JsonResponse(response, encoder=DjangoJSONEncoder)
+
+        except ValueError as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+
+class MovementHistoryExportView(LoginRequiredMixin, PermissionRequiredMixin, MovementHistoryMixin, View):
+    """
+    Streaming movement history export
+
+    GET ?format=csv|json plus the MovementHistoryView filters.
+    Rows are streamed from a server-side iterator - memory stays flat.
+    """
+
+    permission_required = 'inventory.view_inventorymovement'
+
+    CSV_COLUMNS = [
+        'id', 'movement_date', 'movement_type', 'product_code', 'location_code', 'quantity',
+        'cost_price', 'sale_price', 'total_profit', 'batch_number', 'source_document_type',
+        'source_document_number', 'reason', 'created_by',
+    ]
+
+    # format -> (content type, stream method)
+    EXPORT_FORMATS = {
+        'csv': ('text/csv', '_stream_csv'),
+        'json': ('application/json', '_stream_json'),
+    }
+
+    def get(self, request):
+        try:
+            queryset = self.get_history_queryset()
+        except ValueError as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+        # Unknown formats fall back to CSV - extension and content type follow the stream written
+        export_format = request.GET.get('format', 'csv').lower()
+        if export_format not in self.EXPORT_FORMATS:
+            export_format = 'csv'
+        content_type, stream = self.EXPORT_FORMATS[export_format]
+
+        response = StreamingHttpResponse(getattr(self, stream)(queryset), content_type=content_type)
+        filename = f"movements_{timezone.now():%Y%m%d_%H%M%S}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def _stream_csv(self, queryset):
+        buffer = _LineBuffer()
+        writer = csv.DictWriter(buffer, fieldnames=self.CSV_COLUMNS, extrasaction='ignore')
+
+        writer.writeheader()
+        yield buffer.pop()
+
+        for row in MovementHistoryService.iter_history(queryset):
+            writer.writerow(row)
+            yield buffer.pop()
+
+    def _stream_json(self, queryset):
+        summary = MovementHistoryService.get_summary(queryset)
+        yield '{"summary": ' + json.dumps(summary, cls=DjangoJSONEncoder) + ', "movements": ['
+
+        first = True
+        for row in MovementHistoryService.iter_history(queryset):
+            yield ('' if first else ',') + json.dumps(row, cls=DjangoJSONEncoder)
+            first = False
+
+        yield ']}'
+
+
+class _LineBuffer:
+    """File-like target for csv.writer that hands back each written line"""
+
+    def __init__(self):
+        self._lines = []
+
+    def write(self, value):
+        self._lines.append(value)
+
+    def pop(self) -> str:
+        data = ''.join(self._lines)
+        self._lines.clear()
+        return data
@@ -28,7 +28,7 @@ class ProductGroupAdmin(DraggableMPTTAdmin):
             'fields': ('code', 'name', 'parent')
         }),
         (_('Settings'), {
-            'fields': ('is_active', 'sort_order'),
+            'fields': ('is_active', 'sort_order', 'allocation_strategy'),
         }),
     )
 
@@ -14,6 +14,7 @@ from django.utils.translation import gettext_lazy as _
 
 
 from ..models import DocumentStatus, DocumentTypeStatus
+from ..services.workflow import WorkflowSpecService
 
 
 # =================================================================
@@ -170,6 +171,7 @@ class DocumentStatusAdmin(admin.ModelAdmin):
 
     def activate_statuses(self, request, queryset):
         count = queryset.update(is_active=True)
+        WorkflowSpecService.invalidate()  # update() sends no signals
         self.message_user(request, f'Activated {count} statuses.')
 
     activate_statuses.short_description = _('Activate selected statuses')
@@ -181,6 +183,7 @@ class DocumentStatusAdmin(admin.ModelAdmin):
             self.message_user(request, f'Cannot deactivate {system_count} system statuses.', level='warning')
 
         count = queryset.filter(is_system=False).update(is_active=False)
+        WorkflowSpecService.invalidate()  # update() sends no signals
         self.message_user(request, f'Deactivated {count} statuses.')
 
     deactivate_statuses.short_description = _('Deactivate selected statuses')
@@ -311,18 +314,22 @@ class DocumentTypeStatusAdmin(admin.ModelAdmin):
             config.is_initial = True
             config.save()
 
+        WorkflowSpecService.invalidate()  # update() sends no signals
+
         self.message_user(request, f'Marked {queryset.count()} configurations as initial.')
 
     mark_as_initial.short_description = _('Mark as initial status')
 
     def mark_as_final(self, request, queryset):
         count = queryset.update(is_final=True)
+        WorkflowSpecService.invalidate()  # update() sends no signals
         self.message_user(request, f'Marked {count} configurations as final.')
 
     mark_as_final.short_description = _('Mark as final status')
 
     def mark_as_cancellation(self, request, queryset):
         count = queryset.update(is_cancellation=True)
+        WorkflowSpecService.invalidate()  # update() sends no signals
         self.message_user(request, f'Marked {count} configurations as cancellation.')
 
     mark_as_cancellation.short_description = _('Mark as cancellation status')
\ No newline at end of file
@@ -14,6 +14,8 @@ from django.utils.translation import gettext_lazy as _
 from django.db.models import Count, Q
 from django.utils.safestring import mark_safe
 
+from ..services.workflow import WorkflowSpecService
+
 # Conditional import for models
 try:
     from ..models import ApprovalRule, ApprovalLog
@@ -211,12 +213,14 @@ if HAS_APPROVAL_MODELS:
 
         def activate_rules(self, request, queryset):
             count = queryset.update(is_active=True)
+            WorkflowSpecService.invalidate()  # update() sends no signals
             self.message_user(request, f'Activated {count} rules.')
 
         activate_rules.short_description = _('Activate selected rules')
 
         def deactivate_rules(self, request, queryset):
             count = queryset.update(is_active=False)
+            WorkflowSpecService.invalidate()  # update() sends no signals
             self.message_user(request, f'Deactivated {count} rules.')
 
         deactivate_rules.short_description = _('Deactivate selected rules')
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class NomenclaturesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'nomenclatures'
+
+    def ready(self):
+        from . import signals  # noqa: F401 - workflow spec invalidation
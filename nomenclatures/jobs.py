@@ -0,0 +1,37 @@
+# nomenclatures/jobs.py
+"""
+Background job handlers for document workflow
+
+Autodiscovered by core.services.job_queue.JobQueue (run_jobs command).
+"""
+
+import logging
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+
+from core.services.job_queue import JobQueue
+from nomenclatures.services.status_manager import StatusManager
+
+logger = logging.getLogger(__name__)
+
+
+@JobQueue.register(StatusManager.POST_TRANSITION_JOB)
+def run_post_transition_actions(job):
+    """Movement creation/reversal, emails and final/cancel processing after a status change"""
+    payload = job.payload
+
+    model = apps.get_model(payload['app_label'], payload['model'])
+    document = model.objects.select_related('document_type').get(pk=payload['document_id'])
+    user = get_user_model().objects.filter(pk=payload.get('user_id')).first()
+
+    summary = StatusManager.perform_post_transition_actions(
+        document, payload['old_status'], payload['new_status'], user, strict=True, job=job
+    )
+
+    return {
+        'document_number': getattr(document, 'document_number', ''),
+        'old_status': payload['old_status'],
+        'new_status': payload['new_status'],
+        **summary
+    }
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nomenclatures', '0003_add_semantic_type_to_document_type_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productgroup',
+            name='allocation_strategy',
+            field=models.CharField(blank=True, choices=[('', 'Inherit (parent group / location)'), ('FIFO', 'FIFO - First in, first out'), ('FEFO', 'FEFO - First expired, first out'), ('LIFO', 'LIFO - Last in, first out')], default='', help_text='Batch consumption order for products of this group and its subgroups', max_length=10, verbose_name='Allocation Strategy'),
+        ),
+    ]
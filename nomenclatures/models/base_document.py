@@ -86,16 +86,14 @@ class DocumentManager(models.Manager):
     def drafts(self):
         """Draft documents - FIXED: Dynamic status resolution"""
         try:
-            from nomenclatures.services._status_resolver import StatusResolver
+            from nomenclatures.services.workflow import WorkflowSpecService
             # Get all document types in queryset and find their draft statuses
             document_types = self.values_list('document_type', flat=True).distinct()
             draft_statuses = set()
             for doc_type_id in document_types:
                 if doc_type_id:
                     try:
-                        from nomenclatures.models import DocumentType
-                        doc_type = DocumentType.objects.get(pk=doc_type_id)
-                        initial_status = StatusResolver.get_initial_status(doc_type)
+                        initial_status = WorkflowSpecService.get(doc_type_id).initial_status
                         if initial_status:
                             draft_statuses.add(initial_status)
                     except:
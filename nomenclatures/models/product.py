@@ -8,6 +8,15 @@ from .base_nomenclature import BaseNomenclature, ActiveManager
 
 class ProductGroup(MPTTModel):
     """Йерархична структура на продуктови групи"""
+
+    # Batch allocation override (same codes as InventoryLocation.allocation_strategy)
+    ALLOCATION_STRATEGY_CHOICES = [
+        ('', _('Inherit (parent group / location)')),
+        ('FIFO', _('FIFO - First in, first out')),
+        ('FEFO', _('FEFO - First expired, first out')),
+        ('LIFO', _('LIFO - Last in, first out')),
+    ]
+
     code = models.CharField(
         _('Group Code'),
         max_length=20,
@@ -37,6 +46,14 @@ class ProductGroup(MPTTModel):
         default=0,
         help_text=_('Used for custom ordering in reports and UI')
     )
+    allocation_strategy = models.CharField(
+        _('Allocation Strategy'),
+        max_length=10,
+        choices=ALLOCATION_STRATEGY_CHOICES,
+        blank=True,
+        default='',
+        help_text=_('Batch consumption order for products of this group and its subgroups')
+    )
 
     # Managers
     objects = models.Manager()
@@ -26,6 +26,7 @@ from .status_manager import StatusManager
 from .validator import DocumentValidator
 from .vat_calculation_service import VATCalculationService
 from .document_line_service import DocumentLineService
+from .workflow import WorkflowSpec, WorkflowSpecService
 
 # Numbering service (optional)
 try:
@@ -49,6 +50,8 @@ __all__ = [
     'DocumentValidator',
     'DocumentQuery',
     'DocumentLineService',
+    'WorkflowSpec',
+    'WorkflowSpecService',
 ]
 
 # Add numbering if available
@@ -1,7 +1,7 @@
 # nomenclatures/services/approval_service.py - COMPLETE RESULT PATTERN REFACTORING
 
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -20,10 +20,59 @@ except ImportError:
     ApprovalLog = None
     HAS_APPROVAL_MODELS = False
 
+from .workflow import WorkflowSpecService
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
+class ApproverContext:
+    """
+    What a user can approve with - loaded once per request
+
+    Cached on the user instance (like Django's own _perm_cache), so every
+    rule check of a request reuses one groups query and the user's
+    permission cache.
+    """
+
+    __slots__ = ('user', 'user_id', 'group_ids', 'is_staff', '_permissions')
+
+    def __init__(self, user):
+        self.user = user
+        self.user_id = getattr(user, 'pk', None)
+        self.group_ids = frozenset(user.groups.values_list('id', flat=True)) if self.user_id else frozenset()
+        self.is_staff = bool(getattr(user, 'is_staff', False))
+        self._permissions = {}
+
+    @staticmethod
+    def for_user(user) -> 'ApproverContext':
+        context = getattr(user, '_approver_context', None)
+        if context is None:
+            context = ApproverContext(user)
+            try:
+                user._approver_context = context
+            except AttributeError:
+                pass
+        return context
+
+    def has_perm(self, permission: str) -> bool:
+        if permission not in self._permissions:
+            self._permissions[permission] = self.user.has_perm(permission)
+        return self._permissions[permission]
+
+    def can_approve(self, rule) -> bool:
+        """Same decision as ApprovalRule.can_user_approve for a compiled RuleSpec"""
+        if rule.approver_type == 'user':
+            return self.user_id is not None and rule.approver_user_id == self.user_id
+        elif rule.approver_type == 'role':
+            return rule.approver_role_id in self.group_ids
+        elif rule.approver_type == 'permission':
+            return bool(rule.approver_permission) and self.has_perm(rule.approver_permission)
+        elif rule.approver_type == 'dynamic':
+            return self.is_staff
+        return False
+
+
 class ApprovalService:
     """
     APPROVAL SERVICE - REFACTORED WITH RESULT PATTERN
@@ -124,6 +173,66 @@ class ApprovalService:
                 data={'from_status': current_status, 'to_status': to_status}
             )
 
+    @staticmethod
+    def authorize_bulk_transition(documents: List, from_status: str, to_status: str, user: User) -> Result:
+        """
+        🎯 BULK API: Authorize one transition for documents sharing a type and status
+
+        Rule lookup and user authorization run once for the whole group; only
+        the amount constraints are checked per document.
+
+        Returns:
+            Result with data {'rule_id', 'approval_level', 'authorized': [documents],
+            'denied': [(document, Result)]}, or an error when the whole group is denied
+        """
+        try:
+            if not HAS_APPROVAL_MODELS:
+                return Result.error(
+                    code='APPROVAL_MODELS_UNAVAILABLE',
+                    msg='Approval models are not available in this system'
+                )
+
+            if not documents:
+                return Result.success(data={'rule_id': None, 'authorized': [], 'denied': []})
+
+            sample = documents[0]
+            rule_result = ApprovalService._find_approval_rule(sample, from_status, to_status)
+            if not rule_result.ok:
+                return rule_result
+            rule = rule_result.data['rule']
+
+            auth_result = ApprovalService._check_user_authorization(rule, user, sample)
+            if not auth_result.ok:
+                return auth_result
+
+            authorized, denied = [], []
+            for document in documents:
+                constraints_result = ApprovalService._check_approval_constraints(rule, document, user)
+                if constraints_result.ok:
+                    authorized.append(document)
+                else:
+                    denied.append((document, constraints_result))
+
+            return Result.success(
+                data={
+                    'rule_id': rule.id,
+                    'rule_name': rule.name,
+                    'approval_level': rule.approval_level,
+                    'authorized': authorized,
+                    'denied': denied,
+                },
+                msg=f'Transition authorized for {len(authorized)}/{len(documents)} documents: '
+                    f'{from_status} → {to_status}'
+            )
+
+        except Exception as e:
+            logger.error(f"Error in bulk authorization: {e}")
+            return Result.error(
+                code='AUTHORIZATION_ERROR',
+                msg=f'Authorization failed: {str(e)}',
+                data={'from_status': from_status, 'to_status': to_status}
+            )
+
     @staticmethod
     def get_available_transitions(document, user: User) -> Result:
         """
@@ -145,38 +254,12 @@ class ApprovalService:
                     msg='Document has no current status'
                 )
 
-            # Get all rules from current status
-            rules = ApprovalRule.objects.filter(
-                document_type=document.document_type,
-                from_status_obj__code=current_status,
-                is_active=True
-            ).select_related('to_status_obj')
-
-            available_transitions = []
-
-            for rule in rules:
-                # Check if user can use this rule
-                auth_result = ApprovalService._check_user_authorization(rule, user, document)
-                if auth_result.ok:
-                    # Check constraints
-                    constraints_result = ApprovalService._check_approval_constraints(rule, document, user)
-
-                    transition_info = {
-                        'rule_id': rule.id,
-                        'to_status': rule.to_status_obj.code,
-                        'to_status_name': rule.to_status_obj.name,
-                        'to_status_display': getattr(rule, 'custom_name', None) or rule.to_status_obj.name,
-                        'semantic_type': rule.semantic_type,  # ✅ NEW: Configuration-driven semantic type
-                        'approval_level': rule.approval_level,
-                        'can_execute': constraints_result.ok,
-                        'block_reason': None if constraints_result.ok else constraints_result.msg,
-                        'requires_comments': getattr(rule, 'requires_comments', False),
-                        'requires_previous_level': getattr(rule, 'requires_previous_level', False),
-                        'button_style': ApprovalService._get_button_style_from_semantic(rule.semantic_type),  # ✅ ENHANCED: Use semantic type
-                        'confirmation_required': ApprovalService._requires_confirmation(rule.to_status_obj)
-                    }
-
-                    available_transitions.append(transition_info)
+            # Rules from the compiled approval matrix of (document type, current status)
+            available_transitions = ApprovalService._evaluate_transitions(
+                WorkflowSpecService.get(document.document_type),
+                document,
+                ApproverContext.for_user(user)
+            )
 
             transitions_data = {
                 'current_status': current_status,
@@ -199,6 +282,59 @@ class ApprovalService:
                 msg=f'Failed to get available transitions: {str(e)}'
             )
 
+    @staticmethod
+    def get_available_transitions_batch(documents: Iterable, user: User) -> Result:
+        """
+        🎯 NAVIGATION API: Available transitions for a whole page of documents
+
+        The user's groups are loaded once and every (document type, status,
+        amount) combination is evaluated once against the compiled approval
+        matrix - no queries per document.
+
+        Returns:
+            Result with data['transitions'] = {document.pk: [transition_info, ...]}
+        """
+        try:
+            transitions = {}
+            if not HAS_APPROVAL_MODELS:
+                return Result.success(
+                    data={'transitions': transitions},
+                    msg='No approval models available - all transitions allowed'
+                )
+
+            context = ApproverContext.for_user(user)
+            evaluated = {}
+            for document in documents:
+                current_status = getattr(document, 'status', None)
+                document_type_id = getattr(document, 'document_type_id', None)
+                if not current_status or not document_type_id:
+                    transitions[document.pk] = []
+                    continue
+
+                key = (document_type_id, current_status, ApprovalService._document_amount(document))
+                if key not in evaluated:
+                    evaluated[key] = ApprovalService._evaluate_transitions(
+                        WorkflowSpecService.get(document_type_id), document, context
+                    )
+                transitions[document.pk] = [dict(transition) for transition in evaluated[key]]
+
+            return Result.success(
+                data={
+                    'transitions': transitions,
+                    'documents_count': len(transitions),
+                    'user_id': user.id,
+                    'username': user.username,
+                },
+                msg=f'Evaluated transitions for {len(transitions)} documents'
+            )
+
+        except Exception as e:
+            logger.error(f"Error getting available transitions batch: {e}")
+            return Result.error(
+                code='TRANSITIONS_ERROR',
+                msg=f'Failed to get available transitions: {str(e)}'
+            )
+
     @staticmethod
     def get_workflow_information(document) -> Result:
         """
@@ -456,14 +592,10 @@ class ApprovalService:
 
     @staticmethod
     def _find_approval_rule(document, from_status, to_status) -> Result:
-        """Find applicable approval rule"""
+        """Find applicable approval rule (compiled RuleSpec, lowest approval level first)"""
         try:
-            rule = ApprovalRule.objects.filter(
-                document_type=document.document_type,
-                from_status_obj__code=from_status,
-                to_status_obj__code=to_status,
-                is_active=True
-            ).first()
+            rules = WorkflowSpecService.get(document.document_type).rules_for_transition(from_status, to_status)
+            rule = rules[0] if rules else None
 
             if rule:
                 return Result.success(
@@ -487,7 +619,7 @@ class ApprovalService:
         """Check if user is authorized for the rule"""
         try:
             # Check if user can approve this rule
-            if not rule.can_user_approve(user, document):
+            if not ApproverContext.for_user(user).can_approve(rule):
                 return Result.error(
                     code='USER_NOT_AUTHORIZED',
                     msg=f'User {user.username} is not authorized for this approval level'
@@ -501,13 +633,58 @@ class ApprovalService:
                 msg=f'Error checking user authorization: {str(e)}'
             )
 
+    @staticmethod
+    def _evaluate_transitions(spec, document, context: ApproverContext) -> List[Dict]:
+        """Transitions of the document's approval matrix row the user may perform"""
+        if spec is None:
+            return []
+
+        entry = spec.approval_rules_from(document.status)
+        if not entry.rules:
+            return []
+
+        rule_ids_in_band = entry.rule_ids_in_band(ApprovalService._document_amount(document))
+
+        transitions = []
+        for rule in entry.rules:
+            # Check if user can use this rule
+            if not context.can_approve(rule):
+                continue
+
+            # Amount band check - the constraint message is only needed for blocked rules
+            can_execute = rule.id in rule_ids_in_band
+            block_reason = None
+            if not can_execute:
+                block_reason = ApprovalService._check_approval_constraints(rule, document, context.user).msg
+
+            transitions.append({
+                'rule_id': rule.id,
+                'to_status': rule.to_status,
+                'to_status_name': rule.to_status_name,
+                'to_status_display': rule.to_status_name,
+                'semantic_type': rule.semantic_type,  # ✅ NEW: Configuration-driven semantic type
+                'approval_level': rule.approval_level,
+                'can_execute': can_execute,
+                'block_reason': block_reason,
+                'requires_comments': getattr(rule, 'requires_comments', False),
+                'requires_previous_level': getattr(rule, 'requires_previous_level', False),
+                'button_style': ApprovalService._get_button_style_from_semantic(rule.semantic_type),  # ✅ ENHANCED: Use semantic type
+                'confirmation_required': ApprovalService._requires_confirmation(rule.to_status)
+            })
+
+        return transitions
+
+    @staticmethod
+    def _document_amount(document):
+        return getattr(document, 'total_amount', None) or getattr(document, 'amount', None)
+
     @staticmethod
     def _check_approval_constraints(rule, document, user) -> Result:
         """Check additional approval constraints (amount limits, etc.)"""
         try:
             # Check amount limits if applicable
             if hasattr(rule, 'min_amount') and rule.min_amount is not None:
-                document_amount = getattr(document, 'total_amount', None) or getattr(document, 'amount', None)
+                document_amount = ApprovalService._document_amount(document)
                 if document_amount is not None and document_amount < rule.min_amount:
                     return Result.error(
                         code='AMOUNT_TOO_LOW',
@@ -515,7 +692,7 @@ class ApprovalService:
                     )
 
             if hasattr(rule, 'max_amount') and rule.max_amount is not None:
-                document_amount = getattr(document, 'total_amount', None) or getattr(document, 'amount', None)
+                document_amount = ApprovalService._document_amount(document)
                 if document_amount is not None and document_amount > rule.max_amount:
                     return Result.error(
                         code='AMOUNT_TOO_HIGH',
@@ -542,13 +719,8 @@ class ApprovalService:
             if not HAS_APPROVAL_MODELS:
                 return []
 
-            next_rules = ApprovalRule.objects.filter(
-                document_type=document.document_type,
-                from_status_obj__code=current_to_status,
-                is_active=True
-            ).values_list('to_status_obj__code', flat=True)
-
-            return list(next_rules)
+            entry = WorkflowSpecService.get(document.document_type).approval_rules_from(current_to_status)
+            return [rule.to_status for rule in entry.rules]
 
         except Exception:
             return []
@@ -584,9 +756,9 @@ class ApprovalService:
         return semantic_styles.get(semantic_type, 'btn-secondary')
 
     @staticmethod
-    def _requires_confirmation(status) -> bool:
+    def _requires_confirmation(status_code: str) -> bool:
         """Check if status transition requires confirmation"""
-        status_code = status.code.lower()
+        status_code = status_code.lower()
         # FIXED: More comprehensive semantic keywords
         return any(keyword in status_code for keyword in ['reject', 'cancel', 'delete', 'final', 'refuse', 'deny', 'terminate'])
 
@@ -708,39 +880,19 @@ class ApprovalService:
         try:
             ApprovalService._require_approval_models()
 
-            rules = ApprovalRule.objects.filter(
-                document_type=document.document_type,
-                from_status_obj__code=document.status,
-                is_active=True
-            ).select_related('to_status_obj')
+            spec = WorkflowSpecService.get(document.document_type)
+            if spec is None:
+                return None
+            rules = spec.approval_rules_from(document.status).rules
 
-            # FIXED: Use StatusResolver for semantic detection
-            try:
-                from ._status_resolver import StatusResolver
-                rejection_statuses = StatusResolver.get_statuses_by_semantic_type(
-                    document.document_type, 'rejection'
-                )
-                
-                # Check if any rule leads to rejection status
-                for rule in rules:
-                    if rule.to_status_obj.code in rejection_statuses:
-                        return rule.to_status_obj.code
-                        
-            except Exception:
-                # Fallback to pattern matching
-                for rule in rules:
-                    status_code = rule.to_status_obj.code.lower()
-                    if any(pattern in status_code for pattern in ['reject', 'deny', 'cancel', 'refuse']):
-                        return rule.to_status_obj.code
-
-            # Fallback: look in DocumentTypeStatus for cancellation status
-            cancellation_status = DocumentTypeStatus.objects.filter(
-                document_type=document.document_type,
-                is_cancellation=True,
-                is_active=True
-            ).first()
+            # Check if any rule leads to rejection status
+            rejection_statuses = spec.statuses_by_semantic_type('rejection')
+            for rule in rules:
+                if rule.to_status in rejection_statuses:
+                    return rule.to_status
 
-            return cancellation_status.status.code if cancellation_status else None
+            # Fallback: cancellation status of the document type
+            return spec.cancellation_status
 
         except ImportError:
             logger.warning("Models not available for find_rejection_status")
@@ -759,30 +911,15 @@ class ApprovalService:
         try:
             ApprovalService._require_approval_models()
 
-            rules = ApprovalRule.objects.filter(
-                document_type=document.document_type,
-                from_status_obj__code=document.status,
-                is_active=True
-            ).select_related('to_status_obj')
+            spec = WorkflowSpecService.get(document.document_type)
+            if spec is None:
+                return None
 
-            # FIXED: Use StatusResolver for semantic detection
-            try:
-                from ._status_resolver import StatusResolver
-                approval_statuses = StatusResolver.get_statuses_by_semantic_type(
-                    document.document_type, 'approval'
-                )
-                
-                # Check if any rule leads to approval status
-                for rule in rules.order_by('approval_level'):
-                    if rule.to_status_obj.code in approval_statuses:
-                        return rule.to_status_obj.code
-                        
-            except Exception:
-                # Fallback to pattern matching
-                for rule in rules.order_by('approval_level'):
-                    status_code = rule.to_status_obj.code.lower()
-                    if any(pattern in status_code for pattern in ['submit', 'pending', 'review']):
-                        return rule.to_status_obj.code
+            # Check if any rule leads to approval status (rules are ordered by approval level)
+            approval_statuses = spec.statuses_by_semantic_type('approval')
+            for rule in spec.approval_rules_from(document.status).rules:
+                if rule.to_status in approval_statuses:
+                    return rule.to_status
 
             return None
 
@@ -498,13 +498,9 @@ class DocumentService:
             return self._config_cache[cache_key]
             
         try:
-            from ..models import DocumentTypeStatus
-            
-            status_config = DocumentTypeStatus.objects.filter(
-                document_type=self.document.document_type,
-                status__code=self.document.status,
-                is_active=True
-            ).select_related('status').first()
+            from .workflow import WorkflowSpecService
+
+            status_config = WorkflowSpecService.get_status(self.document.document_type, self.document.status)
             
             config = {
                 'document_type': {
@@ -518,7 +514,7 @@ class DocumentService:
                 },
                 'current_status': {
                     'code': self.document.status,
-                    'name': status_config.status.name if status_config else self.document.status,
+                    'name': status_config.name if status_config else self.document.status,
                     'is_initial': status_config.is_initial if status_config else False,
                     'is_final': status_config.is_final if status_config else False,
                     'allows_editing': status_config.allows_editing if status_config else True,
@@ -571,58 +567,41 @@ class DocumentService:
         """Get documents ready for processing"""
         return DocumentQuery.get_ready_for_processing_documents(model_class, queryset)
     
+    @staticmethod
+    def get_available_actions_batch(documents, user: User) -> Dict[int, List[Dict]]:
+        """Available actions for a list page of documents, keyed by document pk"""
+        return DocumentQuery.get_available_actions_batch(documents, user)
+    
     # =====================================================
     # BULK OPERATIONS
     # =====================================================
     
     @staticmethod
-    @transaction.atomic
-    def bulk_status_transition(documents: List, target_status: str, user: User, comments: str = '') -> Result:
+    def bulk_status_transition(documents: List, target_status: str, user: User, comments: str = '',
+                               **kwargs) -> Result:
         """
         Bulk transition multiple documents to same status
         
+        Set-based: documents sharing a type and status are validated once,
+        updated with one query and logged with one bulk insert per group
+        (see StatusManager.bulk_transition_documents).
+        
         Args:
-            documents: List of document instances
+            documents: List (or queryset) of document instances
             target_status: Target status for all documents
             user: User performing transitions
             comments: Optional comments
+            run_post_actions_async: Queue post-transition jobs (default: settings.POST_TRANSITION_ASYNC)
             
         Returns:
-            Result: Bulk operation result with success/failure counts
+            Result: Bulk operation result with per-document successes/failures
         """
         try:
+            documents = list(documents)
             logger.info(f"Bulk transitioning {len(documents)} documents to {target_status}")
-            
-            results = {
-                'successful': [],
-                'failed': [],
-                'total': len(documents)
-            }
-            
-            for doc in documents:
-                service = DocumentService(doc, user)
-                result = service.transition_to(target_status, comments)
-                
-                if result.ok:
-                    results['successful'].append({
-                        'document_number': doc.document_number,
-                        'old_status': result.data.get('old_status'),
-                        'new_status': result.data.get('new_status')
-                    })
-                else:
-                    results['failed'].append({
-                        'document_number': doc.document_number,
-                        'error': result.msg
-                    })
-            
-            success_count = len(results['successful'])
-            fail_count = len(results['failed'])
-            
-            logger.info(f"Bulk transition complete: {success_count} success, {fail_count} failed")
-            
-            return Result.success(
-                data=results,
-                msg=f'Bulk transition: {success_count}/{len(documents)} successful'
+
+            return StatusManager.bulk_transition_documents(
+                documents, target_status, user, comments, **kwargs
             )
             
         except Exception as e:
@@ -8,9 +8,12 @@ Document Query - queries и информационни методи
 - get_active_documents()
 - get_available_actions()
 - _get_button_style()
+
+NEW:
+- get_available_actions_batch() - actions за цяла страница документи
 """
 
-from typing import List, Dict
+from typing import Dict, Iterable, List
 from django.contrib.auth import get_user_model
 import logging
 
@@ -237,6 +240,43 @@ class DocumentQuery:
 
         КОПИРАНО 1:1 от DocumentService.get_available_actions()
         """
+        return DocumentQuery._build_actions(document, user)
+
+    @staticmethod
+    def get_available_actions_batch(documents: Iterable, user: User) -> Dict[int, List[Dict]]:
+        """
+        Available actions for a page of documents, keyed by document pk
+
+        Approval transitions of all documents are evaluated in one
+        ApprovalService.get_available_transitions_batch() call. Load the
+        documents with select_related('document_type').
+        """
+        documents = list(documents)
+        transitions_by_document = {}
+        approval_documents = [
+            document for document in documents
+            if document.document_type and document.document_type.requires_approval
+        ]
+
+        if approval_documents:
+            try:
+                from .approval_service import ApprovalService
+                transitions_result = ApprovalService.get_available_transitions_batch(approval_documents, user)
+                if transitions_result.ok:
+                    transitions_by_document = transitions_result.data.get('transitions', {})
+            except ImportError:
+                logger.warning("ApprovalService not available")
+
+        return {
+            document.pk: DocumentQuery._build_actions(
+                document, user, transitions_by_document.get(document.pk, [])
+            )
+            for document in documents
+        }
+
+    @staticmethod
+    def _build_actions(document, user: User, transitions: List[Dict] = None) -> List[Dict]:
+        """Actions of one document - approval transitions may be passed in precomputed"""
         try:
             actions = []
 
@@ -247,12 +287,13 @@ class DocumentQuery:
                 # === APPROVAL WORKFLOW ACTIONS ===
                 try:
 
-                    from .approval_service import ApprovalService
-                    transitions_result = ApprovalService.get_available_transitions(document, user)
-                    transitions = []
+                    if transitions is None:
+                        from .approval_service import ApprovalService
+                        transitions_result = ApprovalService.get_available_transitions(document, user)
+                        transitions = []
 
-                    if transitions_result.ok:
-                        transitions = transitions_result.data.get('transitions', [])
+                        if transitions_result.ok:
+                            transitions = transitions_result.data.get('transitions', [])
 
                     for trans in transitions:
                         actions.append({
@@ -272,22 +313,20 @@ class DocumentQuery:
             else:
                 # === SIMPLE WORKFLOW ACTIONS ===
                 from ._status_resolver import StatusResolver
+                from .workflow import WorkflowSpecService
                 available_statuses = StatusResolver.get_next_possible_statuses(
                     document.document_type, 
                     document.status
                 )
+                spec = WorkflowSpecService.get(document.document_type)
 
                 for status in available_statuses:
-                    # ✅ NEW: Get semantic type from DocumentTypeStatus configuration
-                    try:
-                        from nomenclatures.models import DocumentTypeStatus
-                        config = DocumentTypeStatus.objects.get(
-                            document_type=document.document_type,
-                            status__code=status
-                        )
+                    # ✅ NEW: Get semantic type from the compiled workflow configuration
+                    config = spec.status(status) if spec else None
+                    if config:
                         semantic_type = config.semantic_type
-                        status_label = config.status.name  # Use proper status name
-                    except DocumentTypeStatus.DoesNotExist:
+                        status_label = config.name  # Use proper status name
+                    else:
                         # Fallback to generic if configuration not found
                         semantic_type = 'generic'
                         status_label = status.replace('_', ' ').title()
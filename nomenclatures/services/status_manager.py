@@ -17,6 +17,7 @@ from django.contrib.contenttypes.models import ContentType
 import logging
 import json
 from django.db import transaction
+from django.db.models.signals import post_save
 from core.utils.result import Result
 from nomenclatures.services.validator import DocumentValidator
 
@@ -146,8 +147,9 @@ class StatusManager:
                 logger.warning(f"⚠️ Logging failed but transition succeeded: {log_error}")
 
             # 7. POST-TRANSITION EFFECTS
+            post_transition_job = None
             try:
-                StatusManager._execute_post_transition_actions(
+                post_transition_job = StatusManager._execute_post_transition_actions(
                     document, old_status, to_status, user, **kwargs
                 )
             except Exception as post_error:
@@ -160,6 +162,7 @@ class StatusManager:
                     'document': document,
                     'from_status': old_status,
                     'to_status': to_status,
+                    'post_transition_job_id': post_transition_job.pk if post_transition_job else None,
                     **approval_data
                 },
                 msg=f'Document transitioned from {old_status} to {to_status}'
@@ -171,6 +174,327 @@ class StatusManager:
             logger.error(f"Full traceback: {traceback.format_exc()}")
             return Result.error('TRANSITION_FAILED', str(e))
 
+    # =====================================================
+    # BULK TRANSITIONS (set-based)
+    # =====================================================
+
+    BULK_CHUNK_SIZE = 500
+
+    @staticmethod
+    def bulk_transition_documents(documents, to_status: str, user: User, comments: str = '', **kwargs) -> Result:
+        """
+        🎯 NEW: Set-based transition of many documents to one status
+
+        Documents are grouped by (model, document type, current status). Each
+        group is validated once against the compiled workflow and committed
+        in its own short transaction: one UPDATE, one bulk_create of
+        ApprovalLog / LogEntry rows and one batch of post-transition jobs.
+        Amount bands and model business rules are still checked per
+        document; rejected documents are reported in 'failed'.
+
+        Post-transition actions are queued as background jobs in one INSERT
+        when POST_TRANSITION_ASYNC (or run_post_actions_async) is set,
+        otherwise they run inline like in transition_document().
+
+        Returns:
+            Result with data {'successful': [...], 'failed': [...], 'total': n}
+        """
+        results = {'successful': [], 'failed': [], 'total': 0}
+
+        by_model = {}
+        for document in documents:
+            results['total'] += 1
+            by_model.setdefault(document.__class__, []).append(document.pk)
+
+        for model, pks in by_model.items():
+            queryset = model.objects.select_related('document_type').filter(pk__in=pks)
+            if hasattr(DocumentValidator, f'_validate_{model.__name__.lower()}_rules') and hasattr(model, 'lines'):
+                # Model business rules look at lines - load them for the whole group at once
+                queryset = queryset.prefetch_related('lines')
+            fresh = {document.pk: document for document in queryset}
+
+            groups = {}
+            for pk in pks:
+                document = fresh.get(pk)
+                if document is None:
+                    results['failed'].append({
+                        'document_id': pk,
+                        'document_number': None,
+                        'code': 'DOCUMENT_NOT_FOUND',
+                        'error': f'{model.__name__} {pk} not found'
+                    })
+                    continue
+                groups.setdefault((document.document_type_id, document.status), []).append(document)
+
+            for (document_type_id, from_status), group in groups.items():
+                for start in range(0, len(group), StatusManager.BULK_CHUNK_SIZE):
+                    StatusManager._bulk_transition_group(
+                        model, group[start:start + StatusManager.BULK_CHUNK_SIZE],
+                        from_status, to_status, user, comments, results, **kwargs
+                    )
+
+        success_count = len(results['successful'])
+        logger.info(
+            f"Bulk transition to {to_status} complete: {success_count} success, {len(results['failed'])} failed"
+        )
+
+        return Result.success(
+            data=results,
+            msg=f'Bulk transition: {success_count}/{results["total"]} successful'
+        )
+
+    @staticmethod
+    def _bulk_transition_group(model, documents: List, from_status: str, to_status: str, user: User,
+                               comments: str, results: dict, **kwargs):
+        """Validate and transition documents sharing model, document type and status"""
+
+        def fail(failed_documents, result):
+            for document in failed_documents:
+                results['failed'].append({
+                    'document_id': document.pk,
+                    'document_number': document.document_number,
+                    'code': result.code,
+                    'error': result.msg
+                })
+
+        # Идемпотентност
+        if from_status == to_status:
+            for document in documents:
+                results['successful'].append({
+                    'document_id': document.pk,
+                    'document_number': document.document_number,
+                    'old_status': from_status,
+                    'new_status': to_status
+                })
+            return
+
+        # 1. WORKFLOW ВАЛИДАЦИЯ - веднъж за групата
+        sample = documents[0]
+        if not sample.document_type:
+            fail(documents, Result.error('NO_DOCUMENT_TYPE', 'Document has no type configured'))
+            return
+
+        status_result = StatusManager._validate_status_transition(sample, to_status)
+        if not status_result.ok:
+            fail(documents, status_result)
+            return
+
+        # 2. APPROVAL vs SIMPLE TRANSITION
+        requires_approval = sample.document_type.requires_approval
+        rule_id = None
+
+        if requires_approval:
+            try:
+                from .approval_service import ApprovalService
+            except ImportError:
+                fail(documents, Result.error('APPROVAL_SERVICE_UNAVAILABLE', 'Approval system not available'))
+                return
+
+            approval_result = ApprovalService.authorize_bulk_transition(documents, from_status, to_status, user)
+            if not approval_result.ok:
+                fail(documents, approval_result)
+                return
+
+            rule_id = approval_result.data['rule_id']
+            for document, denial in approval_result.data['denied']:
+                fail([document], denial)
+            candidates = approval_result.data['authorized']
+        else:
+            simple_result = DocumentValidator._validate_simple_transition(sample, to_status, user)
+            if not simple_result.ok:
+                fail(documents, simple_result)
+                return
+            candidates = documents
+
+        # 3. BUSINESS VALIDATION - per document
+        allowed = []
+        for document in candidates:
+            business_result = DocumentValidator._validate_business_rules(document, to_status, user, **kwargs)
+            if business_result.ok:
+                allowed.append(document)
+            else:
+                fail([document], business_result)
+
+        if not allowed:
+            return
+
+        # 4. EXECUTE - one transaction per group
+        try:
+            with transaction.atomic():
+                transitioned = StatusManager._bulk_update_status(model, allowed, from_status, to_status, user)
+
+                changed_meanwhile = [document for document in allowed if document.pk not in transitioned]
+                fail(changed_meanwhile, Result.error(
+                    'CONCURRENT_STATUS_CHANGE',
+                    f'Document is no longer in status {from_status}'
+                ))
+                allowed = [document for document in allowed if document.pk in transitioned]
+
+                StatusManager._bulk_log_transitions(
+                    model, allowed, rule_id, from_status, to_status, user, comments, requires_approval
+                )
+
+                # Listeners (e.g. last purchase prices) still see every saved document
+                if post_save.has_listeners(model):
+                    update_fields = frozenset(StatusManager._status_update_values(model, to_status, user, None))
+                    for document in allowed:
+                        post_save.send(
+                            sender=model, instance=document, created=False,
+                            update_fields=update_fields, raw=False, using=document._state.db
+                        )
+
+                jobs = StatusManager._bulk_post_transition_actions(allowed, from_status, to_status, user, **kwargs)
+
+        except Exception as e:
+            logger.error(f"💥 Bulk transition {from_status} → {to_status} failed: {e}")
+            fail(allowed, Result.error('TRANSITION_FAILED', str(e)))
+            return
+
+        for document in allowed:
+            job = jobs.get(document.pk)
+            results['successful'].append({
+                'document_id': document.pk,
+                'document_number': document.document_number,
+                'old_status': from_status,
+                'new_status': to_status,
+                'post_transition_job_id': job.pk if job else None
+            })
+
+    @staticmethod
+    def _status_update_values(model, to_status: str, user: User, now) -> dict:
+        """Fields written by a transition - same audit fields as transition_document()"""
+        field_names = {field.name for field in model._meta.concrete_fields}
+
+        values = {'status': to_status}
+        if 'updated_by' in field_names:
+            values['updated_by'] = user
+        if 'updated_at' in field_names:
+            values['updated_at'] = now
+        if 'approv' in to_status.lower():
+            if 'approved_by' in field_names:
+                values['approved_by'] = user
+            if 'approved_at' in field_names:
+                values['approved_at'] = now
+        return values
+
+    @staticmethod
+    def _bulk_update_status(model, documents: List, from_status: str, to_status: str, user: User) -> set:
+        """
+        One UPDATE guarded by the current status
+
+        Returns:
+            set: pks that were actually transitioned (documents changed by
+            someone else since loading are left out)
+        """
+        now = timezone.now()
+        values = StatusManager._status_update_values(model, to_status, user, now)
+        pks = [document.pk for document in documents]
+
+        updated = model.objects.filter(pk__in=pks, status=from_status).update(**values)
+
+        if updated == len(pks):
+            transitioned = set(pks)
+        else:
+            # Rows changed concurrently - keep only those stamped by this update
+            stamp = {'updated_at': now} if 'updated_at' in values else {}
+            transitioned = set(
+                model.objects.filter(pk__in=pks, status=to_status, **stamp).values_list('pk', flat=True)
+            )
+
+        for document in documents:
+            if document.pk in transitioned:
+                for field_name, value in values.items():
+                    setattr(document, field_name, value)
+
+        logger.info(f"💾 {len(transitioned)} {model.__name__} documents saved with new status: {to_status}")
+        return transitioned
+
+    @staticmethod
+    def _bulk_log_transitions(model, documents: List, rule_id: Optional[int], old_status: str, new_status: str,
+                              user: User, comments: str, requires_approval: bool):
+        """ApprovalLog / admin LogEntry rows for a whole group - one INSERT"""
+        if not documents:
+            return
+
+        try:
+            with transaction.atomic():
+                content_type = ContentType.objects.get_for_model(model)
+
+                if requires_approval:
+                    from nomenclatures.models.approvals import ApprovalLog
+
+                    ApprovalLog.objects.bulk_create([
+                        ApprovalLog(
+                            content_type=content_type,
+                            object_id=document.pk,
+                            rule_id=rule_id,
+                            from_status=old_status,
+                            to_status=new_status,
+                            action='approved' if 'approv' in new_status.lower() else 'submitted',
+                            actor=user,
+                            comments=comments or f'Status changed from {old_status} to {new_status}'
+                        )
+                        for document in documents
+                    ])
+                else:
+                    change_message = json.dumps([{
+                        'changed': {
+                            'fields': ['status'],
+                            'from': old_status,
+                            'to': new_status,
+                            'comments': comments
+                        }
+                    }])
+                    LogEntry.objects.bulk_create([
+                        LogEntry(
+                            user=user,
+                            content_type=content_type,
+                            object_id=str(document.pk),
+                            object_repr=str(document)[:200],
+                            action_flag=CHANGE,
+                            change_message=change_message
+                        )
+                        for document in documents
+                    ])
+
+        except Exception as e:
+            logger.warning(f"⚠️ Logging failed but bulk transition succeeded: {e}")
+
+    @staticmethod
+    def _bulk_post_transition_actions(documents: List, old_status: str, new_status: str, user: User,
+                                      **kwargs) -> dict:
+        """
+        Queue post-transition jobs for the group in one INSERT
+
+        Same switch as the single-document path: run_post_actions_async, by
+        default settings.POST_TRANSITION_ASYNC. Inline actions run one
+        document at a time, each in its own savepoint inside the group's
+        transaction - a failed document rolls back only its own effects.
+
+        Returns:
+            dict: {document.pk: BackgroundJob}
+        """
+        from django.conf import settings
+
+        run_async = kwargs.pop('run_post_actions_async', getattr(settings, 'POST_TRANSITION_ASYNC', False))
+        if not run_async:
+            for document in documents:
+                try:
+                    with transaction.atomic():
+                        StatusManager.perform_post_transition_actions(document, old_status, new_status, user)
+                except Exception as post_error:
+                    logger.warning(f"⚠️ Post-transition actions failed for {document.document_number}: {post_error}")
+            return {}
+
+        from core.services.job_queue import JobQueue
+
+        jobs = JobQueue.enqueue_batch(
+            StatusManager.POST_TRANSITION_JOB,
+            [StatusManager._post_transition_job_spec(document, old_status, new_status, user) for document in documents],
+            created_by=user
+        )
+        return {document.pk: job for document, job in zip(documents, jobs)}
+
     @staticmethod
     def _validate_status_transition(document, to_status: str) -> Result:
         """
@@ -179,45 +503,29 @@ class StatusManager:
         ✅ БЕЗ ПРОМЯНА - работи перфектно
         """
         try:
-            from ..models.statuses import DocumentStatus, DocumentTypeStatus
+            from .workflow import WorkflowSpecService
 
-            # Check if to_status exists
-            status_obj = DocumentStatus.objects.filter(
-                code=to_status,
-                is_active=True
-            ).first()
+            spec = WorkflowSpecService.get(document.document_type)
+            status_config = spec.status(to_status)
 
-            if not status_obj:
-                return Result.error(
-                    'INVALID_STATUS',
-                    f"Status '{to_status}' does not exist"
-                )
-
-            # Check if status is configured for this document type
-            status_config = DocumentTypeStatus.objects.filter(
-                document_type=document.document_type,
-                status=status_obj,
-                is_active=True
-            ).first()
+            if not status_config or not status_config.status_is_active:
+                from ..models.statuses import DocumentStatus
 
-            if not status_config:
-                configured = DocumentTypeStatus.objects.filter(
-                    document_type=document.document_type,
-                    is_active=True
-                ).values_list('status__code', flat=True)
+                # Error path only - tell unknown statuses from unconfigured ones
+                if status_config or not DocumentStatus.objects.filter(code=to_status, is_active=True).exists():
+                    return Result.error(
+                        'INVALID_STATUS',
+                        f"Status '{to_status}' does not exist"
+                    )
 
                 return Result.error(
                     'STATUS_NOT_CONFIGURED',
                     f"Status '{to_status}' not configured for {document.document_type.name}. "
-                    f"Available: {', '.join(configured)}"
+                    f"Available: {', '.join(spec.status_order)}"
                 )
 
             # Check transition rules
-            current_config = DocumentTypeStatus.objects.filter(
-                document_type=document.document_type,
-                status__code=document.status,
-                is_active=True
-            ).first()
+            current_config = spec.status(document.status)
 
             # Cannot transition FROM final status
             if current_config and current_config.is_final:
@@ -239,25 +547,101 @@ class StatusManager:
         except Exception as e:
             return Result.error('STATUS_VALIDATION_ERROR', str(e))
 
+    # =====================================================
+    # POST-TRANSITION ACTIONS (inline or background job)
+    # =====================================================
+
+    POST_TRANSITION_JOB = 'document.post_transition'
+
     @staticmethod
     def _execute_post_transition_actions(document, old_status: str, new_status: str, user: User, **kwargs):
         """
+        🎯 NEW: Dispatch post-transition actions
+
+        POST_TRANSITION_ASYNC → BackgroundJob, processed by run_jobs
+        иначе (default) → inline в текущия request (старото поведение)
+
+        Returns:
+            BackgroundJob or None when the actions ran inline
+        """
+        from django.conf import settings
+
+        run_async = kwargs.pop('run_post_actions_async', getattr(settings, 'POST_TRANSITION_ASYNC', False))
+        if run_async:
+            return StatusManager._enqueue_post_transition_actions(document, old_status, new_status, user)
+
+        # Savepoint - a failure must not leave the status change's transaction unusable
+        with transaction.atomic():
+            StatusManager.perform_post_transition_actions(document, old_status, new_status, user)
+        return None
+
+    @staticmethod
+    def get_job_ordering_key(document) -> str:
+        """Per-document key - jobs of one document run one at a time, in order"""
+        return f"{document._meta.label_lower}:{document.pk}"
+
+    @staticmethod
+    def _enqueue_post_transition_actions(document, old_status: str, new_status: str, user: User):
+        """Queue post-transition actions - committed together with the status change"""
+        from core.services.job_queue import JobQueue
+
+        job = JobQueue.enqueue(
+            StatusManager.POST_TRANSITION_JOB,
+            created_by=user,
+            **StatusManager._post_transition_job_spec(document, old_status, new_status, user)
+        )
+        logger.info(f"📥 Post-transition actions for {document.document_number} queued as job #{job.pk}")
+        return job
+
+    @staticmethod
+    def _post_transition_job_spec(document, old_status: str, new_status: str, user: User) -> dict:
+        """payload / ordering_key / idempotency_key of a post-transition job"""
+        ordering_key = StatusManager.get_job_ordering_key(document)
+        changed_at = getattr(document, 'updated_at', None) or timezone.now()
+
+        return {
+            'payload': {
+                'app_label': document._meta.app_label,
+                'model': document._meta.model_name,
+                'document_id': document.pk,
+                'document_number': getattr(document, 'document_number', ''),
+                'old_status': old_status,
+                'new_status': new_status,
+                'user_id': getattr(user, 'pk', None),
+            },
+            'ordering_key': ordering_key,
+            'idempotency_key': f"{ordering_key}:{old_status}>{new_status}:{changed_at.isoformat()}",
+        }
+
+    @staticmethod
+    def get_post_transition_status(document) -> Result:
+        """UI polling - status of all queued post-transition jobs for a document"""
+        from core.services.job_queue import JobQueue
+        return JobQueue.get_status(ordering_key=StatusManager.get_job_ordering_key(document))
+
+    @staticmethod
+    def perform_post_transition_actions(document, old_status: str, new_status: str, user: User,
+                                        strict: bool = False, job=None) -> dict:
+        """
         🎯 FIXED: CONFIGURATION-DRIVEN post-transition actions
 
         ПРЕДИ: Hardcoded if new_status == 'received' and model == 'deliveryreceipt'
         СЕГА: Използва DocumentTypeStatus.creates_inventory_movements конфигурация
+
+        strict=True (background job): inventory failures raise, so the job
+        transaction is rolled back and retried.
+        job: the running BackgroundJob - the email is sent after it commits
+        and recorded, so a retry does not send it again.
         """
+        summary = {'movements_created': 0, 'movements_reversed': 0}
+
         try:
-            from nomenclatures.models import DocumentTypeStatus
+            from .workflow import WorkflowSpecService
 
             # =====================
             # STEP 1: Намери конфигурацията за НОВИЯ статус
             # =====================
-            new_status_config = DocumentTypeStatus.objects.filter(
-                document_type=document.document_type,
-                status__code=new_status,
-                is_active=True
-            ).first()
+            new_status_config = WorkflowSpecService.get_status(document.document_type, new_status)
 
             if new_status_config:
                 logger.debug(f"Found status configuration: {new_status_config}")
@@ -266,7 +650,7 @@ class StatusManager:
                 
             if not new_status_config:
                 logger.warning(f"No configuration found for {document.document_type.name} status '{new_status}'")
-                return
+                return summary
 
             # =====================
             # STEP 2: INVENTORY ACTIONS (Configuration-Driven)
@@ -280,13 +664,18 @@ class StatusManager:
                     result = MovementService.process_document_movements(document, created_by=user)
                     if result.ok:
                         movements_count = result.data.get('movements_created', 0)
+                        summary['movements_created'] = movements_count
                         logger.info(f"✅ Created {movements_count} inventory movements")
                     else:
                         logger.error(f"❌ Movement creation failed: {result.msg}")
+                        if strict:
+                            raise RuntimeError(f"Movement creation failed: {result.msg}")
                 except ImportError:
                     logger.warning("⚠️ MovementService not available")
                 except Exception as e:
                     logger.error(f"❌ Movement creation error: {str(e)}")
+                    if strict:
+                        raise
 
             # 🔄 Обръщане на движения (DIRECT DELETION - bypasses correction permission checks)
             if new_status_config.reverses_inventory_movements:
@@ -304,12 +693,17 @@ class StatusManager:
                     
                     if reverse_result.ok:
                         reversed_count = reverse_result.data.get('reversed_count', 0)
+                        summary['movements_reversed'] = reversed_count
                         logger.info(f"✅ Movement reversal completed: {reversed_count} movements reversed with cache updates")
                     else:
                         logger.warning(f"⚠️ Movement reversal failed: {reverse_result.msg}")
-                        
+                        if strict:
+                            raise RuntimeError(f"Movement reversal failed: {reverse_result.msg}")
+
                 except Exception as e:
                     logger.error(f"❌ Movement reversal error: {str(e)}")
+                    if strict:
+                        raise
 
             # =====================
             # STEP 3: LEGACY ACTIONS (Backward Compatibility)
@@ -317,11 +711,19 @@ class StatusManager:
 
             # 📧 Email notifications (unchanged)
             if hasattr(document, 'send_status_change_email'):
-                try:
-                    document.send_status_change_email(old_status, new_status, user)
-                    logger.debug(f"📧 Status change email sent")
-                except Exception as e:
-                    logger.warning(f"⚠️ Failed to send email: {e}")
+                if job is not None:
+                    # NEW: Once per job, after commit - retries must not mail twice
+                    from core.services.job_queue import JobQueue
+                    JobQueue.once_after_commit(
+                        job, 'status_change_email',
+                        lambda: document.send_status_change_email(old_status, new_status, user)
+                    )
+                else:
+                    try:
+                        document.send_status_change_email(old_status, new_status, user)
+                        logger.debug(f"📧 Status change email sent")
+                    except Exception as e:
+                        logger.warning(f"⚠️ Failed to send email: {e}")
 
             # 🔗 Update related documents (improved logic)
             if new_status == 'converted' and hasattr(document, 'converted_to_order'):
@@ -358,6 +760,10 @@ class StatusManager:
         except Exception as e:
             logger.error(f"💥 Error in post-transition actions for {document.document_number}: {e}")
             # НЕ re-raise - не искаме transition да се провали заради side effects
+            if strict:
+                raise
+
+        return summary
 
     @staticmethod
     def _process_final_document(document, final_status: str, user: User):
@@ -448,6 +854,10 @@ class StatusManager:
     def get_next_statuses(document_type, current_status: str) -> List[str]:
         """
         🎯 NEW: Static version of _get_simple_next_statuses for external use
+
+        Transitions are precompiled per document type (WorkflowSpec): later
+        statuses in workflow order up to the first final one, skipping
+        initial statuses, plus the cancellation status.
         
         Args:
             document_type: DocumentType instance
@@ -457,56 +867,10 @@ class StatusManager:
             List[str]: Next available status codes
         """
         try:
-            from nomenclatures.models.statuses import DocumentTypeStatus
-
-            # Get configured statuses for this document type
-            configured_statuses = DocumentTypeStatus.objects.filter(
-                document_type=document_type,
-                is_active=True
-            ).select_related('status').order_by('sort_order')
-
-            # Build dynamic transitions based on configuration
-            next_statuses = []
-            current_position = None
-
-            for i, config in enumerate(configured_statuses):
-                if config.status.code == current_status:
-                    current_position = i
-                    break
-
-            if current_position is not None:
-                # Get next statuses in workflow order
-                remaining_configs = configured_statuses[current_position + 1:]
-
-                for config in remaining_configs:
-                    # ✅ FIXED: Check if both config and status are active
-                    if not config.is_active or not config.status.is_active:
-                        continue
-                        
-                    # ✅ FIXED: Skip if same as current status (don't show duplicate actions)
-                    if config.status.code == current_status:
-                        continue
-                        
-                    # Skip initial statuses (can't go back to initial)
-                    if not config.is_initial:
-                        next_statuses.append(config.status.code)
-
-                    # Stop at first final status option
-                    if config.is_final and next_statuses:
-                        break
-
-                # Always allow cancellation if configured and active
-                cancellation_config = configured_statuses.filter(
-                    is_cancellation=True,
-                    is_active=True,
-                    status__is_active=True
-                ).first()
-                if (cancellation_config and 
-                    cancellation_config.status.code not in next_statuses and
-                    cancellation_config.status.code != current_status):  # ✅ FIXED: Don't show cancel if already cancelled
-                    next_statuses.append(cancellation_config.status.code)
-
-            return next_statuses
+            from .workflow import WorkflowSpecService
+
+            spec = WorkflowSpecService.get(document_type)
+            return spec.next_statuses(current_status) if spec else []
 
         except Exception as e:
             logger.warning(f"Error getting next statuses: {e}")
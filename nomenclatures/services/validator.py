@@ -15,7 +15,7 @@ from django.db import models
 import logging
 
 from core.utils.result import Result
-from nomenclatures.models import DocumentTypeStatus
+from .workflow import WorkflowSpecService
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -105,22 +105,10 @@ class DocumentValidator:
         """
         try:
 
-            # FIXED: Use StatusResolver for cancellation detection
-            try:
-                from ._status_resolver import StatusResolver
-                cancellation_status = StatusResolver.get_cancellation_status(document.document_type)
-                if to_status == cancellation_status:
-                    return Result.success(msg="Cancellation allowed")
-            except Exception:
-                # Fallback to configuration check
-                target_config = DocumentTypeStatus.objects.filter(
-                    document_type=document.document_type,
-                    status__code=to_status,
-                    is_active=True
-                ).first()
-
-                if target_config and target_config.is_cancellation:
-                    return Result.success(msg="Cancellation allowed")
+            # Cancellation status from the compiled workflow
+            spec = WorkflowSpecService.get(document.document_type)
+            if spec and to_status == spec.cancellation_status:
+                return Result.success(msg="Cancellation allowed")
 
             return Result.success(msg="Simple transition allowed")
 
@@ -148,13 +136,7 @@ class DocumentValidator:
             # =====================
             # STEP 1: Find Status Configuration
             # =====================
-            from ..models import DocumentTypeStatus
-
-            status_config = DocumentTypeStatus.objects.filter(
-                document_type=document.document_type,
-                status__code=document.status,
-                is_active=True
-            ).first()
+            status_config = WorkflowSpecService.get_status(document.document_type, document.status)
 
             if not status_config:
                 # Fallback - no configuration found
@@ -217,14 +199,8 @@ class DocumentValidator:
         ✅ FINAL: CONFIGURATION-DRIVEN document deletion validation
         """
         try:
-            from ..models import DocumentTypeStatus
-
             # Find status configuration
-            status_config = DocumentTypeStatus.objects.filter(
-                document_type=document.document_type,
-                status__code=document.status,
-                is_active=True
-            ).first()
+            status_config = WorkflowSpecService.get_status(document.document_type, document.status)
 
             if not status_config:
                 return False, f"No active configuration found for status '{document.status}'"
@@ -266,13 +242,7 @@ class DocumentValidator:
         Returns all computed permissions in one place for UI/API use
         """
         try:
-            from ..models import DocumentTypeStatus
-
-            status_config = DocumentTypeStatus.objects.filter(
-                document_type=document.document_type,
-                status__code=document.status,
-                is_active=True
-            ).first()
+            status_config = WorkflowSpecService.get_status(document.document_type, document.status)
 
             if not status_config:
                 return {
@@ -0,0 +1,441 @@
+# nomenclatures/services/workflow.py - COMPILED PER-DOCUMENT-TYPE WORKFLOW
+"""
+Compiled workflow specs
+
+Целият workflow на един DocumentType (статуси, роли, флагове, преходи,
+approval правила) се компилира веднъж в immutable WorkflowSpec с две
+заявки. StatusResolver, StatusManager, DocumentValidator и views четат
+атрибути от spec-а вместо да пускат отделна заявка за всяка проверка.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from core.services.version_stamp import VersionStamp
+
+logger = logging.getLogger(__name__)
+
+
+# Keyword heuristics used for semantic status detection (see StatusResolver)
+APPROVAL_STATUS_WORDS = ('approved', 'одобрен', 'pending', 'review', 'submit')
+REJECTION_STATUS_WORDS = ('rejected', 'отказан', 'отхвърлен', 'refuse', 'deny')
+PENDING_APPROVAL_WORDS = ('submit', 'pending', 'review', 'approval')
+PROCESSING_STATUS_WORDS = (
+    'approved', 'confirmed', 'sent', 'ready', 'processing',
+    'одобрен', 'потвърден', 'изпратен'
+)
+
+
+@dataclass(frozen=True)
+class StatusSpec:
+    """Active DocumentTypeStatus configuration as compiled into a WorkflowSpec"""
+    code: str
+    name: str
+    display_name: str
+    sort_order: int
+    status_is_active: bool
+    is_initial: bool
+    is_final: bool
+    is_cancellation: bool
+    semantic_type: str
+    creates_inventory_movements: bool
+    reverses_inventory_movements: bool
+    allows_movement_correction: bool
+    auto_correct_movements_on_edit: bool
+    allows_editing: bool
+    allows_deletion: bool
+    color: str
+    badge_class: str
+    icon: str
+
+
+@dataclass(frozen=True)
+class RuleSpec:
+    """Active ApprovalRule as compiled into a WorkflowSpec"""
+    id: int
+    name: str
+    from_status: str
+    to_status: str
+    to_status_name: str
+    approval_level: int
+    requires_previous_level: bool
+    approver_type: str
+    approver_user_id: Optional[int]
+    approver_role_id: Optional[int]
+    approver_permission: Optional[str]
+    semantic_type: str
+    min_amount: Decimal
+    max_amount: Optional[Decimal]
+    currency: str
+    requires_reason: bool
+    rejection_allowed: bool
+    sort_order: int
+
+    def is_amount_in_range(self, amount) -> bool:
+        if amount < self.min_amount:
+            return False
+        if self.max_amount and amount > self.max_amount:
+            return False
+        return True
+
+
+@dataclass(frozen=True)
+class ApprovalMatrixEntry:
+    """
+    Approval rules leaving one status of a document type
+
+    rules keep the legacy order (approval_level, sort_order); bands hold the
+    same rules sorted by min_amount, so the rules whose amount band covers a
+    document are found with one bisect instead of checking every rule.
+    """
+    rules: Tuple[RuleSpec, ...]
+    band_minimums: Tuple[Decimal, ...]
+    bands: Tuple[RuleSpec, ...]
+
+    @classmethod
+    def build(cls, rules) -> 'ApprovalMatrixEntry':
+        bands = tuple(sorted(rules, key=lambda rule: (rule.min_amount, rule.id)))
+        return cls(
+            rules=tuple(rules),
+            band_minimums=tuple(rule.min_amount for rule in bands),
+            bands=bands
+        )
+
+    def rule_ids_in_band(self, amount) -> FrozenSet[int]:
+        """Rules whose [min_amount, max_amount] covers the amount (all of them when unknown)"""
+        if amount is None:
+            return frozenset(rule.id for rule in self.rules)
+        candidates = self.bands[:bisect_right(self.band_minimums, amount)]
+        return frozenset(
+            rule.id for rule in candidates
+            if rule.max_amount is None or amount <= rule.max_amount
+        )
+
+
+EMPTY_MATRIX_ENTRY = ApprovalMatrixEntry(rules=(), band_minimums=(), bands=())
+
+
+class WorkflowSpec:
+    """
+    Immutable workflow of one document type
+
+    statuses holds only active configurations, in workflow order; every
+    answer (including "no initial status" or an empty role set) is part of
+    the spec, so misses never go back to the database.
+    """
+
+    __slots__ = (
+        'document_type_id', 'version', 'built_at', 'statuses', 'status_order',
+        'initial_status', 'cancellation_status', 'approval_status', 'rejection_status',
+        'roles', 'semantic_statuses', 'next_statuses_map', 'rules', 'rules_by_transition',
+        'approval_matrix',
+    )
+
+    def __init__(self, document_type_id, version, statuses: List[StatusSpec], rules: List[RuleSpec]):
+        set_ = object.__setattr__
+        set_(self, 'document_type_id', document_type_id)
+        set_(self, 'version', version)
+        set_(self, 'built_at', time.monotonic())
+        set_(self, 'status_order', tuple(status.code for status in statuses))
+
+        by_code = {}
+        for status in statuses:
+            by_code.setdefault(status.code, status)
+        set_(self, 'statuses', MappingProxyType(by_code))
+
+        initial = next((status.code for status in statuses if status.is_initial), None)
+        cancellation = next((status.code for status in statuses if status.is_cancellation), None)
+        approval = WorkflowSpec._first_matching(statuses, APPROVAL_STATUS_WORDS)
+        rejection = WorkflowSpec._first_matching(statuses, REJECTION_STATUS_WORDS)
+        set_(self, 'initial_status', initial)
+        set_(self, 'cancellation_status', cancellation)
+        set_(self, 'approval_status', approval)
+        set_(self, 'rejection_status', rejection)
+
+        roles = {
+            'initial': frozenset([initial] if initial else []),
+            'final': frozenset(status.code for status in statuses if status.is_final),
+            'cancellation': frozenset([cancellation] if cancellation else []),
+            'editable': frozenset(status.code for status in statuses if status.allows_editing),
+            'deletable': frozenset(status.code for status in statuses if status.allows_deletion),
+            'movement_creating': frozenset(
+                status.code for status in statuses if status.creates_inventory_movements),
+            'movement_reversing': frozenset(
+                status.code for status in statuses if status.reverses_inventory_movements),
+        }
+        set_(self, 'roles', MappingProxyType(roles))
+
+        pending = set([approval] if approval else [])
+        pending.update(
+            status.code for status in statuses
+            if any(word in status.code.lower() for word in PENDING_APPROVAL_WORDS)
+        )
+        processing = frozenset(
+            status.code for status in statuses
+            if not status.is_final and status.code != initial
+            and any(word in status.code.lower() for word in PROCESSING_STATUS_WORDS)
+        )
+        set_(self, 'semantic_statuses', MappingProxyType({
+            'approval': frozenset(pending),
+            'processing': processing,
+            'completion': frozenset(roles['final'] - {cancellation, rejection}),
+            'initial': roles['initial'],
+            'final': roles['final'],
+            'cancellation': roles['cancellation'],
+            'rejection': frozenset([rejection] if rejection else []),
+        }))
+
+        set_(self, 'next_statuses_map', MappingProxyType(
+            WorkflowSpec._compile_next_statuses(statuses)
+        ))
+
+        by_transition = defaultdict(list)
+        by_from_status = defaultdict(list)
+        for rule in rules:
+            by_transition[(rule.from_status, rule.to_status)].append(rule)
+            by_from_status[rule.from_status].append(rule)
+        set_(self, 'rules', tuple(rules))
+        set_(self, 'rules_by_transition', MappingProxyType(
+            {transition: tuple(items) for transition, items in by_transition.items()}
+        ))
+        set_(self, 'approval_matrix', MappingProxyType({
+            from_status: ApprovalMatrixEntry.build(items) for from_status, items in by_from_status.items()
+        }))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('WorkflowSpec is immutable')
+
+    # =====================================================
+    # LOOKUPS
+    # =====================================================
+
+    def status(self, code: str) -> Optional[StatusSpec]:
+        """Active configuration of a status (None when not configured)"""
+        return self.statuses.get(code)
+
+    def has_role(self, code: str, role: str) -> bool:
+        statuses = self.roles.get(role)
+        if statuses is None:
+            logger.warning(f"Unknown status role: {role}")
+            return False
+        return code in statuses
+
+    def statuses_by_semantic_type(self, semantic_type: str) -> FrozenSet[str]:
+        statuses = self.semantic_statuses.get(semantic_type)
+        if statuses is None:
+            logger.warning(f"Unknown semantic type: {semantic_type}")
+            return frozenset()
+        return statuses
+
+    def next_statuses(self, current_status: str) -> List[str]:
+        return list(self.next_statuses_map.get(current_status, ()))
+
+    def rules_for_transition(self, from_status: str, to_status: str) -> Tuple[RuleSpec, ...]:
+        """Active rules of a transition ordered by approval_level, sort_order"""
+        return self.rules_by_transition.get((from_status, to_status), ())
+
+    def approval_rules_from(self, from_status: str) -> ApprovalMatrixEntry:
+        """Approval matrix row of (document type, from_status)"""
+        return self.approval_matrix.get(from_status, EMPTY_MATRIX_ENTRY)
+
+    # =====================================================
+    # COMPILATION HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _first_matching(statuses, words) -> Optional[str]:
+        for status in statuses:
+            if any(word in status.code.lower() for word in words):
+                return status.code
+        return None
+
+    @staticmethod
+    def _compile_next_statuses(statuses: List[StatusSpec]) -> Dict[str, Tuple[str, ...]]:
+        """
+        Next statuses from each configured status - same rules as the former
+        per-call StatusManager.get_next_statuses: later statuses in workflow
+        order, skipping initial ones, stopping at the first final status, plus
+        the cancellation status.
+        """
+        cancellation = next(
+            (status.code for status in statuses if status.is_cancellation and status.status_is_active), None
+        )
+
+        result = {}
+        for position, current in enumerate(statuses):
+            if current.code in result:
+                continue
+
+            next_codes = []
+            for status in statuses[position + 1:]:
+                if not status.status_is_active or status.code == current.code:
+                    continue
+                if not status.is_initial:
+                    next_codes.append(status.code)
+                if status.is_final and next_codes:
+                    break
+
+            if cancellation and cancellation not in next_codes and cancellation != current.code:
+                next_codes.append(cancellation)
+
+            result[current.code] = tuple(next_codes)
+        return result
+
+
+class WorkflowSpecService:
+    """
+    Process-local LRU of compiled WorkflowSpecs
+
+    One global version stamp (core.services.version_stamp) is shared by all
+    processes; saving or deleting any workflow model (DocumentType,
+    DocumentStatus, DocumentTypeStatus, ApprovalRule - see
+    nomenclatures.signals) bumps it and every spec is recompiled on next
+    use. Specs are also recompiled after MAX_AGE seconds to pick up
+    queryset.update() changes that send no signals.
+    """
+
+    MAX_SPECS = 128
+    MAX_AGE = 3600
+    VERSIONS = VersionStamp('workflow_spec')
+
+    _specs: 'OrderedDict[int, WorkflowSpec]' = OrderedDict()
+    _lock = threading.Lock()
+
+    # =====================================================
+    # PUBLIC API
+    # =====================================================
+
+    @staticmethod
+    def get(document_type) -> Optional[WorkflowSpec]:
+        """Current spec of a document type (instance or id) - None without a type"""
+        document_type_id = getattr(document_type, 'pk', document_type)
+        if document_type_id is None:
+            return None
+
+        version = WorkflowSpecService._current_version()
+        with WorkflowSpecService._lock:
+            spec = WorkflowSpecService._specs.get(document_type_id)
+            if spec is not None and WorkflowSpecService._is_fresh(spec, version):
+                WorkflowSpecService._specs.move_to_end(document_type_id)
+                return spec
+
+        spec = WorkflowSpecService.build(document_type_id, version=version)
+
+        with WorkflowSpecService._lock:
+            WorkflowSpecService._specs[document_type_id] = spec
+            WorkflowSpecService._specs.move_to_end(document_type_id)
+            while len(WorkflowSpecService._specs) > WorkflowSpecService.MAX_SPECS:
+                WorkflowSpecService._specs.popitem(last=False)
+
+        return spec
+
+    @staticmethod
+    def get_status(document_type, status_code: str) -> Optional[StatusSpec]:
+        """Active configuration of a document type's status (None without a type or config)"""
+        spec = WorkflowSpecService.get(document_type)
+        return spec.status(status_code) if spec else None
+
+    @staticmethod
+    def build(document_type_id: int, version: Optional[int] = None) -> WorkflowSpec:
+        """Compile a document type's workflow - one query for statuses, one for rules"""
+        from ..models import ApprovalRule, DocumentTypeStatus
+
+        if version is None:
+            version = WorkflowSpecService._current_version()
+
+        statuses = [
+            StatusSpec(
+                code=config.status.code,
+                name=config.status.name,
+                display_name=config.custom_name or config.status.name,
+                sort_order=config.sort_order,
+                status_is_active=config.status.is_active,
+                is_initial=config.is_initial,
+                is_final=config.is_final,
+                is_cancellation=config.is_cancellation,
+                semantic_type=config.semantic_type,
+                creates_inventory_movements=config.creates_inventory_movements,
+                reverses_inventory_movements=config.reverses_inventory_movements,
+                allows_movement_correction=config.allows_movement_correction,
+                auto_correct_movements_on_edit=config.auto_correct_movements_on_edit,
+                allows_editing=config.allows_editing,
+                allows_deletion=config.allows_deletion,
+                color=config.status.color,
+                badge_class=config.status.badge_class,
+                icon=config.status.icon,
+            )
+            for config in DocumentTypeStatus.objects.filter(
+                document_type_id=document_type_id,
+                is_active=True
+            ).select_related('status').order_by('sort_order', 'pk')
+        ]
+
+        rules = [
+            RuleSpec(
+                id=rule.pk,
+                name=rule.name,
+                from_status=rule.from_status_obj.code,
+                to_status=rule.to_status_obj.code,
+                to_status_name=rule.to_status_obj.name,
+                approval_level=rule.approval_level,
+                requires_previous_level=rule.requires_previous_level,
+                approver_type=rule.approver_type,
+                approver_user_id=rule.approver_user_id,
+                approver_role_id=rule.approver_role_id,
+                approver_permission=(
+                    f"{rule.approver_permission.content_type.app_label}.{rule.approver_permission.codename}"
+                    if rule.approver_permission_id else None
+                ),
+                semantic_type=rule.semantic_type,
+                min_amount=rule.min_amount,
+                max_amount=rule.max_amount,
+                currency=rule.currency,
+                requires_reason=rule.requires_reason,
+                rejection_allowed=rule.rejection_allowed,
+                sort_order=rule.sort_order,
+            )
+            for rule in ApprovalRule.objects.filter(
+                document_type_id=document_type_id,
+                is_active=True
+            ).select_related(
+                'from_status_obj', 'to_status_obj', 'approver_permission__content_type'
+            ).order_by('approval_level', 'sort_order', 'pk')
+        ] if ApprovalRule is not None else []
+
+        logger.debug(
+            f"Compiled workflow for document type {document_type_id}: "
+            f"{len(statuses)} statuses, {len(rules)} rules (version {version})"
+        )
+        return WorkflowSpec(document_type_id, version, statuses, rules)
+
+    @staticmethod
+    def invalidate():
+        """Bump the global version stamp - called from nomenclatures signals"""
+        WorkflowSpecService.VERSIONS.bump()
+
+    @staticmethod
+    def clear():
+        with WorkflowSpecService._lock:
+            WorkflowSpecService._specs.clear()
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _current_version() -> int:
+        return WorkflowSpecService.VERSIONS.current()
+
+    @staticmethod
+    def _is_fresh(spec: WorkflowSpec, version: int) -> bool:
+        return spec.version == version and time.monotonic() - spec.built_at < WorkflowSpecService.MAX_AGE
+
+
+__all__ = ['ApprovalMatrixEntry', 'RuleSpec', 'StatusSpec', 'WorkflowSpec', 'WorkflowSpecService']
@@ -0,0 +1,21 @@
+# nomenclatures/signals.py - WORKFLOW SPEC INVALIDATION
+
+from django.db.models.signals import post_delete, post_save
+
+from .models import ApprovalRule, DocumentStatus, DocumentType, DocumentTypeStatus
+from .services.workflow import WorkflowSpecService
+
+WORKFLOW_MODELS = tuple(
+    model for model in (DocumentType, DocumentStatus, DocumentTypeStatus, ApprovalRule)
+    if model is not None
+)
+
+
+def invalidate_workflow_specs(sender, instance, **kwargs):
+    """Any saved/deleted workflow row bumps the workflow spec version"""
+    WorkflowSpecService.invalidate()
+
+
+for model in WORKFLOW_MODELS:
+    post_save.connect(invalidate_workflow_specs, sender=model, dispatch_uid=f'workflow_spec_save_{model.__name__}')
+    post_delete.connect(invalidate_workflow_specs, sender=model, dispatch_uid=f'workflow_spec_delete_{model.__name__}')
@@ -152,6 +152,12 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# Post-transition actions (movements, reversals, emails) run inline by
+# default. Set POST_TRANSITION_ASYNC=true only where a
+# `python manage.py run_jobs` worker is running (see docs/CORE_APP.md) -
+# without one, approved documents never get their movements or emails
+POST_TRANSITION_ASYNC = env.bool('POST_TRANSITION_ASYNC', default=False)
+
 # settings.py - за да видиш debug логовете
 LOGGING = {
     'version': 1,
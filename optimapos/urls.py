@@ -15,6 +15,8 @@ urlpatterns = [
     # Apps
     path('purchases/', include('purchases.urls')),
     path('nomenclatures/', include('nomenclatures.urls')),
+    path('inventory/', include('inventory.urls')),
+    path('pricing/', include('pricing.urls')),
 ]
 
 if settings.DEBUG:  # Само в режим на разработка
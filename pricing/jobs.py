@@ -0,0 +1,29 @@
+# pricing/jobs.py
+"""
+Background job handlers for pricing
+
+Autodiscovered by core.services.job_queue.JobQueue (run_jobs command).
+"""
+
+from core.services.job_queue import JobQueue
+from pricing.services.repricing import RepricingService
+
+
+@JobQueue.register(RepricingService.JOB_TYPE, atomic=False)
+def run_pending_repricing(job):
+    """
+    Reprice products whose cost changes have settled
+
+    Not atomic: each batch commits (and releases its price row locks) on
+    its own. Re-running after a failure reprices what is still due.
+    """
+    result = RepricingService.process_pending()
+    if not result.ok:
+        return result
+
+    data = result.data
+    return {
+        'products': data['products'],
+        'product_prices': data['product_prices'],
+        'packaging_prices': data['packaging_prices'],
+    }
@@ -0,0 +1,53 @@
+# pricing/management/commands/audit_pricing.py
+
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import InventoryLocation
+from pricing.services import PricingAuditService
+
+
+class Command(BaseCommand):
+    help = 'Audit pricing coverage, margins and promotion overlaps of whole locations as CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--location',
+            action='append',
+            help='Location code, repeatable (default: all active locations)'
+        )
+        parser.add_argument(
+            '--only-issues',
+            action='store_true',
+            help='Export only products with at least one issue'
+        )
+        parser.add_argument(
+            '--output',
+            help='CSV file path (default: stdout)'
+        )
+
+    def handle(self, *args, **options):
+        locations = list(InventoryLocation.objects.filter(is_active=True).order_by('code'))
+        if options['location']:
+            codes = [code.upper() for code in options['location']]
+            locations = list(InventoryLocation.objects.filter(code__in=codes).order_by('code'))
+            missing = set(codes) - {location.code for location in locations}
+            if missing:
+                raise CommandError(f"Locations not found: {', '.join(sorted(missing))}")
+
+        reports = PricingAuditService.audit(locations, only_issues=options['only_issues'])
+
+        if not options['output']:
+            PricingAuditService.export_csv(self.stdout, reports)
+            return
+
+        with open(options['output'], 'w', newline='', encoding='utf-8') as stream:
+            rows = PricingAuditService.export_csv(stream, reports)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} rows to {options['output']}"))
+        for report in reports:
+            summary = report.summary
+            counts = ', '.join(f"{code}: {count}" for code, count in sorted(summary['issue_counts'].items()))
+            self.stdout.write(
+                f"  {summary['location_code']}: {summary['products']} products, "
+                f"{summary['with_issues']} with issues ({counts or 'none'}), "
+                f"average margin {summary['average_margin_pct']}%"
+            )
@@ -0,0 +1,53 @@
+# pricing/management/commands/build_price_snapshots.py
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import InventoryLocation
+from inventory.models.locations import POSLocation
+from pricing.services import PriceSnapshotService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild POS price snapshots of locations with active POS terminals'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--location',
+            action='append',
+            help='Inventory location code, repeatable (default: locations with active POS)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Directory to also write prices_<POS>_v<version>.json.gz files into'
+        )
+
+    def handle(self, *args, **options):
+        locations = InventoryLocation.objects.filter(
+            id__in=POSLocation.objects.filter(is_active=True).values('location_id')
+        ).order_by('code')
+        if options['location']:
+            codes = [code.upper() for code in options['location']]
+            locations = InventoryLocation.objects.filter(code__in=codes).order_by('code')
+            missing = set(codes) - {location.code for location in locations}
+            if missing:
+                raise CommandError(f"Locations not found: {', '.join(sorted(missing))}")
+
+        if options['output']:
+            os.makedirs(options['output'], exist_ok=True)
+
+        for location in locations:
+            snapshot = PriceSnapshotService.build(location)
+            self.stdout.write(
+                f"  {location.code}: v{snapshot.version}, {snapshot.row_count} products"
+            )
+
+            if not options['output']:
+                continue
+            for pos_code in location.pos_locations.filter(is_active=True).values_list('code', flat=True):
+                path = os.path.join(options['output'], f"prices_{pos_code}_v{snapshot.version}.json.gz")
+                with open(path, 'wb') as stream:
+                    PriceSnapshotService.export(snapshot, stream)
+                self.stdout.write(f"    wrote {path}")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(locations)} price snapshots"))
@@ -0,0 +1,20 @@
+# pricing/management/commands/manage_promotion_lifecycle.py
+
+from django.core.management.base import BaseCommand, CommandError
+from pricing.services import PromotionService
+
+
+class Command(BaseCommand):
+    help = 'Deactivate expired promotions and rebuild the active promotions table (run after midnight)'
+
+    def handle(self, *args, **options):
+        result = PromotionService.manage_promotion_lifecycle()
+        if not result.ok:
+            raise CommandError(result.msg)
+
+        for warning in result.data['warnings']:
+            self.stdout.write(f"  {warning['promotion_name']}: {warning['warning']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.msg}, {result.data['active_promotion_rows']} active promotion rows"
+        ))
@@ -0,0 +1,84 @@
+# pricing/management/commands/reprice_products.py
+
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import InventoryLocation
+from pricing.services import RepricingService
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Recompute markup-based product and packaging prices from current costs'
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument(
+            '--pending',
+            action='store_true',
+            help='Products queued by cost changes (what the pricing.reprice job does)'
+        )
+        scope.add_argument(
+            '--product',
+            action='append',
+            help='Product code, repeatable'
+        )
+        scope.add_argument(
+            '--all',
+            action='store_true',
+            help='Every product with a MARKUP/AUTO price'
+        )
+        parser.add_argument(
+            '--location',
+            action='append',
+            help='Inventory location code, repeatable (default: all locations)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the price changes'
+        )
+        parser.add_argument(
+            '--output',
+            help='CSV file for the price change report'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        if options['pending']:
+            if options['location']:
+                raise CommandError('--location cannot be combined with --pending')
+            result = RepricingService.process_pending(dry_run=dry_run)
+        else:
+            product_ids = None
+            if options['product']:
+                codes = set(options['product'])
+                products = dict(Product.objects.filter(code__in=codes).values_list('code', 'id'))
+                missing = codes - set(products)
+                if missing:
+                    raise CommandError(f"Products not found: {', '.join(sorted(missing))}")
+                product_ids = list(products.values())
+
+            locations = None
+            if options['location']:
+                codes = [code.upper() for code in options['location']]
+                locations = list(InventoryLocation.objects.filter(code__in=codes))
+                missing = set(codes) - {location.code for location in locations}
+                if missing:
+                    raise CommandError(f"Locations not found: {', '.join(sorted(missing))}")
+
+            result = RepricingService.reprice(product_ids, locations=locations, dry_run=dry_run)
+
+        if not result.ok:
+            raise CommandError(result.msg)
+
+        data = result.data
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as stream:
+                RepricingService.export_csv(stream, data['changes'])
+        elif dry_run:
+            RepricingService.export_csv(self.stdout, data['changes'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would change' if dry_run else 'Changed'} {data['product_prices']} product prices and "
+            f"{data['packaging_prices']} packaging prices for {data['products']} products"
+        ))
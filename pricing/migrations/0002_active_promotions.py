@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_active_promotions(apps, schema_editor):
+    PromotionalPrice = apps.get_model('pricing', 'PromotionalPrice')
+    ActivePromotion = apps.get_model('pricing', 'ActivePromotion')
+
+    rows = []
+    promotions = PromotionalPrice.objects.filter(is_active=True, end_date__gte=timezone.now().date())
+    for promo in promotions.prefetch_related('customer_groups'):
+        for price_group_id in [group.pk for group in promo.customer_groups.all()] or [None]:
+            rows.append(ActivePromotion(
+                promotion_id=promo.pk,
+                content_type_id=promo.content_type_id,
+                object_id=promo.object_id,
+                product_id=promo.product_id,
+                price_group_id=price_group_id,
+                start_date=promo.start_date,
+                end_date=promo.end_date,
+                min_quantity=promo.min_quantity,
+                max_quantity=promo.max_quantity,
+                promotional_price=promo.promotional_price,
+                priority=promo.priority,
+            ))
+    ActivePromotion.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('nomenclatures', '0004_batch_allocation_strategy'),
+        ('pricing', '0001_initial'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivePromotion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Location ID')),
+                ('start_date', models.DateField(verbose_name='Start Date')),
+                ('end_date', models.DateField(verbose_name='End Date')),
+                ('min_quantity', models.DecimalField(decimal_places=3, max_digits=10, verbose_name='Minimum Quantity')),
+                ('max_quantity', models.DecimalField(blank=True, decimal_places=3, max_digits=10, null=True, verbose_name='Maximum Quantity')),
+                ('promotional_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Promotional Price')),
+                ('priority', models.IntegerField(default=0, verbose_name='Priority')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name='Location Type')),
+                ('price_group', models.ForeignKey(blank=True, help_text='Empty = valid for all customers', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='active_promotions', to='nomenclatures.pricegroup', verbose_name='Price Group')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='active_promotions', to='products.product', verbose_name='Product')),
+                ('promotion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activations', to='pricing.promotionalprice', verbose_name='Promotion')),
+            ],
+            options={
+                'verbose_name': 'Active Promotion',
+                'verbose_name_plural': 'Active Promotions',
+                'indexes': [models.Index(fields=['content_type', 'object_id', 'product', 'end_date'], name='pricing_active_promo_idx'), models.Index(fields=['end_date'], name='pricing_act_end_dat_629207_idx')],
+            },
+        ),
+        migrations.RunPython(populate_active_promotions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pricing', '0002_active_promotions'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingReprice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_changed_at', models.DateTimeField(verbose_name='First Change')),
+                ('last_changed_at', models.DateTimeField(verbose_name='Last Change')),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pending_reprice', to='products.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Pending Reprice',
+                'verbose_name_plural': 'Pending Reprices',
+                'indexes': [models.Index(fields=['last_changed_at'], name='pricing_pen_last_ch_979e9e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('pricing', '0003_pending_reprice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Location ID')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Version')),
+                ('source_version', models.IntegerField(default=0, help_text='PriceBook version stamp the snapshot was built from', verbose_name='Price Book Version')),
+                ('built_at', models.DateTimeField(blank=True, null=True, verbose_name='Built At')),
+                ('built_on', models.DateField(blank=True, null=True, verbose_name='Built On')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='Products')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name='Location Type')),
+            ],
+            options={
+                'verbose_name': 'Price Snapshot',
+                'verbose_name_plural': 'Price Snapshots',
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceSnapshotRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.PositiveIntegerField(verbose_name='Product ID')),
+                ('version', models.PositiveIntegerField(verbose_name='Changed In Version')),
+                ('row_hash', models.CharField(max_length=32, verbose_name='Row Hash')),
+                ('payload', models.JSONField(default=dict, verbose_name='Payload')),
+                ('deleted', models.BooleanField(default=False, verbose_name='Deleted')),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='pricing.pricesnapshot', verbose_name='Snapshot')),
+            ],
+            options={
+                'verbose_name': 'Price Snapshot Row',
+                'verbose_name_plural': 'Price Snapshot Rows',
+                'indexes': [models.Index(fields=['snapshot', 'version'], name='pricing_snapshot_delta_idx')],
+                'unique_together': {('snapshot', 'product_id')},
+            },
+        ),
+    ]
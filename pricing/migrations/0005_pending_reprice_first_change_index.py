@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pricing', '0004_price_snapshots'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pendingreprice',
+            index=models.Index(fields=['first_changed_at'], name='pricing_pen_first_c_8fb933_idx'),
+        ),
+    ]
@@ -8,8 +8,10 @@ Pricing models package
 - base_prices.py: ProductPrice (base prices per location)
 - group_prices.py: ProductPriceByGroup
 - step_prices.py: ProductStepPrice
-- promotions.py: PromotionalPrice
+- promotions.py: PromotionalPrice, ActivePromotion
 - packaging_prices.py: PackagingPrice
+- repricing.py: PendingReprice (cost-driven repricing queue)
+- snapshots.py: PriceSnapshot, PriceSnapshotRow (POS price snapshots)
 """
 
 
@@ -34,7 +36,9 @@ from .step_prices import (
 # Promotions
 from .promotions import (
     PromotionalPrice,
-    PromotionalPriceManager
+    PromotionalPriceManager,
+    ActivePromotion,
+    ActivePromotionManager
 )
 
 # Packaging Prices
@@ -43,6 +47,18 @@ from .packaging_prices import (
     PackagingPriceManager
 )
 
+# Repricing queue
+from .repricing import (
+    PendingReprice,
+    PendingRepriceManager
+)
+
+# POS price snapshots
+from .snapshots import (
+    PriceSnapshot,
+    PriceSnapshotRow
+)
+
 # Export all
 __all__ = [
 
@@ -61,10 +77,20 @@ __all__ = [
     # Promotions
     'PromotionalPrice',
     'PromotionalPriceManager',
+    'ActivePromotion',
+    'ActivePromotionManager',
 
     # Packaging Prices
     'PackagingPrice',
     'PackagingPriceManager',
+
+    # Repricing queue
+    'PendingReprice',
+    'PendingRepriceManager',
+
+    # POS price snapshots
+    'PriceSnapshot',
+    'PriceSnapshotRow',
 ]
 
 # Version info
@@ -190,4 +190,92 @@ class PromotionalPrice(models.Model):
             return False
         if self.max_quantity and quantity > self.max_quantity:
             return False
-        return True
\ No newline at end of file
+        return True
+
+class ActivePromotionManager(models.Manager):
+    """Manager for the materialised promotion table"""
+
+    def for_location(self, location: ILocation):
+        content_type = ContentType.objects.get_for_model(location)
+        return self.filter(content_type=content_type, object_id=location.pk)
+
+    def matching(self, location, product, quantity, date, price_group_id=None, check_max_quantity=False):
+        """
+        Rows that apply to one sale line - a single indexed lookup
+
+        Without a price group every row matches (same rule as the
+        PricingService query path); with one, only unrestricted rows and
+        the group's own rows.
+        """
+        rows = self.for_location(location).filter(
+            product=product,
+            start_date__lte=date,
+            end_date__gte=date,
+            min_quantity__lte=quantity
+        )
+        if check_max_quantity:
+            rows = rows.filter(models.Q(max_quantity__isnull=True) | models.Q(max_quantity__gte=quantity))
+        if price_group_id:
+            rows = rows.filter(models.Q(price_group__isnull=True) | models.Q(price_group_id=price_group_id))
+        return rows
+
+
+class ActivePromotion(models.Model):
+    """
+    Materialised active/upcoming promotions per location+product
+
+    One row per (promotion, eligible price group); price_group is NULL
+    for promotions open to every customer. Maintained by
+    PromotionActivationService from the PromotionalPrice signals and
+    rebuilt by manage_promotion_lifecycle every night - never edit by hand.
+    """
+
+    promotion = models.ForeignKey(
+        PromotionalPrice,
+        on_delete=models.CASCADE,
+        related_name='activations',
+        verbose_name=_('Promotion')
+    )
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_('Location Type')
+    )
+    object_id = models.PositiveIntegerField(verbose_name=_('Location ID'))
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='active_promotions',
+        verbose_name=_('Product')
+    )
+    price_group = models.ForeignKey(
+        'nomenclatures.PriceGroup',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='active_promotions',
+        verbose_name=_('Price Group'),
+        help_text=_('Empty = valid for all customers')
+    )
+
+    start_date = models.DateField(_('Start Date'))
+    end_date = models.DateField(_('End Date'))
+    min_quantity = models.DecimalField(_('Minimum Quantity'), max_digits=10, decimal_places=3)
+    max_quantity = models.DecimalField(_('Maximum Quantity'), max_digits=10, decimal_places=3, null=True, blank=True)
+    promotional_price = models.DecimalField(_('Promotional Price'), max_digits=10, decimal_places=2)
+    priority = models.IntegerField(_('Priority'), default=0)
+
+    objects = ActivePromotionManager()
+
+    class Meta:
+        verbose_name = _('Active Promotion')
+        verbose_name_plural = _('Active Promotions')
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', 'product', 'end_date'],
+                         name='pricing_active_promo_idx'),
+            models.Index(fields=['end_date']),
+        ]
+
+    def __str__(self):
+        group = self.price_group_id or '*'
+        return f"{self.promotion_id} {self.product_id} @ {self.object_id} [{group}]: {self.promotional_price}"
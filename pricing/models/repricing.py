@@ -0,0 +1,48 @@
+# pricing/models/repricing.py
+
+from django.db import models
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+
+class PendingRepriceManager(models.Manager):
+
+    def due(self, cutoff, max_wait_cutoff=None):
+        """Products quiet since the debounce cutoff, or waiting since before max_wait_cutoff"""
+        due = Q(last_changed_at__lte=cutoff)
+        if max_wait_cutoff is not None:
+            due |= Q(first_changed_at__lte=max_wait_cutoff)
+        return self.filter(due)
+
+
+class PendingReprice(models.Model):
+    """
+    Продукт с променена себестойност, чакащ преизчисляване на цените
+
+    Един ред на продукт - всяка нова промяна само мести last_changed_at
+    (debounce). RepricingService.process_pending() обработва редовете,
+    чиято последна промяна е по-стара от DEBOUNCE или които чакат повече
+    от MAX_WAIT (first_changed_at), и изтрива утихналите.
+    """
+
+    product = models.OneToOneField(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='pending_reprice',
+        verbose_name=_('Product')
+    )
+    first_changed_at = models.DateTimeField(_('First Change'))
+    last_changed_at = models.DateTimeField(_('Last Change'))
+
+    objects = PendingRepriceManager()
+
+    class Meta:
+        verbose_name = _('Pending Reprice')
+        verbose_name_plural = _('Pending Reprices')
+        indexes = [
+            models.Index(fields=['last_changed_at']),
+            models.Index(fields=['first_changed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} (since {self.first_changed_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,72 @@
+# pricing/models/snapshots.py
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class PriceSnapshot(models.Model):
+    """
+    Версиониран ценови снапшот на локация за POS терминали
+
+    version расте при всяко пре-генериране с реални промени. Всеки ред в
+    PriceSnapshotRow пази версията, в която е променен за последно, така
+    терминалите дърпат само разликата след своята версия.
+    """
+
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_('Location Type')
+    )
+    object_id = models.PositiveIntegerField(verbose_name=_('Location ID'))
+
+    version = models.PositiveIntegerField(_('Version'), default=0)
+    source_version = models.IntegerField(
+        _('Price Book Version'),
+        default=0,
+        help_text=_('PriceBook version stamp the snapshot was built from')
+    )
+    built_at = models.DateTimeField(_('Built At'), null=True, blank=True)
+    built_on = models.DateField(_('Built On'), null=True, blank=True)
+    row_count = models.PositiveIntegerField(_('Products'), default=0)
+
+    class Meta:
+        verbose_name = _('Price Snapshot')
+        verbose_name_plural = _('Price Snapshots')
+        unique_together = [('content_type', 'object_id')]
+
+    def __str__(self):
+        return f"{self.content_type_id}/{self.object_id} v{self.version} ({self.row_count} products)"
+
+
+class PriceSnapshotRow(models.Model):
+    """
+    Цените на един продукт в снапшота
+
+    payload е компактен JSON (виж PriceSnapshotService); изтрит продукт
+    остава като tombstone (deleted=True) с версията на изтриването.
+    """
+
+    snapshot = models.ForeignKey(
+        PriceSnapshot,
+        on_delete=models.CASCADE,
+        related_name='rows',
+        verbose_name=_('Snapshot')
+    )
+    product_id = models.PositiveIntegerField(_('Product ID'))
+    version = models.PositiveIntegerField(_('Changed In Version'))
+    row_hash = models.CharField(_('Row Hash'), max_length=32)
+    payload = models.JSONField(_('Payload'), default=dict)
+    deleted = models.BooleanField(_('Deleted'), default=False)
+
+    class Meta:
+        verbose_name = _('Price Snapshot Row')
+        verbose_name_plural = _('Price Snapshot Rows')
+        unique_together = [('snapshot', 'product_id')]
+        indexes = [
+            models.Index(fields=['snapshot', 'version'], name='pricing_snapshot_delta_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.snapshot_id}:{self.product_id} v{self.version}{' (deleted)' if self.deleted else ''}"
@@ -6,8 +6,20 @@ Pricing services package
 
 from .pricing_service import PricingService
 from .promotion_service import PromotionService
+from .price_book import PriceBook, PriceBookService
+from .promotion_activation import PromotionActivationService
+from .repricing import RepricingService
+from .pricing_audit import PricingAuditReport, PricingAuditService
+from .price_snapshot import PriceSnapshotService
 
 __all__ = [
     'PricingService',
     'PromotionService',
+    'PriceBook',
+    'PriceBookService',
+    'PromotionActivationService',
+    'RepricingService',
+    'PricingAuditReport',
+    'PricingAuditService',
+    'PriceSnapshotService',
 ]
\ No newline at end of file
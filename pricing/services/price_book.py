@@ -0,0 +1,324 @@
+# pricing/services/price_book.py - COMPILED PER-LOCATION PRICE BOOK
+
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils import timezone
+
+from core.services.version_stamp import VersionStamp
+from ..models import (
+    ProductPrice, ProductPriceByGroup,
+    ProductStepPrice, PromotionalPrice, PackagingPrice
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PromotionEntry:
+    """Active or upcoming promotion as compiled into a PriceBook"""
+    id: int
+    start_date: object
+    end_date: object
+    min_quantity: Decimal
+    max_quantity: Optional[Decimal]
+    price: Decimal
+    priority: int
+    customer_group_ids: FrozenSet[int]
+
+
+class PriceBook:
+    """
+    Immutable price data of one location
+
+    Tiers are tuples sorted by min_quantity descending, so the first tier
+    with min_quantity <= quantity is the applicable one. The resolution
+    rules mirror the PricingService query path exactly.
+    """
+
+    __slots__ = (
+        'location_key', 'version', 'built_at', 'built_on', 'default_markup',
+        'base_prices', 'step_prices', 'group_prices', 'promotions',
+        'packaging_prices', 'costs',
+    )
+
+    def __init__(self, location_key, version, built_on, default_markup,
+                 base_prices, step_prices, group_prices, promotions, packaging_prices, costs):
+        self.location_key = location_key
+        self.version = version
+        self.built_at = time.monotonic()
+        self.built_on = built_on
+        self.default_markup = default_markup
+        self.base_prices = MappingProxyType(base_prices)
+        self.step_prices = MappingProxyType(step_prices)
+        self.group_prices = MappingProxyType(group_prices)
+        self.promotions = MappingProxyType(promotions)
+        self.packaging_prices = MappingProxyType(packaging_prices)
+        self.costs = MappingProxyType(costs)
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError('PriceBook is immutable')
+        super().__setattr__(name, value)
+
+    # =====================================================
+    # LOOKUPS (NO DATABASE ACCESS)
+    # =====================================================
+
+    def covers(self, date) -> bool:
+        """Promotions ending before the build day are not compiled"""
+        return date >= self.built_on
+
+    def base_price(self, product_id: int) -> Decimal:
+        return self.base_prices.get(product_id, Decimal('0'))
+
+    def cost_price(self, product_id: int) -> Decimal:
+        return self.costs.get(product_id, Decimal('0'))
+
+    def step_price(self, product_id: int, quantity: Decimal) -> Optional[Decimal]:
+        return self._tier_price(self.step_prices.get(product_id, ()), quantity)
+
+    def group_price(self, product_id: int, price_group_id: int, quantity: Decimal) -> Optional[Decimal]:
+        return self._tier_price(self.group_prices.get((product_id, price_group_id), ()), quantity)
+
+    def promotional_price(self, product_id: int, quantity: Decimal, date,
+                          price_group_id: Optional[int] = None) -> Optional[Decimal]:
+        best = None
+        for promo in self.promotions.get(product_id, ()):
+            if not (promo.start_date <= date <= promo.end_date) or promo.min_quantity > quantity:
+                continue
+            if price_group_id and promo.customer_group_ids and price_group_id not in promo.customer_group_ids:
+                continue
+            if best is None or promo.price > best:
+                best = promo.price
+        return best
+
+    def fallback_price(self, product_id: int) -> Decimal:
+        cost_price = self.cost_price(product_id)
+        if cost_price <= 0:
+            return Decimal('0')
+        return cost_price * (1 + self.default_markup / 100)
+
+    def packaging_price(self, packaging_id: int) -> Optional[Decimal]:
+        return self.packaging_prices.get(packaging_id)
+
+    @staticmethod
+    def _tier_price(tiers, quantity: Decimal) -> Optional[Decimal]:
+        for min_quantity, price in tiers:
+            if min_quantity <= quantity:
+                return price
+        return None
+
+
+class PriceBookService:
+    """
+    In-process cache of compiled PriceBooks
+
+    Every location has a version stamp (core.services.version_stamp,
+    shared by all processes). Signals on the pricing models
+    (pricing.signals) bump it, and the next lookup rebuilds the book with
+    one bulk query per pricing model.
+
+    avg_cost changes do not send signals (inventory updates are set-based),
+    so books are also rebuilt after MAX_AGE seconds and on date change.
+    """
+
+    MAX_BOOKS = 64
+    MAX_AGE = 300
+    VERSIONS = VersionStamp('price_book')
+
+    _books: 'OrderedDict[Tuple[int, int], PriceBook]' = OrderedDict()
+    _lock = threading.Lock()
+
+    # =====================================================
+    # PUBLIC API
+    # =====================================================
+
+    @staticmethod
+    def get(location) -> Optional[PriceBook]:
+        """Current book for a location (None for non-model locations)"""
+        if not isinstance(location, models.Model):
+            return None
+
+        key = PriceBookService.location_key(location)
+        version = PriceBookService._current_version(key)
+        today = timezone.now().date()
+
+        with PriceBookService._lock:
+            book = PriceBookService._books.get(key)
+            if book is not None and PriceBookService._is_fresh(book, version, today):
+                PriceBookService._books.move_to_end(key)
+                return book
+
+        book = PriceBookService.build(location, version=version)
+
+        with PriceBookService._lock:
+            PriceBookService._books[key] = book
+            PriceBookService._books.move_to_end(key)
+            while len(PriceBookService._books) > PriceBookService.MAX_BOOKS:
+                PriceBookService._books.popitem(last=False)
+
+        return book
+
+    @staticmethod
+    def peek(location) -> Optional[PriceBook]:
+        """Cached book if it is still current - never builds"""
+        if not isinstance(location, models.Model):
+            return None
+
+        key = PriceBookService.location_key(location)
+        version = PriceBookService._current_version(key)
+        with PriceBookService._lock:
+            book = PriceBookService._books.get(key)
+        if book is not None and PriceBookService._is_fresh(book, version, timezone.now().date()):
+            return book
+        return None
+
+    @staticmethod
+    def build(location, version: Optional[int] = None, product_ids=None, as_of=None) -> PriceBook:
+        """
+        Compile a location's prices - one query per pricing model
+
+        Args:
+            product_ids: Only these products (partial book for bulk pricing, not cached)
+            as_of: First date the book must answer for (default: today)
+        """
+        key = PriceBookService.location_key(location)
+        today = as_of or timezone.now().date()
+        if version is None:
+            version = PriceBookService._current_version(key)
+
+        def scoped(queryset, product_field='product_id'):
+            if product_ids is None:
+                return queryset
+            return queryset.filter(**{f'{product_field}__in': product_ids})
+
+        base_prices = dict(
+            scoped(ProductPrice.objects.for_location(location)).values_list('product_id', 'effective_price')
+        )
+
+        step_prices = defaultdict(list)
+        for product_id, min_quantity, price in scoped(ProductStepPrice.objects.for_location(location)).values_list(
+            'product_id', 'min_quantity', 'price'
+        ):
+            step_prices[product_id].append((min_quantity, price))
+
+        group_prices = defaultdict(list)
+        for product_id, price_group_id, min_quantity, price in scoped(ProductPriceByGroup.objects.for_location(
+            location
+        )).values_list('product_id', 'price_group_id', 'min_quantity', 'price'):
+            group_prices[(product_id, price_group_id)].append((min_quantity, price))
+
+        promotions_qs = scoped(PromotionalPrice.objects.for_location(location).filter(end_date__gte=today))
+        promo_groups = defaultdict(set)
+        for promo_id, price_group_id in PromotionalPrice.customer_groups.through.objects.filter(
+            promotionalprice__in=promotions_qs
+        ).values_list('promotionalprice_id', 'pricegroup_id'):
+            promo_groups[promo_id].add(price_group_id)
+
+        promotions = defaultdict(list)
+        for row in promotions_qs.order_by().values_list(
+            'id', 'product_id', 'start_date', 'end_date', 'min_quantity', 'max_quantity',
+            'promotional_price', 'priority'
+        ):
+            promo_id, product_id = row[0], row[1]
+            promotions[product_id].append(PromotionEntry(
+                id=promo_id,
+                start_date=row[2],
+                end_date=row[3],
+                min_quantity=row[4],
+                max_quantity=row[5],
+                price=row[6],
+                priority=row[7],
+                customer_group_ids=frozenset(promo_groups.get(promo_id, ()))
+            ))
+
+        packaging_prices = dict(
+            scoped(PackagingPrice.objects.for_location(location), 'packaging__product_id').values_list(
+                'packaging_id', 'price'
+            )
+        )
+
+        costs = {}
+        from inventory.models import InventoryItem, InventoryLocation
+        if isinstance(location, InventoryLocation):
+            costs = {
+                product_id: avg_cost or Decimal('0')
+                for product_id, avg_cost in scoped(InventoryItem.objects.filter(
+                    location=location
+                )).values_list('product_id', 'avg_cost')
+            }
+
+        book = PriceBook(
+            location_key=key,
+            version=version,
+            built_on=today,
+            default_markup=getattr(location, 'default_markup_percentage', 30),
+            base_prices=base_prices,
+            step_prices={
+                product_id: tuple(sorted(tiers, key=lambda tier: tier[0], reverse=True))
+                for product_id, tiers in step_prices.items()
+            },
+            group_prices={
+                group_key: tuple(sorted(tiers, key=lambda tier: tier[0], reverse=True))
+                for group_key, tiers in group_prices.items()
+            },
+            promotions={product_id: tuple(entries) for product_id, entries in promotions.items()},
+            packaging_prices=packaging_prices,
+            costs=costs
+        )
+
+        logger.debug(
+            f"Built price book for {location}: {len(base_prices)} prices, "
+            f"{sum(len(entries) for entries in promotions.values())} promotions (version {version})"
+        )
+        return book
+
+    @staticmethod
+    def invalidate(content_type_id: int, object_id: int):
+        """Bump the version stamp of a location - called from pricing signals"""
+        PriceBookService.VERSIONS.bump(PriceBookService._version_scope((content_type_id, object_id)))
+
+    @staticmethod
+    def invalidate_location(location):
+        PriceBookService.invalidate(*PriceBookService.location_key(location))
+
+    @staticmethod
+    def clear():
+        with PriceBookService._lock:
+            PriceBookService._books.clear()
+
+    @staticmethod
+    def location_key(location) -> Tuple[int, int]:
+        return ContentType.objects.get_for_model(location).pk, location.pk
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _version_scope(key) -> str:
+        return f"{key[0]}:{key[1]}"
+
+    @staticmethod
+    def _current_version(key) -> int:
+        return PriceBookService.VERSIONS.current(PriceBookService._version_scope(key))
+
+    @staticmethod
+    def _is_fresh(book: PriceBook, version: int, today) -> bool:
+        return (
+            book.version == version
+            and book.built_on == today
+            and time.monotonic() - book.built_at < PriceBookService.MAX_AGE
+        )
+
+
+__all__ = ['PriceBook', 'PriceBookService', 'PromotionEntry']
@@ -0,0 +1,292 @@
+# pricing/services/price_snapshot.py - VERSIONED POS PRICE SNAPSHOTS
+
+import gzip
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import PriceSnapshot, PriceSnapshotRow
+from .price_book import PriceBook, PriceBookService
+
+logger = logging.getLogger(__name__)
+
+
+class PriceSnapshotService:
+    """
+    Per-location price snapshots for offline pricing on POS terminals
+
+    A snapshot row holds everything a till needs to price one product:
+
+        {"id": 12, "code": "P12", "price": "4.99", "source": "BASE",
+         "steps": [["10.000", "4.50"]], "groups": {"3": [["1.000", "4.20"]]},
+         "packagings": [[7, "6.000", "27.00"]],
+         "promotions": [[5, "2025-06-01", "2025-06-07", "1.000", null, "3.99", 0, [3]]]}
+
+    steps/group tiers are [min_quantity, price] sorted by min_quantity
+    descending; packagings are [packaging_id, conversion_factor, price];
+    promotions are [id, start, end, min_qty, max_qty, price, priority,
+    price_group_ids] (empty groups = every customer). Terminals resolve the
+    final price like PricingService._determine_final_price: promotion ->
+    customer group -> step -> base price; "source" is FALLBACK when the
+    price is the cost-based fallback.
+
+    build() compiles the location's PriceBook, hashes every row and writes
+    only rows whose hash changed, stamped with the next snapshot version;
+    products that disappeared become tombstones. delta(since) is then a
+    single indexed range query.
+    """
+
+    BULK_BATCH_SIZE = 1000
+    HASH_SIZE = 16
+
+    # =====================================================
+    # PUBLIC API
+    # =====================================================
+
+    @staticmethod
+    def ensure_current(location) -> PriceSnapshot:
+        """
+        Snapshot matching the current price book - rebuilds when prices changed or it aged out
+
+        One request rebuilds a stale snapshot; concurrent requests get the
+        last snapshot meanwhile instead of compiling the catalog themselves.
+        Only a location without any snapshot makes its requests wait.
+        """
+        key = PriceBookService.location_key(location)
+        snapshot = PriceSnapshot.objects.filter(content_type_id=key[0], object_id=key[1]).first()
+        if snapshot is not None and PriceSnapshotService._is_current(snapshot, key):
+            return snapshot
+
+        rebuilt = PriceSnapshotService.build(location, only_if_stale=True, wait=snapshot is None)
+        return rebuilt or snapshot
+
+    @staticmethod
+    def build(location, only_if_stale: bool = False, wait: bool = True) -> Optional[PriceSnapshot]:
+        """
+        Rebuild a location's snapshot, writing only changed rows
+
+        The snapshot row is locked before the price book is compiled, so
+        concurrent builders run one after another. only_if_stale: re-check
+        under the lock and skip the build when another builder just
+        finished. wait=False: return None instead of waiting for a running
+        build.
+        """
+        started = time.monotonic()
+        key = PriceBookService.location_key(location)
+
+        with transaction.atomic():
+            snapshot, _ = PriceSnapshot.objects.get_or_create(content_type_id=key[0], object_id=key[1])
+            skip_locked = not wait and connection.features.has_select_for_update_skip_locked
+            snapshot = PriceSnapshot.objects.select_for_update(skip_locked=skip_locked).filter(
+                pk=snapshot.pk
+            ).first()
+            if snapshot is None:
+                return None
+            if only_if_stale and PriceSnapshotService._is_current(snapshot, key):
+                return snapshot
+
+            source_version = PriceBookService._current_version(key)
+            book = PriceBookService.build(location, version=source_version)
+            rows = PriceSnapshotService._compile_rows(book)
+
+            existing = {
+                product_id: (row_id, row_hash, deleted)
+                for row_id, product_id, row_hash, deleted in PriceSnapshotRow.objects.filter(
+                    snapshot=snapshot
+                ).values_list('id', 'product_id', 'row_hash', 'deleted').iterator()
+            }
+
+            version = snapshot.version + 1
+            to_create, to_update = [], []
+            for product_id, payload in rows.items():
+                row_hash = PriceSnapshotService._hash(payload)
+                current = existing.get(product_id)
+                if current is None:
+                    to_create.append(PriceSnapshotRow(
+                        snapshot=snapshot, product_id=product_id, version=version,
+                        row_hash=row_hash, payload=payload
+                    ))
+                elif current[1] != row_hash or current[2]:
+                    to_update.append(PriceSnapshotRow(
+                        id=current[0], version=version, row_hash=row_hash, payload=payload, deleted=False
+                    ))
+
+            removed = [
+                PriceSnapshotRow(id=row_id, version=version, row_hash='', payload={}, deleted=True)
+                for product_id, (row_id, _, deleted) in existing.items()
+                if product_id not in rows and not deleted
+            ]
+
+            changed = len(to_create) + len(to_update) + len(removed)
+            if changed:
+                PriceSnapshotRow.objects.bulk_create(to_create, batch_size=PriceSnapshotService.BULK_BATCH_SIZE)
+                PriceSnapshotRow.objects.bulk_update(
+                    to_update + removed, ['version', 'row_hash', 'payload', 'deleted'],
+                    batch_size=PriceSnapshotService.BULK_BATCH_SIZE
+                )
+                snapshot.version = version
+
+            snapshot.source_version = source_version
+            snapshot.built_at = timezone.now()
+            snapshot.built_on = book.built_on
+            snapshot.row_count = len(rows)
+            snapshot.save()
+
+        logger.info(
+            f"Price snapshot {location} v{snapshot.version}: {len(rows)} products, {changed} changed "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        return snapshot
+
+    @staticmethod
+    def delta(snapshot: PriceSnapshot, since: int) -> Dict:
+        """Rows changed after version `since` (tombstones listed under removed)"""
+        if since > snapshot.version:
+            # Terminal is ahead of the server (snapshot was reset) - it must reload everything
+            return PriceSnapshotService._envelope(snapshot, since=since, full_required=True)
+
+        changed, removed = [], []
+        for product_id, payload, deleted in PriceSnapshotRow.objects.filter(
+            snapshot=snapshot, version__gt=since
+        ).order_by('product_id').values_list('product_id', 'payload', 'deleted').iterator():
+            if deleted:
+                removed.append(product_id)
+            else:
+                changed.append(payload)
+
+        return PriceSnapshotService._envelope(snapshot, since=since, changed=changed, removed=removed)
+
+    @staticmethod
+    def export(snapshot: PriceSnapshot, stream, compress: bool = True) -> int:
+        """Write the full snapshot as (gzipped) JSON - returns the number of products"""
+        target = gzip.GzipFile(fileobj=stream, mode='wb') if compress else stream
+        count = 0
+        try:
+            header = PriceSnapshotService._envelope(snapshot, since=0)
+            header.pop('changed')
+            header.pop('removed')
+            PriceSnapshotService._write(target, json.dumps(header, cls=DjangoJSONEncoder)[:-1] + ', "products": [')
+
+            for payload in PriceSnapshotRow.objects.filter(
+                snapshot=snapshot, deleted=False
+            ).order_by('product_id').values_list('payload', flat=True).iterator(chunk_size=5000):
+                PriceSnapshotService._write(target, (',' if count else '') + json.dumps(payload, separators=(',', ':')))
+                count += 1
+
+            PriceSnapshotService._write(target, ']}')
+        finally:
+            if compress:
+                target.close()
+        return count
+
+    # =====================================================
+    # COMPILATION
+    # =====================================================
+
+    @staticmethod
+    def _compile_rows(book: PriceBook) -> Dict[int, Dict]:
+        """PriceBook -> {product_id: payload}; one extra query for product codes/packagings"""
+        from products.models import Product, ProductPackaging
+
+        packagings = {}
+        if book.packaging_prices:
+            for packaging_id, product_id, factor in ProductPackaging.objects.filter(
+                id__in=list(book.packaging_prices)
+            ).values_list('id', 'product_id', 'conversion_factor'):
+                packagings.setdefault(product_id, []).append(
+                    [packaging_id, str(factor), str(book.packaging_prices[packaging_id])]
+                )
+
+        groups = {}
+        for (product_id, price_group_id), tiers in book.group_prices.items():
+            groups.setdefault(product_id, {})[str(price_group_id)] = PriceSnapshotService._tiers(tiers)
+
+        product_ids = (
+            set(book.base_prices) | set(book.step_prices) | set(book.promotions)
+            | set(groups) | set(packagings)
+            | {product_id for product_id, cost in book.costs.items() if cost > 0}
+        )
+        codes = dict(Product.objects.filter(id__in=list(product_ids)).values_list('id', 'code')) \
+            if product_ids else {}
+
+        rows = {}
+        for product_id in sorted(product_ids):
+            if product_id not in codes:
+                continue
+
+            base_price = book.base_price(product_id)
+            if base_price > 0:
+                price, source = base_price, 'BASE'
+            else:
+                price, source = book.fallback_price(product_id), 'FALLBACK'
+
+            rows[product_id] = {
+                'id': product_id,
+                'code': codes[product_id],
+                'price': PriceSnapshotService._money(price),
+                'source': source,
+                'steps': PriceSnapshotService._tiers(book.step_prices.get(product_id, ())),
+                'groups': groups.get(product_id, {}),
+                'packagings': sorted(packagings.get(product_id, [])),
+                'promotions': [
+                    [promo.id, promo.start_date.isoformat(), promo.end_date.isoformat(), str(promo.min_quantity),
+                     str(promo.max_quantity) if promo.max_quantity is not None else None,
+                     str(promo.price), promo.priority, sorted(promo.customer_group_ids)]
+                    for promo in sorted(book.promotions.get(product_id, ()), key=lambda promo: promo.id)
+                ],
+            }
+        return rows
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _is_current(snapshot: PriceSnapshot, key) -> bool:
+        return (
+            snapshot.built_at is not None
+            and snapshot.source_version == PriceBookService._current_version(key)
+            and snapshot.built_on == timezone.now().date()
+            and (timezone.now() - snapshot.built_at).total_seconds() < PriceBookService.MAX_AGE
+        )
+
+    @staticmethod
+    def _envelope(snapshot: PriceSnapshot, since: int, changed: Optional[List] = None,
+                  removed: Optional[List] = None, full_required: bool = False) -> Dict:
+        return {
+            'location_type': snapshot.content_type_id,
+            'location_id': snapshot.object_id,
+            'version': snapshot.version,
+            'since': since,
+            'built_at': snapshot.built_at,
+            'full_required': full_required,
+            'changed': changed or [],
+            'removed': removed or [],
+        }
+
+    @staticmethod
+    def _tiers(tiers) -> List[List[str]]:
+        return [[str(min_quantity), str(price)] for min_quantity, price in tiers]
+
+    @staticmethod
+    def _money(value) -> str:
+        from core.utils.decimal_utils import round_currency
+        return str(round_currency(value, places=2))
+
+    @staticmethod
+    def _hash(payload: Dict) -> str:
+        data = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode()
+        return hashlib.blake2b(data, digest_size=PriceSnapshotService.HASH_SIZE).hexdigest()
+
+    @staticmethod
+    def _write(target, text: str):
+        target.write(text.encode() if isinstance(target, gzip.GzipFile) else text)
+
+
+__all__ = ['PriceSnapshotService']
@@ -0,0 +1,358 @@
+# pricing/services/pricing_audit.py - CATALOG-WIDE PRICING AUDIT
+
+import csv
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional
+
+from django.utils import timezone
+
+from .price_book import PriceBook, PriceBookService
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - pure Python fallback below
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Prices have 2 decimals and avg_cost 4 - both are held as x 10^4 integers
+PRICE_SCALE = 4
+NO_PRICE = -1
+
+
+@dataclass
+class PricingAuditReport:
+    """Output of PricingAuditService.audit_location()"""
+    location_code: str
+    as_of: object
+    rows: List[Dict] = field(default_factory=list)
+    summary: Dict = field(default_factory=dict)
+
+    @property
+    def issues(self) -> List[Dict]:
+        return [row for row in self.rows if row['issues']]
+
+
+class PricingAuditService:
+    """
+    Coverage, margin and promotion audit of a whole location
+
+    All pricing data comes from one compiled PriceBook (one query per
+    pricing model plus InventoryItem.avg_cost) and one catalog query, so a
+    location costs a handful of queries no matter how many products it
+    has - validate_pricing_setup() needs several queries per product.
+
+    Per product the lowest step/group/promotional price is collected in one
+    pass; margin, markup and the issue flags are then computed over
+    scaled-integer arrays (NumPy when installed, plain Python otherwise).
+
+    Issue codes:
+        UNPRICED          no base price and no cost for a fallback price
+        NO_BASE_PRICE     sold through the cost-based fallback price only
+        NO_COST           no inventory cost - margin unknown
+        NEGATIVE_MARGIN   base price not above cost
+        BELOW_COST        a step/group/promotional price below cost
+        PROMO_ABOVE_BASE  promotional price not below the base price
+        PROMO_OVERLAP     promotions with overlapping dates, quantities and groups
+    """
+
+    CRITICAL = ('UNPRICED', 'NO_BASE_PRICE')
+
+    CSV_COLUMNS = [
+        'location_code', 'product_code', 'product_name', 'severity', 'issues',
+        'base_price', 'cost_price', 'fallback_price', 'margin_pct', 'markup_pct',
+        'step_tiers', 'min_step_price', 'group_prices', 'min_group_price',
+        'active_promotions', 'upcoming_promotions', 'min_promo_price', 'promo_overlaps',
+        'lowest_price', 'lowest_margin_pct', 'packaging_prices',
+    ]
+
+    # =====================================================
+    # PUBLIC API
+    # =====================================================
+
+    @staticmethod
+    def audit(locations: Iterable, only_issues: bool = False) -> List[PricingAuditReport]:
+        return [
+            PricingAuditService.audit_location(location, only_issues=only_issues)
+            for location in locations
+        ]
+
+    @staticmethod
+    def audit_location(location, only_issues: bool = False) -> PricingAuditReport:
+        """
+        Audit every sellable or priced product of a location
+
+        Args:
+            only_issues: Keep only rows with at least one issue
+        """
+        today = timezone.now().date()
+        book = PriceBookService.get(location) or PriceBookService.build(location)
+        products = PricingAuditService._load_catalog(book)
+
+        columns = PricingAuditService._collect(book, products, today)
+        if np is not None and products:
+            metrics = PricingAuditService._metrics_numpy(columns)
+        else:
+            metrics = PricingAuditService._metrics_python(columns)
+
+        report = PricingAuditReport(location_code=getattr(location, 'code', str(location)), as_of=today)
+        issue_counts = {}
+        with_issues = 0
+        for index, (product_id, code, name) in enumerate(products):
+            issues = metrics['issues'][index]
+            if columns['promo_overlaps'][index]:
+                issues = issues + ['PROMO_OVERLAP']
+            for issue in issues:
+                issue_counts[issue] = issue_counts.get(issue, 0) + 1
+            with_issues += bool(issues)
+            if only_issues and not issues:
+                continue
+
+            report.rows.append({
+                'location_code': report.location_code,
+                'product_id': product_id,
+                'product_code': code,
+                'product_name': name,
+                'severity': PricingAuditService._severity(issues),
+                'issues': issues,
+                'base_price': PricingAuditService._price(columns['base'][index]),
+                'cost_price': PricingAuditService._price(columns['cost'][index], places=4),
+                'fallback_price': book.fallback_price(product_id) if columns['base'][index] <= 0 else None,
+                'margin_pct': metrics['margin'][index],
+                'markup_pct': metrics['markup'][index],
+                'step_tiers': columns['step_tiers'][index],
+                'min_step_price': PricingAuditService._price(columns['min_step'][index]),
+                'group_prices': columns['group_prices'][index],
+                'min_group_price': PricingAuditService._price(columns['min_group'][index]),
+                'active_promotions': columns['active_promotions'][index],
+                'upcoming_promotions': columns['upcoming_promotions'][index],
+                'min_promo_price': PricingAuditService._price(columns['min_promo'][index]),
+                'promo_overlaps': columns['promo_overlaps'][index],
+                'lowest_price': PricingAuditService._price(columns['lowest'][index]),
+                'lowest_margin_pct': metrics['lowest_margin'][index],
+                'packaging_prices': columns['packaging_prices'][index],
+            })
+
+        margins = [margin for margin in metrics['margin'] if margin is not None]
+        report.summary = {
+            'location_code': report.location_code,
+            'as_of': today,
+            'products': len(products),
+            'with_issues': with_issues,
+            'issue_counts': issue_counts,
+            'average_margin_pct': (sum(margins) / len(margins)).quantize(Decimal('0.01')) if margins else None,
+        }
+
+        logger.info(
+            f"Pricing audit {report.location_code}: {len(products)} products, "
+            f"{with_issues} with issues"
+        )
+        return report
+
+    @staticmethod
+    def export_csv(stream, reports: Iterable[PricingAuditReport]) -> int:
+        writer = csv.DictWriter(stream, fieldnames=PricingAuditService.CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+
+        count = 0
+        for report in reports:
+            for row in report.rows:
+                writer.writerow({**row, 'issues': '|'.join(row['issues'])})
+                count += 1
+        return count
+
+    # =====================================================
+    # LOADING
+    # =====================================================
+
+    @staticmethod
+    def _load_catalog(book: PriceBook) -> List[tuple]:
+        """Sellable products plus anything priced or stocked at the location - one query"""
+        from products.models import Product, SELLABLE_STATUSES
+
+        priced_ids = set(book.base_prices) | set(book.costs) | set(book.step_prices) | set(book.promotions)
+        priced_ids.update(product_id for product_id, _ in book.group_prices)
+
+        # Filtered in Python - an id__in list of the whole priced catalog would be a huge query
+        return [
+            (product_id, code, name)
+            for product_id, code, name, status, blocked in Product.objects.order_by('code').values_list(
+                'id', 'code', 'name', 'lifecycle_status', 'sales_blocked'
+            ).iterator()
+            if product_id in priced_ids or (status in SELLABLE_STATUSES and not blocked)
+        ]
+
+    @staticmethod
+    def _collect(book: PriceBook, products: List[tuple], today) -> Dict[str, list]:
+        """One pass over the book -> per-product columns of scaled integers and counts"""
+        min_group = {}
+        group_counts = {}
+        for (product_id, _), tiers in book.group_prices.items():
+            group_counts[product_id] = group_counts.get(product_id, 0) + len(tiers)
+            lowest = min(price for _, price in tiers)
+            if product_id not in min_group or lowest < min_group[product_id]:
+                min_group[product_id] = lowest
+
+        from products.models import ProductPackaging
+        packaging_counts = {}
+        if book.packaging_prices:
+            for product_id in ProductPackaging.objects.filter(
+                id__in=list(book.packaging_prices)
+            ).values_list('product_id', flat=True):
+                packaging_counts[product_id] = packaging_counts.get(product_id, 0) + 1
+
+        scale = PricingAuditService._scaled
+        columns = {name: [] for name in (
+            'base', 'cost', 'min_step', 'min_group', 'min_promo', 'lowest', 'step_tiers', 'group_prices',
+            'active_promotions', 'upcoming_promotions', 'promo_overlaps', 'packaging_prices',
+        )}
+
+        for product_id, _, _ in products:
+            steps = book.step_prices.get(product_id, ())
+            promotions = book.promotions.get(product_id, ())
+            active = [promo for promo in promotions if promo.start_date <= today]
+
+            min_step = min((price for _, price in steps), default=None)
+            min_promo = min((promo.price for promo in active), default=None)
+            options = [price for price in (min_step, min_group.get(product_id), min_promo) if price is not None]
+
+            columns['base'].append(scale(book.base_price(product_id)))
+            columns['cost'].append(scale(book.cost_price(product_id)))
+            columns['min_step'].append(scale(min_step))
+            columns['min_group'].append(scale(min_group.get(product_id)))
+            columns['min_promo'].append(scale(min_promo))
+            columns['lowest'].append(scale(min(options) if options else None))
+            columns['step_tiers'].append(len(steps))
+            columns['group_prices'].append(group_counts.get(product_id, 0))
+            columns['active_promotions'].append(len(active))
+            columns['upcoming_promotions'].append(len(promotions) - len(active))
+            columns['promo_overlaps'].append(PricingAuditService._count_overlaps(promotions))
+            columns['packaging_prices'].append(packaging_counts.get(product_id, 0))
+
+        return columns
+
+    @staticmethod
+    def _count_overlaps(promotions) -> int:
+        """Pairs that can apply to the same sale - dates, quantity range and customer groups intersect"""
+        overlaps = 0
+        for i, first in enumerate(promotions):
+            for second in promotions[i + 1:]:
+                if first.start_date > second.end_date or second.start_date > first.end_date:
+                    continue
+                if first.max_quantity is not None and second.min_quantity > first.max_quantity:
+                    continue
+                if second.max_quantity is not None and first.min_quantity > second.max_quantity:
+                    continue
+                if first.customer_group_ids and second.customer_group_ids and \
+                        not first.customer_group_ids & second.customer_group_ids:
+                    continue
+                overlaps += 1
+        return overlaps
+
+    # =====================================================
+    # METRICS
+    # =====================================================
+
+    @staticmethod
+    def _metrics_numpy(columns) -> Dict[str, list]:
+        base = np.array(columns['base'], dtype=np.int64)
+        cost = np.array(columns['cost'], dtype=np.int64)
+        lowest = np.array(columns['lowest'], dtype=np.int64)
+        min_promo = np.array(columns['min_promo'], dtype=np.int64)
+
+        has_base = base > 0
+        has_cost = cost > 0
+        has_lowest = lowest > 0
+        both = has_base & has_cost
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            margin = np.where(both, (base - cost) * 100.0 / np.where(has_base, base, 1), np.nan)
+            markup = np.where(both, (base - cost) * 100.0 / np.where(has_cost, cost, 1), np.nan)
+            lowest_margin = np.where(has_lowest & has_cost,
+                                     (lowest - cost) * 100.0 / np.where(has_lowest, lowest, 1), np.nan)
+
+        flags = {
+            'UNPRICED': ~has_base & ~has_cost,
+            'NO_BASE_PRICE': ~has_base & has_cost,
+            'NO_COST': has_base & ~has_cost,
+            'NEGATIVE_MARGIN': both & (base <= cost),
+            'BELOW_COST': has_lowest & has_cost & (lowest < cost),
+            'PROMO_ABOVE_BASE': has_base & (min_promo != NO_PRICE) & (min_promo >= base),
+        }
+
+        issues = [[] for _ in range(len(base))]
+        for code, mask in flags.items():
+            for index in np.flatnonzero(mask).tolist():
+                issues[index].append(code)
+
+        return {
+            'margin': [PricingAuditService._percent(value) for value in margin.tolist()],
+            'markup': [PricingAuditService._percent(value) for value in markup.tolist()],
+            'lowest_margin': [PricingAuditService._percent(value) for value in lowest_margin.tolist()],
+            'issues': issues,
+        }
+
+    @staticmethod
+    def _metrics_python(columns) -> Dict[str, list]:
+        metrics = {'margin': [], 'markup': [], 'lowest_margin': [], 'issues': []}
+
+        for base, cost, lowest, min_promo in zip(
+                columns['base'], columns['cost'], columns['lowest'], columns['min_promo']):
+            has_base, has_cost, has_lowest = base > 0, cost > 0, lowest > 0
+            both = has_base and has_cost
+
+            metrics['margin'].append(PricingAuditService._percent((base - cost) * 100.0 / base if both else None))
+            metrics['markup'].append(PricingAuditService._percent((base - cost) * 100.0 / cost if both else None))
+            metrics['lowest_margin'].append(PricingAuditService._percent(
+                (lowest - cost) * 100.0 / lowest if has_lowest and has_cost else None
+            ))
+
+            issues = []
+            if not has_base and not has_cost:
+                issues.append('UNPRICED')
+            if not has_base and has_cost:
+                issues.append('NO_BASE_PRICE')
+            if has_base and not has_cost:
+                issues.append('NO_COST')
+            if both and base <= cost:
+                issues.append('NEGATIVE_MARGIN')
+            if has_lowest and has_cost and lowest < cost:
+                issues.append('BELOW_COST')
+            if has_base and min_promo != NO_PRICE and min_promo >= base:
+                issues.append('PROMO_ABOVE_BASE')
+            metrics['issues'].append(issues)
+
+        return metrics
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _scaled(value: Optional[Decimal]) -> int:
+        if value is None:
+            return NO_PRICE
+        return int(Decimal(value).scaleb(PRICE_SCALE).to_integral_value(rounding=ROUND_HALF_UP))
+
+    @staticmethod
+    def _price(scaled: int, places: int = 2) -> Optional[Decimal]:
+        if scaled == NO_PRICE:
+            return None
+        return Decimal(scaled).scaleb(-PRICE_SCALE).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+    @staticmethod
+    def _percent(value) -> Optional[Decimal]:
+        if value is None or value != value:  # NaN
+            return None
+        return Decimal(repr(value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+    @staticmethod
+    def _severity(issues: List[str]) -> str:
+        if any(issue in PricingAuditService.CRITICAL for issue in issues):
+            return 'critical'
+        return 'warning' if issues else 'ok'
+
+
+__all__ = ['PricingAuditReport', 'PricingAuditService']
@@ -60,51 +60,14 @@ class PricingService:
             if not validation_result.ok:
                 return validation_result
 
-            # Get all pricing components using legacy methods
-            base_price = PricingService._get_base_price_internal(location, product)
-            promo_price = PricingService._get_promotional_price_internal(
-                location, product, quantity, date, customer
-            )
-            group_price = None
-            if customer and hasattr(customer, 'price_group') and customer.price_group:
-                group_price = PricingService._get_group_price_internal(
-                    location, product, customer.price_group, quantity
-                )
+            # Get all pricing components - compiled price book, queries as fallback
+            components = PricingService._get_price_components(location, product, customer, quantity, date)
 
-            step_price = PricingService._get_step_price_internal(location, product, quantity)
-            fallback_price = PricingService._get_fallback_price_internal(location, product)
-            cost_price = PricingService._get_inventory_cost_internal(location, product)
-
-            # Determine final price and pricing rule
-            final_price, pricing_rule = PricingService._determine_final_price(
-                base_price, promo_price, group_price, step_price, fallback_price
+            pricing_data = PricingService._compose_pricing_data(
+                location, product, customer, quantity, date, components
             )
-
-            # Calculate profit metrics
-            profit_data = PricingService._calculate_profit_metrics(cost_price, final_price)
-
-            # Prepare comprehensive pricing data
-            pricing_data = {
-                'final_price': final_price,
-                'pricing_rule': pricing_rule,
-                'base_price': base_price,
-                'promotional_price': promo_price,
-                'group_price': group_price,
-                'step_price': step_price,
-                'fallback_price': fallback_price,
-                'cost_price': cost_price,
-                'quantity': quantity,
-                'date': date,
-                'location_code': getattr(location, 'code', str(location)),
-                'product_code': getattr(product, 'code', str(product)),
-                'customer_info': {
-                    'customer_id': getattr(customer, 'id', None),
-                    'price_group': getattr(customer.price_group, 'name', None) if customer and hasattr(customer,
-                                                                                                       'price_group') else None
-                },
-                'profit_metrics': profit_data,
-                'pricing_timestamp': timezone.now()
-            }
+            final_price = pricing_data['final_price']
+            pricing_rule = pricing_data['pricing_rule']
 
             logger.info(f"Pricing calculated: {product} @ {location} = {final_price} ({pricing_rule})")
 
@@ -121,6 +84,82 @@ class PricingService:
                 data={'product_code': getattr(product, 'code', '?'), 'location_code': getattr(location, 'code', '?')}
             )
 
+    @staticmethod
+    def get_bulk_pricing(
+            location,
+            lines,
+            customer=None,
+            date=None
+    ) -> Result:
+        """
+        🎯 BULK API: Price a whole cart/document at once - NEW
+
+        Args:
+            lines: Iterable of (product, quantity)
+
+        Returns:
+            Result with 'lines' - one dict per input line, identical to
+            get_product_pricing().data - plus 'total_amount'
+
+        Uses the location's cached price book when it is current, otherwise
+        compiles one for just these products (a fixed number of __in queries).
+        """
+        try:
+            if date is None:
+                date = timezone.now().date()
+
+            lines = [(product, Decimal(str(quantity))) for product, quantity in lines]
+            for index, (product, quantity) in enumerate(lines):
+                validation_result = PricingService._validate_pricing_inputs(location, product, quantity)
+                if not validation_result.ok:
+                    return Result.error(
+                        code=validation_result.code,
+                        msg=f'Line {index + 1}: {validation_result.msg}',
+                        data={'line_index': index}
+                    )
+
+            from .price_book import PriceBookService
+            book = PriceBookService.peek(location)
+            if book is None or not book.covers(date):
+                book = PriceBookService.build(
+                    location,
+                    product_ids={product.pk for product, _ in lines},
+                    as_of=min(date, timezone.now().date())
+                )
+
+            price_group_id = getattr(customer, 'price_group_id', None) if customer else None
+
+            priced_lines = []
+            total_amount = Decimal('0')
+            for product, quantity in lines:
+                components = PricingService._book_components(book, product.pk, quantity, date, price_group_id)
+                line_data = PricingService._compose_pricing_data(
+                    location, product, customer, quantity, date, components
+                )
+                priced_lines.append(line_data)
+                total_amount += line_data['final_price'] * quantity
+
+            logger.info(f"Bulk pricing calculated: {len(priced_lines)} lines @ {location} = {total_amount}")
+
+            return Result.success(
+                data={
+                    'lines': priced_lines,
+                    'line_count': len(priced_lines),
+                    'total_amount': total_amount,
+                    'location_code': getattr(location, 'code', str(location)),
+                    'date': date,
+                },
+                msg=f'Bulk pricing calculated for {len(priced_lines)} lines'
+            )
+
+        except Exception as e:
+            logger.error(f"Error in bulk pricing: {e}")
+            return Result.error(
+                code='BULK_PRICING_ERROR',
+                msg=f'Failed to calculate bulk pricing: {str(e)}',
+                data={'location_code': getattr(location, 'code', '?')}
+            )
+
     @staticmethod
     def get_pricing_analysis(
             location,
@@ -408,27 +447,25 @@ class PricingService:
         """
         🎯 BARCODE API: Get pricing for barcode - NEW Result-based method
 
-        Handles both product barcodes and packaging barcodes
+        Handles product, packaging and weight (28PPPPPWWWWWC) barcodes
         """
         try:
-            # Try to find product by barcode
+            # FIXED: Barcodes live in ProductBarcode - resolve through the in-memory index
             product = None
             packaging = None
+            scan = None
 
             try:
                 from products.models import Product, ProductPackaging
+                from products.services.barcode_index import BarcodeIndexService
 
-                # Try product barcode first
-                try:
-                    product = Product.objects.get(barcode=barcode)
-                except Product.DoesNotExist:
-                    # Try packaging barcode
-                    try:
-                        packaging_obj = ProductPackaging.objects.get(barcode=barcode)
-                        product = packaging_obj.product
-                        packaging = packaging_obj
-                    except ProductPackaging.DoesNotExist:
-                        pass
+                scan = BarcodeIndexService.resolve(barcode)
+                if scan is not None:
+                    product = Product.objects.filter(pk=scan.product_id).first()
+                    if scan.packaging_id:
+                        packaging = ProductPackaging.objects.select_related('unit').filter(
+                            pk=scan.packaging_id
+                        ).first()
 
             except ImportError:
                 logger.warning("Product models not available for barcode lookup")
@@ -444,14 +481,19 @@ class PricingService:
             if packaging:
                 # Packaging barcode - get packaging-specific pricing or calculate from base
                 try:
-                    pkg_price = PackagingPrice.objects.for_location(location).filter(
-                        product=product,
-                        packaging=packaging,
-                        is_active=True
-                    ).first()
-
-                    if pkg_price:
-                        price = pkg_price.price
+                    from .price_book import PriceBookService
+                    book = PriceBookService.get(location) if PricingService.USE_PRICE_BOOK else None
+                    if book is not None:
+                        packaging_price = book.packaging_price(packaging.pk)
+                    else:
+                        pkg_price = PackagingPrice.objects.for_location(location).filter(
+                            packaging=packaging,
+                            is_active=True
+                        ).first()
+                        packaging_price = pkg_price.price if pkg_price else None
+
+                    if packaging_price is not None:
+                        price = packaging_price
                         unit_price = price / packaging.conversion_factor
                     else:
                         # Calculate from product price
@@ -488,11 +530,20 @@ class PricingService:
                         data={'barcode': barcode}
                     )
             else:
-                # Product barcode - get standard pricing
-                product_pricing = PricingService.get_product_pricing(location, product, customer)
+                # Product barcode - get standard pricing (weight barcodes carry their quantity)
+                quantity = scan.quantity if scan.is_weight else Decimal('1')
+                if quantity <= 0:
+                    return Result.error(
+                        code='INVALID_WEIGHT',
+                        msg=f'Weight barcode {barcode} encodes no quantity',
+                        data={'barcode': barcode}
+                    )
+
+                product_pricing = PricingService.get_product_pricing(location, product, customer, quantity)
                 if not product_pricing.ok:
                     return product_pricing
 
+                unit_price = product_pricing.data['final_price']
                 barcode_data = {
                     'barcode': barcode,
                     'product': {
@@ -500,12 +551,14 @@ class PricingService:
                         'name': product.name
                     },
                     'packaging': None,
-                    'price': product_pricing.data['final_price'],
-                    'unit_price': product_pricing.data['final_price'],
-                    'quantity_represented': Decimal('1'),
-                    'pricing_type': 'PRODUCT',
+                    'price': unit_price * quantity if scan.is_weight else unit_price,
+                    'unit_price': unit_price,
+                    'quantity_represented': quantity,
+                    'pricing_type': 'WEIGHT' if scan.is_weight else 'PRODUCT',
                     'pricing_details': product_pricing.data
                 }
+                if scan.is_weight:
+                    barcode_data['weight'] = scan.weight
 
             return Result.success(
                 data=barcode_data,
@@ -548,6 +601,59 @@ class PricingService:
 
         return Result.success()
 
+    @staticmethod
+    def _book_components(book, product_id: int, quantity: Decimal, date, price_group_id=None) -> Dict:
+        return {
+            'base_price': book.base_price(product_id),
+            'promotional_price': book.promotional_price(product_id, quantity, date, price_group_id),
+            'group_price': book.group_price(product_id, price_group_id, quantity) if price_group_id else None,
+            'step_price': book.step_price(product_id, quantity),
+            'fallback_price': book.fallback_price(product_id),
+            'cost_price': book.cost_price(product_id),
+        }
+
+    @staticmethod
+    def _compose_pricing_data(location, product, customer, quantity: Decimal, date, components: Dict) -> Dict:
+        """Final price, rule and profit metrics of one line from its price components"""
+        base_price = components['base_price']
+        promo_price = components['promotional_price']
+        group_price = components['group_price']
+        step_price = components['step_price']
+        fallback_price = components['fallback_price']
+        cost_price = components['cost_price']
+
+        # Determine final price and pricing rule
+        final_price, pricing_rule = PricingService._determine_final_price(
+            base_price, promo_price, group_price, step_price, fallback_price
+        )
+
+        # Calculate profit metrics
+        profit_data = PricingService._calculate_profit_metrics(cost_price, final_price)
+
+        # Prepare comprehensive pricing data
+        pricing_data = {
+            'final_price': final_price,
+            'pricing_rule': pricing_rule,
+            'base_price': base_price,
+            'promotional_price': promo_price,
+            'group_price': group_price,
+            'step_price': step_price,
+            'fallback_price': fallback_price,
+            'cost_price': cost_price,
+            'quantity': quantity,
+            'date': date,
+            'location_code': getattr(location, 'code', str(location)),
+            'product_code': getattr(product, 'code', str(product)),
+            'customer_info': {
+                'customer_id': getattr(customer, 'id', None),
+                'price_group': getattr(customer.price_group, 'name', None) if customer and hasattr(customer,
+                                                                                                   'price_group') else None
+            },
+            'profit_metrics': profit_data,
+            'pricing_timestamp': timezone.now()
+        }
+        return pricing_data
+
     @staticmethod
     def _determine_final_price(base_price, promo_price, group_price, step_price, fallback_price) -> tuple:
         """Determine final price and pricing rule used"""
@@ -618,6 +724,39 @@ class PricingService:
     # INTERNAL PRICING METHODS (PRESERVED ORIGINAL LOGIC)
     # =====================================================
 
+    # NEW: Serve lookups from the compiled per-location PriceBook
+    USE_PRICE_BOOK = True
+
+    @staticmethod
+    def _get_price_components(location, product, customer, quantity: Decimal, date) -> Dict:
+        """All price components of one line - dict lookups when the location's price book covers the date"""
+        price_group_id = getattr(customer, 'price_group_id', None) if customer else None
+
+        book = None
+        if PricingService.USE_PRICE_BOOK:
+            from .price_book import PriceBookService
+            book = PriceBookService.get(location)
+
+        if book is not None and book.covers(date):
+            return PricingService._book_components(book, product.pk, quantity, date, price_group_id)
+
+        group_price = None
+        if customer and hasattr(customer, 'price_group') and customer.price_group:
+            group_price = PricingService._get_group_price_internal(
+                location, product, customer.price_group, quantity
+            )
+
+        return {
+            'base_price': PricingService._get_base_price_internal(location, product),
+            'promotional_price': PricingService._get_promotional_price_internal(
+                location, product, quantity, date, customer
+            ),
+            'group_price': group_price,
+            'step_price': PricingService._get_step_price_internal(location, product, quantity),
+            'fallback_price': PricingService._get_fallback_price_internal(location, product),
+            'cost_price': PricingService._get_inventory_cost_internal(location, product),
+        }
+
     @staticmethod
     def _get_base_price_internal(location, product) -> Decimal:
         """Internal base price retrieval - preserved original logic"""
@@ -653,11 +792,13 @@ class PricingService:
         Decimal]:
         """Internal group price retrieval - preserved original logic"""
         try:
+            # FIXED: field is price_group, and the tier's min_quantity applies
             group_price = ProductPriceByGroup.objects.for_location(location).filter(
                 product=product,
-                customer_group=customer_group,
+                price_group=customer_group,
+                min_quantity__lte=quantity,
                 is_active=True
-            ).first()
+            ).order_by('-min_quantity').first()
 
             return group_price.price if group_price else None
         except Exception as e:
@@ -668,6 +809,14 @@ class PricingService:
     def _get_promotional_price_internal(location, product, quantity, date, customer=None) -> Optional[Decimal]:
         """Internal promotional price retrieval - preserved original logic"""
         try:
+            # NEW: Current/upcoming promotions come from the materialised table - one indexed lookup
+            if date >= timezone.now().date():
+                from ..models import ActivePromotion
+                price_group_id = getattr(customer, 'price_group_id', None) if customer else None
+                return ActivePromotion.objects.matching(
+                    location, product, quantity, date, price_group_id=price_group_id
+                ).order_by('-promotional_price').values_list('promotional_price', flat=True).first()
+
             promotions = PromotionalPrice.objects.for_location(location).filter(
                 product=product,
                 is_active=True,
@@ -726,73 +875,18 @@ class PricingService:
         3. Last price from specific partner at any location
         4. Last price from any partner at any location
         5. Fallback to avg_cost from inventory
+
+        NEW: Scenarios 1-4 come from the maintained LastPurchasePrice table
+        (one indexed query) instead of up to four DeliveryLine scans.
         """
         try:
-            from purchases.models import DeliveryLine
-            from django.utils import timezone
-            from datetime import timedelta
-            from django.db.models import Q
-            from django.contrib.contenttypes.models import ContentType
-            
-            cutoff_date = timezone.now() - timedelta(days=days_limit)
-            
-            # Build query hierarchy - most specific first
-            query_scenarios = []
-            
-            # Handle GenericForeignKey queries properly
-            if partner and location:
-                partner_ct = ContentType.objects.get_for_model(partner.__class__)
-                location_ct = ContentType.objects.get_for_model(location.__class__)
-                query_scenarios.append(('exact', Q(
-                    product=product,
-                    document__partner_content_type=partner_ct,
-                    document__partner_object_id=partner.pk,
-                    document__location_content_type=location_ct,
-                    document__location_object_id=location.pk
-                )))
-            
-            if location:
-                location_ct = ContentType.objects.get_for_model(location.__class__)
-                query_scenarios.append(('location', Q(
-                    product=product,
-                    document__location_content_type=location_ct,
-                    document__location_object_id=location.pk
-                )))
-            
-            if partner:
-                partner_ct = ContentType.objects.get_for_model(partner.__class__)
-                query_scenarios.append(('partner', Q(
-                    product=product,
-                    document__partner_content_type=partner_ct,
-                    document__partner_object_id=partner.pk
-                )))
-            
-            query_scenarios.append(('global', Q(product=product)))
-            
-            for match_type, query in query_scenarios:
-                last_line = DeliveryLine.objects.filter(
-                    query,
-                    document__document_date__gte=cutoff_date,
-                    document__status__in=['approved', 'completed'],
-                    unit_price__gt=0  # Only lines with valid prices
-                ).select_related(
-                    'document', 
-                    'document__partner_content_type', 
-                    'document__location_content_type'
-                ).order_by(
-                    '-document__document_date', '-document__created_at'
-                ).first()
-                
-                if last_line:
-                    return Result.success({
-                        'price': last_line.unit_price,
-                        'date': last_line.document.document_date,
-                        'partner': last_line.document.partner.name if last_line.document.partner else 'Unknown',
-                        'location': last_line.document.location.name if last_line.document.location else 'Unknown',
-                        'match_type': match_type,
-                        'delivery_ref': last_line.document.document_number,
-                        'source': 'purchase_history'
-                    })
+            from purchases.services import LastPurchasePriceService
+
+            last_price = LastPurchasePriceService.lookup(
+                product, partner=partner, location=location, days_limit=days_limit
+            )
+            if last_price:
+                return Result.success(last_price)
             
             # Fallback to inventory avg_cost
             if location:
@@ -0,0 +1,89 @@
+# pricing/services/promotion_activation.py - MATERIALISED ACTIVE PROMOTIONS
+
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import ActivePromotion, PromotionalPrice
+
+logger = logging.getLogger(__name__)
+
+
+class PromotionActivationService:
+    """
+    Keep ActivePromotion in step with PromotionalPrice
+
+    Only active promotions that have not ended yet are materialised, with
+    customer-group eligibility expanded to one row per group. sync() runs
+    from the PromotionalPrice signals, refresh() rebuilds the whole table
+    (nightly from manage_promotion_lifecycle, which also drops expired rows).
+    """
+
+    BULK_BATCH_SIZE = 1000
+
+    @staticmethod
+    def sync(promotion_ids: Iterable[int]) -> int:
+        """Re-materialise the given promotions - returns rows written"""
+        promotion_ids = set(promotion_ids)
+        if not promotion_ids:
+            return 0
+
+        with transaction.atomic():
+            ActivePromotion.objects.filter(promotion_id__in=promotion_ids).delete()
+            rows = PromotionActivationService._expand(
+                PromotionalPrice.objects.filter(id__in=promotion_ids)
+            )
+            ActivePromotion.objects.bulk_create(rows, batch_size=PromotionActivationService.BULK_BATCH_SIZE)
+
+        return len(rows)
+
+    @staticmethod
+    def refresh() -> Dict:
+        """Rebuild the table from scratch"""
+        with transaction.atomic():
+            deleted, _ = ActivePromotion.objects.all().delete()
+            rows = PromotionActivationService._expand(PromotionalPrice.objects.all())
+            ActivePromotion.objects.bulk_create(rows, batch_size=PromotionActivationService.BULK_BATCH_SIZE)
+
+        promotions = len({row.promotion_id for row in rows})
+        logger.info(f"Active promotions refreshed: {promotions} promotions, {len(rows)} rows")
+        return {'promotions': promotions, 'rows': len(rows), 'deleted': deleted}
+
+    @staticmethod
+    def _expand(promotions) -> list:
+        """Active, not yet ended promotions -> one row per eligible price group (two queries)"""
+        today = timezone.now().date()
+        promotions = promotions.filter(is_active=True, end_date__gte=today)
+
+        groups = defaultdict(list)
+        for promotion_id, price_group_id in PromotionalPrice.customer_groups.through.objects.filter(
+            promotionalprice__in=promotions
+        ).values_list('promotionalprice_id', 'pricegroup_id'):
+            groups[promotion_id].append(price_group_id)
+
+        rows = []
+        for promo in promotions.order_by().values(
+            'id', 'content_type_id', 'object_id', 'product_id', 'start_date', 'end_date',
+            'min_quantity', 'max_quantity', 'promotional_price', 'priority'
+        ):
+            for price_group_id in groups.get(promo['id']) or [None]:
+                rows.append(ActivePromotion(
+                    promotion_id=promo['id'],
+                    content_type_id=promo['content_type_id'],
+                    object_id=promo['object_id'],
+                    product_id=promo['product_id'],
+                    price_group_id=price_group_id,
+                    start_date=promo['start_date'],
+                    end_date=promo['end_date'],
+                    min_quantity=promo['min_quantity'],
+                    max_quantity=promo['max_quantity'],
+                    promotional_price=promo['promotional_price'],
+                    priority=promo['priority']
+                ))
+        return rows
+
+
+__all__ = ['PromotionActivationService']
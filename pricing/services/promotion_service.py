@@ -438,6 +438,11 @@ class PromotionService:
                     'start_date': promo.start_date
                 })
 
+            # NEW: Nightly rebuild of the materialised active promotions
+            from .promotion_activation import PromotionActivationService
+            refresh_stats = PromotionActivationService.refresh()
+            management_data['active_promotion_rows'] = refresh_stats['rows']
+
             return Result.success(
                 data=management_data,
                 msg=f'Promotion lifecycle managed: {management_data["expired_deactivated"]} expired, {len(management_data["warnings"])} warnings'
@@ -482,6 +487,21 @@ class PromotionService:
     def _find_valid_promotions(location, product, quantity, date, customer) -> Result:
         """Find all valid promotions for given criteria - BUGFIXED"""
         try:
+            # NEW: Materialised table with pre-expanded customer-group eligibility
+            if date >= timezone.now().date():
+                from ..models import ActivePromotion
+                price_group_id = getattr(customer, 'price_group_id', None) if customer else None
+                rows = ActivePromotion.objects.matching(
+                    location, product, quantity, date,
+                    price_group_id=price_group_id, check_max_quantity=True
+                ).select_related('promotion')
+
+                valid_promotions = list({row.promotion_id: row.promotion for row in rows}.values())
+                return Result.success(
+                    data={'promotions': valid_promotions},
+                    msg=f'Found {len(valid_promotions)} valid promotions'
+                )
+
             # FIXED: Use correct field names from PromotionalPrice model
             promotions = PromotionalPrice.objects.filter(
                 # FIXED: Use GenericForeignKey lookup instead of direct location field
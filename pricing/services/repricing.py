@@ -0,0 +1,399 @@
+# pricing/services/repricing.py - COST-DRIVEN REPRICING PIPELINE
+
+import csv
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from core.utils.decimal_utils import get_currency_decimal_places, round_currency
+from core.utils.result import Result
+
+from ..models import PackagingPrice, PendingReprice, ProductPrice
+from .price_book import PriceBookService
+
+logger = logging.getLogger(__name__)
+
+
+class RepricingService:
+    """
+    Recompute MARKUP/AUTO prices after cost changes
+
+    Incoming movements report cost changes through
+    MovementService._trigger_pricing_update -> record_cost_changes(), which
+    marks the products in PendingReprice and schedules a 'pricing.reprice'
+    job. Further changes of the same product only move its timestamp, so a
+    product is repriced once its cost has been quiet for DEBOUNCE - or,
+    while it keeps changing, once it has waited MAX_WAIT since the first
+    change.
+
+    reprice() applies the same formulas as ProductPrice.calculate_effective_price
+    with a fixed number of queries per batch and one bulk_update per model.
+    With dry_run=True nothing is written and the price deltas are returned.
+    """
+
+    JOB_TYPE = 'pricing.reprice'
+    DEBOUNCE = timedelta(minutes=5)
+    MAX_WAIT = timedelta(minutes=30)
+    BATCH_SIZE = 500
+    MARKUP_METHODS = ('MARKUP', 'AUTO')
+
+    REPORT_FIELDS = [
+        'kind', 'id', 'product_id', 'product_code', 'packaging_id', 'location_type', 'location_id',
+        'pricing_method', 'basis', 'old_price', 'new_price', 'change', 'change_pct',
+    ]
+
+    # =====================================================
+    # COLLECTION (called from inventory)
+    # =====================================================
+
+    @staticmethod
+    def record_cost_changes(product_ids: Iterable[int]) -> int:
+        """Queue products for repricing - call inside the movement transaction"""
+        product_ids = set(product_ids)
+        if not product_ids:
+            return 0
+
+        now = timezone.now()
+        PendingReprice.objects.bulk_create(
+            [PendingReprice(product_id=product_id, first_changed_at=now, last_changed_at=now)
+             for product_id in product_ids],
+            ignore_conflicts=True
+        )
+        PendingReprice.objects.filter(product_id__in=product_ids).update(last_changed_at=now)
+
+        RepricingService.schedule(now)
+        return len(product_ids)
+
+    @staticmethod
+    def schedule(now=None):
+        """One job per DEBOUNCE window, due a full window after the window ends"""
+        from core.services.job_queue import JobQueue
+
+        now = now or timezone.now()
+        window = int(RepricingService.DEBOUNCE.total_seconds())
+        bucket = int(now.timestamp()) // window
+        run_at = datetime.fromtimestamp((bucket + 2) * window, tz=dt_timezone.utc)
+
+        return JobQueue.enqueue(
+            RepricingService.JOB_TYPE,
+            payload={'bucket': bucket},
+            # Unordered - every job drains all due rows, so a failed bucket must not block later ones
+            ordering_key='',
+            idempotency_key=f"{RepricingService.JOB_TYPE}:{bucket}",
+            delay=run_at - now
+        )
+
+    # =====================================================
+    # PROCESSING
+    # =====================================================
+
+    @staticmethod
+    def process_pending(dry_run: bool = False, debounce: Optional[timedelta] = None,
+                        max_wait: Optional[timedelta] = None) -> Result:
+        """Reprice every product quiet for the debounce period or waiting longer than max_wait"""
+        now = timezone.now()
+        cutoff = now - (RepricingService.DEBOUNCE if debounce is None else debounce)
+        max_wait_cutoff = now - (RepricingService.MAX_WAIT if max_wait is None else max_wait)
+        product_ids = list(
+            PendingReprice.objects.due(cutoff, max_wait_cutoff).order_by('product_id').values_list(
+                'product_id', flat=True
+            )
+        )
+
+        result = RepricingService.reprice(product_ids, dry_run=dry_run)
+        if result.ok and not dry_run and product_ids:
+            processed = PendingReprice.objects.filter(product_id__in=product_ids)
+            processed.filter(last_changed_at__lte=cutoff).delete()
+            # Still changing - queued again with a fresh max-wait window
+            processed.filter(last_changed_at__gt=cutoff).update(first_changed_at=now)
+        return result
+
+    @staticmethod
+    def reprice(product_ids: Optional[Iterable[int]] = None, locations=None, dry_run: bool = False) -> Result:
+        """
+        Recompute MARKUP/AUTO product and packaging prices
+
+        Args:
+            product_ids: Products to reprice (None = every product with a markup-based price)
+            locations: Limit to these location objects
+            dry_run: Report deltas without writing
+
+        Returns:
+            Result with counts and the list of price changes
+        """
+        try:
+            if product_ids is None:
+                product_ids = RepricingService._markup_products()
+            product_ids = sorted(set(product_ids))
+
+            location_keys = None
+            if locations is not None:
+                location_keys = {PriceBookService.location_key(location) for location in locations}
+
+            summary = {
+                'dry_run': dry_run,
+                'products': len(product_ids),
+                'product_prices': 0,
+                'packaging_prices': 0,
+                'changes': [],
+            }
+
+            batch_size = RepricingService.BATCH_SIZE
+            for start in range(0, len(product_ids), batch_size):
+                changes = RepricingService._reprice_batch(
+                    product_ids[start:start + batch_size], location_keys, dry_run
+                )
+                for change in changes:
+                    summary[f"{change['kind']}s"] += 1
+                summary['changes'].extend(changes)
+
+            logger.info(
+                f"Repricing{' (dry run)' if dry_run else ''}: {summary['products']} products, "
+                f"{summary['product_prices']} product prices, {summary['packaging_prices']} packaging prices changed"
+            )
+            return Result.success(
+                summary,
+                f"{len(summary['changes'])} price changes{' (dry run)' if dry_run else ''}"
+            )
+
+        except Exception as e:
+            logger.error(f"Repricing failed: {e}")
+            return Result.error('REPRICING_ERROR', f'Repricing failed: {str(e)}')
+
+    @staticmethod
+    def export_csv(stream, changes: List[Dict]) -> int:
+        writer = csv.DictWriter(stream, fieldnames=RepricingService.REPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for change in changes:
+            writer.writerow(change)
+        return len(changes)
+
+    # =====================================================
+    # BATCH ENGINE
+    # =====================================================
+
+    @staticmethod
+    def _reprice_batch(product_ids: List[int], location_keys, dry_run: bool) -> List[Dict]:
+        """
+        One transaction per batch - price rows are locked from read to bulk_update
+
+        An admin edit committed before the lock is read and repriced from;
+        one made meanwhile waits, so neither overwrites the other. Call
+        outside a transaction (the pricing.reprice job is registered with
+        atomic=False) - inside one, the locks of every batch are held until
+        the caller commits.
+        """
+        with transaction.atomic():
+            return RepricingService._reprice_rows(product_ids, location_keys, dry_run)
+
+    @staticmethod
+    def _reprice_rows(product_ids: List[int], location_keys, dry_run: bool) -> List[Dict]:
+        """Fixed number of queries per batch - one per model/aggregate, plus one per location model"""
+        now = timezone.now()
+        places = get_currency_decimal_places()  # once per batch - round_currency looks it up per call
+
+        prices = ProductPrice.objects.filter(product_id__in=product_ids, is_active=True).only(
+            'id', 'content_type', 'object_id', 'product', 'pricing_method',
+            'markup_percentage', 'effective_price'
+        ).order_by('id')
+        packaging_prices = PackagingPrice.objects.filter(
+            packaging__product_id__in=product_ids,
+            pricing_method__in=RepricingService.MARKUP_METHODS,
+            is_active=True
+        ).select_related('packaging').only(
+            'id', 'content_type', 'object_id', 'packaging', 'pricing_method',
+            'markup_percentage', 'discount_percentage', 'price',
+            'packaging__product', 'packaging__conversion_factor'
+        ).order_by('id')
+
+        if not dry_run:
+            # Held until the bulk_update below commits
+            prices = prices.select_for_update()
+            packaging_prices = packaging_prices.select_for_update(of=('self',))
+        prices = list(prices)
+        packaging_prices = list(packaging_prices)
+
+        if location_keys is not None:
+            prices = [p for p in prices if (p.content_type_id, p.object_id) in location_keys]
+            packaging_prices = [p for p in packaging_prices if (p.content_type_id, p.object_id) in location_keys]
+
+        markup_prices = [p for p in prices if p.pricing_method in RepricingService.MARKUP_METHODS]
+        if not markup_prices and not packaging_prices:
+            return []
+
+        locations = RepricingService._load_locations(
+            {(p.content_type_id, p.object_id) for p in markup_prices}
+        )
+        costs = RepricingService._load_costs(product_ids, markup_prices)
+        from products.models import Product
+        codes = dict(Product.objects.filter(id__in=product_ids).values_list('id', 'code'))
+
+        changes = []
+        changed_prices = []
+        for price in markup_prices:
+            location_key = (price.content_type_id, price.object_id)
+            cost_price = costs.get(location_key + (price.product_id,), costs.get(('fallback', price.product_id)))
+
+            if price.pricing_method == 'MARKUP':
+                if not price.markup_percentage:
+                    continue
+                markup = price.markup_percentage
+            else:
+                location = locations.get(location_key)
+                if location is None or not hasattr(location, 'default_markup_percentage'):
+                    markup = None
+                else:
+                    markup = getattr(location, 'default_markup_percentage', 30)
+
+            if cost_price and cost_price > 0 and markup is not None:
+                new_price = round_currency(cost_price * (1 + markup / 100), places=places)
+            else:
+                new_price = round_currency(Decimal('0'), places=places)
+
+            if new_price == price.effective_price:
+                continue
+
+            changes.append(RepricingService._change(
+                'product_price', price, price.product_id, codes, cost_price, price.effective_price, new_price
+            ))
+            price.effective_price = new_price
+            price.last_cost_update = now
+            price.updated_at = now
+            changed_prices.append(price)
+
+        # Packaging prices follow the (new) base unit price of their location
+        unit_prices = {(p.content_type_id, p.object_id, p.product_id): p.effective_price for p in prices}
+        changed_packaging = []
+        for packaging_price in packaging_prices:
+            product_id = packaging_price.packaging.product_id
+            unit_price = unit_prices.get((packaging_price.content_type_id, packaging_price.object_id, product_id))
+            if not unit_price or unit_price <= 0:
+                continue
+            if packaging_price.pricing_method == 'MARKUP' and not packaging_price.markup_percentage:
+                continue
+
+            new_price = unit_price * packaging_price.packaging.conversion_factor
+            if packaging_price.pricing_method == 'MARKUP':
+                new_price *= 1 + packaging_price.markup_percentage / 100
+            new_price = round_currency(
+                new_price * (1 - (packaging_price.discount_percentage or 0) / 100), places=places
+            )
+
+            if new_price == packaging_price.price:
+                continue
+
+            changes.append(RepricingService._change(
+                'packaging_price', packaging_price, product_id, codes, unit_price, packaging_price.price, new_price
+            ))
+            packaging_price.price = new_price
+            packaging_price.updated_at = now
+            changed_packaging.append(packaging_price)
+
+        if not dry_run and (changed_prices or changed_packaging):
+            ProductPrice.objects.bulk_update(
+                changed_prices, ['effective_price', 'last_cost_update', 'updated_at'],
+                batch_size=RepricingService.BATCH_SIZE
+            )
+            PackagingPrice.objects.bulk_update(
+                changed_packaging, ['price', 'updated_at'], batch_size=RepricingService.BATCH_SIZE
+            )
+
+            # bulk_update sends no signals - bump the price books ourselves
+            for content_type_id, object_id in {
+                (p.content_type_id, p.object_id) for p in changed_prices + changed_packaging
+            }:
+                PriceBookService.invalidate(content_type_id, object_id)
+
+        return changes
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _markup_products() -> List[int]:
+        product_ids = set(ProductPrice.objects.filter(
+            pricing_method__in=RepricingService.MARKUP_METHODS, is_active=True
+        ).values_list('product_id', flat=True))
+        product_ids.update(PackagingPrice.objects.filter(
+            pricing_method__in=RepricingService.MARKUP_METHODS, is_active=True
+        ).values_list('packaging__product_id', flat=True))
+        return sorted(product_ids)
+
+    @staticmethod
+    def _load_locations(location_keys) -> Dict:
+        by_type = defaultdict(set)
+        for content_type_id, object_id in location_keys:
+            by_type[content_type_id].add(object_id)
+
+        locations = {}
+        for content_type_id, object_ids in by_type.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model is None:
+                continue
+            for pk, location in model._default_manager.in_bulk(list(object_ids)).items():
+                locations[(content_type_id, pk)] = location
+        return locations
+
+    @staticmethod
+    def _load_costs(product_ids: List[int], prices: List[ProductPrice]) -> Dict:
+        """
+        Cost basis as in ProductPrice.get_current_cost_price
+
+        (ct, location_id, product_id) -> InventoryItem.avg_cost, and
+        ('fallback', product_id) -> Product.weighted_avg_cost for locations
+        without an inventory item.
+        """
+        from inventory.models import InventoryItem, InventoryLocation
+
+        inventory_ct = ContentType.objects.get_for_model(InventoryLocation).pk
+        location_ids = {p.object_id for p in prices if p.content_type_id == inventory_ct}
+
+        costs = {}
+        if location_ids:
+            for location_id, product_id, avg_cost in InventoryItem.objects.filter(
+                location_id__in=location_ids, product_id__in=product_ids
+            ).values_list('location_id', 'product_id', 'avg_cost'):
+                costs[(inventory_ct, location_id, product_id)] = avg_cost
+
+        for row in InventoryItem.objects.filter(
+            product_id__in=product_ids, current_qty__gt=0
+        ).values('product_id').annotate(
+            total_qty=Sum('current_qty'),
+            total_value=Sum(F('current_qty') * F('avg_cost'))
+        ).order_by():
+            if row['total_qty'] and row['total_qty'] > 0:
+                costs[('fallback', row['product_id'])] = (
+                    (row['total_value'] or Decimal('0')) / row['total_qty']
+                ).quantize(Decimal('0.0001'))
+
+        return costs
+
+    @staticmethod
+    def _change(kind: str, price, product_id: int, codes: Dict, basis, old_price, new_price) -> Dict:
+        change = new_price - (old_price or Decimal('0'))
+        return {
+            'kind': kind,
+            'id': price.pk,
+            'product_id': product_id,
+            'product_code': codes.get(product_id, ''),
+            'packaging_id': getattr(price, 'packaging_id', None),
+            'location_type': price.content_type_id,
+            'location_id': price.object_id,
+            'pricing_method': price.pricing_method,
+            'basis': basis,
+            'old_price': old_price,
+            'new_price': new_price,
+            'change': change,
+            'change_pct': round(change / old_price * 100, 2) if old_price else None,
+        }
+
+
+__all__ = ['RepricingService']
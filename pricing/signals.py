@@ -0,0 +1,69 @@
+# pricing/signals.py - PRICE BOOK INVALIDATION + ACTIVE PROMOTION SYNC
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    ProductPrice, ProductPriceByGroup,
+    ProductStepPrice, PromotionalPrice, PackagingPrice
+)
+from .services.price_book import PriceBookService
+from .services.promotion_activation import PromotionActivationService
+
+LOCATION_PRICE_MODELS = (
+    ProductPrice,
+    ProductPriceByGroup,
+    ProductStepPrice,
+    PromotionalPrice,
+    PackagingPrice,
+)
+
+
+def invalidate_price_book(sender, instance, **kwargs):
+    """Any saved/deleted price row bumps its location's price book version"""
+    PriceBookService.invalidate(instance.content_type_id, instance.object_id)
+
+
+for model in LOCATION_PRICE_MODELS:
+    post_save.connect(invalidate_price_book, sender=model, dispatch_uid=f'price_book_save_{model.__name__}')
+    post_delete.connect(invalidate_price_book, sender=model, dispatch_uid=f'price_book_delete_{model.__name__}')
+
+
+@receiver(post_save, sender=PromotionalPrice, dispatch_uid='active_promotions_save')
+def sync_active_promotion(sender, instance, **kwargs):
+    """Rows of a deleted promotion go with it (CASCADE)"""
+    PromotionActivationService.sync([instance.pk])
+
+
+@receiver(m2m_changed, sender=PromotionalPrice.customer_groups.through, dispatch_uid='price_book_promo_groups')
+def promotion_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            PriceBookService.invalidate(instance.content_type_id, instance.object_id)
+            PromotionActivationService.sync([instance.pk])
+        return
+
+    # Changed from the PriceGroup side - resync every affected promotion
+    if action == 'pre_clear':
+        # Rows must be read before the links disappear; resync once cleared
+        instance._cleared_promotion_ids = list(
+            PromotionalPrice.objects.filter(customer_groups=instance).values_list('pk', flat=True)
+        )
+        return
+    elif action == 'post_clear':
+        promotion_ids = getattr(instance, '_cleared_promotion_ids', [])
+    elif action in ('post_add', 'post_remove'):
+        promotion_ids = list(pk_set)
+    else:
+        return
+
+    promotions = PromotionalPrice.objects.filter(pk__in=promotion_ids)
+    for content_type_id, object_id in promotions.values_list('content_type_id', 'object_id').distinct():
+        PriceBookService.invalidate(content_type_id, object_id)
+    PromotionActivationService.sync(promotion_ids)
+
+
+@receiver(post_save, sender='inventory.InventoryLocation', dispatch_uid='price_book_location')
+def invalidate_location_settings(sender, instance, **kwargs):
+    """default_markup_percentage drives the fallback price"""
+    PriceBookService.invalidate_location(instance)
@@ -0,0 +1,14 @@
+# pricing/urls.py
+from django.urls import path
+from . import views
+
+app_name = 'pricing'
+
+urlpatterns = [
+    # Catalog-wide pricing audit download
+    path('audit/export/', views.PricingAuditExportView.as_view(), name='pricing_audit_export'),
+
+    # POS price snapshots with delta sync
+    path('pos/<str:code>/snapshot/', views.POSPriceSnapshotView.as_view(), name='pos_price_snapshot'),
+    path('pos/<str:code>/delta/', views.POSPriceDeltaView.as_view(), name='pos_price_delta'),
+]
@@ -1,3 +1,110 @@
-from django.shortcuts import render
+# pricing/views.py
+import logging
 
-# Create your views here.
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.generic import View
+
+from inventory.models import InventoryLocation
+from inventory.models.locations import POSLocation
+from .services import PriceSnapshotService, PricingAuditService
+
+logger = logging.getLogger(__name__)
+
+
+class PricingAuditExportView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """
+    Downloadable pricing audit (coverage gaps, margin, markup, promo overlap)
+
+    GET ?location=CODE[,CODE...]&format=csv|json&only_issues=1
+    Without location every active inventory location is audited.
+    """
+
+    permission_required = 'pricing.view_productprice'
+
+    def get(self, request):
+        codes = [code.strip().upper() for code in request.GET.get('location', '').split(',') if code.strip()]
+        locations = InventoryLocation.objects.filter(is_active=True).order_by('code')
+        if codes:
+            locations = InventoryLocation.objects.filter(code__in=codes).order_by('code')
+            missing = set(codes) - {location.code for location in locations}
+            if missing:
+                return JsonResponse(
+                    {'success': False, 'message': f"Locations not found: {', '.join(sorted(missing))}"},
+                    status=404
+                )
+
+        only_issues = request.GET.get('only_issues') in ('1', 'true', 'yes')
+        reports = PricingAuditService.audit(locations, only_issues=only_issues)
+
+        # Anything but json falls back to CSV - name the file after what is actually written
+        if request.GET.get('format', 'csv').lower() == 'json':
+            extension = 'json'
+            response = JsonResponse({
+                'success': True,
+                'reports': [{'summary': report.summary, 'rows': report.rows} for report in reports],
+            }, encoder=DjangoJSONEncoder)
+        else:
+            extension = 'csv'
+            response = HttpResponse(content_type='text/csv')
+            PricingAuditService.export_csv(response, reports)
+
+        filename = f"pricing_audit_{timezone.now():%Y%m%d_%H%M%S}.{extension}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class POSPriceSnapshotMixin(LoginRequiredMixin, PermissionRequiredMixin):
+    """Resolve the POS till by code - prices are kept per inventory location"""
+
+    permission_required = 'pricing.view_productprice'
+
+    def get_snapshot(self, code):
+        pos = get_object_or_404(POSLocation.objects.select_related('location'), code=code.upper())
+        if not pos.is_active:
+            raise Http404(f"POS {pos.code} is not active")
+        return pos, PriceSnapshotService.ensure_current(pos.location)
+
+
+class POSPriceSnapshotView(POSPriceSnapshotMixin, View):
+    """
+    Full gzipped price snapshot for a POS terminal
+
+    GET /pricing/pos/<code>/snapshot/ - the terminal keeps the returned
+    version and asks for deltas from it afterwards.
+    """
+
+    def get(self, request, code):
+        pos, snapshot = self.get_snapshot(code)
+
+        response = HttpResponse(content_type='application/gzip')
+        PriceSnapshotService.export(snapshot, response)
+        response['Content-Disposition'] = (
+            f'attachment; filename="prices_{pos.code}_v{snapshot.version}.json.gz"'
+        )
+        response['X-Snapshot-Version'] = str(snapshot.version)
+        return response
+
+
+class POSPriceDeltaView(POSPriceSnapshotMixin, View):
+    """
+    Price changes since a snapshot version
+
+    GET /pricing/pos/<code>/delta/?since=N - full_required=true means the
+    terminal must download the full snapshot again.
+    """
+
+    def get(self, request, code):
+        try:
+            since = int(request.GET.get('since', 0))
+        except (TypeError, ValueError):
+            return JsonResponse({'success': False, 'message': 'since must be an integer version'}, status=400)
+        if since < 0:
+            return JsonResponse({'success': False, 'message': 'since must not be negative'}, status=400)
+
+        pos, snapshot = self.get_snapshot(code)
+        delta = PriceSnapshotService.delta(snapshot, since)
+        return JsonResponse({'success': True, 'pos': pos.code, **delta}, encoder=DjangoJSONEncoder)
@@ -9,7 +9,7 @@ Products models package - LIFECYCLE VERSION
 """
 
 # Core product models
-from .products import Product, ProductPLU, ProductLifecycleChoices
+from .products import Product, ProductPLU, ProductLifecycleChoices, SELLABLE_STATUSES
 
 # Packaging & Barcodes
 from .packaging import ProductPackaging, ProductBarcode
@@ -20,6 +20,7 @@ __all__ = [
     'Product',
     'ProductPLU',
     'ProductLifecycleChoices',
+    'SELLABLE_STATUSES',
 
     # Опаковки и баркодове
     'ProductPackaging',
@@ -351,12 +351,19 @@ class ProductBarcode(models.Model):
 
         Returns: dict с декодирани данни или None
         """
-        if self.barcode_type != self.WEIGHT or len(self.barcode) != 13:
+        if self.barcode_type != self.WEIGHT:
+            return None
+        return self.decode_weight(self.barcode)
+
+    @staticmethod
+    def decode_weight(barcode: str) -> Optional[Dict[str, Any]]:
+        """Декодира сканиран 28PPPPPWWWWWC код без запис в базата"""
+        if not barcode or len(barcode) != 13 or not barcode.startswith('28'):
             return None
 
         try:
-            product_code = self.barcode[2:7]
-            weight_str = self.barcode[7:12]
+            product_code = barcode[2:7]
+            weight_str = barcode[7:12]
             weight_value = int(weight_str)
 
             # Обикновено е в грамове, но може да е и в стотинки (за цена)
@@ -366,7 +373,7 @@ class ProductBarcode(models.Model):
                 'product_code': product_code,
                 'weight_value': weight_value,
                 'weight_kg': weight_kg,
-                'check_digit': self.barcode[12]
+                'check_digit': barcode[12]
             }
         except (ValueError, IndexError):
             return None
@@ -20,6 +20,10 @@ class ProductLifecycleChoices(models.TextChoices):
     ARCHIVED = 'ARCHIVED', _('Archived')
 
 
+# Lifecycle stages a product can be sold in (sales_blocked aside)
+SELLABLE_STATUSES = (ProductLifecycleChoices.ACTIVE, ProductLifecycleChoices.PHASE_OUT)
+
+
 # === MANAGERS ===
 class ProductManager(models.Manager):
     """Enhanced Product Manager"""
@@ -36,10 +40,7 @@ class ProductManager(models.Manager):
     def sellable(self):
         """Get products that can be sold"""
         return self.filter(
-            lifecycle_status__in=[
-                ProductLifecycleChoices.ACTIVE,
-                ProductLifecycleChoices.PHASE_OUT
-            ],
+            lifecycle_status__in=SELLABLE_STATUSES,
             sales_blocked=False
         )
 
@@ -314,18 +315,9 @@ class Product(models.Model):
         Calculate weighted average cost across all locations
         Replaces old current_avg_cost field
         """
-        from inventory.models import InventoryItem
-        items = InventoryItem.objects.filter(
-            product=self,
-            current_qty__gt=0
-        )
-
-        total_value = Decimal('0')
-        total_qty = Decimal('0')
-
-        for item in items:
-            total_value += item.current_qty * item.avg_cost
-            total_qty += item.current_qty
+        totals = self._positive_stock_totals()
+        total_value = totals['total_value'] or Decimal('0')
+        total_qty = totals['total_qty'] or Decimal('0')
 
         if total_qty > 0:
             return (total_value / total_qty).quantize(Decimal('0.0001'))
@@ -339,18 +331,22 @@ class Product(models.Model):
     @property
     def stock_value(self) -> Decimal:
         """Calculate total stock value across all locations"""
+        total_value = self._positive_stock_totals()['total_value'] or Decimal('0')
+        return Decimal(total_value).quantize(Decimal('0.01'))
+
+    def _positive_stock_totals(self) -> Dict:
+        """Quantity and value of positive stock - one aggregate query"""
+        from django.db.models import F, Sum
         from inventory.models import InventoryItem
-        items = InventoryItem.objects.filter(
+
+        return InventoryItem.objects.filter(
             product=self,
             current_qty__gt=0
+        ).aggregate(
+            total_qty=Sum('current_qty'),
+            total_value=Sum(F('current_qty') * F('avg_cost'))
         )
 
-        total_value = Decimal('0')
-        for item in items:
-            total_value += item.current_qty * item.avg_cost
-
-        return total_value.quantize(Decimal('0.01'))
-
     # === HELPER METHODS ===
 
     def get_stock_info(self, location=None) -> Dict:
@@ -412,13 +408,7 @@ class Product(models.Model):
     @property
     def is_sellable(self) -> bool:
         """Can this product be sold?"""
-        return (
-                self.lifecycle_status in [
-            ProductLifecycleChoices.ACTIVE,
-            ProductLifecycleChoices.PHASE_OUT
-        ] and
-                not self.sales_blocked
-        )
+        return self.lifecycle_status in SELLABLE_STATUSES and not self.sales_blocked
 
     @property
     def is_purchasable(self) -> bool:
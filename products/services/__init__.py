@@ -6,16 +6,20 @@ Services:
 - ProductService: Basic product operations (search, lookup)
 - ValidationService: Product validation logic
 - LifecycleService: Lifecycle management operations
+- BarcodeIndexService: In-memory barcode resolution
 """
 
 from .product_service import ProductService
 from .validation_service import ProductValidationService
 from .lifecycle_service import ProductLifecycleService
+from .barcode_index import BarcodeIndexService, ScanResult
 
 __all__ = [
     'ProductService',           # Existing - enhanced
     'ProductValidationService', # New
     'ProductLifecycleService',  # New
+    'BarcodeIndexService',
+    'ScanResult',
 ]
 
 # Version info
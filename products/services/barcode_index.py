@@ -0,0 +1,187 @@
+# products/services/barcode_index.py - IN-MEMORY BARCODE RESOLUTION
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Dict, Optional
+
+from core.services.version_stamp import VersionStamp
+from ..models import ProductBarcode, ProductPLU, SELLABLE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BarcodeEntry:
+    """What one barcode (or weight prefix) stands for"""
+    product_id: int
+    packaging_id: Optional[int]
+    conversion_factor: Decimal
+    barcode_type: str
+    sellable: bool
+
+
+@dataclass(frozen=True)
+class ScanResult:
+    """Resolved scan - quantity is in base units (kg for weight barcodes)"""
+    barcode: str
+    product_id: int
+    packaging_id: Optional[int]
+    conversion_factor: Decimal
+    quantity: Decimal
+    barcode_type: str
+    sellable: bool
+    weight: Optional[Dict] = None
+
+    @property
+    def is_weight(self) -> bool:
+        return self.weight is not None
+
+
+class BarcodeIndex:
+    """
+    Immutable barcode -> product/packaging map
+
+    Weight barcodes (28PPPPPWWWWWC) are keyed by their 7-character
+    prefix '28PPPPP' - from active PLU codes and registered WEIGHT barcodes.
+    """
+
+    __slots__ = ('version', 'built_at', 'barcodes', 'weight_prefixes')
+
+    def __init__(self, version, barcodes, weight_prefixes):
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'built_at', time.monotonic())
+        object.__setattr__(self, 'barcodes', MappingProxyType(barcodes))
+        object.__setattr__(self, 'weight_prefixes', MappingProxyType(weight_prefixes))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('BarcodeIndex is immutable')
+
+    def resolve(self, barcode: str) -> Optional[ScanResult]:
+        """One dict probe (plus the weight prefix probe for 28... codes)"""
+        barcode = (barcode or '').strip()
+
+        entry = self.barcodes.get(barcode)
+        if entry is not None and entry.barcode_type != ProductBarcode.WEIGHT:
+            return ScanResult(
+                barcode=barcode,
+                product_id=entry.product_id,
+                packaging_id=entry.packaging_id,
+                conversion_factor=entry.conversion_factor,
+                quantity=entry.conversion_factor,
+                barcode_type=entry.barcode_type,
+                sellable=entry.sellable
+            )
+
+        weight = ProductBarcode.decode_weight(barcode)
+        if weight is None:
+            return None
+
+        entry = self.weight_prefixes.get(barcode[:7]) or entry
+        if entry is None:
+            return None
+
+        return ScanResult(
+            barcode=barcode,
+            product_id=entry.product_id,
+            packaging_id=None,
+            conversion_factor=Decimal('1'),
+            quantity=Decimal(weight['weight_value']) / 1000,
+            barcode_type=ProductBarcode.WEIGHT,
+            sellable=entry.sellable,
+            weight=weight
+        )
+
+
+class BarcodeIndexService:
+    """
+    Process-wide BarcodeIndex with a version stamp shared by all processes
+
+    Signals on ProductBarcode, ProductPackaging, ProductPLU and Product
+    (products.signals) bump the version; the next resolve() rebuilds the
+    index with two queries. The index is also rebuilt after MAX_AGE
+    seconds to pick up queryset.update() changes that send no signals.
+    """
+
+    MAX_AGE = 300
+    VERSIONS = VersionStamp('barcode_index')
+
+    _index: Optional[BarcodeIndex] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def resolve(barcode: str, only_sellable: bool = False) -> Optional[ScanResult]:
+        result = BarcodeIndexService.get_index().resolve(barcode)
+        if result is None or (only_sellable and not result.sellable):
+            return None
+        return result
+
+    @staticmethod
+    def get_index() -> BarcodeIndex:
+        version = BarcodeIndexService.VERSIONS.current()
+        index = BarcodeIndexService._index
+        if index is not None and BarcodeIndexService._is_fresh(index, version):
+            return index
+
+        with BarcodeIndexService._lock:
+            index = BarcodeIndexService._index
+            if index is None or not BarcodeIndexService._is_fresh(index, version):
+                index = BarcodeIndexService.build(version)
+                BarcodeIndexService._index = index
+        return index
+
+    @staticmethod
+    def build(version: int = 0) -> BarcodeIndex:
+        barcodes = {}
+        weight_prefixes = {}
+
+        rows = ProductBarcode.objects.filter(is_active=True).values_list(
+            'barcode', 'barcode_type', 'product_id', 'packaging_id', 'packaging__conversion_factor',
+            'product__lifecycle_status', 'product__sales_blocked'
+        )
+        for barcode, barcode_type, product_id, packaging_id, factor, status, blocked in rows.iterator():
+            entry = BarcodeEntry(
+                product_id=product_id,
+                packaging_id=packaging_id,
+                conversion_factor=factor or Decimal('1'),
+                barcode_type=barcode_type,
+                sellable=status in SELLABLE_STATUSES and not blocked
+            )
+            barcodes[barcode] = entry
+            if barcode_type == ProductBarcode.WEIGHT:
+                weight_prefixes.setdefault(barcode[:7], entry)
+
+        # PLU codes win over registered weight barcodes - Meta.ordering puts the preferred PLU first
+        plu_prefixes = {}
+        plu_rows = ProductPLU.objects.filter(is_active=True).values_list(
+            'plu_code', 'product_id', 'product__lifecycle_status', 'product__sales_blocked'
+        )
+        for plu_code, product_id, status, blocked in plu_rows.iterator():
+            plu_code = plu_code.strip()
+            if not plu_code.isdigit() or len(plu_code) > 5:
+                continue
+            plu_prefixes.setdefault(f"28{plu_code.zfill(5)}", BarcodeEntry(
+                product_id=product_id,
+                packaging_id=None,
+                conversion_factor=Decimal('1'),
+                barcode_type=ProductBarcode.WEIGHT,
+                sellable=status in SELLABLE_STATUSES and not blocked
+            ))
+        weight_prefixes.update(plu_prefixes)
+
+        logger.debug(f"Built barcode index: {len(barcodes)} barcodes, {len(weight_prefixes)} weight prefixes")
+        return BarcodeIndex(version, barcodes, weight_prefixes)
+
+    @staticmethod
+    def invalidate():
+        BarcodeIndexService.VERSIONS.bump()
+
+    @staticmethod
+    def _is_fresh(index: BarcodeIndex, version: int) -> bool:
+        return index.version == version and time.monotonic() - index.built_at < BarcodeIndexService.MAX_AGE
+
+
+__all__ = ['BarcodeIndex', 'BarcodeIndexService', 'ScanResult']
@@ -36,27 +36,13 @@ class ProductService:
 
     @staticmethod
     def find_by_barcode(barcode: str, only_sellable: bool = True) -> Optional[Product]:
-        """Find product by barcode with lifecycle filtering"""
-        try:
-            base_query = ProductBarcode.objects.select_related('product').filter(
-                barcode=barcode,
-                is_active=True
-            )
-
-            if only_sellable:
-                base_query = base_query.filter(
-                    product__lifecycle_status__in=[
-                        ProductLifecycleChoices.ACTIVE,
-                        ProductLifecycleChoices.PHASE_OUT
-                    ],
-                    product__sales_blocked=False
-                )
-
-            barcode_obj = base_query.first()
-            return barcode_obj.product if barcode_obj else None
+        """Find product by barcode with lifecycle filtering - resolved from the in-memory index"""
+        from .barcode_index import BarcodeIndexService
 
-        except ProductBarcode.DoesNotExist:
+        scan = BarcodeIndexService.resolve(barcode, only_sellable=only_sellable)
+        if scan is None:
             return None
+        return Product.objects.filter(pk=scan.product_id).first()
 
     @staticmethod
     def search_products(
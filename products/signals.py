@@ -0,0 +1,18 @@
+# products/signals.py - BARCODE INDEX INVALIDATION
+
+from django.db.models.signals import post_delete, post_save
+
+from .models import Product, ProductBarcode, ProductPackaging, ProductPLU
+from .services.barcode_index import BarcodeIndexService
+
+# Product: lifecycle_status / sales_blocked feed the "sellable" flag
+BARCODE_SOURCE_MODELS = (ProductBarcode, ProductPackaging, ProductPLU, Product)
+
+
+def invalidate_barcode_index(sender, **kwargs):
+    BarcodeIndexService.invalidate()
+
+
+for model in BARCODE_SOURCE_MODELS:
+    post_save.connect(invalidate_barcode_index, sender=model, dispatch_uid=f'barcode_index_save_{model.__name__}')
+    post_delete.connect(invalidate_barcode_index, sender=model, dispatch_uid=f'barcode_index_delete_{model.__name__}')
@@ -1,6 +1,9 @@
 from django.apps import AppConfig
 
+
 class PurchasesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'purchases'
 
+    def ready(self):
+        from . import signals  # noqa: F401 - last purchase price maintenance
@@ -0,0 +1,34 @@
+# purchases/management/commands/rebuild_last_purchase_prices.py
+
+from django.core.management.base import BaseCommand, CommandError
+from purchases.services import LastPurchasePriceService
+
+
+class Command(BaseCommand):
+    help = 'Recompute the last purchase price table from approved/completed deliveries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--product',
+            action='append',
+            type=int,
+            help='Product ID, repeatable (default: all products)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['product']:
+                rows = LastPurchasePriceService.refresh_products(options['product'])
+                self.stdout.write(self.style.SUCCESS(
+                    f"Rebuilt {rows} rows for {len(set(options['product']))} products"
+                ))
+                return
+
+            summary = LastPurchasePriceService.rebuild()
+        except Exception as e:
+            raise CommandError(f"Rebuild failed: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {summary['rows']} rows for {summary['products']} products "
+            f"({summary['deleted']} stale rows removed)"
+        ))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('products', '0001_initial'),
+        ('purchases', '0003_alter_deliveryline_received_quantity_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LastPurchasePrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope_key', models.CharField(help_text='partner_ct:partner_id/location_ct:location_id, * = any', max_length=64, verbose_name='Scope')),
+                ('partner_object_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='Partner ID')),
+                ('location_object_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='Location ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Unit Price')),
+                ('document_date', models.DateField(verbose_name='Document Date')),
+                ('document_created_at', models.DateTimeField(verbose_name='Document Created At')),
+                ('delivery_number', models.CharField(blank=True, max_length=50, verbose_name='Delivery Number')),
+                ('partner_name', models.CharField(blank=True, max_length=200, verbose_name='Partner')),
+                ('location_name', models.CharField(blank=True, max_length=200, verbose_name='Location')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('delivery', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='purchases.deliveryreceipt', verbose_name='Delivery Receipt')),
+                ('location_content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype', verbose_name='Location Type')),
+                ('partner_content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype', verbose_name='Partner Type')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='last_purchase_prices', to='products.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Last Purchase Price',
+                'verbose_name_plural': 'Last Purchase Prices',
+                'indexes': [models.Index(fields=['delivery'], name='purchases_l_deliver_4d9d8a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'scope_key'), name='purchases_last_price_scope_uniq')],
+            },
+        ),
+    ]
@@ -8,6 +8,7 @@ Purchases models package - Clean organized structure
 - requests.py: PurchaseRequest заявки (БЕЗ финансови данни)
 - orders.py: PurchaseOrder поръчки (С финансови данни)
 - deliveries.py: DeliveryReceipt доставки (С всички данни)
+- purchase_prices.py: LastPurchasePrice последни покупни цени
 
 ПРИНЦИП: Explicit imports за максимална яснота
 """
@@ -56,6 +57,14 @@ from .deliveries import (
     DeliveryLineManager  # Manager за редове
 )
 
+# =====================
+# PURCHASE PRICE HISTORY (поддържана таблица)
+# =====================
+from .purchase_prices import (
+    LastPurchasePrice,  # Последна покупна цена по обхват
+    LastPurchasePriceManager
+)
+
 # =====================
 # DJANGO AUTO-DISCOVERY EXPORTS
 # =====================
@@ -88,6 +97,10 @@ __all__ = [
     'DeliveryLine',
     'DeliveryReceiptManager',
     'DeliveryLineManager',
+
+    # Purchase price history
+    'LastPurchasePrice',
+    'LastPurchasePriceManager',
 ]
 
 # =====================
@@ -104,6 +117,7 @@ def get_available_models():
         'requests': ['PurchaseRequest', 'PurchaseRequestLine'],
         'orders': ['PurchaseOrder', 'PurchaseOrderLine'],
         'deliveries': ['DeliveryReceipt', 'DeliveryLine'],
+        'purchase_prices': ['LastPurchasePrice'],
         'base': ['BaseDocument', 'BaseDocumentLine'],
         'mixins': ['FinancialMixin', 'PaymentMixin', 'DeliveryMixin', 'FinancialLineMixin']
     }
\ No newline at end of file
@@ -0,0 +1,88 @@
+# purchases/models/purchase_prices.py - LAST PURCHASE PRICE TABLE
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class LastPurchasePriceManager(models.Manager):
+    """Lookups по scope ключ"""
+
+    def for_product(self, product, scope_keys):
+        return self.filter(product=product, scope_key__in=scope_keys)
+
+
+class LastPurchasePrice(models.Model):
+    """
+    Последна покупна цена по продукт и обхват
+
+    Един ред за всяка комбинация (product, scope_key), където scope_key е:
+    - 'P/L' - конкретен доставчик в конкретна локация
+    - '*/L' - всеки доставчик в локацията
+    - 'P/*' - конкретен доставчик във всяка локация
+    - '*/*' - глобално
+
+    Поддържа се от LastPurchasePriceService при одобрение/приключване на
+    доставка - не се редактира ръчно.
+    """
+
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='last_purchase_prices',
+        verbose_name=_('Product')
+    )
+    scope_key = models.CharField(
+        _('Scope'),
+        max_length=64,
+        help_text=_('partner_ct:partner_id/location_ct:location_id, * = any')
+    )
+
+    partner_content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('Partner Type')
+    )
+    partner_object_id = models.PositiveIntegerField(_('Partner ID'), null=True, blank=True)
+    location_content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('Location Type')
+    )
+    location_object_id = models.PositiveIntegerField(_('Location ID'), null=True, blank=True)
+
+    price = models.DecimalField(_('Unit Price'), max_digits=10, decimal_places=2)
+    document_date = models.DateField(_('Document Date'))
+    document_created_at = models.DateTimeField(_('Document Created At'))
+    delivery = models.ForeignKey(
+        'purchases.DeliveryReceipt',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('Delivery Receipt')
+    )
+    delivery_number = models.CharField(_('Delivery Number'), max_length=50, blank=True)
+    partner_name = models.CharField(_('Partner'), max_length=200, blank=True)
+    location_name = models.CharField(_('Location'), max_length=200, blank=True)
+
+    updated_at = models.DateTimeField(_('Updated At'), auto_now=True)
+
+    objects = LastPurchasePriceManager()
+
+    class Meta:
+        verbose_name = _('Last Purchase Price')
+        verbose_name_plural = _('Last Purchase Prices')
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'scope_key'], name='purchases_last_price_scope_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['delivery']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} [{self.scope_key}]: {self.price} ({self.document_date})"
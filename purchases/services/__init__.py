@@ -15,10 +15,12 @@ from .purchase_service import (
     PurchaseOrderService,
     DeliveryReceiptService
 )
+from .last_purchase_price import LastPurchasePriceService
 
 __all__ = [
     'PurchaseDocumentService',
     'PurchaseRequestService',
     'PurchaseOrderService', 
-    'DeliveryReceiptService'
+    'DeliveryReceiptService',
+    'LastPurchasePriceService'
 ]
\ No newline at end of file
@@ -0,0 +1,299 @@
+# purchases/services/last_purchase_price.py - MAINTAINED LAST PURCHASE PRICES
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import DeliveryLine, DeliveryReceipt, LastPurchasePrice
+
+logger = logging.getLogger(__name__)
+
+ANY = '*'
+
+
+class LastPurchasePriceService:
+    """
+    Keep LastPurchasePrice in step with approved/completed deliveries
+
+    Every priced delivery line feeds four rows - (partner, location),
+    (any, location), (partner, any) and (any, any) - and the newest
+    delivery (document_date, then created_at) wins each of them.
+    record_delivery() runs from the purchases signals when a delivery is
+    saved in a recorded status; refresh_products() recomputes rows from the
+    delivery history when a delivery leaves that status or is deleted.
+    """
+
+    RECORDED_STATUSES = ('approved', 'completed')
+    BULK_BATCH_SIZE = 1000
+    REBUILD_CHUNK = 500
+
+    ROW_FIELDS = [
+        'partner_content_type', 'partner_object_id', 'location_content_type', 'location_object_id',
+        'price', 'document_date', 'document_created_at', 'delivery', 'delivery_number',
+        'partner_name', 'location_name', 'updated_at',
+    ]
+
+    # =====================================================
+    # LOOKUP
+    # =====================================================
+
+    @staticmethod
+    def lookup(product, partner=None, location=None, days_limit: int = 365) -> Optional[Dict]:
+        """Most specific price not older than days_limit - one indexed query"""
+        scopes = LastPurchasePriceService.scope_keys(
+            LastPurchasePriceService._object_key(partner),
+            LastPurchasePriceService._object_key(location)
+        )
+        rows = {
+            row.scope_key: row
+            for row in LastPurchasePrice.objects.for_product(product, [key for _, key in scopes])
+        }
+
+        cutoff = timezone.now().date() - timedelta(days=days_limit)
+        for match_type, key in scopes:
+            row = rows.get(key)
+            if row is not None and row.document_date >= cutoff:
+                return {
+                    'price': row.price,
+                    'date': row.document_date,
+                    'partner': row.partner_name or 'Unknown',
+                    'location': row.location_name or 'Unknown',
+                    'match_type': match_type,
+                    'delivery_ref': row.delivery_number,
+                    'source': 'purchase_history'
+                }
+        return None
+
+    @staticmethod
+    def scope_keys(partner_key: Optional[Tuple[int, int]],
+                   location_key: Optional[Tuple[int, int]]) -> List[Tuple[str, str]]:
+        """(match_type, scope_key) pairs, most specific first"""
+        partner = f"{partner_key[0]}:{partner_key[1]}" if partner_key else None
+        location = f"{location_key[0]}:{location_key[1]}" if location_key else None
+
+        scopes = []
+        if partner and location:
+            scopes.append(('exact', f"{partner}/{location}"))
+        if location:
+            scopes.append(('location', f"{ANY}/{location}"))
+        if partner:
+            scopes.append(('partner', f"{partner}/{ANY}"))
+        scopes.append(('global', f"{ANY}/{ANY}"))
+        return scopes
+
+    # =====================================================
+    # MAINTENANCE
+    # =====================================================
+
+    @staticmethod
+    def record_delivery(delivery: DeliveryReceipt, product_ids: Optional[Iterable[int]] = None) -> int:
+        """Apply the delivery's prices where it is the newest source - returns rows written"""
+        if delivery.status not in LastPurchasePriceService.RECORDED_STATUSES:
+            return 0
+
+        lines = delivery.lines.filter(unit_price__gt=0)
+        if product_ids is not None:
+            lines = lines.filter(product_id__in=list(product_ids))
+
+        prices = {}
+        for product_id, unit_price in lines.order_by('line_number', 'pk').values_list('product_id', 'unit_price'):
+            prices[product_id] = unit_price
+        if not prices:
+            return 0
+
+        source = LastPurchasePriceService._source(
+            delivery.pk, delivery.document_number, delivery.document_date, delivery.created_at,
+            LastPurchasePriceService._object_key_from_ids(
+                delivery.partner_content_type_id, delivery.partner_object_id),
+            LastPurchasePriceService._object_key_from_ids(
+                delivery.location_content_type_id, delivery.location_object_id),
+            partner_name=getattr(delivery.partner, 'name', '') if delivery.partner_object_id else '',
+            location_name=getattr(delivery.location, 'name', '') if delivery.location_object_id else ''
+        )
+        scope_keys = [key for _, key in LastPurchasePriceService.scope_keys(source['partner'], source['location'])]
+
+        with transaction.atomic():
+            existing = {
+                (row.product_id, row.scope_key): row
+                for row in LastPurchasePrice.objects.select_for_update().filter(
+                    product_id__in=list(prices), scope_key__in=scope_keys
+                )
+            }
+
+            to_create, to_update = [], []
+            for product_id, price in prices.items():
+                for scope_key in scope_keys:
+                    row = existing.get((product_id, scope_key))
+                    if row is None:
+                        to_create.append(LastPurchasePriceService._new_row(product_id, scope_key, price, source))
+                    elif LastPurchasePriceService._is_newer(source, row):
+                        LastPurchasePriceService._apply(row, price, source)
+                        to_update.append(row)
+
+            LastPurchasePrice.objects.bulk_create(to_create, batch_size=LastPurchasePriceService.BULK_BATCH_SIZE)
+            if to_update:
+                LastPurchasePrice.objects.bulk_update(
+                    to_update, LastPurchasePriceService.ROW_FIELDS,
+                    batch_size=LastPurchasePriceService.BULK_BATCH_SIZE
+                )
+
+        return len(to_create) + len(to_update)
+
+    @staticmethod
+    def refresh_products(product_ids: Iterable[int]) -> int:
+        """Recompute every row of the given products from the delivery history"""
+        product_ids = set(product_ids)
+        if not product_ids:
+            return 0
+
+        lines = DeliveryLine.objects.filter(
+            product_id__in=product_ids,
+            document__status__in=LastPurchasePriceService.RECORDED_STATUSES,
+            unit_price__gt=0
+        ).order_by(
+            'document__document_date', 'document__created_at', 'document_id', 'line_number', 'pk'
+        ).values_list(
+            'product_id', 'unit_price', 'document_id', 'document__document_number',
+            'document__document_date', 'document__created_at',
+            'document__partner_content_type_id', 'document__partner_object_id',
+            'document__location_content_type_id', 'document__location_object_id'
+        )
+
+        # Ascending order - the newest line of every scope overwrites the older ones
+        latest = {}
+        for (product_id, price, delivery_id, number, document_date, created_at,
+             partner_ct, partner_id, location_ct, location_id) in lines.iterator():
+            partner = LastPurchasePriceService._object_key_from_ids(partner_ct, partner_id)
+            location = LastPurchasePriceService._object_key_from_ids(location_ct, location_id)
+            source = (delivery_id, number, document_date, created_at, partner, location)
+            for _, scope_key in LastPurchasePriceService.scope_keys(partner, location):
+                latest[(product_id, scope_key)] = (price, source)
+
+        names = LastPurchasePriceService._names(
+            {key for _, (_, _, _, _, partner, location) in latest.values() for key in (partner, location) if key}
+        )
+
+        rows = []
+        for (product_id, scope_key), (price, (delivery_id, number, document_date, created_at,
+                                              partner, location)) in latest.items():
+            source = LastPurchasePriceService._source(
+                delivery_id, number, document_date, created_at, partner, location,
+                partner_name=names.get(partner, ''), location_name=names.get(location, '')
+            )
+            rows.append(LastPurchasePriceService._new_row(product_id, scope_key, price, source))
+
+        with transaction.atomic():
+            LastPurchasePrice.objects.filter(product_id__in=product_ids).delete()
+            LastPurchasePrice.objects.bulk_create(rows, batch_size=LastPurchasePriceService.BULK_BATCH_SIZE)
+
+        return len(rows)
+
+    @staticmethod
+    def rebuild() -> Dict:
+        """Recompute the whole table in product chunks"""
+        product_ids = sorted(set(
+            DeliveryLine.objects.filter(
+                document__status__in=LastPurchasePriceService.RECORDED_STATUSES,
+                unit_price__gt=0
+            ).values_list('product_id', flat=True).distinct()
+        ))
+
+        deleted, _ = LastPurchasePrice.objects.exclude(product_id__in=product_ids).delete()
+        rows = 0
+        chunk = LastPurchasePriceService.REBUILD_CHUNK
+        for start in range(0, len(product_ids), chunk):
+            rows += LastPurchasePriceService.refresh_products(product_ids[start:start + chunk])
+
+        logger.info(f"Last purchase prices rebuilt: {len(product_ids)} products, {rows} rows")
+        return {'products': len(product_ids), 'rows': rows, 'deleted': deleted}
+
+    @staticmethod
+    def recorded_products(delivery_id: int) -> List[int]:
+        """Products whose rows currently point at the delivery"""
+        return list(
+            LastPurchasePrice.objects.filter(delivery_id=delivery_id).values_list('product_id', flat=True).distinct()
+        )
+
+    # =====================================================
+    # HELPERS
+    # =====================================================
+
+    @staticmethod
+    def _object_key(obj) -> Optional[Tuple[int, int]]:
+        if obj is None:
+            return None
+        return ContentType.objects.get_for_model(obj.__class__).pk, obj.pk
+
+    @staticmethod
+    def _object_key_from_ids(content_type_id, object_id) -> Optional[Tuple[int, int]]:
+        if content_type_id is None or object_id is None:
+            return None
+        return content_type_id, object_id
+
+    @staticmethod
+    def _source(delivery_id, number, document_date, created_at, partner, location,
+                partner_name='', location_name='') -> Dict:
+        return {
+            'delivery_id': delivery_id,
+            'delivery_number': number or '',
+            'document_date': document_date,
+            'created_at': created_at,
+            'partner': partner,
+            'location': location,
+            'partner_name': partner_name or '',
+            'location_name': location_name or '',
+        }
+
+    @staticmethod
+    def _new_row(product_id, scope_key, price, source) -> LastPurchasePrice:
+        row = LastPurchasePrice(product_id=product_id, scope_key=scope_key)
+        LastPurchasePriceService._apply(row, price, source)
+        return row
+
+    @staticmethod
+    def _apply(row: LastPurchasePrice, price, source: Dict):
+        """Scope rows keep only the partner/location part their key names"""
+        partner_scoped = not row.scope_key.startswith(ANY)
+        location_scoped = not row.scope_key.endswith(ANY)
+        partner = source['partner'] if partner_scoped else None
+        location = source['location'] if location_scoped else None
+
+        row.partner_content_type_id, row.partner_object_id = partner or (None, None)
+        row.location_content_type_id, row.location_object_id = location or (None, None)
+        row.price = price
+        row.document_date = source['document_date']
+        row.document_created_at = source['created_at']
+        row.delivery_id = source['delivery_id']
+        row.delivery_number = source['delivery_number']
+        row.partner_name = source['partner_name']
+        row.location_name = source['location_name']
+        row.updated_at = timezone.now()
+
+    @staticmethod
+    def _is_newer(source: Dict, row: LastPurchasePrice) -> bool:
+        return (source['document_date'], source['created_at'], source['delivery_id']) >= \
+            (row.document_date, row.document_created_at, row.delivery_id)
+
+    @staticmethod
+    def _names(keys) -> Dict[Tuple[int, int], str]:
+        """Display names of partners/locations - one query per content type"""
+        by_type = defaultdict(set)
+        for content_type_id, object_id in keys:
+            by_type[content_type_id].add(object_id)
+
+        names = {}
+        for content_type_id, object_ids in by_type.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model is None:
+                continue
+            for pk, obj in model._default_manager.in_bulk(list(object_ids)).items():
+                names[(content_type_id, pk)] = getattr(obj, 'name', str(obj))
+        return names
+
+
+__all__ = ['LastPurchasePriceService']
@@ -0,0 +1,43 @@
+# purchases/signals.py - LAST PURCHASE PRICE MAINTENANCE
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import DeliveryLine, DeliveryReceipt
+from .services.last_purchase_price import LastPurchasePriceService
+
+
+@receiver(post_save, sender=DeliveryReceipt, dispatch_uid='last_purchase_price_delivery')
+def delivery_saved(sender, instance, **kwargs):
+    """Approved/completed deliveries feed the table; any other status withdraws their prices"""
+    if instance.status in LastPurchasePriceService.RECORDED_STATUSES:
+        LastPurchasePriceService.record_delivery(instance)
+        return
+
+    product_ids = LastPurchasePriceService.recorded_products(instance.pk)
+    if product_ids:
+        LastPurchasePriceService.refresh_products(product_ids)
+
+
+@receiver(pre_delete, sender=DeliveryReceipt, dispatch_uid='last_purchase_price_delivery_pre_delete')
+def delivery_deleting(sender, instance, **kwargs):
+    # Rows cascade with the delivery - remember which products to recompute
+    instance._last_price_product_ids = LastPurchasePriceService.recorded_products(instance.pk)
+
+
+@receiver(post_delete, sender=DeliveryReceipt, dispatch_uid='last_purchase_price_delivery_delete')
+def delivery_deleted(sender, instance, **kwargs):
+    LastPurchasePriceService.refresh_products(getattr(instance, '_last_price_product_ids', []))
+
+
+@receiver(post_save, sender=DeliveryLine, dispatch_uid='last_purchase_price_line')
+def delivery_line_saved(sender, instance, **kwargs):
+    """Lines edited on an already recorded delivery"""
+    if instance.document.status in LastPurchasePriceService.RECORDED_STATUSES:
+        LastPurchasePriceService.record_delivery(instance.document, product_ids=[instance.product_id])
+
+
+@receiver(post_delete, sender=DeliveryLine, dispatch_uid='last_purchase_price_line_delete')
+def delivery_line_deleted(sender, instance, **kwargs):
+    if instance.product_id in LastPurchasePriceService.recorded_products(instance.document_id):
+        LastPurchasePriceService.refresh_products([instance.product_id])
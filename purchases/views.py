@@ -844,18 +844,14 @@ class DeliveryReceiptDetailView(LoginRequiredMixin, PermissionRequiredMixin, Det
         """
         try:
             if delivery.document_type:
-                from nomenclatures.models import DocumentTypeStatus
+                from nomenclatures.services.workflow import WorkflowSpecService
                 
                 # Намери конфигурацията за този статус
-                config = DocumentTypeStatus.objects.filter(
-                    document_type=delivery.document_type,
-                    status__code=delivery.status,
-                    is_active=True
-                ).select_related('status').first()
+                config = WorkflowSpecService.get_status(delivery.document_type, delivery.status)
                 
-                if config and config.status.badge_class:
+                if config and config.badge_class:
                     # Конвертирай Bootstrap → Metronic класове
-                    bootstrap_class = config.status.badge_class
+                    bootstrap_class = config.badge_class
                     metronic_class = self._convert_bootstrap_to_metronic(bootstrap_class)
                     return metronic_class
             